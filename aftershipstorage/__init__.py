@@ -10,7 +10,33 @@ from .services import (
     AiserveClient
 )
 from .base import BaseClient
-from .config import Config, ServiceConfig, AfterDarkAccount
+from .async_client import AsyncAftershipStorage
+from .async_services import (
+    AsyncDarkshipClient,
+    AsyncDarkstorageClient,
+    AsyncShipshackClient,
+    AsyncModels2GoClient,
+    AsyncHostscienceClient,
+    AsyncAiserveClient
+)
+from .async_base import AsyncBaseClient
+from .config import Config, ServiceConfig, AfterDarkAccount, PoolConfig, RetryConfig, TimeoutConfig, CacheConfig, CoalesceConfig, TransferConfig, PresignConfig, CompressionConfig
+from .timeouts import deadline, DeadlineExceeded
+from .fanout import RequestSpec, RequestResult
+from .pagination import Paginator, AsyncPaginator
+from .streaming import ItemStream, AsyncItemStream
+from .codec import JSONCodec, OrjsonCodec
+from .transfer import TransferResult
+from .throttle import TransferController
+from .sync import SyncResult
+from .bulk import ObjectResult, ObjectError
+from .presign import PresignedURL
+from .index import ObjectIndex, RefreshResult
+from .jobs import JobWaiter, JobFailed
+from .metrics import JobMetricsReader, MetricSeries
+from .artifacts import ArtifactCache, CachedArtifact
+from .registry import ModelRegistry, VersionRange, VersionNotFound
+from .batching import InferenceBatcher, AsyncInferenceBatcher, BatchMetrics, InferenceError
 
 __version__ = "0.1.0"
 
@@ -23,7 +49,54 @@ __all__ = [
     "HostscienceClient",
     "AiserveClient",
     "BaseClient",
+    "AsyncAftershipStorage",
+    "AsyncDarkshipClient",
+    "AsyncDarkstorageClient",
+    "AsyncShipshackClient",
+    "AsyncModels2GoClient",
+    "AsyncHostscienceClient",
+    "AsyncAiserveClient",
+    "AsyncBaseClient",
     "Config",
     "ServiceConfig",
     "AfterDarkAccount",
+    "PoolConfig",
+    "RetryConfig",
+    "TimeoutConfig",
+    "CacheConfig",
+    "CoalesceConfig",
+    "TransferConfig",
+    "PresignConfig",
+    "CompressionConfig",
+    "deadline",
+    "DeadlineExceeded",
+    "RequestSpec",
+    "RequestResult",
+    "Paginator",
+    "AsyncPaginator",
+    "ItemStream",
+    "AsyncItemStream",
+    "JSONCodec",
+    "OrjsonCodec",
+    "TransferResult",
+    "TransferController",
+    "SyncResult",
+    "ObjectResult",
+    "ObjectError",
+    "PresignedURL",
+    "ObjectIndex",
+    "RefreshResult",
+    "JobWaiter",
+    "JobFailed",
+    "JobMetricsReader",
+    "MetricSeries",
+    "InferenceBatcher",
+    "AsyncInferenceBatcher",
+    "BatchMetrics",
+    "InferenceError",
+    "ArtifactCache",
+    "CachedArtifact",
+    "ModelRegistry",
+    "VersionRange",
+    "VersionNotFound",
 ]
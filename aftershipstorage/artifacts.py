@@ -0,0 +1,398 @@
+"""Content-addressed on-disk cache of models2go artifacts."""
+import hashlib
+import json
+import mmap
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Optional, Dict, Any, Iterator, List, Tuple
+from urllib.parse import quote
+
+from .checksums import CHECKSUM_ALGORITHM, file_digest, format_checksum
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+    import msvcrt
+
+
+# Environment variable naming the cache directory
+CACHE_DIR_ENV = "MODELS2GO_CACHE_DIR"
+
+# Cache directory when neither an argument nor the environment names one
+DEFAULT_CACHE_DIR = os.path.join("~", ".cache", "aftershipstorage", "models")
+
+# Mark a blob as used at most this often (seconds), so hot hits do not write metadata
+TOUCH_INTERVAL = 60.0
+
+_HEX_RE = re.compile(r"[0-9a-f]+")
+
+
+def parse_digest(digest: str) -> Tuple[str, str]:
+    """
+    Split and validate a ``"<algorithm>:<hex>"`` digest.
+
+    The hex part becomes a file name in the cache, so it must be lowercase
+    hex of exactly the algorithm's digest length.
+
+    Returns:
+        (algorithm, hex digest)
+
+    Raises:
+        ValueError: If the algorithm is unknown or the hex is malformed
+    """
+    algorithm, _, hex_digest = digest.partition(":")
+    if algorithm not in hashlib.algorithms_guaranteed or algorithm.startswith("shake_"):
+        raise ValueError(f"Unsupported digest algorithm in {digest!r}")
+    if len(hex_digest) != hashlib.new(algorithm).digest_size * 2 or not _HEX_RE.fullmatch(hex_digest):
+        raise ValueError(f"Malformed {algorithm} digest {digest!r}")
+    return algorithm, hex_digest
+
+
+def default_cache_dir() -> str:
+    """Cache directory from ``MODELS2GO_CACHE_DIR``, or ``~/.cache/aftershipstorage/models``."""
+    return os.path.expanduser(os.getenv(CACHE_DIR_ENV) or DEFAULT_CACHE_DIR)
+
+
+@contextmanager
+def file_lock(path: str) -> Iterator[None]:
+    """
+    Hold an exclusive advisory lock on a lock file, across processes.
+
+    Args:
+        path: Lock file (created if missing)
+    """
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        else:  # pragma: no cover - Windows
+            msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            else:  # pragma: no cover - Windows
+                os.lseek(fd, 0, os.SEEK_SET)
+                msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+    finally:
+        os.close(fd)
+
+
+@dataclass
+class CachedArtifact:
+    """A model artifact stored in the cache."""
+    model_id: str
+    version: Optional[str]
+    digest: str  # "<algorithm>:<hex>"
+    path: str  # Read-only blob; do not modify
+    size: int
+    hit: bool  # Served from the cache without downloading
+
+    def open(self):
+        """Open the artifact for reading."""
+        return open(self.path, "rb")
+
+    def mmap(self) -> mmap.mmap:
+        """
+        Map the artifact read-only into memory.
+
+        The map supports the buffer protocol, so loaders can read weights
+        without copying (``numpy.frombuffer(mapping, dtype)``,
+        ``memoryview(mapping)``). Close it when done; pages are shared with
+        other processes mapping the same artifact.
+
+        Raises:
+            ValueError: If the artifact is empty (empty files cannot be mapped)
+        """
+        with open(self.path, "rb") as f:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class ArtifactCache:
+    """
+    Local store of downloaded model artifacts, shared by the processes of a host.
+
+    Artifacts are stored once per content digest under ``blobs/``, so
+    versions (or models) with identical weights share a file. A small ref
+    file under ``refs/`` maps a model ID and version to its digest. A
+    redeploy of a pinned version finds its artifact without any request.
+
+    Downloads are verified against the digest before a blob is moved into
+    place, so a blob that exists is complete. Processes fetching the same
+    artifact take a lock on it. One downloads, and the others wait and then
+    use its blob. An interrupted download resumes in the next process.
+
+    With ``max_size``, the least recently used blobs are removed once the
+    cache grows past it. Removing a blob does not disturb a process that
+    still has it open or mapped (POSIX). Blobs used within the last
+    ``TOUCH_INTERVAL`` seconds are never evicted, so a path returned by
+    ``get()`` or ``fetch()`` stays valid for at least that long; open it
+    promptly (an open file or mapping outlives eviction).
+    """
+
+    def __init__(self, root: Optional[str] = None, max_size: Optional[int] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            root: Cache directory (default: ``MODELS2GO_CACHE_DIR``, or
+                ``~/.cache/aftershipstorage/models``)
+            max_size: Bytes of artifacts kept (default: unbounded)
+        """
+        self.root = os.path.abspath(os.path.expanduser(root)) if root else default_cache_dir()
+        self.max_size = max_size
+        for name in ("blobs", "refs", "locks"):
+            os.makedirs(os.path.join(self.root, name), exist_ok=True)
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "downloaded_bytes": 0, "evictions": 0, "evicted_bytes": 0}
+
+    def blob_path(self, digest: str) -> str:
+        """
+        Path of the blob for a ``"<algorithm>:<hex>"`` digest.
+
+        Raises:
+            ValueError: If the digest is malformed (see parse_digest)
+        """
+        algorithm, hex_digest = parse_digest(digest)
+        return os.path.join(self.root, "blobs", algorithm, hex_digest[:2], hex_digest)
+
+    def _ref_path(self, model_id: str, version: Optional[str]) -> str:
+        version = "latest" if version is None else f"v-{version}"
+        return os.path.join(self.root, "refs", quote(model_id, safe=""), quote(version, safe="") + ".json")
+
+    @contextmanager
+    def lock(self, name: str) -> Iterator[None]:
+        """Hold the cross-process lock ``name`` (e.g. a digest)."""
+        with file_lock(os.path.join(self.root, "locks", quote(name, safe="") + ".lock")):
+            yield
+
+    def _count(self, name: str, amount: int = 1):
+        with self._lock:
+            self._stats[name] += amount
+
+    def lookup(self, model_id: str, version: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Get the recorded digest and size of a model version.
+
+        Returns:
+            Ref dictionary (digest, size, stored), or None if not recorded
+        """
+        try:
+            with open(self._ref_path(model_id, version)) as f:
+                ref = json.load(f)
+            parse_digest(ref["digest"])
+            return ref
+        except (FileNotFoundError, ValueError, KeyError, TypeError):
+            return None
+
+    def record(self, model_id: str, version: Optional[str], digest: str, size: int):
+        """Record that a model version has the artifact ``digest``."""
+        path = self._ref_path(model_id, version)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # A temporary name per writer, so processes recording the same ref do not collide
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"digest": digest, "size": size, "stored": time.time()}, f)
+        os.replace(tmp_path, path)
+
+    def get(self, digest: str, verify: bool = False) -> Optional[str]:
+        """
+        Find a stored blob and mark it as recently used.
+
+        Args:
+            digest: ``"<algorithm>:<hex>"``
+            verify: Re-hash the blob and discard it if it does not match
+
+        Returns:
+            Blob path, or None if it is not stored (or failed verification)
+
+        Raises:
+            ValueError: If the digest is malformed
+        """
+        path = self.blob_path(digest)
+        try:
+            modified = os.stat(path).st_mtime
+        except FileNotFoundError:
+            return None
+        if verify:
+            algorithm, _, expected = digest.partition(":")
+            if file_digest(path, algorithm) != expected.lower():
+                self._remove(path)
+                return None
+        now = time.time()
+        if now - modified > TOUCH_INTERVAL:
+            try:
+                # mtime is the LRU clock; atime is unreliable (noatime/relatime mounts)
+                os.utime(path, (now, now))
+            except OSError:
+                pass
+        return path
+
+    def add(self, source: str, digest: Optional[str] = None) -> Tuple[str, str]:
+        """
+        Move a downloaded file into the cache.
+
+        Args:
+            source: File to take over (moved, not copied; same filesystem
+                as the cache for an atomic move)
+            digest: Expected ``"<algorithm>:<hex>"`` (default: the file's sha256)
+
+        Returns:
+            (digest, blob path)
+
+        Raises:
+            ValueError: If the file does not match ``digest``
+        """
+        algorithm, _, expected = (digest or f"{CHECKSUM_ALGORITHM}:").partition(":")
+        actual = file_digest(source, algorithm)
+        if expected and actual != expected.lower():
+            os.remove(source)
+            raise ValueError(f"{algorithm} checksum mismatch for {source}")
+        digest = format_checksum(actual, algorithm)
+        path = self.blob_path(digest)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(source, path)
+        self.evict()
+        return digest, path
+
+    def _remove(self, path: str) -> bool:
+        try:
+            os.remove(path)
+            return True
+        except FileNotFoundError:
+            return False
+        except OSError:  # pragma: no cover - open on Windows
+            return False
+
+    def entries(self) -> List[Tuple[float, int, str]]:
+        """List stored blobs as (last used, size, path), least recently used first."""
+        entries = []
+        for directory, _, names in os.walk(os.path.join(self.root, "blobs")):
+            for name in names:
+                path = os.path.join(directory, name)
+                if name.endswith((".part", ".download-state", ".download")):
+                    continue  # An unfinished download
+                try:
+                    info = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((info.st_mtime, info.st_size, path))
+        entries.sort()
+        return entries
+
+    def size(self) -> int:
+        """Bytes of stored artifacts."""
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self, max_size: Optional[int] = None) -> int:
+        """
+        Remove least recently used blobs until the cache fits.
+
+        Blobs used within the last ``TOUCH_INTERVAL`` seconds are kept, even
+        if the cache stays over its limit until they age.
+
+        Args:
+            max_size: Bytes to keep (default: the cache's max_size; no-op if unset)
+
+        Returns:
+            Bytes removed
+        """
+        max_size = self.max_size if max_size is None else max_size
+        if max_size is None:
+            return 0
+        removed = 0
+        with self.lock("evict"):
+            entries = self.entries()
+            total = sum(size for _, size, _ in entries)
+            # Recently handed out blobs may not have been opened yet (see the class docstring)
+            in_use = time.time() - TOUCH_INTERVAL
+            # Keep the newest blob even if it alone exceeds the limit; it was just fetched
+            for used, size, path in entries[:-1]:
+                if total <= max_size or used >= in_use:
+                    break
+                if self._remove(path):
+                    total -= size
+                    removed += size
+                    self._count("evictions")
+        self._count("evicted_bytes", removed)
+        return removed
+
+    def fetch(self, client, model_id: str, version: Optional[str] = None, verify: bool = False,
+              **download_options) -> CachedArtifact:
+        """
+        Get a model artifact, downloading it only if no stored blob matches.
+
+        A pinned ``version`` already recorded is served without a request.
+        Otherwise ``/v1/models/{id}/download`` is asked for the artifact's
+        digest, and only an unknown digest is downloaded.
+
+        Args:
+            client: Models2GoClient used for the requests
+            model_id: Model ID
+            version: Model version (default: the latest; always checked
+                with the server)
+            verify: Re-hash a stored blob before returning it
+            **download_options: part_size, concurrency and progress for
+                the download
+
+        Returns:
+            CachedArtifact
+
+        Raises:
+            requests.HTTPError: If a request fails
+            ValueError: If the reported digest is malformed, or the download
+                does not match it
+        """
+        if version is not None:
+            ref = self.lookup(model_id, version)
+            if ref is not None:
+                path = self.get(ref["digest"], verify=verify)
+                if path is not None:
+                    self._count("hits")
+                    return CachedArtifact(model_id, version, ref["digest"], path, ref["size"], True)
+
+        params = {"version": version} if version is not None else None
+        info = client.decode_json(client.get(f"/v1/models/{model_id}/download", params=params))
+        digest = format_checksum(info["sha256"].lower()) if info.get("sha256") else None
+        if digest is not None:
+            parse_digest(digest)  # It becomes a file name; reject anything but hex
+        lock_name = digest or f"{model_id}@{version or 'latest'}"
+        with self.lock(lock_name):
+            # Another process may have finished the download while we waited for the lock
+            path = self.get(digest, verify=verify) if digest else None
+            hit = path is not None
+            if not hit:
+                target = self.blob_path(digest) if digest else os.path.join(
+                    self.root, "blobs", quote(lock_name, safe="") + ".download"
+                )
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                result = client._download_artifact(info, target, model_id, checksum=digest, **download_options)
+                self._count("downloaded_bytes", result.size)
+                if digest:
+                    path = target
+                    self.evict()
+                else:
+                    digest, path = self.add(target)
+        self._count("hits" if hit else "misses")
+        size = os.path.getsize(path)
+        ref = self.lookup(model_id, version)
+        if ref is None or ref.get("digest") != digest:
+            self.record(model_id, version, digest, size)
+        return CachedArtifact(model_id, version, digest, path, size, hit)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache counters for this process.
+
+        Returns:
+            Dictionary with hits, misses, downloaded_bytes, evictions and
+            evicted_bytes
+        """
+        with self._lock:
+            return dict(self._stats)
@@ -0,0 +1,566 @@
+"""Async HTTP client for making authenticated requests."""
+import asyncio
+from typing import Optional, Dict, Any, Union, Iterable, AsyncIterator, Tuple
+from urllib.parse import urljoin, urlsplit
+
+from .bodies import Body, RequestBody
+from .cache import ResponseCache, CacheEntry
+from .compression import BodyCompressor, accept_encoding, httpx_decoders, OFFLOAD_SIZE
+from .codec import JSONCodec, get_codec, encode_body
+from .coalesce import AsyncSingleFlight
+from .fanout import RequestResult, arun_requests, DEFAULT_CONCURRENCY
+from .pagination import AsyncPaginator
+from .streaming import AsyncItemStream, make_parser, DEFAULT_CHUNK_SIZE
+from .config import PoolConfig, RetryConfig, TimeoutConfig, CacheConfig, CoalesceConfig, TransferConfig, PresignConfig, CompressionConfig
+from .retry import RetryPolicy
+from .timeouts import TimeoutPolicy
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover - optional dependency
+    httpx = None
+
+
+class AsyncBaseClient:
+    """Async HTTP client with API key authentication, backed by a pooled httpx transport."""
+
+    def __init__(
+        self,
+        base_url: str,
+        api_key: str,
+        api_key_header: str = "X-API-Key",
+        max_connections: int = 1000,
+        max_keepalive_connections: int = 100,
+        pool: Optional[PoolConfig] = None,
+        retry: Optional[RetryConfig] = None,
+        timeouts: Optional[TimeoutConfig] = None,
+        verify_ssl: bool = True,
+        cache: Optional[CacheConfig] = None,
+        coalesce: Optional[CoalesceConfig] = None,
+        codec: Union[str, JSONCodec, None] = "auto",
+        transfer: Optional[TransferConfig] = None,
+        presign: Optional[PresignConfig] = None,
+        compression: Optional[CompressionConfig] = None,
+    ):
+        """
+        Initialize the async base client.
+
+        Args:
+            base_url: Base URL for the API (e.g., "https://api.darkship.io")
+            api_key: API key for authentication
+            api_key_header: Header name for the API key (default: "X-API-Key")
+            max_connections: Maximum number of concurrent connections in the pool
+            max_keepalive_connections: Maximum number of idle connections kept alive
+            pool: Pool settings; when given, ``maxsize`` and ``keepalive_expiry``
+                override max_keepalive_connections and the keep-alive expiry.
+                With ``block``, ``maxsize`` also caps max_connections (further
+                requests wait for a free connection, as with the sync client);
+                otherwise max_connections is raised to at least ``maxsize``
+            retry: Retry policy settings (default: RetryConfig())
+            timeouts: Connect/read timeout settings (default: TimeoutConfig())
+            verify_ssl: Verify SSL certificates
+            cache: Response cache settings; GET responses are only cached when
+                ``cache.enabled`` is set
+            coalesce: Request coalescing settings; identical concurrent requests
+                are only collapsed when ``coalesce.enabled`` is set
+            codec: JSON codec for request and response bodies: a JSONCodec,
+                "json", "orjson", or "auto" for the fastest installed one. The
+                codecs differ on non-JSON values such as datetimes and NaN;
+                see get_codec
+            transfer: Large object upload/download settings (default: TransferConfig())
+            presign: Presigned URL settings (default: PresignConfig())
+            compression: Compression settings; JSON bodies are only compressed,
+                and compressed responses only negotiated, when
+                ``compression.enabled`` is set
+
+        Raises:
+            ImportError: If httpx is not installed
+        """
+        if httpx is None:
+            raise ImportError(
+                "AsyncBaseClient requires httpx. Install with: pip install 'aftershipstorage[async]'"
+            )
+
+        self.base_url = base_url.rstrip('/')
+        self.api_key = api_key
+        self.api_key_header = api_key_header
+
+        keepalive_expiry = 5.0
+        if pool is not None:
+            max_keepalive_connections = pool.maxsize
+            # httpx pools are not per host; maxsize bounds the whole pool
+            max_connections = pool.maxsize if pool.block else max(max_connections, pool.maxsize)
+            if pool.keepalive_expiry is not None:
+                keepalive_expiry = pool.keepalive_expiry
+
+        # The API key is added per request (see _request), so it never
+        # reaches URLs outside base_url such as presigned storage URLs
+        headers = {
+            "Content-Type": "application/json",
+            "User-Agent": "aftershipstorage-python-client/0.1.0",
+        }
+        if compression is not None and compression.enabled:
+            headers["Accept-Encoding"] = accept_encoding(httpx_decoders())
+
+        self.session = httpx.AsyncClient(
+            headers=headers,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry,
+            ),
+            verify=verify_ssl,
+            event_hooks={"request": [self._strip_foreign_credentials]},
+        )
+        self.codec = get_codec(codec)
+        self.transfer_config = transfer or TransferConfig()
+        self.presign_config = presign or PresignConfig()
+        self.compressor = BodyCompressor(compression) if compression is not None and compression.enabled else None
+        self.retry_policy = RetryPolicy(retry)
+        self.timeout_policy = TimeoutPolicy(timeouts)
+        self.response_cache = ResponseCache(cache) if cache is not None and cache.enabled else None
+        self.single_flight = AsyncSingleFlight(coalesce) if coalesce is not None and coalesce.enabled else None
+
+    def is_api_url(self, url: str) -> bool:
+        """Check whether a URL is on the API's own scheme, host and port (the only place the API key is sent)."""
+        return urlsplit(url)[:2] == urlsplit(self.base_url)[:2]
+
+    async def _strip_foreign_credentials(self, request: "httpx.Request"):
+        """Drop the API key from requests leaving the API's origin, including followed redirects."""
+        if not self.is_api_url(str(request.url)):
+            request.headers.pop(self.api_key_header, None)
+
+    def _build_url(self, endpoint: str) -> str:
+        """Build full URL from endpoint."""
+        endpoint = endpoint.lstrip('/')
+        return urljoin(f"{self.base_url}/", endpoint)
+
+    def _full_url(self, url: str, params: Optional[Dict[str, Any]] = None) -> str:
+        """Build the URL including the encoded query string."""
+        if not params:
+            return url
+        return str(httpx.URL(url, params=params))
+
+    async def request(
+        self,
+        method: str,
+        endpoint: str,
+        params: Optional[Dict[str, Any]] = None,
+        data: Optional[Body] = None,
+        json: Any = None,
+        headers: Optional[Dict[str, str]] = None,
+        retry: Optional[bool] = None,
+        cache: Optional[bool] = None,
+        credentials: bool = True,
+        **kwargs
+    ) -> "httpx.Response":
+        """
+        Make an HTTP request.
+
+        Retries, timeouts, the response cache and coalescing follow the same
+        policies as BaseClient.request.
+
+        Args:
+            method: HTTP method (GET, POST, PUT, DELETE, etc.)
+            endpoint: API endpoint path
+            params: Query parameters
+            data: Form fields, or a raw body: bytes or memoryview (sent without
+                copying), a binary file object, or an iterable of byte chunks
+                (sent with chunked transfer encoding)
+            json: JSON body, encoded with the client's codec, or bytes
+                already holding encoded JSON (sent as-is)
+            headers: Additional headers
+            retry: Force retries on (True) or off (False) for this request
+            cache: Set to False to bypass the response cache for this request
+            credentials: Set to False to send the request without the API key
+                (presigned URLs carry their own authorization). URLs outside
+                ``base_url`` never receive the key.
+            **kwargs: Additional arguments to pass to httpx
+
+        Returns:
+            Response object
+
+        Raises:
+            httpx.HTTPStatusError: If the request fails
+            DeadlineExceeded: If the active deadline has passed
+        """
+        if (
+            self.single_flight is not None
+            and self.single_flight.applies_to(method)
+            and not kwargs.get("stream")
+            and data is None
+            and json is None
+        ):
+            key = (
+                method.upper(),
+                self._full_url(self._build_url(endpoint), params),
+                tuple(sorted((headers or {}).items())),
+                credentials,
+            )
+            return await self.single_flight.do(key, lambda: self._request(
+                method, endpoint, params, data, json, headers, retry, cache, credentials, **kwargs
+            ))
+        return await self._request(method, endpoint, params, data, json, headers, retry, cache, credentials, **kwargs)
+
+    async def _request(
+        self,
+        method: str,
+        endpoint: str,
+        params: Optional[Dict[str, Any]],
+        data: Optional[Body],
+        json: Any,
+        headers: Optional[Dict[str, str]],
+        retry: Optional[bool],
+        cache: Optional[bool],
+        credentials: bool,
+        **kwargs
+    ) -> "httpx.Response":
+        """Make a request through the response cache (see request)."""
+        url = self._build_url(endpoint)
+
+        request_headers = {}
+        if credentials and self.is_api_url(url):
+            request_headers[self.api_key_header] = self.api_key
+        if headers:
+            request_headers.update(headers)
+
+        cache_key = None
+        entry = None
+        if (
+            self.response_cache is not None
+            and method.upper() == "GET"
+            and cache is not False
+            and not kwargs.get("stream")
+        ):
+            cache_key = self.response_cache.key(
+                self._full_url(url, params), {**self.session.headers, **request_headers}
+            )
+            entry = self.response_cache.lookup(cache_key)
+            if entry is not None:
+                if entry.is_fresh():
+                    return self._cached_response(entry)
+                request_headers.update(entry.validators())
+
+        plain = None
+        if json is not None:
+            kwargs["content"] = encode_body(self.codec, json)
+            if self.compressor is not None and self.compressor.applies_to(kwargs["content"], request_headers):
+                plain = kwargs["content"]
+                if len(plain) >= OFFLOAD_SIZE:
+                    loop = asyncio.get_running_loop()
+                    kwargs["content"] = await loop.run_in_executor(None, self.compressor.compress, plain)
+                else:
+                    kwargs["content"] = self.compressor.compress(plain)
+                request_headers.update(self.compressor.headers())
+
+        response = await self._send(
+            method, endpoint, url,
+            params=params,
+            data=data,
+            headers=request_headers,
+            retry=retry,
+            **kwargs
+        )
+        if plain is not None and response.status_code == 415:
+            # The server does not accept compressed bodies: resend as-is and stop compressing
+            await response.aclose()
+            self.compressor.rejected = True
+            del request_headers["Content-Encoding"]
+            kwargs["content"] = plain
+            response = await self._send(
+                method, endpoint, url,
+                params=params,
+                data=data,
+                headers=request_headers,
+                retry=retry,
+                **kwargs
+            )
+
+        if cache_key is not None:
+            if response.status_code == 304 and entry is not None:
+                await response.aclose()
+                entry = self.response_cache.revalidated(cache_key, entry, response.headers)
+                return self._cached_response(entry)
+            if response.status_code == 200:
+                self.response_cache.store(
+                    cache_key, response.status_code, response.headers, response.content, str(response.url)
+                )
+        elif self.response_cache is not None and method.upper() != "GET" and response.is_success:
+            # Writes make cached representations of the resource stale
+            self.response_cache.invalidate(url)
+
+        if response.is_error and kwargs.get("stream"):
+            # The caller never gets this response, so release its connection now
+            await response.aclose()
+        response.raise_for_status()
+        return response
+
+    async def _send(
+        self,
+        method: str,
+        endpoint: str,
+        url: str,
+        retry: Optional[bool] = None,
+        **kwargs
+    ) -> "httpx.Response":
+        """Send a request, applying the timeout and retry policies."""
+        explicit_timeout = kwargs.pop("timeout", None)
+        stream = kwargs.pop("stream", False)
+        data = kwargs.pop("data", None)
+        body = None
+        if isinstance(data, dict):
+            kwargs["data"] = data
+        elif data is not None:
+            body = RequestBody(data)
+        headers = kwargs.pop("headers", None) or {}
+        # A generator body cannot be sent twice
+        retryable = self.retry_policy.is_retryable(method, retry) and (body is None or body.replayable)
+        self.retry_policy.budget.deposit()
+        attempt = 0
+        while True:
+            connect, read = self.timeout_policy.resolve(endpoint, explicit_timeout)
+            kwargs["headers"] = headers
+            if body is not None:
+                body.rewind()
+                content = body.for_httpx()
+                kwargs["content"] = content["content"]
+                kwargs["headers"] = {**headers, **content.get("headers", {})}
+            try:
+                if stream:
+                    request = self.session.build_request(
+                        method=method,
+                        url=url,
+                        timeout=httpx.Timeout(read, connect=connect),
+                        **kwargs
+                    )
+                    response = await self.session.send(request, stream=True)
+                else:
+                    response = await self.session.request(
+                        method=method,
+                        url=url,
+                        timeout=httpx.Timeout(read, connect=connect),
+                        **kwargs
+                    )
+            except httpx.TransportError:
+                delay = self.retry_policy.next_delay(attempt) if retryable else None
+                if delay is None:
+                    raise
+            else:
+                if not retryable or response.status_code < 400:
+                    return response
+                delay = self.retry_policy.next_delay(attempt, response)
+                if delay is None:
+                    return response
+                await response.aclose()
+
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def _cached_response(self, entry: CacheEntry) -> "httpx.Response":
+        """Build a response object from a cache entry."""
+        return httpx.Response(
+            entry.status_code,
+            headers=dict(entry.headers),
+            content=entry.content,
+            request=httpx.Request("GET", entry.url),
+        )
+
+    def decode_json(self, response: "httpx.Response") -> Any:
+        """
+        Decode a JSON response body with the client's codec (see BaseClient.decode_json).
+
+        Args:
+            response: Response to decode
+
+        Returns:
+            Decoded body
+        """
+        return self.codec.loads(response.content)
+
+    async def get(self, endpoint: str, params: Optional[Dict[str, Any]] = None, **kwargs) -> "httpx.Response":
+        """Make a GET request."""
+        return await self.request("GET", endpoint, params=params, **kwargs)
+
+    async def post(
+        self,
+        endpoint: str,
+        data: Optional[Body] = None,
+        json: Any = None,
+        **kwargs
+    ) -> "httpx.Response":
+        """Make a POST request."""
+        return await self.request("POST", endpoint, data=data, json=json, **kwargs)
+
+    async def put(
+        self,
+        endpoint: str,
+        data: Optional[Body] = None,
+        json: Any = None,
+        **kwargs
+    ) -> "httpx.Response":
+        """Make a PUT request."""
+        return await self.request("PUT", endpoint, data=data, json=json, **kwargs)
+
+    async def patch(
+        self,
+        endpoint: str,
+        data: Optional[Body] = None,
+        json: Any = None,
+        **kwargs
+    ) -> "httpx.Response":
+        """Make a PATCH request."""
+        return await self.request("PATCH", endpoint, data=data, json=json, **kwargs)
+
+    async def delete(self, endpoint: str, **kwargs) -> "httpx.Response":
+        """Make a DELETE request."""
+        return await self.request("DELETE", endpoint, **kwargs)
+
+    def map(
+        self,
+        specs: Iterable[Any],
+        concurrency: int = DEFAULT_CONCURRENCY,
+        ordered: bool = True,
+    ) -> AsyncIterator[RequestResult]:
+        """
+        Run many requests with bounded concurrency.
+
+        Args:
+            specs: Request specs (see BaseClient.map)
+            concurrency: Maximum requests in flight
+            ordered: Yield results in input order (True) or as they complete (False)
+
+        Returns:
+            Async iterator of RequestResult; failures are captured in ``result.error``
+
+        Example:
+            async for result in client.map(f"/v1/shipments/{n}" for n in tracking_numbers):
+                ...
+        """
+        return arun_requests(
+            specs,
+            lambda spec: self.request(spec.method, spec.endpoint, **spec.kwargs),
+            concurrency=concurrency,
+            ordered=ordered,
+        )
+
+    def paginate(
+        self,
+        endpoint: str,
+        params: Optional[Dict[str, Any]] = None,
+        style: str = "auto",
+        page_size: int = 100,
+        items_key: Union[str, Tuple[str, ...], None] = None,
+        prefetch: int = 1,
+        max_items: Optional[int] = None,
+        **kwargs
+    ) -> AsyncPaginator:
+        """
+        Iterate lazily over every item of a paginated listing endpoint.
+
+        Args:
+            endpoint: Listing endpoint path
+            params: Additional query parameters
+            style: "offset", "cursor", "link" or "auto" (see BaseClient.paginate)
+            page_size: Items requested per page
+            items_key: Body key holding the items (default: auto-detect), or
+                a tuple of keys whose lists are joined
+            prefetch: Pages fetched ahead of the one being consumed (0 disables prefetch)
+            max_items: Stop after this many items
+            **kwargs: Additional AsyncPaginator options or arguments for each GET
+
+        Returns:
+            Async iterable of items
+
+        Example:
+            async for shipment in client.paginate("/v1/shipments"):
+                ...
+        """
+        return AsyncPaginator(
+            self,
+            endpoint,
+            params=params,
+            style=style,
+            page_size=page_size,
+            items_key=items_key,
+            prefetch=prefetch,
+            max_items=max_items,
+            **kwargs
+        )
+
+    async def stream_items(
+        self,
+        endpoint: str,
+        params: Optional[Dict[str, Any]] = None,
+        items_key: Optional[str] = None,
+        format: str = "auto",
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        **kwargs
+    ) -> AsyncItemStream:
+        """
+        Stream the items of a large list response without loading the whole body.
+
+        Args:
+            endpoint: API endpoint path
+            params: Query parameters
+            items_key: Object field holding the array (default: auto-detect)
+            format: "json", "ndjson", "sse", or "auto" (see BaseClient.stream_items)
+            chunk_size: Bytes read from the socket at a time
+            **kwargs: Additional arguments to pass to request
+
+        Returns:
+            Async iterable of items
+
+        Example:
+            async with await client.stream_items("/v1/buckets/ml-models/objects") as objects:
+                async for obj in objects:
+                    ...
+        """
+        method = kwargs.pop("method", "GET")
+        response = await self.request(method, endpoint, params=params, stream=True, **kwargs)
+        parser = make_parser(format, response.headers.get("Content-Type"), items_key, self.codec)
+        return AsyncItemStream(response, parser, chunk_size)
+
+    def retry_stats(self) -> Dict[str, Any]:
+        """
+        Get retry counters.
+
+        Returns:
+            Dictionary of retry counters (see RetryPolicy.stats)
+        """
+        return self.retry_policy.stats()
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """
+        Get response cache counters.
+
+        Returns:
+            Dictionary of cache counters (see ResponseCache.stats), empty if
+            the cache is disabled
+        """
+        if self.response_cache is None:
+            return {}
+        return self.response_cache.stats()
+
+    def coalesce_stats(self) -> Dict[str, Any]:
+        """
+        Get request coalescing counters.
+
+        Returns:
+            Dictionary of coalescing counters (see AsyncSingleFlight.stats),
+            empty if coalescing is disabled
+        """
+        if self.single_flight is None:
+            return {}
+        return self.single_flight.stats()
+
+    async def close(self):
+        """Close the session."""
+        await self.session.aclose()
+
+    async def __aenter__(self):
+        """Async context manager entry."""
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """Async context manager exit."""
+        await self.close()
@@ -0,0 +1,88 @@
+"""Async AftershipStorage meta client."""
+from typing import Any, Iterable, AsyncIterator
+
+from .async_services import (
+    AsyncDarkshipClient,
+    AsyncDarkstorageClient,
+    AsyncShipshackClient,
+    AsyncModels2GoClient,
+    AsyncHostscienceClient,
+    AsyncAiserveClient
+)
+from .client import AftershipStorage
+from .fanout import RequestResult, arun_requests, DEFAULT_CONCURRENCY
+
+
+class AsyncAftershipStorage(AftershipStorage):
+    """
+    Async meta client for managing multiple aftership storage services.
+
+    Accepts the same arguments and factory methods (``from_env``,
+    ``from_config``) as :class:`AftershipStorage`, but every service client
+    is an :class:`AsyncBaseClient` whose request methods must be awaited.
+
+    Example:
+        async with AsyncAftershipStorage.from_env() as client:
+            response = await client.darkship.get("/v1/shipments")
+    """
+
+    darkship_client_class = AsyncDarkshipClient
+    darkstorage_client_class = AsyncDarkstorageClient
+    shipshack_client_class = AsyncShipshackClient
+    models2go_client_class = AsyncModels2GoClient
+    hostscience_client_class = AsyncHostscienceClient
+    aiserve_client_class = AsyncAiserveClient
+
+    def gather(
+        self,
+        specs: Iterable[Any],
+        concurrency: int = DEFAULT_CONCURRENCY,
+        ordered: bool = True,
+    ) -> AsyncIterator[RequestResult]:
+        """
+        Run many requests across services concurrently.
+
+        Args:
+            specs: Request specs naming their service (see AftershipStorage.gather)
+            concurrency: Maximum requests in flight across all services
+            ordered: Yield results in input order (True) or as they complete (False)
+
+        Returns:
+            Async iterator of RequestResult; failures are captured in ``result.error``
+        """
+        return arun_requests(
+            specs,
+            lambda spec: self._service_client(spec).request(spec.method, spec.endpoint, **spec.kwargs),
+            concurrency=concurrency,
+            ordered=ordered,
+            coerce=self._service_spec,
+        )
+
+    async def close_all(self):
+        """Close all active client sessions."""
+        for client in [
+            self._darkship,
+            self._darkstorage,
+            self._shipshack,
+            self._models2go,
+            self._hostscience,
+            self._aiserve
+        ]:
+            if client:
+                await client.close()
+
+    def __enter__(self):
+        """Reject synchronous context manager use."""
+        raise TypeError("AsyncAftershipStorage must be used with 'async with'")
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Reject synchronous context manager use."""
+        raise TypeError("AsyncAftershipStorage must be used with 'async with'")
+
+    async def __aenter__(self):
+        """Async context manager entry."""
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """Async context manager exit."""
+        await self.close_all()
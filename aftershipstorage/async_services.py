@@ -0,0 +1,94 @@
+"""Async service clients for each platform."""
+from typing import Any, Dict
+
+from .async_base import AsyncBaseClient
+from .batching import AsyncInferenceBatcher
+
+
+class AsyncDarkshipClient(AsyncBaseClient):
+    """Async client for darkship.io API."""
+
+    def __init__(self, api_key: str, base_url: str = "https://api.darkship.io", **kwargs):
+        """Initialize async Darkship client."""
+        super().__init__(base_url=base_url, api_key=api_key, **kwargs)
+
+
+class AsyncDarkstorageClient(AsyncBaseClient):
+    """Async client for darkstorage.io API."""
+
+    def __init__(self, api_key: str, base_url: str = "https://api.darkstorage.io", **kwargs):
+        """Initialize async Darkstorage client."""
+        super().__init__(base_url=base_url, api_key=api_key, **kwargs)
+
+
+class AsyncShipshackClient(AsyncBaseClient):
+    """Async client for shipshack.io API."""
+
+    def __init__(self, api_key: str, base_url: str = "https://api.shipshack.io", **kwargs):
+        """Initialize async Shipshack client."""
+        super().__init__(base_url=base_url, api_key=api_key, **kwargs)
+
+
+class AsyncModels2GoClient(AsyncBaseClient):
+    """Async client for models2go.com API."""
+
+    def __init__(self, api_key: str, base_url: str = "https://api.models2go.com", **kwargs):
+        """Initialize async Models2Go client."""
+        super().__init__(base_url=base_url, api_key=api_key, **kwargs)
+
+
+class AsyncHostscienceClient(AsyncBaseClient):
+    """Async client for hostscience.io API."""
+
+    def __init__(self, api_key: str, base_url: str = "https://api.hostscience.io", **kwargs):
+        """Initialize async Hostscience client."""
+        super().__init__(base_url=base_url, api_key=api_key, **kwargs)
+
+
+class AsyncAiserveClient(AsyncBaseClient):
+    """Async client for aiserve.farm API."""
+
+    def __init__(self, api_key: str, base_url: str = "https://api.aiserve.farm", **kwargs):
+        """Initialize async Aiserve client."""
+        super().__init__(base_url=base_url, api_key=api_key, **kwargs)
+        self._batchers: Dict[str, AsyncInferenceBatcher] = {}
+
+    def inference_batcher(self, endpoint_id: str, **kwargs) -> AsyncInferenceBatcher:
+        """
+        Get the batcher used by predict() for an inference endpoint (created on first use).
+
+        Args:
+            endpoint_id: Inference endpoint ID
+            **kwargs: AsyncInferenceBatcher settings, applied when the
+                batcher is created
+
+        Returns:
+            AsyncInferenceBatcher shared by all callers of this endpoint
+        """
+        batcher = self._batchers.get(endpoint_id)
+        if batcher is None:
+            batcher = self._batchers[endpoint_id] = AsyncInferenceBatcher(self, endpoint_id, **kwargs)
+        return batcher
+
+    async def predict(self, endpoint_id: str, input: Any) -> Any:
+        """
+        Run inference on one input, batched with concurrent calls to the same endpoint.
+
+        Args:
+            endpoint_id: Inference endpoint ID
+            input: Model input
+
+        Returns:
+            The input's result
+
+        Example:
+            results = await asyncio.gather(*(client.predict(endpoint_id, x) for x in inputs))
+        """
+        return await self.inference_batcher(endpoint_id).predict(input)
+
+    async def close(self):
+        """Send queued predictions and close the client."""
+        batchers, self._batchers = list(self._batchers.values()), {}
+        for batcher in batchers:
+            await batcher.close()
+        await super().close()
@@ -1,13 +1,60 @@
 """Base HTTP client for making authenticated requests."""
+import time
 import requests
-from typing import Optional, Dict, Any, Union
-from urllib.parse import urljoin
+from concurrent.futures import Executor
+from typing import Optional, Dict, Any, Union, Iterable, Iterator, Tuple
+from urllib.parse import urljoin, urlsplit
+
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from .bodies import Body, RequestBody
+from .cache import ResponseCache, CacheEntry
+from .compression import BodyCompressor, accept_encoding, requests_decoders
+from .codec import JSONCodec, get_codec, encode_body
+from .coalesce import SingleFlight
+from .fanout import RequestResult, run_requests, DEFAULT_CONCURRENCY
+from .pagination import Paginator
+from .streaming import ItemStream, make_parser, DEFAULT_CHUNK_SIZE
+from .config import PoolConfig, RetryConfig, TimeoutConfig, CacheConfig, CoalesceConfig, TransferConfig, PresignConfig, CompressionConfig
+from .pool import PooledHTTPAdapter
+from .retry import RetryPolicy
+from .throttle import TransferController
+from .timeouts import TimeoutPolicy
+
+
+class CredentialSession(requests.Session):
+    """Session that drops the API key header when a redirect leaves the original host."""
+
+    credential_headers: Iterable[str] = ()
+
+    def rebuild_auth(self, prepared_request, response):
+        """Strip credentials on cross-host redirects (requests only strips Authorization itself)."""
+        super().rebuild_auth(prepared_request, response)
+        if self.should_strip_auth(response.request.url, prepared_request.url):
+            for name in self.credential_headers:
+                prepared_request.headers.pop(name, None)
 
 
 class BaseClient:
     """Base HTTP client with API key authentication."""
 
-    def __init__(self, base_url: str, api_key: str, api_key_header: str = "X-API-Key"):
+    def __init__(
+        self,
+        base_url: str,
+        api_key: str,
+        api_key_header: str = "X-API-Key",
+        pool: Optional[PoolConfig] = None,
+        retry: Optional[RetryConfig] = None,
+        timeouts: Optional[TimeoutConfig] = None,
+        verify_ssl: bool = True,
+        cache: Optional[CacheConfig] = None,
+        coalesce: Optional[CoalesceConfig] = None,
+        codec: Union[str, JSONCodec, None] = "auto",
+        transfer: Optional[TransferConfig] = None,
+        presign: Optional[PresignConfig] = None,
+        compression: Optional[CompressionConfig] = None,
+    ):
         """
         Initialize the base client.
 
@@ -15,42 +62,104 @@ class BaseClient:
             base_url: Base URL for the API (e.g., "https://api.darkship.io")
             api_key: API key for authentication
             api_key_header: Header name for the API key (default: "X-API-Key")
+            pool: Connection pool and keep-alive settings (default: PoolConfig())
+            retry: Retry policy settings (default: RetryConfig())
+            timeouts: Connect/read timeout settings (default: TimeoutConfig())
+            verify_ssl: Verify SSL certificates
+            cache: Response cache settings; GET responses are only cached when
+                ``cache.enabled`` is set
+            coalesce: Request coalescing settings; identical concurrent requests
+                are only collapsed when ``coalesce.enabled`` is set
+            codec: JSON codec for request and response bodies: a JSONCodec,
+                "json", "orjson", or "auto" for the fastest installed one. The
+                codecs differ on non-JSON values such as datetimes and NaN;
+                see get_codec
+            transfer: Large object upload/download settings (default: TransferConfig())
+            presign: Presigned URL settings (default: PresignConfig())
+            compression: Compression settings; JSON bodies are only compressed,
+                and compressed responses only negotiated, when
+                ``compression.enabled`` is set
         """
         self.base_url = base_url.rstrip('/')
         self.api_key = api_key
         self.api_key_header = api_key_header
-        self.session = requests.Session()
+        self.session = CredentialSession()
+        self.session.credential_headers = (self.api_key_header,)
+        self.session.verify = verify_ssl
         self.session.headers.update({
             self.api_key_header: self.api_key,
             "Content-Type": "application/json",
-            "User-Agent": "aftershipstorage-python-client/0.1.0"
+            "User-Agent": "aftershipstorage-python-client/0.1.0",
         })
+        if compression is not None and compression.enabled:
+            self.session.headers["Accept-Encoding"] = accept_encoding(requests_decoders())
+        self.adapter = PooledHTTPAdapter(pool)
+        self.session.mount("https://", self.adapter)
+        self.session.mount("http://", self.adapter)
+        self.codec = get_codec(codec)
+        self.transfer_config = transfer or TransferConfig()
+        self.transfer_controller = TransferController(self.transfer_config)
+        self.presign_config = presign or PresignConfig()
+        self.compressor = BodyCompressor(compression) if compression is not None and compression.enabled else None
+        self.retry_policy = RetryPolicy(retry)
+        self.timeout_policy = TimeoutPolicy(timeouts)
+        self.response_cache = ResponseCache(cache) if cache is not None and cache.enabled else None
+        self.single_flight = SingleFlight(coalesce) if coalesce is not None and coalesce.enabled else None
 
     def _build_url(self, endpoint: str) -> str:
         """Build full URL from endpoint."""
         endpoint = endpoint.lstrip('/')
         return urljoin(f"{self.base_url}/", endpoint)
 
+    def _full_url(self, url: str, params: Optional[Dict[str, Any]] = None) -> str:
+        """Build the URL including the encoded query string."""
+        if not params:
+            return url
+        return requests.Request("GET", url, params=params).prepare().url
+
+    def is_api_url(self, url: str) -> bool:
+        """Check whether a URL is on the API's own scheme, host and port (the only place the API key is sent)."""
+        return urlsplit(url)[:2] == urlsplit(self.base_url)[:2]
+
     def request(
         self,
         method: str,
         endpoint: str,
         params: Optional[Dict[str, Any]] = None,
-        data: Optional[Dict[str, Any]] = None,
-        json: Optional[Dict[str, Any]] = None,
+        data: Optional[Body] = None,
+        json: Any = None,
         headers: Optional[Dict[str, str]] = None,
+        retry: Optional[bool] = None,
+        cache: Optional[bool] = None,
+        credentials: bool = True,
         **kwargs
     ) -> requests.Response:
         """
         Make an HTTP request.
 
+        Idempotent methods are retried on connection errors and retryable
+        status codes (see RetryConfig); pass ``retry=True`` to opt a POST in.
+        Timeouts come from the client's TimeoutConfig unless ``timeout`` is
+        passed, and are capped by any active ``deadline``. When the response
+        cache is enabled, GET responses are served from and revalidated
+        against it. When coalescing is enabled, concurrent identical GETs
+        share one in-flight request and all callers receive its response.
+
         Args:
             method: HTTP method (GET, POST, PUT, DELETE, etc.)
             endpoint: API endpoint path
             params: Query parameters
-            data: Form data
-            json: JSON body
+            data: Form fields, or a raw body: bytes or memoryview (sent without
+                copying), a binary file object, or an iterable of byte chunks
+                (sent with chunked transfer encoding)
+            json: JSON body, encoded with the client's codec, or bytes
+                already holding encoded JSON (sent as-is)
             headers: Additional headers
+            retry: Force retries on (True) or off (False) for this request
+            cache: Set to False to bypass the response cache for this request
+            credentials: Set to False to send the request without the API key
+                (presigned URLs carry their own authorization). URLs outside
+                ``base_url`` never receive the key.
             **kwargs: Additional arguments to pass to requests
 
         Returns:
@@ -58,26 +167,177 @@ class BaseClient:
 
         Raises:
             requests.HTTPError: If the request fails
+            DeadlineExceeded: If the active deadline has passed
         """
+        if (
+            self.single_flight is not None
+            and self.single_flight.applies_to(method)
+            and not kwargs.get("stream")
+            and data is None
+            and json is None
+        ):
+            key = (
+                method.upper(),
+                self._full_url(self._build_url(endpoint), params),
+                tuple(sorted((headers or {}).items())),
+                credentials,
+            )
+            return self.single_flight.do(key, lambda: self._request(
+                method, endpoint, params, data, json, headers, retry, cache, credentials, **kwargs
+            ))
+        return self._request(method, endpoint, params, data, json, headers, retry, cache, credentials, **kwargs)
+
+    def _request(
+        self,
+        method: str,
+        endpoint: str,
+        params: Optional[Dict[str, Any]],
+        data: Optional[Body],
+        json: Any,
+        headers: Optional[Dict[str, str]],
+        retry: Optional[bool],
+        cache: Optional[bool],
+        credentials: bool,
+        **kwargs
+    ) -> requests.Response:
+        """Make a request through the response cache (see request)."""
         url = self._build_url(endpoint)
 
         request_headers = {}
         if headers:
             request_headers.update(headers)
+        if not credentials or not self.is_api_url(url):
+            # None removes the session's API key header from this request
+            request_headers[self.api_key_header] = None
+
+        cache_key = None
+        entry = None
+        if (
+            self.response_cache is not None
+            and method.upper() == "GET"
+            and cache is not False
+            and not kwargs.get("stream")
+        ):
+            cache_key = self.response_cache.key(
+                self._full_url(url, params), {**self.session.headers, **request_headers}
+            )
+            entry = self.response_cache.lookup(cache_key)
+            if entry is not None:
+                if entry.is_fresh():
+                    return self._cached_response(entry)
+                request_headers.update(entry.validators())
 
-        response = self.session.request(
-            method=method,
-            url=url,
+        plain = None
+        if json is not None:
+            data = encode_body(self.codec, json)
+            if self.compressor is not None and self.compressor.applies_to(data, request_headers):
+                plain, data = data, self.compressor.compress(data)
+                request_headers.update(self.compressor.headers())
+
+        response = self._send(
+            method, endpoint, url,
             params=params,
             data=data,
-            json=json,
             headers=request_headers,
+            retry=retry,
             **kwargs
         )
+        if plain is not None and response.status_code == 415:
+            # The server does not accept compressed bodies: resend as-is and stop compressing
+            response.close()
+            self.compressor.rejected = True
+            del request_headers["Content-Encoding"]
+            response = self._send(
+                method, endpoint, url,
+                params=params,
+                data=plain,
+                headers=request_headers,
+                retry=retry,
+                **kwargs
+            )
+
+        if cache_key is not None:
+            if response.status_code == 304 and entry is not None:
+                response.close()
+                entry = self.response_cache.revalidated(cache_key, entry, response.headers)
+                return self._cached_response(entry)
+            if response.status_code == 200:
+                self.response_cache.store(
+                    cache_key, response.status_code, response.headers, response.content, response.url
+                )
+        elif self.response_cache is not None and method.upper() != "GET" and response.ok:
+            # Writes make cached representations of the resource stale
+            self.response_cache.invalidate(url)
 
+        if not response.ok and kwargs.get("stream"):
+            # The caller never gets this response, so release its connection now
+            response.close()
         response.raise_for_status()
         return response
 
+    def _send(
+        self,
+        method: str,
+        endpoint: str,
+        url: str,
+        retry: Optional[bool] = None,
+        **kwargs
+    ) -> requests.Response:
+        """Send a request, applying the timeout and retry policies."""
+        explicit_timeout = kwargs.pop("timeout", None)
+        body = RequestBody(kwargs.get("data"))
+        kwargs["data"] = body.data
+        # A generator body cannot be sent twice
+        retryable = self.retry_policy.is_retryable(method, retry) and body.replayable
+        self.retry_policy.budget.deposit()
+        attempt = 0
+        while True:
+            timeout = self.timeout_policy.resolve(endpoint, explicit_timeout)
+            try:
+                response = self.session.request(method=method, url=url, timeout=timeout, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                delay = self.retry_policy.next_delay(attempt) if retryable else None
+                if delay is None:
+                    raise
+            else:
+                if not retryable or response.status_code < 400:
+                    return response
+                delay = self.retry_policy.next_delay(attempt, response)
+                if delay is None:
+                    return response
+                response.close()
+
+            time.sleep(delay)
+            attempt += 1
+            body.rewind()
+
+    def _cached_response(self, entry: CacheEntry) -> requests.Response:
+        """Build a response object from a cache entry."""
+        response = requests.Response()
+        response.status_code = entry.status_code
+        response.reason = "OK"
+        response.headers = CaseInsensitiveDict(entry.headers)
+        response.url = entry.url
+        response.encoding = get_encoding_from_headers(response.headers)
+        response._content = entry.content
+        response.from_cache = True
+        return response
+
+    def decode_json(self, response: requests.Response) -> Any:
+        """
+        Decode a JSON response body with the client's codec.
+
+        Faster than ``response.json()`` when a fast codec is installed, and
+        decodes the raw bytes without building an intermediate ``str``.
+
+        Args:
+            response: Response to decode
+
+        Returns:
+            Decoded body
+        """
+        return self.codec.loads(response.content)
+
     def get(self, endpoint: str, params: Optional[Dict[str, Any]] = None, **kwargs) -> requests.Response:
         """Make a GET request."""
         return self.request("GET", endpoint, params=params, **kwargs)
@@ -85,8 +345,8 @@ class BaseClient:
     def post(
         self,
         endpoint: str,
-        data: Optional[Dict[str, Any]] = None,
-        json: Optional[Dict[str, Any]] = None,
+        data: Optional[Body] = None,
+        json: Any = None,
         **kwargs
     ) -> requests.Response:
         """Make a POST request."""
@@ -95,8 +355,8 @@ class BaseClient:
     def put(
         self,
         endpoint: str,
-        data: Optional[Dict[str, Any]] = None,
-        json: Optional[Dict[str, Any]] = None,
+        data: Optional[Body] = None,
+        json: Any = None,
         **kwargs
     ) -> requests.Response:
         """Make a PUT request."""
@@ -105,8 +365,8 @@ class BaseClient:
     def patch(
         self,
         endpoint: str,
-        data: Optional[Dict[str, Any]] = None,
-        json: Optional[Dict[str, Any]] = None,
+        data: Optional[Body] = None,
+        json: Any = None,
         **kwargs
     ) -> requests.Response:
         """Make a PATCH request."""
@@ -116,6 +376,183 @@ class BaseClient:
         """Make a DELETE request."""
         return self.request("DELETE", endpoint, **kwargs)
 
+    def map(
+        self,
+        specs: Iterable[Any],
+        concurrency: int = DEFAULT_CONCURRENCY,
+        ordered: bool = True,
+        executor: Optional[Executor] = None,
+    ) -> Iterator[RequestResult]:
+        """
+        Run many requests with bounded concurrency.
+
+        Args:
+            specs: Request specs: endpoint strings (GET), ``(method, endpoint[, kwargs])``
+                tuples, dicts or RequestSpec objects
+            concurrency: Maximum requests in flight
+            ordered: Yield results in input order (True) or as they complete (False)
+            executor: Worker pool to run requests on (default: a pool created for this call)
+
+        Yields:
+            RequestResult per spec; failures are captured in ``result.error``
+
+        Example:
+            for result in client.map(f"/v1/shipments/{n}" for n in tracking_numbers):
+                if result.ok:
+                    print(result.response.json())
+        """
+        return run_requests(
+            specs,
+            lambda spec: self.request(spec.method, spec.endpoint, **spec.kwargs),
+            concurrency=concurrency,
+            ordered=ordered,
+            executor=executor,
+        )
+
+    def paginate(
+        self,
+        endpoint: str,
+        params: Optional[Dict[str, Any]] = None,
+        style: str = "auto",
+        page_size: int = 100,
+        items_key: Union[str, Tuple[str, ...], None] = None,
+        prefetch: int = 1,
+        max_items: Optional[int] = None,
+        **kwargs
+    ) -> Paginator:
+        """
+        Iterate lazily over every item of a paginated listing endpoint.
+
+        The next page is fetched in the background while the current one is
+        consumed, and pages are never accumulated in memory.
+
+        Args:
+            endpoint: Listing endpoint path
+            params: Additional query parameters
+            style: "offset", "cursor", "link" (Link header) or "auto" to detect
+                from the first page
+            page_size: Items requested per page
+            items_key: Body key holding the items (default: auto-detect), or
+                a tuple of keys whose lists are joined
+            prefetch: Pages fetched ahead of the one being consumed (0 disables prefetch)
+            max_items: Stop after this many items
+            **kwargs: Additional Paginator options (cursor_key, cursor_param,
+                limit_param, offset_param) or arguments for each GET
+
+        Returns:
+            Iterable of items
+
+        Example:
+            for shipment in client.paginate("/v1/shipments", params={"status": "in_transit"}):
+                print(shipment["tracking_number"])
+        """
+        return Paginator(
+            self,
+            endpoint,
+            params=params,
+            style=style,
+            page_size=page_size,
+            items_key=items_key,
+            prefetch=prefetch,
+            max_items=max_items,
+            **kwargs
+        )
+
+    def stream_items(
+        self,
+        endpoint: str,
+        params: Optional[Dict[str, Any]] = None,
+        items_key: Optional[str] = None,
+        format: str = "auto",
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        **kwargs
+    ) -> ItemStream:
+        """
+        Stream the items of a large list response without loading the whole body.
+
+        The body is read incrementally and decoded one item at a time, so
+        peak memory is proportional to a single item. Supports a top-level
+        JSON array, an array field of a top-level object, NDJSON, and
+        server-sent events with JSON data.
+
+        Args:
+            endpoint: API endpoint path
+            params: Query parameters
+            items_key: Object field holding the array (default: auto-detect)
+            format: "json", "ndjson", "sse", or "auto" to choose from the Content-Type
+            chunk_size: Bytes read from the socket at a time
+            **kwargs: Additional arguments to pass to request
+
+        Returns:
+            Iterable of items; ``metadata`` holds the other top-level fields
+            once iteration has finished
+
+        Raises:
+            requests.HTTPError: If the request fails
+            ValueError: If the body is malformed or has no item array
+
+        Example:
+            with client.stream_items("/v1/buckets/ml-models/objects") as objects:
+                for obj in objects:
+                    print(obj["key"])
+        """
+        method = kwargs.pop("method", "GET")
+        response = self.request(method, endpoint, params=params, stream=True, **kwargs)
+        parser = make_parser(format, response.headers.get("Content-Type"), items_key, self.codec)
+        return ItemStream(response, parser, chunk_size)
+
+    def pool_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get connection pool usage counters per host.
+
+        Returns:
+            Mapping of host to counters (see PooledHTTPAdapter.stats)
+        """
+        return self.adapter.stats()
+
+    def retry_stats(self) -> Dict[str, Any]:
+        """
+        Get retry counters.
+
+        Returns:
+            Dictionary of retry counters (see RetryPolicy.stats)
+        """
+        return self.retry_policy.stats()
+
+    def transfer_stats(self) -> Dict[str, Any]:
+        """
+        Get live metrics of this client's file transfers.
+
+        Returns:
+            Dictionary of in-flight requests, concurrency limit, throughput
+            and backoffs (see TransferController.stats)
+        """
+        return self.transfer_controller.stats()
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """
+        Get response cache counters.
+
+        Returns:
+            Dictionary of cache counters (see ResponseCache.stats), empty if
+            the cache is disabled
+        """
+        if self.response_cache is None:
+            return {}
+        return self.response_cache.stats()
+
+    def coalesce_stats(self) -> Dict[str, Any]:
+        """
+        Get request coalescing counters.
+
+        Returns:
+            Dictionary of coalescing counters (see SingleFlight.stats), empty
+            if coalescing is disabled
+        """
+        if self.single_flight is None:
+            return {}
+        return self.single_flight.stats()
+
     def close(self):
         """Close the session."""
         self.session.close()
@@ -0,0 +1,451 @@
+"""Client-side micro-batching of aiserve inference calls."""
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, InvalidStateError
+from dataclasses import dataclass
+from typing import Optional, Dict, Any, List, Callable, Iterable
+
+
+# Response fields holding the per-input results, in order
+OUTPUT_KEYS = ("outputs", "predictions", "results", "data")
+
+# stats() counter for each reason a batch was sent
+FLUSH_COUNTERS = {"size": "full_batches", "latency": "latency_flushes", "close": "close_flushes"}
+
+# Batches kept for latency percentiles in stats()
+RECENT_BATCHES = 1024
+
+
+class InferenceError(Exception):
+    """The batch endpoint returned an error for one input."""
+
+    def __init__(self, endpoint_id: str, index: int, detail: Any):
+        super().__init__(f"Inference on endpoint {endpoint_id} failed for input {index}: {detail}")
+        self.endpoint_id = endpoint_id
+        self.index = index
+        self.detail = detail
+
+
+@dataclass
+class BatchMetrics:
+    """Timing of one batch request."""
+    size: int
+    reason: str  # "size" (batch filled), "latency" (window expired) or "close"
+    wait: float  # Seconds the oldest input queued before the batch was sent
+    latency: float  # Seconds the batch request took
+    error: Optional[BaseException] = None
+
+
+@dataclass
+class _Pending:
+    """One queued predict() call."""
+    input: Any
+    future: Any
+    enqueued: float
+
+
+def _outputs(body: Any) -> Optional[List[Any]]:
+    """Find the per-input results in a batch response."""
+    if isinstance(body, list):
+        return body
+    if isinstance(body, dict):
+        for key in OUTPUT_KEYS:
+            if isinstance(body.get(key), list):
+                return body[key]
+    return None
+
+
+def _percentile(values: List[float], fraction: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class _BatcherBase:
+    """Settings, request bodies, result routing and metrics shared by both batchers."""
+
+    endpoint = "/v1/inference/batch"
+
+    def __init__(
+        self,
+        client,
+        endpoint_id: str,
+        max_batch_size: int = 32,
+        max_latency: float = 0.01,
+        max_in_flight: int = 4,
+        parameters: Optional[Dict[str, Any]] = None,
+        on_batch: Optional[Callable[[BatchMetrics], None]] = None,
+    ):
+        if max_batch_size < 1 or max_in_flight < 1:
+            raise ValueError("max_batch_size and max_in_flight must be at least 1")
+        self.client = client
+        self.endpoint_id = endpoint_id
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency
+        self.max_in_flight = max_in_flight
+        self.parameters = parameters
+        self.on_batch = on_batch
+        self._recent: deque = deque(maxlen=RECENT_BATCHES)
+        self._stats = {
+            "batches": 0, "items": 0, "errors": 0, "full_batches": 0, "latency_flushes": 0, "close_flushes": 0,
+        }
+
+    def _body(self, batch: List[_Pending]) -> Dict[str, Any]:
+        body = {"model_endpoint_id": self.endpoint_id, "inputs": [item.input for item in batch]}
+        if self.parameters:
+            body["parameters"] = self.parameters
+        return body
+
+    def _resolve(self, batch: List[_Pending], body: Any):
+        """Route each result of a batch response to its caller's future."""
+        outputs = _outputs(body)
+        if outputs is None or len(outputs) != len(batch):
+            count = "no" if outputs is None else len(outputs)
+            self._fail(batch, ValueError(f"Batch of {len(batch)} inputs returned {count} results"))
+            return
+        for index, (item, output) in enumerate(zip(batch, outputs)):
+            if isinstance(output, dict) and output.get("error") is not None:
+                self._set(item.future, exception=InferenceError(self.endpoint_id, index, output["error"]))
+            else:
+                self._set(item.future, result=output)
+
+    def _fail(self, batch: List[_Pending], exc: BaseException):
+        for item in batch:
+            self._set(item.future, exception=exc)
+
+    @staticmethod
+    def _set(future, result: Any = None, exception: Optional[BaseException] = None):
+        if future.done():  # Cancelled while the batch was in flight
+            return
+        try:
+            if exception is not None:
+                future.set_exception(exception)
+            else:
+                future.set_result(result)
+        except InvalidStateError:  # pragma: no cover - cancelled concurrently
+            pass
+
+    def _record(self, metrics: BatchMetrics):
+        """Add a finished batch to the metrics (lock held, on_batch not called)."""
+        self._recent.append(metrics)
+        self._stats["batches"] += 1
+        self._stats["items"] += metrics.size
+        self._stats[FLUSH_COUNTERS[metrics.reason]] += 1
+        if metrics.error is not None:
+            self._stats["errors"] += 1
+
+    def _summary(self) -> Dict[str, Any]:
+        stats = dict(self._stats)
+        recent = list(self._recent)
+        latencies = [batch.latency for batch in recent]
+        waits = [batch.wait for batch in recent]
+        stats["mean_batch_size"] = sum(batch.size for batch in recent) / len(recent) if recent else None
+        stats["latency_p50"] = _percentile(latencies, 0.5)
+        stats["latency_p95"] = _percentile(latencies, 0.95)
+        stats["latency_max"] = max(latencies) if latencies else None
+        stats["wait_p50"] = _percentile(waits, 0.5)
+        stats["wait_max"] = max(waits) if waits else None
+        return stats
+
+
+class InferenceBatcher(_BatcherBase):
+    """
+    Combine predict() calls from many threads into batch requests.
+
+    Each call queues its input and returns a Future. A flusher thread sends
+    the queued inputs as one ``POST /v1/inference/batch`` when
+    ``max_batch_size`` inputs are waiting or the oldest has waited
+    ``max_latency`` seconds, and resolves each future with its own result.
+    Up to ``max_in_flight`` batches are sent at once. While all of them are
+    busy, inputs keep queueing, so batches grow under load instead of
+    requests piling up.
+
+    ``max_batch_size`` and ``max_latency`` may be changed while the batcher
+    runs; they apply from the next batch.
+    """
+
+    def __init__(
+        self,
+        client,
+        endpoint_id: str,
+        max_batch_size: int = 32,
+        max_latency: float = 0.01,
+        max_in_flight: int = 4,
+        parameters: Optional[Dict[str, Any]] = None,
+        on_batch: Optional[Callable[[BatchMetrics], None]] = None,
+    ):
+        """
+        Initialize the batcher.
+
+        Args:
+            client: AiserveClient used for the requests
+            endpoint_id: Inference endpoint the inputs are sent to
+            max_batch_size: Inputs per batch request
+            max_latency: Seconds an input may wait for its batch to fill
+            max_in_flight: Batch requests sent at the same time
+            parameters: Inference parameters sent with every batch
+            on_batch: Called with the BatchMetrics of each batch (on a
+                sender thread)
+
+        Raises:
+            ValueError: If max_batch_size or max_in_flight is below 1
+        """
+        super().__init__(client, endpoint_id, max_batch_size, max_latency, max_in_flight, parameters, on_batch)
+        self._cond = threading.Condition()
+        self._pending: List[_Pending] = []
+        self._in_flight = 0
+        self._closed = False
+        self._executor = ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix="aftership-batch")
+        self._thread = threading.Thread(target=self._run, name="aftership-batcher", daemon=True)
+        self._thread.start()
+
+    def predict(self, input: Any) -> Future:
+        """
+        Queue one input.
+
+        Args:
+            input: Model input, as the endpoint expects it in ``inputs``
+
+        Returns:
+            Future resolving with the input's result. It fails with
+            InferenceError if the endpoint rejected this input, or with the
+            request's exception if the whole batch failed.
+
+        Raises:
+            RuntimeError: If the batcher is closed
+        """
+        future = Future()
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Cannot predict after the batcher is closed")
+            self._pending.append(_Pending(input, future, time.monotonic()))
+            if len(self._pending) == 1 or len(self._pending) >= self.max_batch_size:
+                self._cond.notify_all()
+        return future
+
+    def predict_many(self, inputs: Iterable[Any]) -> List[Future]:
+        """Queue several inputs; returns their futures in order."""
+        return [self.predict(input) for input in inputs]
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if not self._pending:
+                    return
+                # Wait for the batch to fill, its window to expire, and a free sender
+                while not self._closed:
+                    remaining = self._pending[0].enqueued + self.max_latency - time.monotonic()
+                    due = len(self._pending) >= self.max_batch_size or remaining <= 0
+                    if due and self._in_flight < self.max_in_flight:
+                        break
+                    self._cond.wait(remaining if not due else None)
+                if self._closed and self._in_flight >= self.max_in_flight:
+                    self._cond.wait_for(lambda: self._in_flight < self.max_in_flight)
+                oldest = self._pending[0].enqueued
+                if self._closed:
+                    reason = "close"
+                elif len(self._pending) >= self.max_batch_size:
+                    reason = "size"
+                else:
+                    reason = "latency"
+                batch = self._pending[:self.max_batch_size]
+                del self._pending[:self.max_batch_size]
+                batch = [item for item in batch if item.future.set_running_or_notify_cancel()]
+                if not batch:
+                    continue
+                self._in_flight += 1
+            self._executor.submit(self._send, batch, reason, time.monotonic() - oldest)
+
+    def _send(self, batch: List[_Pending], reason: str, wait: float):
+        started = time.monotonic()
+        error = None
+        try:
+            response = self.client.post(self.endpoint, json=self._body(batch))
+            self._resolve(batch, self.client.decode_json(response))
+        except Exception as exc:
+            error = exc
+            self._fail(batch, exc)
+        finally:
+            with self._cond:
+                self._in_flight -= 1
+                self._cond.notify_all()
+        metrics = BatchMetrics(len(batch), reason, wait, time.monotonic() - started, error)
+        with self._cond:
+            self._record(metrics)
+        if self.on_batch is not None:
+            self.on_batch(metrics)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get batching metrics.
+
+        Returns:
+            Dictionary with batches, items and errors (failed batches);
+            full_batches, latency_flushes and close_flushes (why batches
+            were sent); mean_batch_size, latency_p50/p95/max (seconds per
+            batch request) and wait_p50/max (seconds the oldest input
+            queued) over the last 1024 batches; and queued and in_flight
+        """
+        with self._cond:
+            stats = self._summary()
+            stats["queued"] = len(self._pending)
+            stats["in_flight"] = self._in_flight
+        return stats
+
+    def close(self, wait: bool = True):
+        """
+        Send the queued inputs and stop.
+
+        Args:
+            wait: Wait for the last batches to finish
+        """
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if wait:
+            self._thread.join()
+        self._executor.shutdown(wait=wait)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class AsyncInferenceBatcher(_BatcherBase):
+    """
+    Combine predict() calls from many coroutines into batch requests.
+
+    The asyncio counterpart of InferenceBatcher, for AsyncAiserveClient.
+    It runs on the event loop without threads; use it from one loop only.
+    """
+
+    def __init__(
+        self,
+        client,
+        endpoint_id: str,
+        max_batch_size: int = 32,
+        max_latency: float = 0.01,
+        max_in_flight: int = 4,
+        parameters: Optional[Dict[str, Any]] = None,
+        on_batch: Optional[Callable[[BatchMetrics], None]] = None,
+    ):
+        """
+        Initialize the batcher.
+
+        Args:
+            client: AsyncAiserveClient used for the requests
+            endpoint_id: Inference endpoint the inputs are sent to
+            max_batch_size: Inputs per batch request
+            max_latency: Seconds an input may wait for its batch to fill
+            max_in_flight: Batch requests sent at the same time
+            parameters: Inference parameters sent with every batch
+            on_batch: Called with the BatchMetrics of each batch
+
+        Raises:
+            ValueError: If max_batch_size or max_in_flight is below 1
+        """
+        super().__init__(client, endpoint_id, max_batch_size, max_latency, max_in_flight, parameters, on_batch)
+        self._pending: List[_Pending] = []
+        self._in_flight = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks = set()
+        self._closed = False
+
+    async def predict(self, input: Any) -> Any:
+        """
+        Queue one input and wait for its result.
+
+        Args:
+            input: Model input, as the endpoint expects it in ``inputs``
+
+        Returns:
+            The input's result
+
+        Raises:
+            InferenceError: If the endpoint rejected this input
+            RuntimeError: If the batcher is closed
+        """
+        if self._closed:
+            raise RuntimeError("Cannot predict after the batcher is closed")
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append(_Pending(input, future, loop.time()))
+        self._schedule(loop)
+        return await future
+
+    def _schedule(self, loop: asyncio.AbstractEventLoop, reason: Optional[str] = None):
+        """Send a batch if one is due and a sender is free, else arm the latency timer."""
+        while self._pending and self._in_flight < self.max_in_flight:
+            remaining = self._pending[0].enqueued + self.max_latency - loop.time()
+            if reason is None:
+                if len(self._pending) >= self.max_batch_size:
+                    batch_reason = "size"
+                elif remaining <= 0:
+                    batch_reason = "latency"
+                else:
+                    if self._timer is None:
+                        self._timer = loop.call_later(remaining, self._expire, loop)
+                    return
+            else:
+                batch_reason = reason
+            batch = [item for item in self._pending[:self.max_batch_size] if not item.future.done()]
+            wait = loop.time() - self._pending[0].enqueued
+            del self._pending[:self.max_batch_size]
+            if not batch:
+                continue
+            self._in_flight += 1
+            task = loop.create_task(self._send(batch, batch_reason, wait))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    def _expire(self, loop: asyncio.AbstractEventLoop):
+        self._timer = None
+        self._schedule(loop)
+
+    async def _send(self, batch: List[_Pending], reason: str, wait: float):
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        error = None
+        try:
+            response = await self.client.post(self.endpoint, json=self._body(batch))
+            self._resolve(batch, self.client.decode_json(response))
+        except Exception as exc:
+            error = exc
+            self._fail(batch, exc)
+        finally:
+            self._in_flight -= 1
+            self._schedule(loop, "close" if self._closed else None)
+        metrics = BatchMetrics(len(batch), reason, wait, loop.time() - started, error)
+        self._record(metrics)
+        if self.on_batch is not None:
+            self.on_batch(metrics)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get batching metrics (see InferenceBatcher.stats)."""
+        stats = self._summary()
+        stats["queued"] = len(self._pending)
+        stats["in_flight"] = self._in_flight
+        return stats
+
+    async def close(self):
+        """Send the queued inputs and wait for every batch to finish."""
+        self._closed = True
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self._schedule(asyncio.get_running_loop(), "close")
+        while self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
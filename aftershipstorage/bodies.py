@@ -0,0 +1,136 @@
+"""Streaming request bodies: bytes, file objects and iterables of chunks."""
+import asyncio
+import os
+from typing import Optional, Dict, Any, Union, Iterable, AsyncIterable, AsyncIterator, BinaryIO
+
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+# Anything accepted as a request body besides a JSON value
+Body = Union[
+    Dict[str, Any],  # Form fields
+    bytes,
+    bytearray,
+    memoryview,
+    str,
+    BinaryIO,  # Streamed from its current position
+    Iterable[bytes],  # Streamed with chunked transfer encoding
+    AsyncIterable[bytes],  # Async clients only
+]
+
+
+def is_file(data: Any) -> bool:
+    """Check whether a body is a readable file object."""
+    return hasattr(data, "read")
+
+
+def is_stream(data: Any) -> bool:
+    """Check whether a body is an iterable of chunks rather than a single value."""
+    if data is None or is_file(data):
+        return False
+    if isinstance(data, (bytes, bytearray, memoryview, str, dict, list, tuple)):
+        return False
+    return hasattr(data, "__iter__") or hasattr(data, "__aiter__")
+
+
+def _bytes_view(chunk) -> Union[bytes, memoryview]:
+    """Present a chunk as bytes, viewing multi-byte memoryviews as bytes without copying."""
+    if isinstance(chunk, memoryview) and (chunk.format != "B" or chunk.ndim != 1):
+        return chunk.cast("B")
+    if isinstance(chunk, str):
+        return chunk.encode("utf-8")
+    return chunk
+
+
+class RequestBody:
+    """
+    A request body that may be sent more than once.
+
+    Bytes-like bodies are sent as-is (a ``memoryview`` is never copied),
+    seekable files are rewound to their starting position before a retry,
+    and one-shot iterables such as generators are marked as not replayable
+    so the request is not retried after part of the body was consumed.
+    """
+
+    def __init__(self, data: Any):
+        """
+        Initialize the body.
+
+        Args:
+            data: Request body (see Body)
+        """
+        self.data = data
+        self._position: Optional[int] = None
+        self.replayable = True
+
+        if is_file(data):
+            try:
+                if data.seekable():
+                    self._position = data.tell()
+            except (AttributeError, OSError):
+                pass
+            self.replayable = self._position is not None
+        elif is_stream(data):
+            self.replayable = False
+            if not hasattr(data, "__aiter__"):
+                self.data = (_bytes_view(chunk) for chunk in data)
+        elif isinstance(data, memoryview):
+            self.data = _bytes_view(data)
+
+    @property
+    def length(self) -> Optional[int]:
+        """Body size in bytes, or None if unknown (sent chunked)."""
+        data = self.data
+        if isinstance(data, (bytes, bytearray)):
+            return len(data)
+        if isinstance(data, memoryview):
+            return data.nbytes
+        if is_file(data):
+            try:
+                size = os.fstat(data.fileno()).st_size
+            except (AttributeError, OSError, ValueError):
+                return None
+            # Pipes and sockets report 0; only trust regular files
+            if size == 0:
+                return None
+            return size - (self._position or 0)
+        return None
+
+    def rewind(self):
+        """Reset the body before sending it again."""
+        if self._position is not None:
+            self.data.seek(self._position)
+
+    def for_httpx(self, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Dict[str, Any]:
+        """
+        Build httpx request arguments for an async client.
+
+        Returns:
+            ``content`` (and a Content-Length header when the size is known)
+        """
+        data = self.data
+        if isinstance(data, bytes):
+            return {"content": data}
+        if isinstance(data, (bytearray, memoryview)):
+            return {"content": _aiter_chunks([data]), "headers": {"Content-Length": str(self.length)}}
+        if is_file(data):
+            headers = {} if self.length is None else {"Content-Length": str(self.length)}
+            return {"content": _aiter_file(data, chunk_size), "headers": headers}
+        if hasattr(data, "__aiter__"):
+            return {"content": data}
+        return {"content": _aiter_chunks(data)}
+
+
+async def _aiter_chunks(chunks: Iterable) -> AsyncIterator[bytes]:
+    for chunk in chunks:
+        yield _bytes_view(chunk)
+
+
+async def _aiter_file(f: BinaryIO, chunk_size: int) -> AsyncIterator[bytes]:
+    """Read a blocking file in a worker thread so the event loop keeps running."""
+    loop = asyncio.get_running_loop()
+    while True:
+        chunk = await loop.run_in_executor(None, f.read, chunk_size)
+        if not chunk:
+            break
+        yield chunk
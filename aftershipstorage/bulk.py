@@ -0,0 +1,331 @@
+"""Bulk object operations: delete, HEAD and copy many keys through a bounded pipeline."""
+from dataclasses import dataclass, field
+from itertools import chain, islice
+from typing import Optional, Dict, Any, Iterable, Iterator, List, Tuple, Callable, Union
+from urllib.parse import quote
+
+import requests
+
+from .fanout import RequestSpec, RequestResult, DEFAULT_CONCURRENCY
+
+
+# Largest batch accepted by the batch delete endpoint
+MAX_DELETE_BATCH = 1000
+
+# Batch delete responses meaning the endpoint does not exist on this server
+BATCH_UNSUPPORTED_STATUSES = frozenset({404, 405, 501})
+
+# Per-key error codes in batch delete responses meaning the object was already gone
+NOT_FOUND_CODES = frozenset({"NoSuchKey", "NotFound", "not_found"})
+
+# A key, or a listing item with a "key" field (e.g. from client.paginate)
+ObjectRef = Union[str, Dict[str, Any]]
+
+
+class ObjectError(Exception):
+    """A per-key failure reported inside a successful batch response."""
+
+    def __init__(self, key: str, code: Optional[str], message: Optional[str] = None):
+        super().__init__(f"{key}: {code or 'error'}" + (f" ({message})" if message else ""))
+        self.key = key
+        self.code = code
+        self.message = message
+
+
+@dataclass
+class ObjectRequest(RequestSpec):
+    """A RequestSpec that remembers which object keys it covers."""
+    keys: List[str] = field(default_factory=list)
+    destination: Optional[str] = None  # Copy target key
+
+
+@dataclass
+class ObjectResult:
+    """Outcome of a bulk operation on one object."""
+    key: str
+    op: str  # "delete", "head" or "copy"
+    metadata: Optional[Dict[str, Any]] = None  # HEAD metadata, or the copy response
+    error: Optional[BaseException] = None
+    destination: Optional[str] = None  # Copy target key
+
+    @property
+    def ok(self) -> bool:
+        """True if the operation succeeded."""
+        return self.error is None
+
+    def result(self) -> Optional[Dict[str, Any]]:
+        """
+        Get the metadata, re-raising the captured error if the operation failed.
+
+        Returns:
+            Metadata dict (None for deletes)
+        """
+        if self.error is not None:
+            raise self.error
+        return self.metadata
+
+
+def object_key(item: ObjectRef) -> str:
+    """Get the key of a key string or listing item."""
+    return item if isinstance(item, str) else item["key"]
+
+
+def batched(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    """Split an iterable into lists of at most ``size`` items, lazily."""
+    iterator = iter(items)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def head_metadata(response: requests.Response) -> Dict[str, Any]:
+    """
+    Extract object metadata from a HEAD response.
+
+    Returns:
+        Dict with size, etag, content_type, last_modified and user
+        ``metadata`` (from ``X-Meta-*`` headers)
+    """
+    headers = response.headers
+    size = headers.get("Content-Length")
+    return {
+        "size": int(size) if size is not None else None,
+        "etag": headers.get("ETag"),
+        "content_type": headers.get("Content-Type"),
+        "last_modified": headers.get("Last-Modified"),
+        "metadata": {
+            name.lower()[len("x-meta-"):]: value
+            for name, value in headers.items()
+            if name.lower().startswith("x-meta-")
+        },
+    }
+
+
+def _status(error: Optional[BaseException]) -> Optional[int]:
+    response = getattr(error, "response", None)
+    return getattr(response, "status_code", None)
+
+
+class BulkObjects:
+    """
+    Run delete, HEAD and copy operations over a stream of object keys.
+
+    Keys are consumed lazily, so a listing iterator of millions of objects
+    can be fed straight in, and at most ``concurrency`` requests are in
+    flight at once (see BaseClient.map). Each key produces one
+    ObjectResult; failures are captured on the result instead of raised.
+
+    Deletes use the batch endpoint (``POST .../objects/delete`` with up to
+    1000 keys per request) when the server has it, falling back to one
+    ``DELETE`` per key otherwise.
+    """
+
+    object_endpoint = "/v1/buckets/{bucket}/objects/{key}"
+    copy_endpoint = "/v1/buckets/{bucket}/objects/{key}/copy"
+    delete_batch_endpoint = "/v1/buckets/{bucket}/objects/delete"
+
+    def __init__(
+        self,
+        client,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        ordered: bool = False,
+        progress: Optional[Callable[[int, int], None]] = None,
+    ):
+        """
+        Initialize the pipeline.
+
+        Args:
+            client: DarkstorageClient
+            concurrency: Maximum requests in flight
+            ordered: Yield results in input order (True) or as they complete (False)
+            progress: Called with (keys_done, keys_failed) after each result
+        """
+        self.client = client
+        self.concurrency = concurrency
+        self.ordered = ordered
+        self.progress = progress
+
+    def _endpoint(self, template: str, bucket: str, key: str) -> str:
+        return template.format(bucket=bucket, key=quote(key))
+
+    def _map(self, specs: Iterable[ObjectRequest]) -> Iterator[RequestResult]:
+        return self.client.map(specs, concurrency=self.concurrency, ordered=self.ordered)
+
+    def _reported(self, results: Iterable[ObjectResult]) -> Iterator[ObjectResult]:
+        done = failed = 0
+        for result in results:
+            done += 1
+            if not result.ok:
+                failed += 1
+            if self.progress is not None:
+                self.progress(done, failed)
+            yield result
+
+    # Delete
+
+    def delete(
+        self,
+        bucket: str,
+        keys: Iterable[ObjectRef],
+        batch_size: int = MAX_DELETE_BATCH,
+        missing_ok: bool = True,
+    ) -> Iterator[ObjectResult]:
+        """
+        Delete objects.
+
+        Args:
+            bucket: Bucket name
+            keys: Keys or listing items
+            batch_size: Keys per batch delete request (at most 1000)
+            missing_ok: Treat already-deleted objects as deleted
+
+        Yields:
+            ObjectResult per key
+        """
+        batch_size = max(1, min(batch_size, MAX_DELETE_BATCH))
+        batches = batched((object_key(item) for item in keys), batch_size)
+        return self._reported(self._delete(bucket, batches, missing_ok))
+
+    def _delete(self, bucket: str, batches: Iterator[List[str]], missing_ok: bool) -> Iterator[ObjectResult]:
+        use_batch = self.client.batch_delete_supported is not False
+        if self.client.batch_delete_supported is None:
+            # Probe with the first batch before fanning out
+            first = next(batches, None)
+            if first is None:
+                return
+            spec = self._delete_batch_spec(bucket, first)
+            try:
+                response = self.client.request(spec.method, spec.endpoint, **spec.kwargs)
+                probe = RequestResult(0, spec, response=response)
+            except Exception as e:
+                probe = RequestResult(0, spec, error=e)
+            if _status(probe.error) in BATCH_UNSUPPORTED_STATUSES:
+                self.client.batch_delete_supported = use_batch = False
+                batches = chain([first], batches)
+            else:
+                if probe.ok:
+                    self.client.batch_delete_supported = True
+                yield from self._batch_results(probe, missing_ok)
+
+        if use_batch:
+            specs = (self._delete_batch_spec(bucket, batch) for batch in batches)
+            for result in self._map(specs):
+                yield from self._batch_results(result, missing_ok)
+        else:
+            specs = (
+                ObjectRequest(self._endpoint(self.object_endpoint, bucket, key), method="DELETE", keys=[key])
+                for batch in batches
+                for key in batch
+            )
+            for result in self._map(specs):
+                error = result.error
+                if missing_ok and _status(error) == 404:
+                    error = None
+                yield ObjectResult(result.spec.keys[0], "delete", error=error)
+
+    def _delete_batch_spec(self, bucket: str, keys: List[str]) -> ObjectRequest:
+        return ObjectRequest(
+            self.delete_batch_endpoint.format(bucket=bucket),
+            method="POST",
+            kwargs={"json": {"keys": keys}, "retry": True},
+            keys=keys,
+        )
+
+    def _batch_results(self, result: RequestResult, missing_ok: bool) -> Iterator[ObjectResult]:
+        """Expand a batch delete response into per-key results."""
+        if not result.ok:
+            for key in result.spec.keys:
+                yield ObjectResult(key, "delete", error=result.error)
+            return
+
+        body = self.client.decode_json(result.response) if result.response.content else {}
+        errors: Dict[str, ObjectError] = {}
+        for item in (body or {}).get("errors") or ():
+            code = item.get("code")
+            if missing_ok and code in NOT_FOUND_CODES:
+                continue
+            errors[item["key"]] = ObjectError(item["key"], code, item.get("message"))
+        for key in result.spec.keys:
+            yield ObjectResult(key, "delete", error=errors.get(key))
+
+    # HEAD
+
+    def head(self, bucket: str, keys: Iterable[ObjectRef]) -> Iterator[ObjectResult]:
+        """
+        Fetch object metadata with HEAD requests.
+
+        Args:
+            bucket: Bucket name
+            keys: Keys or listing items
+
+        Yields:
+            ObjectResult per key, with metadata from head_metadata(); missing
+            objects fail with a 404 HTTPError
+        """
+        specs = (
+            ObjectRequest(self._endpoint(self.object_endpoint, bucket, key), method="HEAD", keys=[key])
+            for key in map(object_key, keys)
+        )
+        return self._reported(
+            ObjectResult(
+                result.spec.keys[0],
+                "head",
+                metadata=head_metadata(result.response) if result.ok else None,
+                error=result.error,
+            )
+            for result in self._map(specs)
+        )
+
+    # Copy
+
+    def copy(
+        self,
+        bucket: str,
+        keys: Iterable[Union[ObjectRef, Tuple[str, str]]],
+        dest_bucket: Optional[str] = None,
+        dest_key: Optional[Callable[[str], str]] = None,
+    ) -> Iterator[ObjectResult]:
+        """
+        Copy objects server-side.
+
+        Args:
+            bucket: Source bucket
+            keys: Keys or listing items, or ``(source_key, dest_key)`` tuples
+            dest_bucket: Destination bucket (default: the source bucket)
+            dest_key: Maps a source key to its destination key (default:
+                the same key)
+
+        Yields:
+            ObjectResult per key, with the copy response as metadata
+        """
+        dest_bucket = dest_bucket or bucket
+
+        def spec(item) -> ObjectRequest:
+            if isinstance(item, tuple):
+                key, destination = item
+            else:
+                key = object_key(item)
+                destination = dest_key(key) if dest_key is not None else key
+            return ObjectRequest(
+                self._endpoint(self.copy_endpoint, bucket, key),
+                method="POST",
+                kwargs={"json": {"destination_bucket": dest_bucket, "destination_key": destination}, "retry": True},
+                keys=[key],
+                destination=destination,
+            )
+
+        return self._reported(
+            ObjectResult(
+                result.spec.keys[0],
+                "copy",
+                metadata=self._decode(result.response) if result.ok else None,
+                error=result.error,
+                destination=result.spec.destination,
+            )
+            for result in self._map(map(spec, keys))
+        )
+
+    def _decode(self, response) -> Optional[Dict[str, Any]]:
+        return self.client.decode_json(response) if response.content else None
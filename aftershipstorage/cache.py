@@ -0,0 +1,286 @@
+"""In-memory conditional-GET response cache with LRU and TTL eviction."""
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Optional, Dict, Any, Tuple
+
+from requests.structures import CaseInsensitiveDict
+
+from .config import CacheConfig
+
+
+# Request headers that change the representation returned for a URL
+VARY_HEADERS = ("Accept", "Accept-Encoding", "Accept-Language")
+
+# Lower-cased VARY_HEADERS; a response varying on any other header is not stored
+_KEYED_HEADERS = frozenset(name.lower() for name in VARY_HEADERS)
+
+
+@dataclass
+class CacheEntry:
+    """A cached response body with its validators and freshness."""
+    status_code: int
+    headers: CaseInsensitiveDict
+    content: bytes
+    url: str
+    expires_at: float
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    size: int = 0
+
+    def is_fresh(self) -> bool:
+        """Check whether the entry can be served without revalidation."""
+        return time.monotonic() < self.expires_at
+
+    def validators(self) -> Dict[str, str]:
+        """Conditional request headers for revalidating this entry."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+def parse_cache_control(value: Optional[str]) -> Dict[str, Optional[str]]:
+    """
+    Parse a Cache-Control header into directives.
+
+    Args:
+        value: Header value (e.g. "public, max-age=60")
+
+    Returns:
+        Mapping of lower-cased directive name to its value (None for flags)
+    """
+    directives = {}
+    if not value:
+        return directives
+    for part in value.split(","):
+        name, _, arg = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = arg.strip('"') if arg else None
+    return directives
+
+
+def _is_below(url: str, prefix: str) -> bool:
+    """Check whether a URL is ``prefix`` itself or a path or query below it."""
+    return url.startswith(prefix) and url[len(prefix):len(prefix) + 1] in ("", "/", "?")
+
+
+class ResponseCache:
+    """
+    Thread-safe response cache bounded by entry count and total bytes.
+
+    Responses are stored with their ETag/Last-Modified validators. Fresh
+    entries (per Cache-Control max-age or Expires, otherwise
+    ``default_ttl``) are served from memory; stale entries are revalidated
+    with If-None-Match/If-Modified-Since and a 304 refreshes them in place.
+    The least recently used entries are evicted first.
+    """
+
+    def __init__(self, config: Optional[CacheConfig] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            config: Cache settings (default: CacheConfig())
+        """
+        self.config = config or CacheConfig()
+        self._entries: "OrderedDict[Tuple, CacheEntry]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "revalidations": 0,
+            "evictions": 0,
+            "stores": 0,
+        }
+
+    @staticmethod
+    def key(url: str, headers: Optional[Dict[str, str]] = None) -> Tuple:
+        """
+        Build the cache key for a GET request.
+
+        Args:
+            url: Full request URL including the query string
+            headers: Request headers
+
+        Returns:
+            Hashable cache key
+        """
+        headers = {name.lower(): value for name, value in (headers or {}).items()}
+        vary = tuple(headers.get(name.lower()) for name in VARY_HEADERS)
+        return (url, vary)
+
+    def lookup(self, key: Tuple) -> Optional[CacheEntry]:
+        """
+        Get an entry, fresh or stale.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            CacheEntry, or None on a miss
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            if entry.is_fresh():
+                self._stats["hits"] += 1
+            return entry
+
+    def _freshness(self, headers) -> Optional[float]:
+        """Return the freshness lifetime in seconds, or None if not storable."""
+        directives = parse_cache_control(headers.get("Cache-Control"))
+        if "no-store" in directives:
+            return None
+        if "private" in directives and not self.config.store_private:
+            return None
+        if "no-cache" in directives:
+            return 0.0
+
+        max_age = directives.get("max-age")
+        if max_age is not None:
+            try:
+                lifetime = float(max_age)
+            except ValueError:
+                lifetime = 0.0
+        elif headers.get("Expires"):
+            try:
+                lifetime = parsedate_to_datetime(headers["Expires"]).timestamp() - time.time()
+            except (TypeError, ValueError):
+                lifetime = 0.0
+        else:
+            lifetime = self.config.default_ttl
+
+        try:
+            lifetime -= float(headers.get("Age", 0))
+        except ValueError:
+            pass
+        return max(0.0, min(lifetime, self.config.max_ttl))
+
+    def store(self, key: Tuple, status_code: int, headers, content: bytes, url: str) -> Optional[CacheEntry]:
+        """
+        Store a 200 response if it is cacheable.
+
+        Args:
+            key: Cache key
+            status_code: Response status code
+            headers: Response headers
+            content: Response body
+            url: Response URL
+
+        Returns:
+            The stored CacheEntry, or None if the response was not cacheable
+        """
+        if status_code != 200:
+            return None
+        vary = {name.strip().lower() for name in (headers.get("Vary") or "").split(",") if name.strip()}
+        if not vary <= _KEYED_HEADERS:
+            # The cache key cannot tell these representations apart ("*" included)
+            return None
+        lifetime = self._freshness(headers)
+        if lifetime is None:
+            return None
+
+        etag = headers.get("ETag")
+        last_modified = headers.get("Last-Modified")
+        if lifetime <= 0 and not etag and not last_modified:
+            return None
+
+        header_dict = CaseInsensitiveDict(headers)
+        # The body is stored decoded, so transfer details no longer apply
+        for name in ("Content-Encoding", "Content-Length", "Transfer-Encoding"):
+            header_dict.pop(name, None)
+        size = len(content) + sum(len(k) + len(v) for k, v in header_dict.items())
+        if size > self.config.max_bytes:
+            return None
+
+        entry = CacheEntry(
+            status_code=status_code,
+            headers=header_dict,
+            content=content,
+            url=url,
+            expires_at=time.monotonic() + lifetime,
+            etag=etag,
+            last_modified=last_modified,
+            size=size,
+        )
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old.size
+            self._entries[key] = entry
+            self._bytes += size
+            self._stats["stores"] += 1
+            self._evict()
+        return entry
+
+    def revalidated(self, key: Tuple, entry: CacheEntry, headers) -> CacheEntry:
+        """
+        Refresh an entry after a 304 Not Modified response.
+
+        Args:
+            key: Cache key
+            entry: Entry that was revalidated
+            headers: Headers of the 304 response
+
+        Returns:
+            The refreshed entry
+        """
+        for name in ("Cache-Control", "Expires", "ETag", "Last-Modified", "Date"):
+            if name in headers:
+                entry.headers[name] = headers[name]
+        lifetime = self._freshness(entry.headers) or 0.0
+        with self._lock:
+            entry.expires_at = time.monotonic() + lifetime
+            entry.etag = entry.headers.get("ETag", entry.etag)
+            entry.last_modified = entry.headers.get("Last-Modified", entry.last_modified)
+            self._stats["revalidations"] += 1
+            if key in self._entries:
+                self._entries.move_to_end(key)
+        return entry
+
+    def _evict(self):
+        """Drop least recently used entries until within bounds (lock held)."""
+        while self._entries and (
+            len(self._entries) > self.config.max_entries or self._bytes > self.config.max_bytes
+        ):
+            _, entry = self._entries.popitem(last=False)
+            self._bytes -= entry.size
+            self._stats["evictions"] += 1
+
+    def invalidate(self, url_prefix: Optional[str] = None):
+        """
+        Remove cached entries.
+
+        Args:
+            url_prefix: Only remove entries for this URL and the resources
+                below it, i.e. URLs continuing with "/" or "?" (default:
+                remove everything)
+        """
+        with self._lock:
+            for key in list(self._entries):
+                if url_prefix is None or _is_below(key[0], url_prefix.rstrip("/")):
+                    self._bytes -= self._entries.pop(key).size
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache counters.
+
+        Returns:
+            Dictionary with hits (served fresh from memory), misses,
+            revalidations (304s served from memory), evictions, stores,
+            and the current entry count and byte size
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+            stats["bytes"] = self._bytes
+        return stats
@@ -0,0 +1,152 @@
+"""Content checksums computed while request bodies stream out."""
+import hashlib
+import mmap
+import os
+from typing import Callable, List, Optional, Union
+
+
+# Digest used for object checksums and content addressing
+CHECKSUM_ALGORITHM = "sha256"
+
+# Bytes hashed per update when digesting a whole file
+HASH_BLOCK_SIZE = 4 * 1024 * 1024
+
+
+class HashingReader:
+    """
+    File-like view of a buffer that hashes the bytes as they are read.
+
+    Passed as a request body, the buffer is read in chunks by the HTTP
+    library and each chunk is hashed on its way to the socket, so the
+    checksum costs no extra pass over the data. Chunks are ``memoryview``
+    slices, never copies. Rewinding to the start (as the retry logic does)
+    resets the digest.
+    """
+
+    def __init__(
+        self,
+        buffer: Union[bytes, bytearray, memoryview],
+        algorithm: str = CHECKSUM_ALGORITHM,
+        on_read: Optional[Callable[[int], None]] = None,
+    ):
+        """
+        Initialize the reader.
+
+        Args:
+            buffer: Data to send
+            algorithm: hashlib algorithm name
+            on_read: Called with the size of each chunk before it is
+                returned (e.g. to meter or throttle the upload)
+        """
+        view = memoryview(buffer)
+        self._view = view.cast("B") if view.format != "B" or view.ndim != 1 else view
+        self.algorithm = algorithm
+        self._hash = hashlib.new(algorithm)
+        self._position = 0
+        self.on_read = on_read
+
+    def __len__(self) -> int:
+        return self._view.nbytes - self._position
+
+    def read(self, size: int = -1) -> memoryview:
+        """Read up to ``size`` bytes (all remaining if negative), hashing them."""
+        end = self._view.nbytes if size is None or size < 0 else min(self._position + size, self._view.nbytes)
+        chunk = self._view[self._position:end]
+        if self.on_read is not None and chunk.nbytes:
+            self.on_read(chunk.nbytes)
+        self._hash.update(chunk)
+        self._position = end
+        return chunk
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        """Rewind to the start; the digest restarts with it."""
+        if whence != os.SEEK_SET or offset != 0:
+            raise ValueError("HashingReader can only be rewound to the start")
+        self._position = 0
+        self._hash = hashlib.new(self.algorithm)
+        return 0
+
+    @property
+    def complete(self) -> bool:
+        """True once every byte has been read (and hashed)."""
+        return self._position == self._view.nbytes
+
+    def hexdigest(self) -> str:
+        """
+        Get the digest of the bytes read so far.
+
+        Raises:
+            ValueError: If the buffer has not been read to the end
+        """
+        if not self.complete:
+            raise ValueError("Body was not fully read; checksum is incomplete")
+        return self._hash.hexdigest()
+
+    def release(self):
+        """Release the view of the buffer (required before closing an mmap it points into)."""
+        self._view.release()
+
+    def __enter__(self) -> "HashingReader":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+
+def buffer_digest(buffer: Union[bytes, memoryview], algorithm: str = CHECKSUM_ALGORITHM) -> str:
+    """Compute the hex digest of a buffer, hashing it in blocks (the GIL is released per block)."""
+    digest = hashlib.new(algorithm)
+    with memoryview(buffer) as view:
+        for start in range(0, view.nbytes, HASH_BLOCK_SIZE):
+            with view[start:start + HASH_BLOCK_SIZE] as block:
+                digest.update(block)
+    return digest.hexdigest()
+
+
+def file_digest(path: str, algorithm: str = CHECKSUM_ALGORITHM) -> str:
+    """
+    Compute the hex digest of a file through a memory map.
+
+    Args:
+        path: File to hash
+        algorithm: hashlib algorithm name
+
+    Returns:
+        Hex digest
+    """
+    if os.path.getsize(path) == 0:
+        return hashlib.new(algorithm).hexdigest()
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapping:
+        with memoryview(mapping) as view:
+            return buffer_digest(view, algorithm)
+
+
+def composite_digest(part_digests: List[str], algorithm: str = CHECKSUM_ALGORITHM) -> str:
+    """
+    Combine per-part digests into an object checksum.
+
+    The result is the digest of the concatenated binary part digests with
+    ``-<part count>`` appended (the S3 composite checksum form), so it can
+    be computed from parts hashed in parallel.
+
+    Args:
+        part_digests: Hex digests in part order
+
+    Returns:
+        Composite hex digest, e.g. ``"9f86...-12"``
+    """
+    digest = hashlib.new(algorithm)
+    for part in part_digests:
+        digest.update(bytes.fromhex(part))
+    return f"{digest.hexdigest()}-{len(part_digests)}"
+
+
+def format_checksum(hex_digest: str, algorithm: str = CHECKSUM_ALGORITHM) -> str:
+    """Format a checksum as ``"<algorithm>:<hex>"`` (as accepted by download_file)."""
+    return f"{algorithm}:{hex_digest}"
@@ -215,6 +215,85 @@ def darkstorage_post(ctx, endpoint: str, data: Optional[str], output_format: str
     format_output(response.json(), output_format)
 
 
+@darkstorage.command("sync")
+@click.argument("local_dir", type=click.Path(file_okay=False))
+@click.argument("bucket")
+@click.option("--prefix", default="", help="Key prefix the directory maps to")
+@click.option(
+    "--direction",
+    type=click.Choice(["upload", "download", "both"]),
+    default="upload",
+    show_default=True,
+    help="Which way changes flow",
+)
+@click.option("--delete", is_flag=True, help="Propagate deletions")
+@click.option(
+    "--conflict",
+    type=click.Choice(["skip", "local", "remote"]),
+    default="skip",
+    show_default=True,
+    help="Files changed on both sides (two-way sync)",
+)
+@click.option("--dry-run", is_flag=True, help="Show what would change without transferring")
+@click.option("--concurrency", type=int, help="Files transferred in parallel")
+@click.option("--manifest", "manifest_path", help="Manifest database (default: LOCAL_DIR/.aftership-sync.db)")
+@click.option("--exclude", multiple=True, help="Glob pattern to skip (repeatable)")
+@click.option("--max-bandwidth", type=int, help="Cap on bytes per second across all transfers")
+@click.pass_context
+def darkstorage_sync(
+    ctx,
+    local_dir: str,
+    bucket: str,
+    prefix: str,
+    direction: str,
+    delete: bool,
+    conflict: str,
+    dry_run: bool,
+    concurrency: Optional[int],
+    manifest_path: Optional[str],
+    exclude: tuple,
+    max_bandwidth: Optional[int],
+):
+    """Sync LOCAL_DIR with BUCKET, transferring only changed files."""
+    client = ctx.obj["client"]
+    if max_bandwidth:
+        client.darkstorage.transfer_controller.set_bandwidth(max_bandwidth)
+    result = client.darkstorage.sync(
+        local_dir,
+        bucket,
+        prefix=prefix,
+        direction=direction,
+        delete=delete,
+        conflict=conflict,
+        dry_run=dry_run,
+        concurrency=concurrency,
+        manifest_path=manifest_path,
+        exclude=exclude,
+    )
+
+    table = Table(show_header=True, title="Dry run" if dry_run else None)
+    table.add_column("Action")
+    table.add_column("Files", justify="right")
+    for label, paths in [
+        ("Uploaded", result.uploaded),
+        ("Downloaded", result.downloaded),
+        ("Deleted remote", result.deleted_remote),
+        ("Deleted local", result.deleted_local),
+        ("Conflicts", result.conflicts),
+    ]:
+        table.add_row(label, str(len(paths)))
+    table.add_row("Errors", str(len(result.errors)))
+    console.print(table)
+    if not dry_run:
+        console.print(f"Transferred {result.bytes_transferred} bytes in {result.elapsed:.1f}s")
+    for path in result.conflicts:
+        console.print(f"[yellow]Conflict: {path}[/yellow]")
+    for path, error in result.errors.items():
+        console.print(f"[red]Error: {path}: {error}[/red]")
+    if not result.ok:
+        sys.exit(1)
+
+
 @main.group()
 @click.option("--config", help="Config file path")
 @click.pass_context
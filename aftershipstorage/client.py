@@ -1,6 +1,7 @@
 """Main AftershipStorage meta client."""
 import os
-from typing import Optional
+from concurrent.futures import Executor
+from typing import Optional, Dict, Any, Iterable, Iterator
 from dotenv import load_dotenv
 
 from .services import (
@@ -11,7 +12,8 @@ from .services import (
     HostscienceClient,
     AiserveClient
 )
-from .config import Config
+from .config import Config, SERVICES
+from .fanout import RequestSpec, RequestResult, run_requests, DEFAULT_CONCURRENCY
 
 
 class AftershipStorage:
@@ -27,6 +29,13 @@ class AftershipStorage:
     - aiserve.farm
     """
 
+    darkship_client_class = DarkshipClient
+    darkstorage_client_class = DarkstorageClient
+    shipshack_client_class = ShipshackClient
+    models2go_client_class = Models2GoClient
+    hostscience_client_class = HostscienceClient
+    aiserve_client_class = AiserveClient
+
     def __init__(
         self,
         darkship_api_key: Optional[str] = None,
@@ -41,6 +50,7 @@ class AftershipStorage:
         models2go_base_url: Optional[str] = None,
         hostscience_base_url: Optional[str] = None,
         aiserve_base_url: Optional[str] = None,
+        client_options: Optional[Dict[str, Dict[str, Any]]] = None,
     ):
         """
         Initialize AftershipStorage meta client.
@@ -58,6 +68,8 @@ class AftershipStorage:
             models2go_base_url: Optional custom base URL for models2go.com
             hostscience_base_url: Optional custom base URL for hostscience.io
             aiserve_base_url: Optional custom base URL for aiserve.farm
+            client_options: Optional per-service client keyword arguments keyed by
+                service name, e.g. {"darkstorage": {"pool": PoolConfig(maxsize=50)}}
         """
         # Initialize clients only if API keys are provided
         self._darkship = None
@@ -66,42 +78,43 @@ class AftershipStorage:
         self._models2go = None
         self._hostscience = None
         self._aiserve = None
+        client_options = client_options or {}
 
         if darkship_api_key:
-            kwargs = {"api_key": darkship_api_key}
+            kwargs = {"api_key": darkship_api_key, **client_options.get("darkship", {})}
             if darkship_base_url:
                 kwargs["base_url"] = darkship_base_url
-            self._darkship = DarkshipClient(**kwargs)
+            self._darkship = self.darkship_client_class(**kwargs)
 
         if darkstorage_api_key:
-            kwargs = {"api_key": darkstorage_api_key}
+            kwargs = {"api_key": darkstorage_api_key, **client_options.get("darkstorage", {})}
             if darkstorage_base_url:
                 kwargs["base_url"] = darkstorage_base_url
-            self._darkstorage = DarkstorageClient(**kwargs)
+            self._darkstorage = self.darkstorage_client_class(**kwargs)
 
         if shipshack_api_key:
-            kwargs = {"api_key": shipshack_api_key}
+            kwargs = {"api_key": shipshack_api_key, **client_options.get("shipshack", {})}
             if shipshack_base_url:
                 kwargs["base_url"] = shipshack_base_url
-            self._shipshack = ShipshackClient(**kwargs)
+            self._shipshack = self.shipshack_client_class(**kwargs)
 
         if models2go_api_key:
-            kwargs = {"api_key": models2go_api_key}
+            kwargs = {"api_key": models2go_api_key, **client_options.get("models2go", {})}
             if models2go_base_url:
                 kwargs["base_url"] = models2go_base_url
-            self._models2go = Models2GoClient(**kwargs)
+            self._models2go = self.models2go_client_class(**kwargs)
 
         if hostscience_api_key:
-            kwargs = {"api_key": hostscience_api_key}
+            kwargs = {"api_key": hostscience_api_key, **client_options.get("hostscience", {})}
             if hostscience_base_url:
                 kwargs["base_url"] = hostscience_base_url
-            self._hostscience = HostscienceClient(**kwargs)
+            self._hostscience = self.hostscience_client_class(**kwargs)
 
         if aiserve_api_key:
-            kwargs = {"api_key": aiserve_api_key}
+            kwargs = {"api_key": aiserve_api_key, **client_options.get("aiserve", {})}
             if aiserve_base_url:
                 kwargs["base_url"] = aiserve_base_url
-            self._aiserve = AiserveClient(**kwargs)
+            self._aiserve = self.aiserve_client_class(**kwargs)
 
     @classmethod
     def from_env(cls, env_file: Optional[str] = None):
@@ -197,6 +210,7 @@ class AftershipStorage:
             models2go_base_url=config.resolve_base_url('models2go', 'https://api.models2go.com'),
             hostscience_base_url=config.resolve_base_url('hostscience', 'https://api.hostscience.io'),
             aiserve_base_url=config.resolve_base_url('aiserve', 'https://api.aiserve.farm'),
+            client_options={service: config.client_options(service) for service in SERVICES},
         )
 
     @property
@@ -253,6 +267,58 @@ class AftershipStorage:
             )
         return self._aiserve
 
+    def gather(
+        self,
+        specs: Iterable[Any],
+        concurrency: int = DEFAULT_CONCURRENCY,
+        ordered: bool = True,
+        executor: Optional[Executor] = None,
+    ) -> Iterator[RequestResult]:
+        """
+        Run many requests across services on one worker pool.
+
+        Args:
+            specs: Request specs naming their service, as dicts
+                (``{"service": "darkship", "endpoint": "/v1/shipments"}``),
+                ``(service, method, endpoint[, kwargs])`` tuples or RequestSpec objects
+            concurrency: Maximum requests in flight across all services
+            ordered: Yield results in input order (True) or as they complete (False)
+            executor: Worker pool to run requests on (default: a pool created for this call)
+
+        Yields:
+            RequestResult per spec; failures (including an unknown or
+            uninitialized service) are captured in ``result.error``
+
+        Example:
+            results = list(client.gather([
+                {"service": "darkstorage", "endpoint": "/v1/buckets/ml-models/objects"},
+                {"service": "models2go", "endpoint": f"/v1/models/{model_id}"},
+            ]))
+        """
+        return run_requests(
+            specs,
+            lambda spec: self._service_client(spec).request(spec.method, spec.endpoint, **spec.kwargs),
+            concurrency=concurrency,
+            ordered=ordered,
+            coerce=self._service_spec,
+            executor=executor,
+        )
+
+    @staticmethod
+    def _service_spec(spec: Any) -> RequestSpec:
+        """Normalize a gather spec, accepting a leading service name in tuples."""
+        if isinstance(spec, tuple) and len(spec) >= 3 and isinstance(spec[2], str):
+            request_spec = RequestSpec.coerce(spec[1:])
+            request_spec.service = spec[0]
+            return request_spec
+        return RequestSpec.coerce(spec)
+
+    def _service_client(self, spec: RequestSpec):
+        """Get the client for the service a spec names."""
+        if spec.service not in SERVICES:
+            raise ValueError(f"Unknown service in request spec: {spec.service!r}")
+        return getattr(self, spec.service)
+
     def close_all(self):
         """Close all active client sessions."""
         for client in [
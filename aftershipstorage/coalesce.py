@@ -0,0 +1,159 @@
+"""Single-flight coalescing of identical in-flight requests."""
+import asyncio
+import threading
+from typing import Optional, Dict, Any, Callable, Awaitable, Hashable
+
+from .config import CoalesceConfig
+from .timeouts import remaining, DeadlineExceeded
+
+
+class _Call:
+    """An in-flight call shared by every caller with the same key."""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class _Stats:
+    """Counters shared by the threaded and async single-flight groups."""
+
+    def __init__(self, config: Optional[CoalesceConfig]):
+        self.config = config or CoalesceConfig()
+        self._stats_lock = threading.Lock()
+        self._stats = {"executed": 0, "coalesced": 0}
+
+    def applies_to(self, method: str) -> bool:
+        """Check whether requests with this method are coalesced."""
+        return method.upper() in self.config.methods
+
+    def _count(self, name: str):
+        with self._stats_lock:
+            self._stats[name] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get coalescing counters.
+
+        Returns:
+            Dictionary with requests actually sent (executed), requests that
+            joined an identical in-flight request instead (coalesced), and
+            the number of keys currently in flight
+        """
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats["in_flight"] = len(self._calls)
+        return stats
+
+
+class SingleFlight(_Stats):
+    """
+    Collapse concurrent identical calls from many threads into one.
+
+    The first caller for a key runs the call; callers arriving while it is in
+    flight wait and receive the same result (or exception).
+    """
+
+    def __init__(self, config: Optional[CoalesceConfig] = None):
+        """
+        Initialize the group.
+
+        Args:
+            config: Coalescing settings (default: CoalesceConfig())
+        """
+        super().__init__(config)
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """
+        Run ``fn`` once for all concurrent callers with the same key.
+
+        Args:
+            key: Identity of the call
+            fn: Function performing the call
+
+        Returns:
+            The result of ``fn``
+
+        Raises:
+            Exception: Whatever ``fn`` raised
+            DeadlineExceeded: If the active deadline passes while waiting
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+
+        if not leader:
+            self._count("coalesced")
+            if not call.event.wait(timeout=remaining()):
+                raise DeadlineExceeded("Deadline exceeded while waiting for a coalesced request")
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        self._count("executed")
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+
+
+class AsyncSingleFlight(_Stats):
+    """
+    Collapse concurrent identical calls from many coroutines into one.
+
+    The call runs in its own task, so cancelling the coroutine that started
+    it does not cancel it for the other waiters.
+    """
+
+    def __init__(self, config: Optional[CoalesceConfig] = None):
+        """
+        Initialize the group.
+
+        Args:
+            config: Coalescing settings (default: CoalesceConfig())
+        """
+        super().__init__(config)
+        self._calls: Dict[Hashable, "asyncio.Future"] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Await ``fn()`` once for all concurrent callers with the same key.
+
+        Args:
+            key: Identity of the call
+            fn: Coroutine function performing the call
+
+        Returns:
+            The result of ``fn()``
+
+        Raises:
+            Exception: Whatever ``fn()`` raised
+            DeadlineExceeded: If the active deadline passes while waiting
+        """
+        task = self._calls.get(key)
+        if task is None:
+            self._count("executed")
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda _: self._calls.pop(key, None))
+        else:
+            self._count("coalesced")
+
+        try:
+            return await asyncio.wait_for(asyncio.shield(task), timeout=remaining())
+        except asyncio.TimeoutError:
+            if task.done():
+                raise
+            raise DeadlineExceeded("Deadline exceeded while waiting for a coalesced request")
@@ -0,0 +1,125 @@
+"""Pluggable JSON codecs for request and response bodies."""
+import json
+from typing import Any, Dict, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+class JSONCodec:
+    """
+    Stdlib JSON codec.
+
+    Encodes straight to compact UTF-8 bytes and decodes bytes without an
+    intermediate ``str`` copy (``json.loads`` detects the encoding itself).
+    """
+
+    name = "json"
+
+    def dumps(self, obj: Any) -> bytes:
+        """
+        Encode a value as a JSON body.
+
+        Args:
+            obj: JSON-serializable value
+
+        Returns:
+            UTF-8 encoded JSON
+        """
+        return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+    def loads(self, data: Union[bytes, bytearray, str]) -> Any:
+        """
+        Decode a JSON body.
+
+        Args:
+            data: UTF-8 encoded JSON (or text)
+
+        Returns:
+            Decoded value
+        """
+        return json.loads(data)
+
+
+class OrjsonCodec(JSONCodec):
+    """Codec backed by orjson (``pip install 'aftershipstorage[orjson]'``)."""
+
+    name = "orjson"
+
+    def __init__(self):
+        """
+        Initialize the codec.
+
+        Raises:
+            ImportError: If orjson is not installed
+        """
+        if orjson is None:
+            raise ImportError("OrjsonCodec requires orjson. Install with: pip install 'aftershipstorage[orjson]'")
+
+    def dumps(self, obj: Any) -> bytes:
+        """Encode a value as a JSON body (see JSONCodec.dumps)."""
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+
+    def loads(self, data: Union[bytes, bytearray, str]) -> Any:
+        """Decode a JSON body (see JSONCodec.loads)."""
+        return orjson.loads(data)
+
+
+CODECS: Dict[str, type] = {
+    "json": JSONCodec,
+    "orjson": OrjsonCodec,
+}
+
+
+def get_codec(codec: Union[str, JSONCodec, None] = "auto") -> JSONCodec:
+    """
+    Resolve a codec by name.
+
+    "auto" picks orjson whenever it is installed, which changes how values
+    outside plain JSON are handled compared with the standard library:
+
+    - datetime, date, UUID and dataclass values are encoded (datetimes as
+      RFC 3339 strings) instead of raising TypeError
+    - NaN and infinity are encoded as ``null`` instead of the non-standard
+      ``NaN`` / ``Infinity`` tokens, and decoding those tokens fails
+    - Integers beyond 64 bits cannot be encoded, and decode as floats
+
+    Pass "json" to keep the standard library's behaviour regardless of
+    what is installed.
+
+    Args:
+        codec: Codec instance, a name from CODECS, or "auto" (or None) for
+            the fastest installed codec
+
+    Returns:
+        JSONCodec instance
+
+    Raises:
+        ValueError: If the name is unknown
+        ImportError: If the named codec's library is not installed
+    """
+    if isinstance(codec, JSONCodec):
+        return codec
+    if codec is None or codec == "auto":
+        return OrjsonCodec() if orjson is not None else JSONCodec()
+    if codec not in CODECS:
+        raise ValueError(f"Unknown JSON codec: {codec!r} (expected one of auto, {', '.join(CODECS)})")
+    return CODECS[codec]()
+
+
+def encode_body(codec: JSONCodec, body: Any) -> bytes:
+    """
+    Encode a ``json=`` request body, passing pre-encoded bytes through unchanged.
+
+    Args:
+        codec: Codec used for non-bytes bodies
+        body: JSON-serializable value, or bytes already holding JSON
+
+    Returns:
+        Encoded body
+    """
+    if isinstance(body, (bytes, bytearray)):
+        return body
+    return codec.dumps(body)
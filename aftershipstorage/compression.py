@@ -0,0 +1,137 @@
+"""Request body compression and response Accept-Encoding negotiation."""
+import gzip
+import threading
+from typing import Optional, Dict, Iterable, Tuple
+
+from .config import CompressionConfig
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+
+# Request body encodings in order of preference
+ENCODINGS = ("zstd", "gzip")
+
+# Default compression level per encoding
+DEFAULT_LEVELS = {"gzip": 6, "zstd": 3}
+
+# Response encodings in order of preference, when the HTTP library can decode them
+ACCEPT_PREFERENCE = ("zstd", "br", "gzip", "deflate")
+
+# Bodies at least this large are compressed off the event loop by the async clients
+OFFLOAD_SIZE = 1024 * 1024
+
+
+def available_encodings() -> Tuple[str, ...]:
+    """Request body encodings supported by this installation."""
+    return tuple(name for name in ENCODINGS if name != "zstd" or zstandard is not None)
+
+
+def resolve_encoding(encoding: str) -> str:
+    """
+    Resolve a configured request body encoding.
+
+    Args:
+        encoding: "gzip", "zstd", or "auto" for the best installed one
+
+    Returns:
+        Encoding name
+
+    Raises:
+        ValueError: If the encoding is unknown
+        ImportError: If zstd is requested but zstandard is not installed
+    """
+    if encoding == "auto":
+        return available_encodings()[0]
+    if encoding not in ENCODINGS:
+        raise ValueError(f"Unknown compression encoding: {encoding!r} (expected one of auto, {', '.join(ENCODINGS)})")
+    if encoding == "zstd" and zstandard is None:
+        raise ImportError("zstd compression requires zstandard. Install with: pip install 'aftershipstorage[zstd]'")
+    return encoding
+
+
+def accept_encoding(decodable: Iterable[str]) -> str:
+    """
+    Build an Accept-Encoding header listing the decodable encodings, best first.
+
+    Args:
+        decodable: Content encodings the HTTP library can decode
+
+    Returns:
+        Header value, e.g. "zstd, gzip, deflate"
+    """
+    decodable = {name.strip().lower() for name in decodable}
+    return ", ".join(name for name in ACCEPT_PREFERENCE if name in decodable)
+
+
+def requests_decoders() -> Tuple[str, ...]:
+    """Content encodings urllib3 (and so requests) can decode."""
+    from urllib3.util.request import ACCEPT_ENCODING
+    return tuple(name.strip() for name in ACCEPT_ENCODING.split(","))
+
+
+def httpx_decoders() -> Tuple[str, ...]:
+    """Content encodings httpx can decode."""
+    try:
+        from httpx._decoders import SUPPORTED_DECODERS
+    except ImportError:  # pragma: no cover - layout of a future httpx
+        return ("gzip", "deflate")
+    return tuple(name for name in SUPPORTED_DECODERS if name != "identity")
+
+
+class BodyCompressor:
+    """
+    Compress JSON request bodies above a size threshold.
+
+    If the server answers a compressed request with 415 Unsupported Media
+    Type, the client resends it uncompressed and stops compressing (see
+    ``rejected``).
+    """
+
+    def __init__(self, config: Optional[CompressionConfig] = None):
+        """
+        Initialize the compressor.
+
+        Args:
+            config: Compression settings (default: CompressionConfig())
+
+        Raises:
+            ImportError: If zstd is configured but zstandard is not installed
+        """
+        self.config = config or CompressionConfig()
+        self.encoding = resolve_encoding(self.config.encoding)
+        self.level = self.config.level if self.config.level is not None else DEFAULT_LEVELS[self.encoding]
+        self.rejected = False
+        self._local = threading.local()
+
+    def applies_to(self, body: bytes, headers: Dict[str, str]) -> bool:
+        """Check whether a body should be compressed."""
+        return (
+            not self.rejected
+            and len(body) >= self.config.min_size
+            and not any(name.lower() == "content-encoding" for name in headers)
+        )
+
+    def compress(self, body: bytes) -> bytes:
+        """
+        Compress a body with the configured encoding.
+
+        Args:
+            body: Encoded JSON
+
+        Returns:
+            Compressed body
+        """
+        if self.encoding == "zstd":
+            # ZstdCompressor objects are not thread-safe; keep one per thread
+            compressor = getattr(self._local, "zstd", None)
+            if compressor is None:
+                compressor = self._local.zstd = zstandard.ZstdCompressor(level=self.level)
+            return compressor.compress(body)
+        return gzip.compress(body, compresslevel=self.level, mtime=0)
+
+    def headers(self) -> Dict[str, str]:
+        """Headers to send with a compressed body."""
+        return {"Content-Encoding": self.encoding}
@@ -2,8 +2,163 @@
 import os
 import yaml
 from pathlib import Path
-from typing import Optional, Dict, Any
-from dataclasses import dataclass, field
+from typing import Optional, Dict, Any, Tuple
+from dataclasses import dataclass, field, fields, replace, asdict
+
+
+SERVICES = ['darkship', 'darkstorage', 'shipshack', 'models2go', 'hostscience', 'aiserve']
+
+
+class SettingsGroup:
+    """Base class for a nested settings block (e.g. ``settings.pool``)."""
+    section = "settings"
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], base: Optional["SettingsGroup"] = None):
+        """
+        Create settings from dictionary.
+
+        Args:
+            data: Settings dictionary
+            base: Settings to fill in for keys missing from data
+
+        Returns:
+            Settings object
+
+        Raises:
+            ValueError: If data contains unknown keys
+        """
+        known = {f.name for f in fields(cls)}
+        unknown = set(data) - known
+        if unknown:
+            raise ValueError(f"Unknown {cls.section} settings: {', '.join(sorted(unknown))}")
+        return replace(base or cls(), **data)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert settings to a YAML-safe dictionary."""
+        return {
+            key: list(value) if isinstance(value, tuple) else value
+            for key, value in asdict(self).items()
+        }
+
+
+@dataclass
+class PoolConfig(SettingsGroup):
+    """Connection pool and keep-alive settings."""
+    section = "pool"
+
+    connections: int = 10  # Number of per-host pools to cache
+    maxsize: int = 10  # Maximum connections kept per host
+    block: bool = False  # Wait for a free connection instead of opening and discarding extras
+    keepalive_expiry: Optional[float] = None  # Seconds before idle keep-alive connections are closed
+
+
+@dataclass
+class RetryConfig(SettingsGroup):
+    """Retry policy settings."""
+    section = "retry"
+
+    max_retries: int = 3  # Retries per request after the first attempt (0 disables retries)
+    backoff_base: float = 0.5  # Backoff cap for the first retry, doubled per attempt (seconds)
+    backoff_max: float = 30.0  # Upper bound for the backoff cap (seconds)
+    statuses: Tuple[int, ...] = (429, 502, 503, 504)  # Response codes that are retried
+    methods: Tuple[str, ...] = ("GET", "HEAD", "OPTIONS", "PUT", "DELETE")  # Methods retried by default
+    retry_connection_errors: bool = True  # Retry connection failures and timeouts
+    respect_retry_after: bool = True  # Wait for the server's Retry-After instead of the backoff
+    retry_after_max: float = 120.0  # Give up rather than wait longer than this for Retry-After (seconds)
+    budget_ratio: float = 0.2  # Retry tokens earned per request
+    budget_capacity: float = 20.0  # Maximum retry tokens saved up
+
+    def __post_init__(self):
+        self.statuses = tuple(int(status) for status in self.statuses)
+        self.methods = tuple(method.upper() for method in self.methods)
+
+
+@dataclass
+class TimeoutConfig(SettingsGroup):
+    """Connect/read timeout settings."""
+    section = "timeouts"
+
+    connect: float = 10.0  # Connect timeout (seconds)
+    read: Optional[float] = None  # Read timeout (seconds); defaults to settings.timeout
+    endpoints: Dict[str, Any] = field(default_factory=dict)  # Path pattern -> read timeout or {connect, read}
+
+
+@dataclass
+class CacheConfig(SettingsGroup):
+    """Conditional-GET response cache settings."""
+    section = "cache"
+
+    enabled: bool = False  # Cache GET responses in memory
+    max_entries: int = 1024  # Maximum cached responses
+    max_bytes: int = 64 * 1024 * 1024  # Maximum total size of cached responses
+    default_ttl: float = 0.0  # Freshness for responses without max-age/Expires (0 = always revalidate)
+    max_ttl: float = 86400.0  # Upper bound on freshness (seconds)
+    store_private: bool = False  # Also cache "Cache-Control: private" responses (client serves a single user)
+
+
+@dataclass
+class CoalesceConfig(SettingsGroup):
+    """Single-flight request coalescing settings."""
+    section = "coalesce"
+
+    enabled: bool = False  # Share one in-flight request among identical concurrent requests
+    methods: Tuple[str, ...] = ("GET", "HEAD")  # Methods that are coalesced
+
+    def __post_init__(self):
+        self.methods = tuple(method.upper() for method in self.methods)
+
+
+@dataclass
+class TransferConfig(SettingsGroup):
+    """Large object upload/download settings."""
+    section = "transfer"
+
+    part_size: int = 16 * 1024 * 1024  # Bytes per multipart upload part or download range
+    concurrency: int = 8  # Parts transferred in parallel per file
+    multipart_threshold: int = 64 * 1024 * 1024  # Files at least this large are uploaded in parts
+    adaptive: bool = False  # Adjust part requests in flight (across all transfers) to latency and 503s
+    min_concurrency: int = 1  # Lower bound of the adaptive limit
+    max_concurrency: int = 64  # Upper bound of the adaptive limit
+    latency_tolerance: float = 2.0  # Cut the limit once time per byte exceeds this multiple of the best seen
+    backoff_ratio: float = 0.5  # Factor the adaptive limit is cut by on a 429/503
+    max_bandwidth: Optional[int] = None  # Bytes per second across all transfers of the client (None: unlimited)
+
+
+@dataclass
+class PresignConfig(SettingsGroup):
+    """Presigned URL settings."""
+    section = "presign"
+
+    cache: bool = True  # Reuse presigned URLs until shortly before they expire
+    max_entries: int = 10000  # Maximum cached URLs (least recently used are evicted)
+    expires_in: int = 3600  # Lifetime requested for new URLs (seconds)
+    safety_margin: float = 60.0  # Stop handing out a cached URL this long before it expires (seconds)
+    concurrency: int = 16  # Presign requests in flight when presigning many keys
+
+
+@dataclass
+class CompressionConfig(SettingsGroup):
+    """Request body compression settings."""
+    section = "compression"
+
+    enabled: bool = False  # Compress JSON request bodies
+    encoding: str = "auto"  # "gzip", "zstd", or "auto" (zstd if zstandard is installed, else gzip)
+    min_size: int = 1024  # Bodies smaller than this many bytes are sent uncompressed
+    level: Optional[int] = None  # Compression level (default: 6 for gzip, 3 for zstd)
+
+
+# Settings blocks accepted under ``settings:`` and overridable per service
+SETTINGS_GROUPS = {
+    'pool': PoolConfig,
+    'retry': RetryConfig,
+    'timeouts': TimeoutConfig,
+    'cache': CacheConfig,
+    'coalesce': CoalesceConfig,
+    'transfer': TransferConfig,
+    'presign': PresignConfig,
+    'compression': CompressionConfig,
+}
 
 
 @dataclass
@@ -11,6 +166,14 @@ class ServiceConfig:
     """Configuration for a single service."""
     api_key: Optional[str] = None
     base_url: Optional[str] = None
+    pool: Dict[str, Any] = field(default_factory=dict)  # Overrides for the global pool settings
+    retry: Dict[str, Any] = field(default_factory=dict)  # Overrides for the global retry settings
+    timeouts: Dict[str, Any] = field(default_factory=dict)  # Overrides for the global timeout settings
+    cache: Dict[str, Any] = field(default_factory=dict)  # Overrides for the global cache settings
+    coalesce: Dict[str, Any] = field(default_factory=dict)  # Overrides for the global coalescing settings
+    transfer: Dict[str, Any] = field(default_factory=dict)  # Overrides for the global transfer settings
+    presign: Dict[str, Any] = field(default_factory=dict)  # Overrides for the global presign settings
+    compression: Dict[str, Any] = field(default_factory=dict)  # Overrides for the global compression settings
 
 
 @dataclass
@@ -39,6 +202,14 @@ class Config:
     # Global settings
     timeout: int = 30
     verify_ssl: bool = True
+    pool: PoolConfig = field(default_factory=PoolConfig)
+    retry: RetryConfig = field(default_factory=RetryConfig)
+    timeouts: TimeoutConfig = field(default_factory=TimeoutConfig)
+    cache: CacheConfig = field(default_factory=CacheConfig)
+    coalesce: CoalesceConfig = field(default_factory=CoalesceConfig)
+    transfer: TransferConfig = field(default_factory=TransferConfig)
+    presign: PresignConfig = field(default_factory=PresignConfig)
+    compression: CompressionConfig = field(default_factory=CompressionConfig)
 
     @classmethod
     def from_file(cls, config_path: str) -> "Config":
@@ -82,13 +253,13 @@ class Config:
         config = cls()
 
         # Load service configurations
-        services = ['darkship', 'darkstorage', 'shipshack', 'models2go', 'hostscience', 'aiserve']
-        for service in services:
+        for service in SERVICES:
             if service in data:
                 service_data = data[service]
                 setattr(config, service, ServiceConfig(
                     api_key=service_data.get('api_key'),
-                    base_url=service_data.get('base_url')
+                    base_url=service_data.get('base_url'),
+                    **{name: dict(service_data.get(name) or {}) for name in SETTINGS_GROUPS}
                 ))
 
         # Load AfterDark Systems account
@@ -106,6 +277,13 @@ class Config:
             settings = data['settings']
             config.timeout = settings.get('timeout', 30)
             config.verify_ssl = settings.get('verify_ssl', True)
+            for name, group in SETTINGS_GROUPS.items():
+                setattr(config, name, group.from_dict(settings.get(name) or {}))
+
+        # Validate per-service overrides early
+        for service in SERVICES:
+            for name, group in SETTINGS_GROUPS.items():
+                group.from_dict(getattr(getattr(config, service), name))
 
         return config
 
@@ -197,20 +375,211 @@ class Config:
 
         return default
 
+    def resolve_settings(self, service: str, name: str) -> SettingsGroup:
+        """
+        Resolve a settings block for a service.
+
+        Priority:
+        1. Service-specific settings
+        2. Global settings
+
+        Args:
+            service: Service name (e.g., 'darkship')
+            name: Settings block name (a key of SETTINGS_GROUPS, e.g. 'retry')
+
+        Returns:
+            Settings object
+        """
+        settings = getattr(self, name)
+        service_config = getattr(self, service, None)
+        overrides = getattr(service_config, name, None) if service_config else None
+        if overrides:
+            return SETTINGS_GROUPS[name].from_dict(overrides, base=settings)
+        return settings
+
+    def resolve_pool(self, service: str) -> PoolConfig:
+        """
+        Resolve connection pool settings for a service.
+
+        Priority:
+        1. Service-specific pool settings
+        2. Global pool settings
+
+        Args:
+            service: Service name (e.g., 'darkship')
+
+        Returns:
+            PoolConfig
+        """
+        return self.resolve_settings(service, 'pool')
+
+    def resolve_retry(self, service: str) -> RetryConfig:
+        """
+        Resolve retry policy settings for a service.
+
+        Priority:
+        1. Service-specific retry settings
+        2. Global retry settings
+
+        Args:
+            service: Service name (e.g., 'darkship')
+
+        Returns:
+            RetryConfig
+        """
+        return self.resolve_settings(service, 'retry')
+
+    def resolve_timeouts(self, service: str) -> TimeoutConfig:
+        """
+        Resolve timeout settings for a service.
+
+        Priority:
+        1. Service-specific timeout settings (endpoint patterns are checked
+           before the global ones)
+        2. Global timeout settings
+        3. settings.timeout as the read timeout
+
+        Args:
+            service: Service name (e.g., 'darkship')
+
+        Returns:
+            TimeoutConfig
+        """
+        timeouts = self.timeouts
+        if timeouts.read is None:
+            timeouts = replace(timeouts, read=self.timeout)
+
+        service_config = getattr(self, service, None)
+        if service_config and service_config.timeouts:
+            overrides = dict(service_config.timeouts)
+            endpoints = dict(overrides.get('endpoints') or {})
+            for pattern, value in timeouts.endpoints.items():
+                endpoints.setdefault(pattern, value)
+            overrides['endpoints'] = endpoints
+            timeouts = TimeoutConfig.from_dict(overrides, base=timeouts)
+        return timeouts
+
+    def resolve_cache(self, service: str) -> CacheConfig:
+        """
+        Resolve response cache settings for a service.
+
+        Priority:
+        1. Service-specific cache settings
+        2. Global cache settings
+
+        Args:
+            service: Service name (e.g., 'darkship')
+
+        Returns:
+            CacheConfig
+        """
+        return self.resolve_settings(service, 'cache')
+
+    def resolve_coalesce(self, service: str) -> CoalesceConfig:
+        """
+        Resolve request coalescing settings for a service.
+
+        Priority:
+        1. Service-specific coalescing settings
+        2. Global coalescing settings
+
+        Args:
+            service: Service name (e.g., 'darkship')
+
+        Returns:
+            CoalesceConfig
+        """
+        return self.resolve_settings(service, 'coalesce')
+
+    def resolve_transfer(self, service: str) -> TransferConfig:
+        """
+        Resolve large object transfer settings for a service.
+
+        Priority:
+        1. Service-specific transfer settings
+        2. Global transfer settings
+
+        Args:
+            service: Service name (e.g., 'darkstorage')
+
+        Returns:
+            TransferConfig
+        """
+        return self.resolve_settings(service, 'transfer')
+
+    def resolve_presign(self, service: str) -> PresignConfig:
+        """
+        Resolve presigned URL settings for a service.
+
+        Priority:
+        1. Service-specific presign settings
+        2. Global presign settings
+
+        Args:
+            service: Service name (e.g., 'darkstorage')
+
+        Returns:
+            PresignConfig
+        """
+        return self.resolve_settings(service, 'presign')
+
+    def resolve_compression(self, service: str) -> CompressionConfig:
+        """
+        Resolve request compression settings for a service.
+
+        Priority:
+        1. Service-specific compression settings
+        2. Global compression settings
+
+        Args:
+            service: Service name (e.g., 'darkship')
+
+        Returns:
+            CompressionConfig
+        """
+        return self.resolve_settings(service, 'compression')
+
+    def client_options(self, service: str) -> Dict[str, Any]:
+        """
+        Resolve keyword arguments for a service client.
+
+        Args:
+            service: Service name (e.g., 'darkship')
+
+        Returns:
+            Keyword arguments accepted by BaseClient
+        """
+        return {
+            'pool': self.resolve_pool(service),
+            'retry': self.resolve_retry(service),
+            'timeouts': self.resolve_timeouts(service),
+            'cache': self.resolve_cache(service),
+            'coalesce': self.resolve_coalesce(service),
+            'transfer': self.resolve_transfer(service),
+            'presign': self.resolve_presign(service),
+            'compression': self.resolve_compression(service),
+            'verify_ssl': self.verify_ssl,
+        }
+
     def to_dict(self) -> Dict[str, Any]:
         """Convert config to dictionary."""
         result = {}
 
         # Services
-        services = ['darkship', 'darkstorage', 'shipshack', 'models2go', 'hostscience', 'aiserve']
-        for service in services:
+        for service in SERVICES:
             service_config = getattr(self, service)
-            if service_config.api_key or service_config.base_url:
+            overrides = {
+                name: dict(getattr(service_config, name))
+                for name in SETTINGS_GROUPS
+                if getattr(service_config, name)
+            }
+            if service_config.api_key or service_config.base_url or overrides:
                 result[service] = {}
                 if service_config.api_key:
                     result[service]['api_key'] = service_config.api_key
                 if service_config.base_url:
                     result[service]['base_url'] = service_config.base_url
+                result[service].update(overrides)
 
         # AfterDark account
         if self.afterdark_account:
@@ -227,8 +596,10 @@ class Config:
         # Settings
         result['settings'] = {
             'timeout': self.timeout,
-            'verify_ssl': self.verify_ssl
+            'verify_ssl': self.verify_ssl,
         }
+        for name in SETTINGS_GROUPS:
+            result['settings'][name] = getattr(self, name).to_dict()
 
         return result
 
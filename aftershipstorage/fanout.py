@@ -0,0 +1,224 @@
+"""Bounded-concurrency fan-out of many requests."""
+import asyncio
+import contextvars
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, Executor, Future, wait, FIRST_COMPLETED
+from dataclasses import dataclass, field
+from typing import Optional, Dict, Any, Iterable, Iterator, AsyncIterator, Callable, Union
+
+
+DEFAULT_CONCURRENCY = 16
+
+
+@dataclass
+class RequestSpec:
+    """A single request in a fan-out batch."""
+    endpoint: str
+    method: str = "GET"
+    service: Optional[str] = None  # Service name, used by AftershipStorage.gather
+    kwargs: Dict[str, Any] = field(default_factory=dict)  # Arguments for BaseClient.request
+
+    @classmethod
+    def coerce(cls, spec: Union["RequestSpec", str, tuple, dict]) -> "RequestSpec":
+        """
+        Normalize a request spec.
+
+        Accepts a RequestSpec, an endpoint string (GET), a
+        ``(method, endpoint)`` or ``(method, endpoint, kwargs)`` tuple, or a
+        dict with ``endpoint`` and optional ``method``, ``service`` and any
+        BaseClient.request keyword arguments.
+
+        Args:
+            spec: Request spec in any accepted form
+
+        Returns:
+            RequestSpec
+
+        Raises:
+            TypeError: If the spec has an unsupported type
+        """
+        if isinstance(spec, cls):
+            return spec
+        if isinstance(spec, str):
+            return cls(endpoint=spec)
+        if isinstance(spec, tuple):
+            method, endpoint = spec[0], spec[1]
+            kwargs = dict(spec[2]) if len(spec) > 2 else {}
+            return cls(endpoint=endpoint, method=method, kwargs=kwargs)
+        if isinstance(spec, dict):
+            kwargs = dict(spec)
+            endpoint = kwargs.pop("endpoint")
+            method = kwargs.pop("method", "GET")
+            service = kwargs.pop("service", None)
+            return cls(endpoint=endpoint, method=method, service=service, kwargs=kwargs)
+        raise TypeError(f"Unsupported request spec: {spec!r}")
+
+
+@dataclass
+class RequestResult:
+    """Outcome of one request in a fan-out batch."""
+    index: int  # Position of the spec in the input
+    spec: RequestSpec  # The raw input spec if it could not be normalized
+    response: Any = None
+    error: Optional[BaseException] = None
+
+    @property
+    def ok(self) -> bool:
+        """True if the request succeeded."""
+        return self.error is None
+
+    def result(self):
+        """
+        Get the response, re-raising the captured error if the request failed.
+
+        Returns:
+            Response object
+        """
+        if self.error is not None:
+            raise self.error
+        return self.response
+
+
+def _call(
+    index: int,
+    spec: Any,
+    send: Callable[[RequestSpec], Any],
+    coerce: Callable[[Any], RequestSpec],
+) -> RequestResult:
+    try:
+        spec = coerce(spec)
+        return RequestResult(index, spec, response=send(spec))
+    except Exception as e:
+        return RequestResult(index, spec, error=e)
+
+
+def run_requests(
+    specs: Iterable[Any],
+    send: Callable[[RequestSpec], Any],
+    concurrency: int = DEFAULT_CONCURRENCY,
+    ordered: bool = True,
+    executor: Optional[Executor] = None,
+    coerce: Callable[[Any], RequestSpec] = RequestSpec.coerce,
+) -> Iterator[RequestResult]:
+    """
+    Run requests on a worker pool with at most ``concurrency`` in flight.
+
+    Specs are consumed lazily, so generators of millions of specs run in
+    constant memory. Errors are captured on each RequestResult instead of
+    being raised, including a spec that cannot be normalized, so one
+    malformed spec does not abort the batch. The caller's context
+    (including any ``deadline``) is carried into the workers.
+
+    Args:
+        specs: Request specs (see RequestSpec.coerce)
+        send: Function performing one request
+        concurrency: Maximum requests in flight
+        ordered: Yield results in input order (True) or as they complete (False)
+        executor: Worker pool to use (default: a pool of ``concurrency``
+            threads created for this call)
+        coerce: Function normalizing one spec (default: RequestSpec.coerce)
+
+    Yields:
+        RequestResult for every spec
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+
+    own_executor = executor is None
+    if own_executor:
+        executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="aftership-fanout")
+
+    specs_iter = enumerate(specs)
+    pending: "deque[Future]" = deque()
+
+    def submit_next() -> bool:
+        try:
+            index, spec = next(specs_iter)
+        except StopIteration:
+            return False
+        context = contextvars.copy_context()
+        pending.append(executor.submit(context.run, _call, index, spec, send, coerce))
+        return True
+
+    try:
+        while len(pending) < concurrency and submit_next():
+            pass
+
+        while pending:
+            if ordered:
+                future = pending.popleft()
+                result = future.result()
+            else:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                future = next(iter(done))
+                pending.remove(future)
+                result = future.result()
+            submit_next()
+            yield result
+    finally:
+        for future in pending:
+            future.cancel()
+        if own_executor:
+            executor.shutdown(wait=False)
+
+
+async def arun_requests(
+    specs: Iterable[Any],
+    send: Callable[[RequestSpec], Any],
+    concurrency: int = DEFAULT_CONCURRENCY,
+    ordered: bool = True,
+    coerce: Callable[[Any], RequestSpec] = RequestSpec.coerce,
+) -> AsyncIterator[RequestResult]:
+    """
+    Async counterpart of run_requests with at most ``concurrency`` requests in flight.
+
+    Args:
+        specs: Request specs (see RequestSpec.coerce)
+        send: Coroutine function performing one request
+        concurrency: Maximum requests in flight
+        ordered: Yield results in input order (True) or as they complete (False)
+        coerce: Function normalizing one spec (default: RequestSpec.coerce)
+
+    Yields:
+        RequestResult for every spec
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+
+    async def call(index: int, spec: Any) -> RequestResult:
+        try:
+            spec = coerce(spec)
+            return RequestResult(index, spec, response=await send(spec))
+        except Exception as e:
+            return RequestResult(index, spec, error=e)
+
+    specs_iter = enumerate(specs)
+    pending: "deque[asyncio.Task]" = deque()
+
+    def submit_next() -> bool:
+        try:
+            index, spec = next(specs_iter)
+        except StopIteration:
+            return False
+        pending.append(asyncio.ensure_future(call(index, spec)))
+        return True
+
+    try:
+        while len(pending) < concurrency and submit_next():
+            pass
+
+        while pending:
+            if ordered:
+                task = pending.popleft()
+                result = await task
+            else:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                task = next(iter(done))
+                pending.remove(task)
+                result = task.result()
+            submit_next()
+            yield result
+    finally:
+        for task in pending:
+            task.cancel()
+
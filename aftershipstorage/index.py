@@ -0,0 +1,440 @@
+"""Local SQLite index of darkstorage bucket listings."""
+import contextvars
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Optional, Dict, Any, List, Tuple, Callable, Union
+
+from .fanout import DEFAULT_CONCURRENCY
+
+
+# Objects written to SQLite per transaction while refreshing
+WRITE_BATCH = 1000
+
+# Seconds refresh threads wait on the row queue before checking whether the refresh stopped
+PUT_TIMEOUT = 0.1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS objects (
+    key TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    generation INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS prefixes (
+    prefix TEXT PRIMARY KEY,
+    refreshed_at REAL NOT NULL
+) WITHOUT ROWID;
+"""
+
+
+class _Abandoned(Exception):
+    """Raised in a listing worker once the refresh it feeds has stopped."""
+
+
+@dataclass
+class RefreshResult:
+    """Outcome of refreshing a prefix."""
+    prefix: str
+    objects: int  # Objects listed
+    removed: int  # Indexed objects that no longer exist
+    shards: int  # Prefixes listed in parallel
+    elapsed: float
+
+
+def prefix_upper_bound(prefix: str) -> Optional[str]:
+    """
+    Smallest string greater than every string starting with ``prefix``.
+
+    Lets prefix scans use the primary key index as a range
+    (``prefix <= key < bound``) instead of a LIKE pattern.
+
+    Returns:
+        Upper bound, or None for the empty prefix (no bound)
+    """
+    while prefix:
+        last = ord(prefix[-1])
+        if last < 0x10FFFF:
+            return prefix[:-1] + chr(last + 1)
+        prefix = prefix[:-1]
+    return None
+
+
+class ObjectIndex:
+    """
+    Local index of a bucket's objects for existence, prefix and size queries.
+
+    Listings are stored in SQLite and queries are answered from it with an
+    indexed lookup (microseconds) instead of a listing request. A prefix is
+    listed again once its last refresh is older than ``max_age`` seconds;
+    with ``max_age=None`` the index is only refreshed explicitly.
+
+    Refreshes shard the listing: the prefix is listed once with a ``/``
+    delimiter, which returns the objects directly under it and its
+    sub-prefixes, and the sub-prefixes are then listed in parallel. Servers
+    that ignore the delimiter are listed in one pass. Listed objects are
+    written in short batches, so queries are answered while a refresh
+    runs. Objects that disappeared from a refreshed prefix are dropped from
+    the index once the whole listing has completed. ``refresh(prefix, start_after=marker)`` lists only keys after a
+    marker, which keeps append-only prefixes (logs, checkpoints) current
+    with a single short listing.
+    """
+
+    list_endpoint = "/v1/buckets/{bucket}/objects"
+
+    def __init__(
+        self,
+        client,
+        bucket: str,
+        path: str = ":memory:",
+        max_age: Optional[float] = 300.0,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        delimiter: str = "/",
+        page_size: int = 1000,
+    ):
+        """
+        Initialize the index.
+
+        Args:
+            client: DarkstorageClient used for listings
+            bucket: Bucket to index
+            path: SQLite database file (default: in memory); a file keeps the
+                index across processes and restarts
+            max_age: Seconds before an indexed prefix is listed again on the
+                next query (None: never refresh automatically)
+            concurrency: Sub-prefixes listed in parallel
+            delimiter: Delimiter used to discover sub-prefixes
+            page_size: Objects requested per listing page
+        """
+        self.client = client
+        self.bucket = bucket
+        self.path = path
+        self.max_age = max_age
+        self.concurrency = max(1, concurrency)
+        self.delimiter = delimiter
+        self.page_size = page_size
+
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        if path != ":memory:":
+            self.db.execute("PRAGMA journal_mode=WAL")
+            self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(_SCHEMA)
+        self._lock = threading.RLock()
+        self._refresh_lock = threading.Lock()
+        self._refreshed: Dict[str, float] = dict(self.db.execute("SELECT prefix, refreshed_at FROM prefixes"))
+        row = self.db.execute("SELECT MAX(generation) FROM objects").fetchone()
+        self._generation = row[0] or 0
+
+    # Freshness
+
+    def _covering(self, key: str) -> Optional[Tuple[str, float]]:
+        """Longest refreshed prefix of ``key``, with its refresh time."""
+        best = None
+        for prefix, refreshed_at in self._refreshed.items():
+            if key.startswith(prefix) and (best is None or len(prefix) > len(best[0])):
+                best = (prefix, refreshed_at)
+        return best
+
+    def is_fresh(self, prefix: str = "") -> bool:
+        """Check whether ``prefix`` is covered by a refresh within ``max_age``."""
+        with self._lock:
+            covering = self._covering(prefix)
+        if covering is None:
+            return False
+        return self.max_age is None or time.time() - covering[1] <= self.max_age
+
+    def _ensure_fresh(self, prefix: str, lookup: bool = False):
+        if self.is_fresh(prefix):
+            return
+        with self._lock:
+            covering = self._covering(prefix)
+        if covering is None:
+            # Nothing indexed here yet; a key lookup lists the key's parent "directory"
+            self.refresh(self._parent(prefix) if lookup else prefix)
+        elif self.max_age is not None:
+            self.refresh(covering[0])
+
+    def _parent(self, key: str) -> str:
+        """Prefix up to and including the key's last delimiter."""
+        if not self.delimiter:
+            return ""
+        cut = key.rfind(self.delimiter)
+        return key[:cut + len(self.delimiter)] if cut >= 0 else ""
+
+    # Queries
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up an object.
+
+        Args:
+            key: Object key
+
+        Returns:
+            Dict with key, size, etag and last_modified, or None if absent
+        """
+        self._ensure_fresh(key, lookup=True)
+        with self._lock:
+            row = self.db.execute(
+                "SELECT key, size, etag, last_modified FROM objects WHERE key = ?", (key,)
+            ).fetchone()
+        return None if row is None else dict(zip(("key", "size", "etag", "last_modified"), row))
+
+    def exists(self, key: str) -> bool:
+        """Check whether an object exists."""
+        self._ensure_fresh(key, lookup=True)
+        with self._lock:
+            return self.db.execute("SELECT 1 FROM objects WHERE key = ?", (key,)).fetchone() is not None
+
+    def _range(self, prefix: str) -> Tuple[str, List[Any]]:
+        bound = prefix_upper_bound(prefix)
+        if bound is None:
+            return "key >= ?", [prefix]
+        return "key >= ? AND key < ?", [prefix, bound]
+
+    def list(self, prefix: str = "", limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        List indexed objects under a prefix, in key order.
+
+        Args:
+            prefix: Key prefix
+            limit: Maximum objects to return
+
+        Returns:
+            Dicts with key, size, etag and last_modified
+        """
+        self._ensure_fresh(prefix)
+        where, args = self._range(prefix)
+        sql = f"SELECT key, size, etag, last_modified FROM objects WHERE {where} ORDER BY key"
+        if limit is not None:
+            sql += " LIMIT ?"
+            args.append(limit)
+        with self._lock:
+            rows = self.db.execute(sql, args).fetchall()
+        return [dict(zip(("key", "size", "etag", "last_modified"), row)) for row in rows]
+
+    def size(self, prefix: str = "") -> Tuple[int, int]:
+        """
+        Count the objects and bytes under a prefix.
+
+        Returns:
+            (object count, total bytes)
+        """
+        self._ensure_fresh(prefix)
+        where, args = self._range(prefix)
+        with self._lock:
+            count, total = self.db.execute(
+                f"SELECT COUNT(*), COALESCE(SUM(size), 0) FROM objects WHERE {where}", args
+            ).fetchone()
+        return count, total
+
+    # Refresh
+
+    def _listing(self, prefix: str, delimiter: Optional[str] = None,
+                 items_key: Union[str, Tuple[str, ...], None] = None, start_after: Optional[str] = None):
+        params = {"prefix": prefix} if prefix else {}
+        if delimiter:
+            params["delimiter"] = delimiter
+        if start_after:
+            params["start_after"] = start_after
+        return self.client.paginate(
+            self.list_endpoint.format(bucket=self.bucket),
+            params=params,
+            page_size=self.page_size,
+            items_key=items_key,
+        )
+
+    @staticmethod
+    def _row(obj: Dict[str, Any]) -> Optional[Tuple[str, int, Optional[str], Optional[str]]]:
+        key = obj["key"]
+        if key.endswith("/") and not obj.get("size"):
+            return None  # Folder placeholder
+        return key, int(obj.get("size") or 0), obj.get("etag"), obj.get("last_modified")
+
+    def _write(self, batch: List[tuple], generation: int):
+        """Store a batch of listed rows in its own short transaction."""
+        with self._lock:
+            self.db.executemany(
+                "INSERT OR REPLACE INTO objects VALUES (?, ?, ?, ?, ?)",
+                [row + (generation,) for row in batch],
+            )
+            self.db.commit()
+
+    def _list_top(self, prefix: str, start_after: Optional[str], generation: int) -> Tuple[int, List[str]]:
+        """
+        List the objects directly under ``prefix`` and discover its sub-prefixes.
+
+        Objects and common prefixes are read from the same delimited
+        listing (they share its page size), so a page holding only one kind
+        does not end the listing early. Returns (objects listed, sub-prefixes).
+        """
+        delimiter = None if start_after else self.delimiter
+        items_key = ("items", "common_prefixes") if delimiter else None
+        listed, shards, batch = 0, [], []
+        for item in self._listing(prefix, delimiter, items_key=items_key, start_after=start_after):
+            if isinstance(item, dict) and "key" in item:
+                row = self._row(item)
+                if row is not None:
+                    batch.append(row)
+            else:
+                shard = item if isinstance(item, str) else item.get("prefix")
+                if shard and shard.startswith(prefix) and shard != prefix:
+                    shards.append(shard)
+            if len(batch) >= WRITE_BATCH:
+                self._write(batch, generation)
+                listed += len(batch)
+                batch = []
+        if batch:
+            self._write(batch, generation)
+            listed += len(batch)
+        return listed, shards
+
+    def _list_into(self, put: Callable[[Any], None], prefix: str):
+        """List a sub-prefix, handing batches of rows to ``put``."""
+        batch = []
+        for obj in self._listing(prefix):
+            row = self._row(obj)
+            if row is None:
+                continue
+            batch.append(row)
+            if len(batch) >= WRITE_BATCH:
+                put(batch)
+                batch = []
+        if batch:
+            put(batch)
+
+    def refresh(self, prefix: str = "", start_after: Optional[str] = None) -> RefreshResult:
+        """
+        List a prefix and bring the index in line with it.
+
+        Args:
+            prefix: Key prefix to refresh (default: the whole bucket)
+            start_after: Only list keys after this marker; indexed keys up
+                to the marker are kept as they are
+
+        Returns:
+            RefreshResult
+
+        Raises:
+            requests.HTTPError: If a listing request fails; objects listed
+                so far are updated, but nothing is removed from the index
+        """
+        with self._refresh_lock:
+            return self._refresh(prefix, start_after)
+
+    def _refresh(self, prefix: str, start_after: Optional[str]) -> RefreshResult:
+        started = time.monotonic()
+        refreshed_at = time.time()
+        with self._lock:
+            self._generation += 1
+            generation = self._generation
+
+        listed, shards = self._list_top(prefix, start_after, generation)
+        if shards:
+            listed += self._list_shards(shards, generation)
+
+        # Only now is the listing known to be complete, so absent keys are really gone
+        with self._lock:
+            try:
+                where, args = self._range(prefix)
+                if start_after:
+                    where += " AND key > ?"
+                    args.append(start_after)
+                removed = self.db.execute(
+                    f"DELETE FROM objects WHERE {where} AND generation != ?", args + [generation]
+                ).rowcount
+                if not start_after:
+                    # This refresh supersedes the refresh records of sub-prefixes
+                    for other in [p for p in self._refreshed if p.startswith(prefix)]:
+                        del self._refreshed[other]
+                    bound = prefix_upper_bound(prefix)
+                    if bound is None:
+                        self.db.execute("DELETE FROM prefixes")
+                    else:
+                        self.db.execute("DELETE FROM prefixes WHERE prefix >= ? AND prefix < ?", (prefix, bound))
+                self._refreshed[prefix] = refreshed_at
+                self.db.execute("INSERT OR REPLACE INTO prefixes VALUES (?, ?)", (prefix, refreshed_at))
+                self.db.commit()
+            except BaseException:
+                self.db.rollback()
+                raise
+
+        return RefreshResult(prefix, listed, removed, len(shards), time.monotonic() - started)
+
+    def _list_shards(self, shards: List[str], generation: int) -> int:
+        """List sub-prefixes in parallel, writing their rows as they arrive. Returns objects listed."""
+        rows: "queue.Queue" = queue.Queue(maxsize=self.concurrency * 4)
+        done = object()
+        stop = threading.Event()
+        errors: List[BaseException] = []
+
+        def put(item: Any):
+            # Never block for good: the consumer may have given up
+            while True:
+                if stop.is_set():
+                    raise _Abandoned()
+                try:
+                    rows.put(item, timeout=PUT_TIMEOUT)
+                    return
+                except queue.Full:
+                    pass
+
+        def run(shard: str):
+            try:
+                self._list_into(put, shard)
+            except _Abandoned:
+                return
+            except BaseException as e:
+                errors.append(e)
+                stop.set()
+                return
+            try:
+                put(done)
+            except _Abandoned:
+                pass
+
+        listed = 0
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="aftership-index") as executor:
+            for shard in shards:
+                executor.submit(contextvars.copy_context().run, run, shard)
+            try:
+                remaining = len(shards)
+                while remaining and not stop.is_set():
+                    try:
+                        batch = rows.get(timeout=PUT_TIMEOUT)
+                    except queue.Empty:
+                        continue
+                    if batch is done:
+                        remaining -= 1
+                        continue
+                    self._write(batch, generation)
+                    listed += len(batch)
+            finally:
+                # Workers blocked on a full queue see this and exit
+                stop.set()
+        if errors:
+            raise errors[0]
+        return listed
+
+    def invalidate(self, prefix: str = ""):
+        """Mark a prefix as stale so the next query under it lists it again."""
+        with self._lock:
+            for other in [p for p in self._refreshed if p.startswith(prefix) or prefix.startswith(p)]:
+                self._refreshed[other] = 0.0
+                self.db.execute("UPDATE prefixes SET refreshed_at = 0 WHERE prefix = ?", (other,))
+            self.db.commit()
+
+    def close(self):
+        """Close the database."""
+        with self._lock:
+            self.db.close()
+
+    def __enter__(self) -> "ObjectIndex":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
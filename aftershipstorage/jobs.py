@@ -0,0 +1,462 @@
+"""Multiplexed waiting on aiserve compute jobs from one scheduler thread."""
+import heapq
+import itertools
+import random
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, InvalidStateError
+from dataclasses import dataclass, field
+from typing import Optional, Dict, Any, Iterable, List, Callable
+
+import requests
+
+from .fanout import RequestSpec, DEFAULT_CONCURRENCY
+from .pagination import extract_items
+
+
+# Job states after which a job never changes again
+TERMINAL_STATES = frozenset({"completed", "succeeded", "failed", "cancelled", "canceled", "stopped", "error"})
+
+# Terminal states that count as success; the others fail the job's future with JobFailed
+SUCCESS_STATES = frozenset({"completed", "succeeded"})
+
+# Responses to a filtered job listing meaning the server cannot filter by id
+BATCH_UNSUPPORTED_STATUSES = frozenset({400, 404, 405, 501})
+
+# Status polls failing with these codes will never succeed, so the job's future fails
+PERMANENT_ERROR_STATUSES = frozenset({401, 403, 404, 410})
+
+# Called with (job_id, final status) when a job reaches a terminal state
+JobCallback = Callable[[str, Dict[str, Any]], None]
+
+
+class JobFailed(Exception):
+    """A watched job ended in a failed, cancelled or stopped state."""
+
+    def __init__(self, job_id: str, status: Dict[str, Any]):
+        state = job_state(status)
+        detail = status.get("error") or status.get("message")
+        super().__init__(f"Job {job_id} {state}" + (f": {detail}" if detail else ""))
+        self.job_id = job_id
+        self.state = state
+        self.status = status
+
+
+def job_state(status: Dict[str, Any]) -> Optional[str]:
+    """
+    Get the lowercased state of a job status or listing item.
+
+    Accepts ``{"status": "running"}``, ``{"state": "running"}`` and
+    ``{"status": {"state": "running"}}``.
+    """
+    state = status.get("status", status.get("state"))
+    if isinstance(state, dict):
+        state = state.get("state", state.get("status"))
+    return str(state).lower() if state is not None else None
+
+
+@dataclass
+class _Watch:
+    """Scheduling state of one watched job."""
+    job_id: str
+    future: Future
+    expected_runtime: Optional[float]
+    interval: float
+    started: float = field(default_factory=time.monotonic)
+    next_poll: float = 0.0
+    state: Optional[str] = None
+    status: Optional[Dict[str, Any]] = None
+    etag: Optional[str] = None  # Validator for conditional status GETs
+
+
+class JobWaiter:
+    """
+    Track many aiserve compute jobs from a single scheduler thread.
+
+    ``watch()`` returns a Future that resolves with the job's final status
+    (or fails with JobFailed), so thousands of jobs need no thread each.
+    The scheduler keeps jobs in a heap ordered by their next poll time and
+    checks all due jobs together: with one ``GET /v1/compute/jobs?ids=...``
+    per ``batch_size`` jobs where the server supports filtering by id, and
+    otherwise with conditional ``GET /v1/compute/jobs/{id}/status`` requests
+    (``If-None-Match``, so unchanged jobs cost a 304) on a shared worker
+    pool.
+
+    Each job's poll interval starts at ``min_interval`` and grows by
+    ``backoff`` per unchanged poll up to ``max_interval``. A state change
+    resets it, since one transition (queued -> running) is often followed
+    by another soon after. With ``expected_runtime``, the interval is also
+    kept under half the time left until the job is expected to finish, so
+    completion is noticed promptly.
+    """
+
+    list_endpoint = "/v1/compute/jobs"
+    status_endpoint = "/v1/compute/jobs/{job_id}/status"
+
+    def __init__(
+        self,
+        client,
+        min_interval: float = 1.0,
+        max_interval: float = 60.0,
+        backoff: float = 1.5,
+        batch_size: int = 100,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        jitter: float = 0.1,
+    ):
+        """
+        Initialize the waiter.
+
+        Args:
+            client: AiserveClient used for the status requests
+            min_interval: Shortest time between polls of a job (seconds)
+            max_interval: Longest time between polls of a job (seconds)
+            backoff: Factor the interval grows by per unchanged poll
+            batch_size: Jobs checked per listing request
+            concurrency: Per-job status requests in flight, when the server
+                cannot list jobs by id
+            jitter: Random spread applied to intervals (fraction), so jobs
+                watched together do not stay in lockstep
+        """
+        self.client = client
+        self.min_interval = min_interval
+        self.max_interval = max(min_interval, max_interval)
+        self.backoff = backoff
+        self.batch_size = max(1, batch_size)
+        self.concurrency = concurrency
+        self.jitter = jitter
+        # Whether the listing endpoint filters by id; None until first used
+        self.batch_supported: Optional[bool] = None
+
+        self._watches: Dict[str, _Watch] = {}
+        self._heap: List[tuple] = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._closed = False
+        self._stats = {"requests": 0, "checks": 0, "not_modified": 0, "errors": 0, "completed": 0, "failed": 0}
+
+    # Public API
+
+    def watch(
+        self,
+        job_id: str,
+        callback: Optional[JobCallback] = None,
+        expected_runtime: Optional[float] = None,
+    ) -> Future:
+        """
+        Start tracking a job.
+
+        Args:
+            job_id: Compute job ID
+            callback: Called with (job_id, final status) once the job reaches
+                a terminal state, on the scheduler thread (keep it short)
+            expected_runtime: Expected seconds until the job finishes, used
+                to poll more often as that time approaches
+
+        Returns:
+            Future resolving with the final status dict; it fails with
+            JobFailed if the job failed or was cancelled, or with the HTTP
+            error if the job cannot be read (e.g. 404). Cancelling the
+            future stops tracking the job.
+
+        Raises:
+            RuntimeError: If the waiter is closed
+        """
+        job_id = str(job_id)
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("JobWaiter is closed")
+            watch = self._watches.get(job_id)
+            if watch is None:
+                watch = _Watch(job_id, Future(), expected_runtime, self.min_interval)
+                watch.future.add_done_callback(lambda future, watch=watch: self._forget(watch))
+                self._watches[job_id] = watch
+                self._schedule(watch, time.monotonic())
+                self._start()
+            elif expected_runtime is not None:
+                watch.expected_runtime = expected_runtime
+        if callback is not None:
+            watch.future.add_done_callback(lambda future: self._run_callback(callback, job_id, future))
+        return watch.future
+
+    def watch_many(
+        self,
+        job_ids: Iterable[str],
+        callback: Optional[JobCallback] = None,
+        expected_runtime: Optional[float] = None,
+    ) -> Dict[str, Future]:
+        """
+        Start tracking several jobs.
+
+        Returns:
+            Mapping of job ID to Future (see watch); combine them with
+            ``concurrent.futures.wait`` or ``as_completed``
+        """
+        return {
+            str(job_id): self.watch(job_id, callback=callback, expected_runtime=expected_runtime)
+            for job_id in job_ids
+        }
+
+    def wait(self, job_id: str, timeout: Optional[float] = None, expected_runtime: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Block until a job finishes.
+
+        Args:
+            job_id: Compute job ID
+            timeout: Seconds to wait (default: forever)
+            expected_runtime: Expected seconds until the job finishes
+
+        Returns:
+            Final status dict
+
+        Raises:
+            JobFailed: If the job failed or was cancelled
+            concurrent.futures.TimeoutError: If the timeout passes first
+        """
+        return self.watch(job_id, expected_runtime=expected_runtime).result(timeout)
+
+    def unwatch(self, job_id: str) -> bool:
+        """
+        Stop tracking a job, cancelling its future.
+
+        Returns:
+            True if the job was being tracked
+        """
+        with self._cond:
+            watch = self._watches.get(str(job_id))
+        return watch is not None and watch.future.cancel()
+
+    @property
+    def tracked(self) -> int:
+        """Number of jobs being tracked."""
+        with self._cond:
+            return len(self._watches)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get waiter counters.
+
+        Returns:
+            Dictionary with tracked jobs, requests sent, job checks made,
+            not_modified (304s), errors, jobs completed and failed, and
+            whether id-filtered listing is used (batch_supported)
+        """
+        with self._cond:
+            stats = dict(self._stats)
+            stats["tracked"] = len(self._watches)
+        stats["batch_supported"] = self.batch_supported
+        return stats
+
+    def close(self):
+        """Stop the scheduler and cancel the futures of jobs still tracked."""
+        with self._cond:
+            self._closed = True
+            watches = list(self._watches.values())
+            self._watches.clear()
+            self._cond.notify_all()
+        for watch in watches:
+            watch.future.cancel()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+
+    def __enter__(self) -> "JobWaiter":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    # Scheduling
+
+    def _start(self):
+        """Start the scheduler thread (lock held)."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="aftership-jobs", daemon=True)
+            self._thread.start()
+        else:
+            self._cond.notify_all()
+
+    def _schedule(self, watch: _Watch, at: float):
+        """Queue the next poll of a job (lock held)."""
+        watch.next_poll = at
+        heapq.heappush(self._heap, (at, next(self._seq), watch.job_id))
+        if self._heap[0][2] == watch.job_id:
+            self._cond.notify_all()
+
+    def _due(self) -> List[_Watch]:
+        """Wait for the next poll time, then take every job due by then."""
+        with self._cond:
+            while not self._closed:
+                now = time.monotonic()
+                due = []
+                while self._heap and self._heap[0][0] <= now:
+                    at, _, job_id = heapq.heappop(self._heap)
+                    watch = self._watches.get(job_id)
+                    # Skip entries superseded by a reschedule or an unwatch
+                    if watch is not None and watch.next_poll == at:
+                        due.append(watch)
+                if due:
+                    return due
+                self._cond.wait(self._heap[0][0] - now if self._heap else None)
+            return []
+
+    def _run(self):
+        while True:
+            due = self._due()
+            if not due:
+                return
+            try:
+                self._check(due)
+            except Exception:  # pragma: no cover - keep the scheduler alive whatever happens
+                for watch in due:
+                    self._reschedule(watch, changed=False)
+
+    def _next_interval(self, watch: _Watch, changed: bool) -> float:
+        interval = self.min_interval if changed else min(self.max_interval, watch.interval * self.backoff)
+        watch.interval = interval
+        if watch.expected_runtime is not None:
+            left = watch.started + watch.expected_runtime - time.monotonic()
+            if left > 0:
+                interval = min(interval, max(self.min_interval, left / 2))
+        return interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def _reschedule(self, watch: _Watch, changed: bool):
+        with self._cond:
+            if self._watches.get(watch.job_id) is watch:
+                self._schedule(watch, time.monotonic() + self._next_interval(watch, changed))
+
+    # Checking
+
+    def _count(self, name: str, n: int = 1):
+        with self._cond:
+            self._stats[name] += n
+
+    def _check(self, due: List[_Watch]):
+        """Check due jobs, in batches where the server can list by id."""
+        if self.batch_supported is not False and len(due) > 1:
+            pending = []
+            for start in range(0, len(due), self.batch_size):
+                pending.extend(self._check_batch(due[start:start + self.batch_size]))
+                if self.batch_supported is False:
+                    pending.extend(due[start + self.batch_size:])
+                    break
+            due = pending
+        if due:
+            self._check_each(due)
+
+    def _check_batch(self, batch: List[_Watch]) -> List[_Watch]:
+        """
+        Check jobs with one listing request.
+
+        Returns:
+            Jobs the listing did not report, to be checked one by one
+        """
+        self._count("requests")
+        try:
+            response = self.client.get(
+                self.list_endpoint,
+                params={"ids": ",".join(watch.job_id for watch in batch), "limit": len(batch)},
+                cache=False,
+            )
+            items = extract_items(self.client.decode_json(response))
+        except requests.HTTPError as e:
+            if e.response is not None and e.response.status_code in BATCH_UNSUPPORTED_STATUSES:
+                self.batch_supported = False
+                return batch
+            return self._failed_checks(batch, e)
+        except (requests.RequestException, ValueError) as e:
+            return self._failed_checks(batch, e)
+
+        wanted = {watch.job_id: watch for watch in batch}
+        reported = {str(item.get("id")): item for item in items if isinstance(item, dict)}
+        if any(job_id not in wanted for job_id in reported):
+            # The server ignored the id filter and listed other jobs
+            self.batch_supported = False
+        elif self.batch_supported is None:
+            self.batch_supported = True
+
+        missing = []
+        for job_id, watch in wanted.items():
+            item = reported.get(job_id)
+            if item is None or job_state(item) is None:
+                missing.append(watch)
+            else:
+                self._count("checks")
+                self._update(watch, item)
+        return missing
+
+    def _failed_checks(self, batch: List[_Watch], error: BaseException) -> List[_Watch]:
+        self._count("errors")
+        for watch in batch:
+            self._reschedule(watch, changed=False)
+        return []
+
+    def _check_each(self, watches: List[_Watch]):
+        """Check jobs with concurrent conditional status requests."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="aftership-jobs")
+        specs = []
+        for watch in watches:
+            headers = {"If-None-Match": watch.etag} if watch.etag else {}
+            specs.append(RequestSpec(
+                self.status_endpoint.format(job_id=watch.job_id),
+                kwargs={"headers": headers, "cache": False},
+            ))
+        for result in self.client.map(specs, concurrency=self.concurrency, ordered=True, executor=self._executor):
+            watch = watches[result.index]
+            self._count("requests")
+            if not result.ok:
+                status = getattr(getattr(result.error, "response", None), "status_code", None)
+                self._count("errors")
+                if status in PERMANENT_ERROR_STATUSES:
+                    self._finish(watch, error=result.error)
+                else:
+                    self._reschedule(watch, changed=False)
+                continue
+            self._count("checks")
+            response = result.response
+            if response.status_code == 304 and watch.status is not None:
+                self._count("not_modified")
+                self._reschedule(watch, changed=False)
+                continue
+            watch.etag = response.headers.get("ETag")
+            self._update(watch, self.client.decode_json(response))
+
+    def _update(self, watch: _Watch, status: Dict[str, Any]):
+        """Record a job's latest status, resolving it if terminal."""
+        state = job_state(status)
+        changed = state != watch.state
+        watch.state, watch.status = state, status
+        if state in TERMINAL_STATES:
+            self._finish(watch, status=status)
+        else:
+            self._reschedule(watch, changed)
+
+    def _forget(self, watch: _Watch):
+        """Stop tracking a job whose future is done (resolved or cancelled)."""
+        with self._cond:
+            if self._watches.get(watch.job_id) is watch:
+                del self._watches[watch.job_id]
+
+    def _finish(self, watch: _Watch, status: Optional[Dict[str, Any]] = None, error: Optional[BaseException] = None):
+        if error is None and watch.state not in SUCCESS_STATES:
+            error = JobFailed(watch.job_id, status)
+        try:
+            if error is None:
+                watch.future.set_result(status)
+            else:
+                watch.future.set_exception(error)
+        except InvalidStateError:
+            return  # Cancelled meanwhile
+        self._count("completed" if error is None else "failed")
+
+    def _run_callback(self, callback: JobCallback, job_id: str, future: Future):
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error is None:
+            callback(job_id, future.result())
+        elif isinstance(error, JobFailed):
+            callback(job_id, error.status)
@@ -0,0 +1,435 @@
+"""Incremental reading of aiserve job metrics into compact array buffers."""
+import math
+import threading
+from array import array
+from bisect import bisect_right
+from typing import Optional, Dict, Any, Iterator, List, Tuple
+
+import requests
+from requests.exceptions import ChunkedEncodingError
+from urllib3.exceptions import ProtocolError
+
+from .jobs import JobWaiter, TERMINAL_STATES, job_state
+from .pagination import extract_cursor
+from .presign import parse_expiry
+from .streaming import SSE_TYPE, NDJSON_TYPES, make_parser, iter_items
+
+
+# Point fields that locate a value rather than name a metric
+COORDINATE_FIELDS = frozenset({"step", "timestamp", "time", "ts"})
+
+# Top-level fields that hold the points of a metrics response
+CONTAINER_FIELDS = ("metrics", "points", "series", "data", "items")
+
+# Fields of a metrics response that are never metric values
+META_FIELDS = frozenset({"id", "job_id", "cursor", "next_cursor", "next_page_token", "next", "count", "total"})
+
+# Media types offered when asking for a metrics stream, best first
+STREAM_ACCEPT = f"{SSE_TYPE}, application/x-ndjson;q=0.9, application/json;q=0.5"
+
+# (metric name, step, timestamp, value); step is -1 and timestamp NaN when absent
+Point = Tuple[str, int, float, float]
+
+
+class MetricSeries:
+    """
+    The points of one metric, stored in parallel typed arrays.
+
+    A point costs 24 bytes (int64 step, float64 timestamp and value) instead
+    of a dict per point. The arrays support the buffer protocol, so
+    ``numpy.frombuffer(series.values)`` views them without copying. With
+    ``max_points``, the oldest points are dropped in blocks as new ones
+    arrive.
+    """
+
+    __slots__ = ("name", "steps", "timestamps", "values", "max_points", "_untimed")
+
+    def __init__(self, name: str, max_points: Optional[int] = None):
+        """
+        Initialize an empty series.
+
+        Args:
+            name: Metric name
+            max_points: Points kept (default: all)
+        """
+        self.name = name
+        self.steps = array("q")
+        self.timestamps = array("d")
+        self.values = array("d")
+        self.max_points = max_points
+        self._untimed = 0  # Points without a timestamp (NaN), which bisect cannot order
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __iter__(self) -> Iterator[Tuple[int, float, float]]:
+        """Iterate over (step, timestamp, value) tuples."""
+        return zip(self.steps, self.timestamps, self.values)
+
+    @property
+    def last_step(self) -> Optional[int]:
+        """Step of the newest point, if points have steps."""
+        return self.steps[-1] if self.steps and self.steps[-1] >= 0 else None
+
+    @property
+    def last_timestamp(self) -> Optional[float]:
+        """Timestamp of the newest point, if points have timestamps."""
+        return self.timestamps[-1] if self.timestamps and not math.isnan(self.timestamps[-1]) else None
+
+    def is_new(self, step: int, timestamp: float) -> bool:
+        """Check whether a point comes after the newest one (servers may resend the boundary point)."""
+        if not self.values:
+            return True
+        if step >= 0 and self.steps[-1] >= 0:
+            return step > self.steps[-1]
+        if not math.isnan(timestamp) and not math.isnan(self.timestamps[-1]):
+            return timestamp > self.timestamps[-1]
+        return True
+
+    def append(self, step: int, timestamp: float, value: float):
+        """Add a point at the end."""
+        self.steps.append(step)
+        self.timestamps.append(timestamp)
+        self.values.append(value)
+        if math.isnan(timestamp):
+            self._untimed += 1
+        if self.max_points is not None and len(self.values) >= self.max_points + max(64, self.max_points // 4):
+            # Trim in blocks so each point is moved O(1) times on average
+            excess = len(self.values) - self.max_points
+            if self._untimed:
+                self._untimed -= sum(1 for t in self.timestamps[:excess] if math.isnan(t))
+            del self.steps[:excess]
+            del self.timestamps[:excess]
+            del self.values[:excess]
+
+    def since(self, timestamp: float) -> "MetricSeries":
+        """
+        Get the points newer than a timestamp.
+
+        Points without a timestamp are included if they arrived after the
+        newest point at or before ``timestamp``, so a series without
+        timestamps is returned whole.
+
+        Returns:
+            A new MetricSeries with copies of those points
+        """
+        if not self._untimed:
+            start = bisect_right(self.timestamps, timestamp)
+        else:
+            # NaN breaks bisect's ordering; walk back from the newest point instead
+            start = len(self.timestamps)
+            while start and not self.timestamps[start - 1] <= timestamp:
+                start -= 1
+        return self._tail(start)
+
+    def copy(self) -> "MetricSeries":
+        """Copy the series (e.g. to read it while a reader keeps appending)."""
+        return self._tail(0)
+
+    def _tail(self, start: int) -> "MetricSeries":
+        tail = MetricSeries(self.name)
+        tail.steps = self.steps[start:]
+        tail.timestamps = self.timestamps[start:]
+        tail.values = self.values[start:]
+        tail._untimed = sum(1 for t in tail.timestamps if math.isnan(t)) if self._untimed else 0
+        return tail
+
+
+def _number(value: Any) -> Optional[float]:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    return float(value)
+
+
+def _timestamp(point: Dict[str, Any]) -> float:
+    for name in ("timestamp", "time", "ts"):
+        if name in point:
+            parsed = parse_expiry(point[name])
+            if parsed is not None:
+                return parsed
+    return math.nan
+
+
+def _step(point: Dict[str, Any]) -> int:
+    step = point.get("step")
+    return int(step) if _number(step) is not None else -1
+
+
+def iter_points(body: Any, name: Optional[str] = None) -> Iterator[Point]:
+    """
+    Extract metric points from a metrics response, event or NDJSON line.
+
+    Understands lists of points, ``{"name": ..., "value": ...}`` points,
+    wide rows (``{"step": 10, "loss": 0.4, "accuracy": 0.8}``), and series
+    keyed by metric name (``{"loss": [{"step": 10, "value": 0.4}]}``),
+    wrapped in any of ``metrics``, ``points``, ``series``, ``data`` or
+    ``items``.
+
+    Args:
+        body: Decoded JSON
+        name: Metric name for points that do not carry one
+
+    Yields:
+        (name, step, timestamp, value) tuples
+    """
+    if isinstance(body, list):
+        for item in body:
+            yield from iter_points(item, name)
+        return
+    if not isinstance(body, dict):
+        value = _number(body)
+        if value is not None and name is not None:
+            yield name, -1, math.nan, value
+        return
+
+    point_name = body.get("name", body.get("metric", name))
+    if "value" in body and point_name is not None:
+        value = _number(body["value"])
+        if value is not None:
+            yield str(point_name), _step(body), _timestamp(body), value
+        return
+
+    for field in CONTAINER_FIELDS:
+        if isinstance(body.get(field), (list, dict)):
+            yield from iter_points(body[field], name)
+            return
+
+    step, timestamp = _step(body), _timestamp(body)
+    for key, value in body.items():
+        if key in COORDINATE_FIELDS or key in META_FIELDS:
+            continue
+        if isinstance(value, (list, dict)):
+            yield from iter_points(value, key)
+        else:
+            number = _number(value)
+            if number is not None:
+                yield key, step, timestamp, number
+
+
+class JobMetricsReader:
+    """
+    Follow a compute job's metrics, fetching only points not seen yet.
+
+    The reader remembers the server's cursor (``next_cursor``, or the id of
+    the last server-sent event), or else the newest timestamp seen, and
+    sends it with each request (``cursor=`` or ``since=``), so a refresh
+    downloads only new points. Points are stored per metric in
+    MetricSeries buffers.
+
+    ``follow()`` asks for a live stream (``Accept: text/event-stream``,
+    ``follow=true``) and reads server-sent events or NDJSON as they arrive.
+    It reconnects from the cursor if the stream drops. If the server
+    answers with plain JSON instead, the reader switches to polling every
+    ``interval`` seconds.
+    """
+
+    endpoint = "/v1/compute/jobs/{job_id}/metrics"
+
+    def __init__(
+        self,
+        client,
+        job_id: str,
+        max_points: Optional[int] = None,
+        stream: bool = True,
+        interval: float = 5.0,
+    ):
+        """
+        Initialize the reader.
+
+        Args:
+            client: AiserveClient used for the requests
+            job_id: Compute job ID
+            max_points: Points kept per metric (default: all)
+            stream: Try a live stream in follow() before polling
+            interval: Seconds between polls when not streaming
+        """
+        self.client = client
+        self.job_id = str(job_id)
+        self.max_points = max_points
+        self.interval = interval
+        self.cursor: Optional[str] = None
+        self.last_timestamp: Optional[float] = None
+        # Whether the server streams metrics; None until follow() has asked
+        self.streaming_supported: Optional[bool] = None if stream else False
+        self.series: Dict[str, MetricSeries] = {}
+        self._lock = threading.Lock()
+        self._stats = {"requests": 0, "points": 0, "duplicates": 0, "reconnects": 0}
+
+    def __getitem__(self, name: str) -> MetricSeries:
+        return self.series[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.series
+
+    def names(self) -> List[str]:
+        """Names of the metrics seen so far."""
+        with self._lock:
+            return list(self.series)
+
+    def snapshot(self) -> Dict[str, MetricSeries]:
+        """Copy every series, for reading while follow() runs on another thread."""
+        with self._lock:
+            return {name: series.copy() for name, series in self.series.items()}
+
+    def _params(self) -> Dict[str, Any]:
+        if self.cursor is not None:
+            return {"cursor": self.cursor}
+        if self.last_timestamp is not None:
+            return {"since": self.last_timestamp}
+        return {}
+
+    def _add(self, body: Any) -> int:
+        """Store the new points of a decoded body. Returns how many were new."""
+        added = duplicates = 0
+        with self._lock:
+            for name, step, timestamp, value in iter_points(body):
+                series = self.series.get(name)
+                if series is None:
+                    series = self.series[name] = MetricSeries(name, self.max_points)
+                if not series.is_new(step, timestamp):
+                    duplicates += 1
+                    continue
+                series.append(step, timestamp, value)
+                added += 1
+                if not math.isnan(timestamp) and (self.last_timestamp is None or timestamp > self.last_timestamp):
+                    self.last_timestamp = timestamp
+            self._stats["points"] += added
+            self._stats["duplicates"] += duplicates
+        return added
+
+    def _count(self, name: str):
+        with self._lock:
+            self._stats[name] += 1
+
+    def refresh(self) -> int:
+        """
+        Fetch the points added since the last call.
+
+        Returns:
+            Number of new points
+
+        Raises:
+            requests.HTTPError: If the request fails
+        """
+        self._count("requests")
+        response = self.client.get(self.endpoint.format(job_id=self.job_id), params=self._params(), cache=False)
+        body = self.client.decode_json(response)
+        cursor = extract_cursor(body) if isinstance(body, dict) else None
+        added = self._add(body)
+        if cursor is not None:
+            self.cursor = cursor
+        return added
+
+    def finished(self) -> bool:
+        """Check whether the job has reached a terminal state."""
+        self._count("requests")
+        response = self.client.get(JobWaiter.status_endpoint.format(job_id=self.job_id), cache=False)
+        body = self.client.decode_json(response)
+        return isinstance(body, dict) and job_state(body) in TERMINAL_STATES
+
+    def follow(self, stop: Optional[threading.Event] = None, until_finished: bool = True) -> Iterator[int]:
+        """
+        Keep the series up to date until ``stop`` is set or the caller stops iterating.
+
+        Args:
+            stop: Event that ends following (checked between updates)
+            until_finished: Also end once the job has finished and its last
+                points are read. The job status is checked only when a
+                stream ends or a poll finds nothing new.
+
+        Yields:
+            Number of new points after each update (each event or line of
+            a stream, or each poll)
+
+        Example:
+            reader = client.job_metrics(job_id)
+            for added in reader.follow():
+                redraw(reader.snapshot())
+        """
+        stop = stop or threading.Event()
+        failures = 0
+        while not stop.is_set():
+            try:
+                if self.streaming_supported is not False:
+                    received = False
+                    for added in self._stream(stop):
+                        failures = 0
+                        received = True
+                        yield added
+                    if self.streaming_supported:
+                        if stop.is_set() or (until_finished and self.finished()):
+                            return
+                        # The stream ended early; reconnect from the cursor, at
+                        # the poll interval if it had nothing to send
+                        self._count("reconnects")
+                        stop.wait(self.client.retry_policy.backoff(0) if received else self.interval)
+                        continue
+                else:
+                    added = self.refresh()
+                    failures = 0
+                    yield added
+                    if not added and until_finished and self.finished():
+                        # Points written just before the job finished
+                        yield self.refresh()
+                        return
+                stop.wait(self.interval)
+            except (requests.ConnectionError, requests.Timeout, ChunkedEncodingError, ProtocolError):
+                # A stream cut off mid-body surfaces as ChunkedEncodingError (or a raw ProtocolError)
+                failures += 1
+                self._count("reconnects")
+                stop.wait(min(self.interval, self.client.retry_policy.backoff(failures)))
+
+    def _stream(self, stop: threading.Event) -> Iterator[int]:
+        """Read a metrics stream, or a single JSON page from a server that does not stream."""
+        headers = {"Accept": STREAM_ACCEPT}
+        if self.cursor is not None:
+            headers["Last-Event-ID"] = self.cursor
+        self._count("requests")
+        response = self.client.get(
+            self.endpoint.format(job_id=self.job_id),
+            params={**self._params(), "follow": "true"},
+            headers=headers,
+            stream=True,
+            cache=False,
+        )
+        try:
+            content_type = (response.headers.get("Content-Type") or "").lower()
+            if SSE_TYPE not in content_type and not any(name in content_type for name in NDJSON_TYPES):
+                self.streaming_supported = False
+                body = self.client.decode_json(response)
+                cursor = extract_cursor(body) if isinstance(body, dict) else None
+                added = self._add(body)
+                if cursor is not None:
+                    self.cursor = cursor
+                yield added
+                return
+
+            self.streaming_supported = True
+            parser = make_parser("auto", content_type, codec=self.client.codec)
+            # chunk_size=None hands over data as it arrives instead of waiting for a full chunk
+            for item in iter_items(response.iter_content(chunk_size=None), parser):
+                added = self._add(item)
+                cursor = parser.metadata.get("id")
+                if cursor is None and isinstance(item, dict):
+                    cursor = extract_cursor(item)
+                if cursor is not None:
+                    self.cursor = cursor
+                yield added
+                if stop.is_set():
+                    return
+        finally:
+            response.close()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get reader counters.
+
+        Returns:
+            Dictionary with requests, points stored, duplicates skipped,
+            reconnects, series count, and whether the server streams
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["series"] = len(self.series)
+        stats["streaming"] = self.streaming_supported
+        return stats
@@ -0,0 +1,387 @@
+"""Lazy auto-pagination with background prefetch of upcoming pages."""
+import asyncio
+import contextvars
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Optional, Dict, Any, Iterator, AsyncIterator, List, Set, Tuple, Union
+
+
+# Keys checked, in order, for the item list of a JSON object page
+ITEMS_KEYS = ("items", "data", "results", "objects", "records")
+# Keys checked, in order, for the next-page cursor of a JSON object page
+CURSOR_KEYS = ("next_cursor", "cursor", "next_page_token", "next")
+# Keys checked, in order, for whether more pages follow
+HAS_MORE_KEYS = ("has_more", "hasMore", "more")
+# Keys checked, in order, for the total number of items in the listing
+TOTAL_KEYS = ("total", "total_count", "totalCount")
+
+STYLES = ("auto", "offset", "cursor", "link")
+
+# (endpoint, params) of a page request; params are None for a followed link
+PageRequest = Tuple[str, Optional[Dict[str, Any]]]
+# (offset, endpoint, params) of a page to prefetch; the offset is None for cursor and link pages
+Prefetch = Tuple[Optional[int], str, Optional[Dict[str, Any]]]
+
+
+def extract_items(body: Any, items_key: Union[str, Tuple[str, ...], None] = None) -> List[Any]:
+    """
+    Get the list of items from a page body.
+
+    Args:
+        body: Decoded JSON page
+        items_key: Key holding the items (default: auto-detect), or a tuple
+            of keys whose lists are joined (e.g. objects and common
+            prefixes of a delimited listing, which share the page size)
+
+    Returns:
+        List of items on the page
+
+    Raises:
+        ValueError: If no item list can be found
+    """
+    if isinstance(body, list):
+        return body
+    if isinstance(body, dict):
+        if isinstance(items_key, tuple):
+            return [item for key in items_key for item in body.get(key) or []]
+        if items_key is not None:
+            return body.get(items_key) or []
+        for key in ITEMS_KEYS:
+            if isinstance(body.get(key), list):
+                return body[key]
+        lists = [value for value in body.values() if isinstance(value, list)]
+        if len(lists) == 1:
+            return lists[0]
+    raise ValueError("Could not find the item list in the page; pass items_key")
+
+
+def extract_cursor(body: Any, cursor_key: Optional[str] = None) -> Optional[str]:
+    """
+    Get the next-page cursor from a page body.
+
+    Args:
+        body: Decoded JSON page
+        cursor_key: Key holding the cursor (default: auto-detect)
+
+    Returns:
+        Cursor, or None if this is the last page
+    """
+    if not isinstance(body, dict):
+        return None
+    keys = (cursor_key,) if cursor_key else CURSOR_KEYS
+    for key in keys:
+        value = body.get(key)
+        if isinstance(value, (str, int)) and value != "":
+            return str(value)
+    return None
+
+
+def extract_has_more(body: Any) -> Optional[bool]:
+    """
+    Get whether more pages follow, if the page says so.
+
+    Returns:
+        True or False from ``has_more`` (or a similar key), or None if absent
+    """
+    if isinstance(body, dict):
+        for key in HAS_MORE_KEYS:
+            if isinstance(body.get(key), bool):
+                return body[key]
+    return None
+
+
+def extract_total(body: Any) -> Optional[int]:
+    """
+    Get the total number of items in the listing, if the page reports it.
+
+    Returns:
+        Total from ``total`` (or a similar key), or None if absent
+    """
+    if isinstance(body, dict):
+        for key in TOTAL_KEYS:
+            value = body.get(key)
+            if isinstance(value, int) and not isinstance(value, bool):
+                return value
+    return None
+
+
+class Paginator:
+    """
+    Iterate over the items of a paginated listing endpoint.
+
+    Supports three pagination styles:
+
+    - ``offset``: ``limit``/``offset`` query parameters; the offset advances
+      by the items actually returned (servers may cap ``limit``) and the
+      listing ends at an empty page, ``has_more: false`` or the reported
+      ``total``
+    - ``cursor``: a cursor returned in the body (``next_cursor``, ``cursor``,
+      ...) sent back as a query parameter
+    - ``link``: an RFC 8288 ``Link: <...>; rel="next"`` response header
+
+    Cursor and link listings end when no next cursor or link is returned,
+    or at ``has_more: false``. A cursor or link that repeats, or an offset
+    page identical to the one before it (the offset is ignored), raises
+    ValueError instead of looping forever.
+
+    ``auto`` picks the style from the first page. While the items of one
+    page are consumed, the next page is already being fetched in the
+    background. For offset pagination up to ``prefetch`` pages are requested
+    ahead in parallel; cursor and link pagination can only look one page
+    ahead. At most ``prefetch`` pages beyond the current one are held in
+    memory, so memory use stays flat for arbitrarily long listings.
+    """
+
+    def __init__(
+        self,
+        client,
+        endpoint: str,
+        params: Optional[Dict[str, Any]] = None,
+        style: str = "auto",
+        page_size: int = 100,
+        items_key: Union[str, Tuple[str, ...], None] = None,
+        cursor_key: Optional[str] = None,
+        cursor_param: str = "cursor",
+        limit_param: str = "limit",
+        offset_param: str = "offset",
+        prefetch: int = 1,
+        max_items: Optional[int] = None,
+        **kwargs
+    ):
+        """
+        Initialize the paginator.
+
+        Args:
+            client: BaseClient used to fetch pages
+            endpoint: Listing endpoint path
+            params: Additional query parameters
+            style: "auto", "offset", "cursor" or "link"
+            page_size: Items requested per page
+            items_key: Body key holding the items (default: auto-detect), or
+                a tuple of keys whose lists are joined
+            cursor_key: Body key holding the next cursor (default: auto-detect)
+            cursor_param: Query parameter the cursor is sent in
+            limit_param: Query parameter for the page size
+            offset_param: Query parameter for the offset
+            prefetch: Pages fetched ahead of the one being consumed (0 disables prefetch)
+            max_items: Stop after this many items
+            **kwargs: Additional arguments to pass to BaseClient.get
+        """
+        if style not in STYLES:
+            raise ValueError(f"Unknown pagination style: {style!r} (expected one of {', '.join(STYLES)})")
+        if prefetch < 0:
+            raise ValueError("prefetch must not be negative")
+
+        self.client = client
+        self.endpoint = endpoint
+        self.params = dict(params or {})
+        self.style = style
+        self.page_size = page_size
+        self.items_key = items_key
+        self.cursor_key = cursor_key
+        self.cursor_param = cursor_param
+        self.limit_param = limit_param
+        self.offset_param = offset_param
+        self.prefetch = prefetch
+        self.max_items = max_items
+        self.kwargs = kwargs
+        self.pages_fetched = 0
+
+    def _fetch(self, endpoint: str, params: Optional[Dict[str, Any]]) -> Tuple[Any, Any]:
+        response = self.client.get(endpoint, params=params, **self.kwargs)
+        self.pages_fetched += 1
+        return response, self.client.decode_json(response)
+
+    def _offset_params(self, offset: int) -> Dict[str, Any]:
+        return {**self.params, self.limit_param: self.page_size, self.offset_param: offset}
+
+    def _first_params(self) -> Dict[str, Any]:
+        # Auto-detected listings may turn out to use cursors or links, so only send an offset the caller asked for
+        if self.style == "offset":
+            return self._offset_params(self.params.get(self.offset_param, 0))
+        return {**self.params, self.limit_param: self.page_size}
+
+    def _detect_style(self, response, body) -> str:
+        if self.style != "auto":
+            return self.style
+        if "next" in response.links:
+            return "link"
+        if extract_cursor(body, self.cursor_key) is not None:
+            return "cursor"
+        return "offset"
+
+    def _next_request(self, style: str, response, body) -> Optional[PageRequest]:
+        """Return (endpoint, params) of the page after this one, or None at the end."""
+        if extract_has_more(body) is False:
+            return None
+        if style == "link":
+            link = response.links.get("next")
+            return (link["url"], None) if link else None
+        cursor = extract_cursor(body, self.cursor_key)
+        if cursor is None:
+            return None
+        return self.endpoint, {**self.params, self.limit_param: self.page_size, self.cursor_param: cursor}
+
+    @staticmethod
+    def _check_repeat(next_request: PageRequest, seen: Set[Any]):
+        """Fail on a cursor or link already followed, which would page forever."""
+        endpoint, params = next_request
+        marker = (endpoint, tuple(sorted((params or {}).items())))
+        if marker in seen:
+            raise ValueError(f"Pagination of {endpoint} returned a cursor or link it already returned")
+        seen.add(marker)
+
+    def _last_offset_page(self, body: Any, items: List[Any], offset: int, previous: Optional[List[Any]]) -> bool:
+        """Whether an offset page ends the listing (see the class docstring)."""
+        if not items or extract_has_more(body) is False:
+            return True
+        if items == previous:
+            raise ValueError(
+                f"Pagination of {self.endpoint} returned the same page twice; is {self.offset_param!r} ignored?"
+            )
+        total = extract_total(body)
+        return total is not None and offset + len(items) >= total
+
+    def __iter__(self) -> Iterator[Any]:
+        """Iterate over items across all pages."""
+        executor = ThreadPoolExecutor(max_workers=max(1, self.prefetch), thread_name_prefix="aftership-paginate")
+        # (offset, future) of prefetched pages; the offset is None for cursor and link pages
+        pending: "deque[Tuple[Optional[int], Future]]" = deque()
+        yielded = 0
+        try:
+            first_params = self._first_params()
+            response, body = self._fetch(self.endpoint, first_params)
+            state = _PageState(self, first_params, response, body)
+
+            while True:
+                items, next_request, prefetch = state.advance(response, body, [offset for offset, _ in pending])
+                for offset, endpoint, params in prefetch:
+                    context = contextvars.copy_context()
+                    pending.append((offset, executor.submit(context.run, self._fetch, endpoint, params)))
+
+                for item in items:
+                    if self.max_items is not None and yielded >= self.max_items:
+                        return
+                    yielded += 1
+                    yield item
+
+                if next_request is None:
+                    return
+                if pending and not state.expects(pending[0][0]):
+                    for _, future in pending:
+                        future.cancel()
+                    pending.clear()
+                if pending:
+                    response, body = pending.popleft()[1].result()
+                else:
+                    response, body = self._fetch(*next_request)
+        finally:
+            for _, future in pending:
+                future.cancel()
+            executor.shutdown(wait=False)
+
+
+class _PageState:
+    """
+    Page-to-page state of one pagination run, shared by the sync and async loops.
+
+    Tracks the detected style, the next offset, the previous offset page and
+    the cursors or links already followed, and works out from each page
+    what to request next and which pages to prefetch.
+    """
+
+    def __init__(self, paginator: Paginator, first_params: Dict[str, Any], response, body):
+        self.paginator = paginator
+        self.style = paginator._detect_style(response, body)
+        self.offset = first_params.get(paginator.offset_param, 0) if self.style == "offset" else None
+        self.previous: Optional[List[Any]] = None
+        self.seen: Set[Any] = set()
+
+    def advance(
+        self, response, body, pending: List[Optional[int]]
+    ) -> Tuple[List[Any], Optional[PageRequest], List[Prefetch]]:
+        """
+        Consume a page.
+
+        Args:
+            response: Response of the page
+            body: Decoded page
+            pending: Offsets of the pages already prefetched (None for
+                cursor and link pages)
+
+        Returns:
+            (items on the page, the request for the next page or None if
+            this is the last page, pages to start prefetching)
+        """
+        paginator = self.paginator
+        items = extract_items(body, paginator.items_key)
+
+        if self.style != "offset":
+            next_request = paginator._next_request(self.style, response, body)
+            if next_request is None:
+                return items, None, []
+            paginator._check_repeat(next_request, self.seen)
+            return items, next_request, [(None, *next_request)] if paginator.prefetch else []
+
+        last_page = paginator._last_offset_page(body, items, self.offset, self.previous)
+        self.previous = items
+        self.offset += len(items)
+        if last_page:
+            return items, None, []
+        # Keep up to `prefetch` later pages in flight, assuming pages as long as this one
+        prefetch = []
+        ahead = pending[-1] if pending else None
+        for _ in range(paginator.prefetch - len(pending)):
+            ahead = self.offset if ahead is None else ahead + len(items)
+            prefetch.append((ahead, paginator.endpoint, paginator._offset_params(ahead)))
+        return items, (paginator.endpoint, paginator._offset_params(self.offset)), prefetch
+
+    def expects(self, offset: Optional[int]) -> bool:
+        """Whether a prefetched page is the next one; after a short page the prefetched offsets are off."""
+        return offset == self.offset
+
+
+class AsyncPaginator(Paginator):
+    """Async counterpart of Paginator for AsyncBaseClient; iterate with ``async for``."""
+
+    async def _fetch(self, endpoint: str, params: Optional[Dict[str, Any]]) -> Tuple[Any, Any]:
+        response = await self.client.get(endpoint, params=params, **self.kwargs)
+        self.pages_fetched += 1
+        return response, self.client.decode_json(response)
+
+    def __iter__(self):
+        raise TypeError("AsyncPaginator must be iterated with 'async for'")
+
+    async def __aiter__(self) -> AsyncIterator[Any]:
+        """Iterate over items across all pages."""
+        pending: "deque[Tuple[Optional[int], asyncio.Task]]" = deque()
+        yielded = 0
+        try:
+            first_params = self._first_params()
+            response, body = await self._fetch(self.endpoint, first_params)
+            state = _PageState(self, first_params, response, body)
+
+            while True:
+                items, next_request, prefetch = state.advance(response, body, [offset for offset, _ in pending])
+                for offset, endpoint, params in prefetch:
+                    pending.append((offset, asyncio.ensure_future(self._fetch(endpoint, params))))
+
+                for item in items:
+                    if self.max_items is not None and yielded >= self.max_items:
+                        return
+                    yielded += 1
+                    yield item
+
+                if next_request is None:
+                    return
+                if pending and not state.expects(pending[0][0]):
+                    for _, task in pending:
+                        task.cancel()
+                    pending.clear()
+                if pending:
+                    response, body = await pending.popleft()[1]
+                else:
+                    response, body = await self._fetch(*next_request)
+        finally:
+            for _, task in pending:
+                task.cancel()
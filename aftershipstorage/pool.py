@@ -0,0 +1,169 @@
+"""Connection pooling and keep-alive management for BaseClient."""
+import queue
+import threading
+import time
+from typing import Optional, Dict, Any
+from urllib.parse import urlsplit
+
+from requests.adapters import HTTPAdapter
+
+from .config import PoolConfig
+
+
+class PooledHTTPAdapter(HTTPAdapter):
+    """
+    HTTPAdapter with configurable pool sizing, keep-alive expiry and usage counters.
+
+    Idle keep-alive connections to a host are closed once they have not been
+    used for ``keepalive_expiry`` seconds, so that the next request opens a
+    fresh connection instead of reusing one the server may already have
+    dropped.
+    """
+
+    __attrs__ = HTTPAdapter.__attrs__ + ["pool_config"]
+
+    def __init__(self, pool: Optional[PoolConfig] = None):
+        """
+        Initialize the adapter.
+
+        Args:
+            pool: Pool settings (default: PoolConfig())
+        """
+        self.pool_config = pool or PoolConfig()
+        self._lock = threading.Lock()
+        self._hosts: Dict[str, Dict[str, Any]] = {}
+        super().__init__(
+            pool_connections=self.pool_config.connections,
+            pool_maxsize=self.pool_config.maxsize,
+            pool_block=self.pool_config.block,
+        )
+
+    def __setstate__(self, state):
+        self._lock = threading.Lock()
+        self._hosts = {}
+        super().__setstate__(state)
+
+    def send(self, request, **kwargs):
+        """Send a request, tracking per-host pool usage."""
+        host = urlsplit(request.url).netloc
+        self._acquire(host)
+        try:
+            return super().send(request, **kwargs)
+        finally:
+            self._release(host)
+
+    def get_connection_with_tls_context(self, request, verify, proxies=None, cert=None):
+        """Get the connection pool for a request, expiring idle connections first."""
+        conn_pool = super().get_connection_with_tls_context(request, verify, proxies=proxies, cert=cert)
+        self._track_pool(request.url, conn_pool)
+        return conn_pool
+
+    def get_connection(self, url, proxies=None):
+        """Get the connection pool for a URL (requests < 2.32)."""
+        conn_pool = super().get_connection(url, proxies=proxies)
+        self._track_pool(url, conn_pool)
+        return conn_pool
+
+    def _host_stats(self, host: str) -> Dict[str, Any]:
+        stats = self._hosts.get(host)
+        if stats is None:
+            stats = {
+                "requests": 0,
+                "in_flight": 0,
+                "peak_in_flight": 0,
+                "keepalive_expired": 0,
+                "last_used": time.monotonic(),
+                "expire_pending": False,
+                "conn_pool": None,
+            }
+            self._hosts[host] = stats
+        return stats
+
+    def _acquire(self, host: str):
+        expiry = self.pool_config.keepalive_expiry
+        with self._lock:
+            stats = self._host_stats(host)
+            if (
+                expiry is not None
+                and stats["in_flight"] == 0
+                and time.monotonic() - stats["last_used"] > expiry
+            ):
+                stats["expire_pending"] = True
+            stats["requests"] += 1
+            stats["in_flight"] += 1
+            stats["peak_in_flight"] = max(stats["peak_in_flight"], stats["in_flight"])
+
+    def _release(self, host: str):
+        with self._lock:
+            stats = self._host_stats(host)
+            stats["in_flight"] -= 1
+            stats["last_used"] = time.monotonic()
+
+    def _track_pool(self, url: str, conn_pool):
+        host = urlsplit(url).netloc
+        with self._lock:
+            stats = self._host_stats(host)
+            stats["conn_pool"] = conn_pool
+            expire = stats["expire_pending"]
+            stats["expire_pending"] = False
+        if expire:
+            closed = self._close_idle(conn_pool)
+            with self._lock:
+                stats["keepalive_expired"] += closed
+
+    def _close_idle(self, conn_pool) -> int:
+        """Close idle keep-alive connections held by ``conn_pool``."""
+        if conn_pool.pool is None:
+            return 0
+
+        closed = 0
+        drained = []
+        while True:
+            try:
+                drained.append(conn_pool.pool.get(block=False))
+            except queue.Empty:
+                break
+        for conn in drained:
+            if conn is not None:
+                conn.close()
+                closed += 1
+            # Return an empty slot so the pool keeps its capacity
+            try:
+                conn_pool.pool.put(None, block=False)
+            except queue.Full:
+                pass
+        return closed
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get pool usage counters per host.
+
+        Returns:
+            Mapping of host to counters:
+            - requests: requests sent through the pool
+            - in_flight: requests currently being sent
+            - peak_in_flight: highest concurrent in_flight seen
+            - connections_opened: connections created by the pool
+            - idle_connections: keep-alive connections waiting for reuse
+            - maxsize: maximum connections kept per host
+            - keepalive_expired: idle connections closed by keep-alive expiry
+
+            ``connections_opened`` growing far beyond ``maxsize`` means
+            connections are being discarded and the pool should be larger.
+        """
+        with self._lock:
+            snapshot = {host: dict(stats) for host, stats in self._hosts.items()}
+
+        result = {}
+        for host, stats in snapshot.items():
+            conn_pool = stats.pop("conn_pool")
+            stats.pop("last_used")
+            stats.pop("expire_pending")
+            stats["connections_opened"] = getattr(conn_pool, "num_connections", 0)
+            idle = 0
+            if conn_pool is not None and conn_pool.pool is not None:
+                idle = sum(1 for conn in list(conn_pool.pool.queue) if conn is not None)
+            stats["idle_connections"] = idle
+            stats["maxsize"] = self.pool_config.maxsize
+            result[host] = stats
+        return result
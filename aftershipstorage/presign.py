@@ -0,0 +1,189 @@
+"""Expiry-aware cache of presigned object URLs."""
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional, Dict, Any, Tuple, Callable
+
+from .coalesce import SingleFlight
+from .config import PresignConfig
+
+
+# (bucket, key, operation)
+PresignKey = Tuple[str, str, str]
+
+
+@dataclass
+class PresignedURL:
+    """A presigned URL and when it stops being usable."""
+    url: str
+    bucket: str
+    key: str
+    operation: str  # "download" or "upload"
+    expires_at: float  # Wall-clock expiry (seconds since the epoch)
+    expires_monotonic: float  # The same expiry on the time.monotonic() clock
+
+    @property
+    def ttl(self) -> float:
+        """Seconds until the URL expires."""
+        return self.expires_at - time.time()
+
+
+def parse_expiry(value: Any) -> Optional[float]:
+    """
+    Parse an expiry timestamp from a presign response.
+
+    Args:
+        value: Seconds since the epoch, or an ISO 8601 string
+
+    Returns:
+        Seconds since the epoch, or None if missing or unparseable
+    """
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+
+
+class PresignCache:
+    """
+    Thread-safe LRU cache of presigned URLs keyed by bucket, key and operation.
+
+    A URL is reused until ``safety_margin`` seconds before it expires, so
+    every URL handed out stays valid for at least that long. Concurrent
+    misses for the same object share one presign request.
+    """
+
+    def __init__(self, config: Optional[PresignConfig] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            config: Presign settings (default: PresignConfig())
+        """
+        self.config = config or PresignConfig()
+        self._entries: "OrderedDict[PresignKey, PresignedURL]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._flight = SingleFlight()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "expired": 0}
+
+    def _usable(self, entry: PresignedURL, min_ttl: float = 0.0) -> bool:
+        margin = max(self.config.safety_margin, min_ttl)
+        return time.monotonic() + margin < entry.expires_monotonic
+
+    def get(self, bucket: str, key: str, operation: str, min_ttl: float = 0.0) -> Optional[PresignedURL]:
+        """
+        Get a cached URL that is still outside the safety margin.
+
+        Args:
+            bucket: Bucket name
+            key: Object key
+            operation: "download" or "upload"
+            min_ttl: Seconds the URL must remain valid, if longer than the
+                safety margin
+
+        Returns:
+            PresignedURL, or None on a miss
+        """
+        cache_key = (bucket, key, operation)
+        with self._lock:
+            entry = self._entries.get(cache_key)
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            if not self._usable(entry, min_ttl):
+                del self._entries[cache_key]
+                self._stats["expired"] += 1
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(cache_key)
+            self._stats["hits"] += 1
+            return entry
+
+    def store(self, entry: PresignedURL):
+        """Cache a URL, evicting the least recently used entries beyond ``max_entries``."""
+        if not self._usable(entry):
+            return
+        with self._lock:
+            self._entries[(entry.bucket, entry.key, entry.operation)] = entry
+            self._entries.move_to_end((entry.bucket, entry.key, entry.operation))
+            while len(self._entries) > self.config.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def get_or_presign(
+        self,
+        bucket: str,
+        key: str,
+        operation: str,
+        presign: Callable[[], PresignedURL],
+        min_ttl: float = 0.0,
+    ) -> PresignedURL:
+        """
+        Get a cached URL, or presign one (once for all concurrent callers) and cache it.
+
+        Args:
+            bucket: Bucket name
+            key: Object key
+            operation: "download" or "upload"
+            presign: Function requesting a new URL
+            min_ttl: Seconds the URL must remain valid (see get)
+
+        Returns:
+            PresignedURL
+        """
+        entry = self.get(bucket, key, operation, min_ttl)
+        if entry is not None:
+            return entry
+        return self.fetch(bucket, key, operation, presign)
+
+    def fetch(self, bucket: str, key: str, operation: str, presign: Callable[[], PresignedURL]) -> PresignedURL:
+        """
+        Presign a URL (once for all concurrent callers) and cache it, skipping the lookup.
+
+        Args:
+            bucket: Bucket name
+            key: Object key
+            operation: "download" or "upload"
+            presign: Function requesting a new URL
+
+        Returns:
+            PresignedURL
+        """
+        def fetch() -> PresignedURL:
+            entry = presign()
+            self.store(entry)
+            return entry
+
+        return self._flight.do((bucket, key, operation), fetch)
+
+    def invalidate(self, bucket: Optional[str] = None, key: Optional[str] = None):
+        """
+        Drop cached URLs.
+
+        Args:
+            bucket: Only drop URLs for this bucket (default: drop everything)
+            key: Only drop URLs for this object key
+        """
+        with self._lock:
+            for cache_key in list(self._entries):
+                if (bucket is None or cache_key[0] == bucket) and (key is None or cache_key[1] == key):
+                    del self._entries[cache_key]
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache counters.
+
+        Returns:
+            Dictionary with hits, misses, evictions (LRU), expired (dropped
+            inside the safety margin) and the current entry count
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+        return stats
@@ -0,0 +1,431 @@
+"""In-memory index of models2go models and versions, with semver resolution."""
+import re
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional, Dict, Any, Iterable, List, Tuple
+
+
+# Sort key of a version: (major, minor, patch, 1 for a release or 0 for a
+# prerelease, prerelease identifiers). Keys of bounds use 0 and () so they
+# sort before every prerelease of that version.
+VersionKey = Tuple[int, int, int, int, Tuple[Tuple[int, Any], ...]]
+
+_VERSION_RE = re.compile(
+    r"^v?(\d+)(?:\.(\d+|[xX*]))?(?:\.(\d+|[xX*]))?(?:-([0-9A-Za-z.-]+))?(?:\+[0-9A-Za-z.-]+)?$"
+)
+_COMPARATOR_RE = re.compile(r"^(\^|~|>=|<=|>|<|=)?\s*(.*)$")
+_TAG_RE = re.compile(r"^(?![xX]$)[A-Za-z][\w.-]*$")
+
+# Spec resolving to the "latest" tag, or else the newest release
+LATEST = "latest"
+
+# Version fields of a versions listing item, in order of preference
+VERSION_FIELDS = ("version", "name")
+
+# Model fields mapping tag names to versions
+TAG_MAP_FIELDS = ("dist_tags", "version_tags", "tags_map")
+
+
+class VersionNotFound(LookupError):
+    """No version of a model matches a range or tag."""
+
+    def __init__(self, model_id: str, spec: str):
+        super().__init__(f"No version of model {model_id} matches {spec!r}")
+        self.model_id = model_id
+        self.spec = spec
+
+
+def _prerelease_key(prerelease: Optional[str]) -> Tuple[Tuple[int, Any], ...]:
+    if not prerelease:
+        return ()
+    # Numeric identifiers sort before alphanumeric ones (semver 11.4)
+    return tuple((0, int(part)) if part.isdigit() else (1, part) for part in prerelease.split("."))
+
+
+def _parse(text: str) -> Optional[Tuple[List[Optional[int]], Optional[str]]]:
+    """Split a possibly partial version into [major, minor, patch] (None for missing or x) and prerelease."""
+    match = _VERSION_RE.match(text.strip())
+    if match is None:
+        return None
+    parts = [int(part) if part is not None and part.isdigit() else None for part in match.group(1, 2, 3)]
+    # Anything after a wildcard is a wildcard too ("1.x.3" is "1.x")
+    for index in range(1, 3):
+        if parts[index - 1] is None:
+            parts[index] = None
+    return parts, match.group(4)
+
+
+def parse_version(text: str) -> Optional[VersionKey]:
+    """
+    Get the sort key of a published version.
+
+    Missing minor and patch numbers count as 0 ("2.1" is 2.1.0).
+
+    Returns:
+        VersionKey, or None if the text is not a version
+    """
+    match = _VERSION_RE.match(str(text).strip())
+    # Wildcards make a range, not a version; build metadata may contain anything
+    if match is None or any(part is not None and not part.isdigit() for part in match.group(2, 3)):
+        return None
+    major, minor, patch = (int(part) if part is not None else 0 for part in match.group(1, 2, 3))
+    prerelease = match.group(4)
+    return (major, minor, patch, 0 if prerelease else 1, _prerelease_key(prerelease))
+
+
+def _bound(parts: List[int]) -> VersionKey:
+    return (parts[0], parts[1], parts[2], 0, ())
+
+
+class VersionRange:
+    """
+    A semver range, in the npm syntax.
+
+    Supports exact versions, comparators (``>=1.2.0 <2``), x-ranges
+    (``1.2.x``, ``1.2``, ``*``), caret (``^1.2.3``) and tilde (``~1.2.3``)
+    ranges, hyphen ranges (``1.2 - 1.4``), and alternatives joined with
+    ``||``. Comparators may also be separated by commas.
+
+    Prereleases match only when the range names a prerelease of the same
+    major.minor.patch (``>=2.0.0-rc.1``), or with ``include_prerelease``.
+    """
+
+    def __init__(self, spec: str):
+        """
+        Parse a range.
+
+        Args:
+            spec: Range text
+
+        Raises:
+            ValueError: If the range cannot be parsed
+        """
+        self.spec = spec
+        # Each alternative: (comparators, release triples of prereleases it names)
+        self.alternatives: List[Tuple[List[Tuple[str, VersionKey]], List[Tuple[int, int, int]]]] = []
+        for alternative in spec.split("||"):
+            comparators: List[Tuple[str, VersionKey]] = []
+            prereleases: List[Tuple[int, int, int]] = []
+            text = alternative.replace(",", " ").strip()
+            hyphen = re.match(r"^(\S+)\s+-\s+(\S+)$", text)
+            if hyphen:
+                self._add(comparators, prereleases, ">=", hyphen.group(1))
+                self._add(comparators, prereleases, "<=", hyphen.group(2))
+            else:
+                # Allow "> = 1.2" style spacing between an operator and its version
+                for token in re.findall(r"(?:\^|~|>=|<=|>|<|=)?\s*[^\s^~<>=]+", text):
+                    operator, version = _COMPARATOR_RE.match(token.strip()).groups()
+                    self._add(comparators, prereleases, operator or "=", version)
+            self.alternatives.append((comparators, prereleases))
+
+    @staticmethod
+    def _add(comparators, prereleases, operator: str, version: str):
+        if version.strip() in ("*", "x", "X", ""):
+            return
+        parsed = _parse(version)
+        if parsed is None:
+            raise ValueError(f"Invalid version range: {version!r}")
+        parts, prerelease = parsed
+        given = sum(part is not None for part in parts)
+        low = [part or 0 for part in parts]
+        if given == 3:
+            key = (low[0], low[1], low[2], 0 if prerelease else 1, _prerelease_key(prerelease))
+            if prerelease:
+                prereleases.append(tuple(low))
+        else:
+            key = _bound(low)
+
+        def bump(index: int) -> VersionKey:
+            high = low[:index] + [low[index] + 1] + [0] * (2 - index)
+            return _bound(high)
+
+        if operator == "^":
+            # Bump the first non-zero given part (or the last given one)
+            index = next((i for i in range(given) if low[i] != 0), given - 1)
+            comparators += [(">=", key), ("<", bump(index))]
+        elif operator == "~":
+            comparators += [(">=", key), ("<", bump(1 if given >= 2 else 0))]
+        elif given == 3:
+            comparators.append(("==" if operator == "=" else operator, key))
+        elif operator == "=":
+            comparators += [(">=", key), ("<", bump(given - 1))]
+        elif operator in (">", "<="):
+            # Partial bounds cover the whole x-range: ">1.2" is ">=1.3.0", "<=1.2" is "<1.3.0"
+            comparators.append((">=" if operator == ">" else "<", bump(given - 1)))
+        else:
+            comparators.append((operator, key))
+
+    def matches(self, key: VersionKey, include_prerelease: bool = False) -> bool:
+        """Check whether a version (as a VersionKey) is in the range."""
+        for comparators, prereleases in self.alternatives:
+            if key[3] == 0 and not include_prerelease and key[:3] not in prereleases:
+                continue
+            if all(_compare(key, operator, bound) for operator, bound in comparators):
+                return True
+        return False
+
+
+def _compare(key: VersionKey, operator: str, bound: VersionKey) -> bool:
+    if operator == ">=":
+        return key >= bound
+    if operator == ">":
+        return key > bound
+    if operator == "<":
+        return key < bound
+    if operator == "<=":
+        return key <= bound
+    return key == bound
+
+
+class _ModelEntry:
+    """Immutable snapshot of one model and its versions, indexed for resolution."""
+
+    __slots__ = ("model", "versions", "ordered", "tags", "fetched", "resolved")
+
+    def __init__(self, model: Dict[str, Any], versions: Iterable[Dict[str, Any]]):
+        self.model = model
+        self.versions: Dict[str, Dict[str, Any]] = {}
+        ordered = []
+        self.tags: Dict[str, str] = {}
+        for item in versions:
+            name = next((str(item[field]) for field in VERSION_FIELDS if item.get(field) is not None), None)
+            if name is None:
+                continue
+            self.versions[name] = item
+            key = parse_version(name)
+            if key is not None:
+                ordered.append((key, name))
+            for tag in item.get("tags") or item.get("aliases") or ():
+                if isinstance(tag, str):
+                    self.tags[tag] = name
+        for field in TAG_MAP_FIELDS:
+            if isinstance(model.get(field), dict):
+                self.tags.update({tag: str(version) for tag, version in model[field].items()})
+        if model.get("latest_version") is not None:
+            self.tags.setdefault(LATEST, str(model["latest_version"]))
+        ordered.sort(reverse=True)
+        self.ordered: List[Tuple[VersionKey, str]] = ordered  # Newest first
+        self.fetched = time.monotonic()
+        # Memoized resolutions: (spec, include_prerelease) -> version name or None
+        self.resolved: Dict[Tuple[str, bool], Optional[str]] = {}
+
+    def resolve(self, spec: str, include_prerelease: bool) -> Optional[str]:
+        memo_key = (spec, include_prerelease)
+        try:
+            return self.resolved[memo_key]
+        except KeyError:
+            pass
+        if spec in self.versions:
+            name = spec
+        elif spec in self.tags:
+            name = self.tags[spec]
+        elif spec == LATEST:
+            name = next((name for key, name in self.ordered if include_prerelease or key[3]), None)
+        elif _TAG_RE.match(spec) and _parse(spec) is None:
+            name = None  # A tag the model does not have ("v2" is a range)
+        else:
+            version_range = VersionRange(spec)
+            name = next(
+                (name for key, name in self.ordered if version_range.matches(key, include_prerelease)), None
+            )
+        self.resolved[memo_key] = name
+        return name
+
+
+class ModelRegistry:
+    """
+    Local, indexed view of models2go models and their versions.
+
+    The first query for a model fetches ``/v1/models/{id}`` and every page
+    of ``/v1/models/{id}/versions``. Later queries, including semver ranges
+    and tags, are answered from memory, and repeated queries from a memo.
+
+    Entries are fresh for ``ttl`` seconds. Until ``max_stale`` seconds, a
+    stale entry is still answered immediately while one background request
+    refreshes it (stale-while-revalidate). Older entries are fetched before
+    answering. Concurrent misses for a model share one fetch.
+
+    Writes made through the owning Models2GoClient to ``/v1/models/{id}``
+    or its ``/versions`` invalidate that model. The next query fetches it
+    again, so a router sees a version right after this process publishes it.
+    """
+
+    def __init__(
+        self,
+        client,
+        ttl: float = 60.0,
+        max_stale: float = 3600.0,
+        include_prerelease: bool = False,
+        refresh_workers: int = 4,
+    ):
+        """
+        Initialize the registry.
+
+        Args:
+            client: Models2GoClient used for the requests
+            ttl: Seconds an entry is answered without refreshing
+            max_stale: Seconds a stale entry may still be answered while it
+                refreshes in the background
+            include_prerelease: Let ranges and "latest" match prereleases
+            refresh_workers: Background refreshes run at the same time
+        """
+        self.client = client
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self.include_prerelease = include_prerelease
+        self.refresh_workers = refresh_workers
+        self._lock = threading.Lock()
+        self._entries: Dict[str, _ModelEntry] = {}
+        self._loading: Dict[str, Future] = {}
+        # Bumped by invalidate(); a fetch started before it does not store its result
+        self._generations: Dict[str, int] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._stats = {
+            "hits": 0, "stale_hits": 0, "misses": 0, "fetches": 0, "refresh_errors": 0, "invalidations": 0,
+        }
+
+    def _fetch(self, model_id: str) -> _ModelEntry:
+        """Fetch a model and its versions (no locks held)."""
+        model = self.client.decode_json(self.client.get(f"/v1/models/{model_id}", cache=False))
+        versions = list(self.client.paginate(f"/v1/models/{model_id}/versions", cache=False))
+        return _ModelEntry(model, versions)
+
+    def _load(self, model_id: str, future: Future, generation: int, background: bool):
+        """Run one fetch and publish it to the waiting callers."""
+        try:
+            entry = self._fetch(model_id)
+        except Exception as exc:
+            with self._lock:
+                self._stats["refresh_errors" if background else "fetches"] += 1
+                if self._loading.get(model_id) is future:
+                    del self._loading[model_id]
+            future.set_exception(exc)
+            return
+        with self._lock:
+            self._stats["fetches"] += 1
+            if self._loading.get(model_id) is future:
+                del self._loading[model_id]
+            if self._generations.get(model_id, 0) == generation:
+                self._entries[model_id] = entry
+        future.set_result(entry)
+
+    def _entry(self, model_id: str) -> _ModelEntry:
+        """Get a model's entry, fetching or refreshing it as its age requires."""
+        with self._lock:
+            entry = self._entries.get(model_id)
+            age = time.monotonic() - entry.fetched if entry is not None else None
+            if entry is not None and age < self.ttl:
+                self._stats["hits"] += 1
+                return entry
+            future = self._loading.get(model_id)
+            owner = future is None
+            if owner:
+                future = self._loading[model_id] = Future()
+            generation = self._generations.get(model_id, 0)
+            if entry is not None and age < self.max_stale:
+                self._stats["stale_hits"] += 1
+                if owner:
+                    if self._executor is None:
+                        self._executor = ThreadPoolExecutor(
+                            max_workers=self.refresh_workers, thread_name_prefix="aftership-registry"
+                        )
+                    self._executor.submit(self._load, model_id, future, generation, True)
+                return entry
+            self._stats["misses"] += 1
+        if owner:
+            self._load(model_id, future, generation, False)
+        return future.result()
+
+    def model(self, model_id: str) -> Dict[str, Any]:
+        """
+        Get a model's metadata (the ``/v1/models/{id}`` body).
+
+        Raises:
+            requests.HTTPError: If the model has to be fetched and the request fails
+        """
+        return self._entry(model_id).model
+
+    def versions(self, model_id: str) -> List[Dict[str, Any]]:
+        """Get a model's versions, newest first (versions that are not semver last)."""
+        entry = self._entry(model_id)
+        named = [entry.versions[name] for _, name in entry.ordered]
+        ordered = {name for _, name in entry.ordered}
+        return named + [item for name, item in entry.versions.items() if name not in ordered]
+
+    def tags(self, model_id: str) -> Dict[str, str]:
+        """Get a model's tags, mapped to versions."""
+        return dict(self._entry(model_id).tags)
+
+    def resolve(self, model_id: str, spec: str = LATEST, include_prerelease: Optional[bool] = None) -> Dict[str, Any]:
+        """
+        Find the version a range or tag selects.
+
+        Args:
+            model_id: Model ID
+            spec: Exact version, tag (e.g. "stable"), "latest" (the
+                "latest" tag, or else the newest release), or semver range
+                (e.g. "^2.1", "~1.4.0", ">=1.2 <2", "1.x || 2.x")
+            include_prerelease: Override the registry's prerelease setting
+
+        Returns:
+            The version's item from the versions listing
+
+        Raises:
+            VersionNotFound: If no version matches
+            ValueError: If the spec is neither a version, a tag nor a valid range
+            requests.HTTPError: If the model has to be fetched and the request fails
+
+        Example:
+            version = registry.resolve("sentiment-analyzer", "^2.1")
+            url = version["file_url"]
+        """
+        if include_prerelease is None:
+            include_prerelease = self.include_prerelease
+        entry = self._entry(model_id)
+        name = entry.resolve(spec.strip(), include_prerelease)
+        if name is None or name not in entry.versions:
+            raise VersionNotFound(model_id, spec)
+        return entry.versions[name]
+
+    def prefetch(self, model_ids: Iterable[str]):
+        """Load several models at once (e.g. on startup), so first queries are answered from memory."""
+        model_ids = list(model_ids)
+        if not model_ids:
+            return
+        with ThreadPoolExecutor(max_workers=min(self.refresh_workers, len(model_ids))) as executor:
+            list(executor.map(self._entry, model_ids))
+
+    def invalidate(self, model_id: Optional[str] = None):
+        """
+        Drop a model's entry (or every entry), so the next query fetches it.
+
+        A refresh already in flight for the model does not store its result.
+        """
+        with self._lock:
+            model_ids = [model_id] if model_id is not None else list(self._entries) + list(self._loading)
+            for name in model_ids:
+                self._entries.pop(name, None)
+                self._loading.pop(name, None)
+                self._generations[name] = self._generations.get(name, 0) + 1
+            self._stats["invalidations"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get registry counters.
+
+        Returns:
+            Dictionary with hits (fresh), stale_hits (answered while
+            refreshing), misses (answered after a fetch), fetches,
+            refresh_errors (failed background refreshes; the stale entry
+            is kept), invalidations, and models held
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["models"] = len(self._entries)
+        return stats
+
+    def close(self):
+        """Stop background refreshes."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
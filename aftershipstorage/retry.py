@@ -0,0 +1,186 @@
+"""Retry policy with exponential backoff, full jitter and a retry budget."""
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Optional, Dict, Any
+
+from .config import RetryConfig
+from .timeouts import remaining
+
+
+class RetryBudget:
+    """
+    Token bucket limiting retries to a fraction of regular traffic.
+
+    Every request deposits ``ratio`` tokens (up to ``capacity``) and every
+    retry withdraws one, so during an outage retries are capped at roughly
+    ``ratio`` times the request rate instead of multiplying load.
+    """
+
+    def __init__(self, ratio: float, capacity: float):
+        """
+        Initialize the budget.
+
+        Args:
+            ratio: Tokens earned per request
+            capacity: Maximum tokens saved up (the bucket starts full)
+        """
+        self.ratio = ratio
+        self.capacity = capacity
+        self._tokens = capacity
+        self._lock = threading.Lock()
+
+    def deposit(self):
+        """Record a request, earning retry tokens."""
+        with self._lock:
+            self._tokens = min(self.capacity, self._tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        """
+        Spend a token for a retry.
+
+        Returns:
+            True if the retry is allowed, False if the budget is exhausted
+        """
+        with self._lock:
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+    @property
+    def tokens(self) -> float:
+        """Tokens currently available."""
+        with self._lock:
+            return self._tokens
+
+
+class RetryPolicy:
+    """Decides whether and when a failed request is retried."""
+
+    def __init__(self, config: Optional[RetryConfig] = None):
+        """
+        Initialize the policy.
+
+        Args:
+            config: Retry settings (default: RetryConfig())
+        """
+        self.config = config or RetryConfig()
+        self.budget = RetryBudget(self.config.budget_ratio, self.config.budget_capacity)
+        self._lock = threading.Lock()
+        self._stats = {"retries": 0, "budget_exhausted": 0, "gave_up": 0}
+
+    def is_retryable(self, method: str, retry: Optional[bool] = None) -> bool:
+        """
+        Check whether requests with this method may be retried.
+
+        Args:
+            method: HTTP method
+            retry: Per-request override; True opts a non-idempotent request
+                (e.g. POST) in, False opts any request out
+
+        Returns:
+            True if the request may be retried
+        """
+        if self.config.max_retries <= 0:
+            return False
+        if retry is not None:
+            return retry
+        return method.upper() in self.config.methods
+
+    def backoff(self, attempt: int) -> float:
+        """
+        Compute a full-jitter backoff delay.
+
+        Args:
+            attempt: Number of retries already made (0 for the first retry)
+
+        Returns:
+            Delay in seconds, uniformly drawn from [0, min(backoff_max, backoff_base * 2**attempt)]
+        """
+        cap = min(self.config.backoff_max, self.config.backoff_base * (2 ** attempt))
+        return random.uniform(0, cap)
+
+    def retry_after(self, response) -> Optional[float]:
+        """
+        Parse the Retry-After header of a response.
+
+        Args:
+            response: HTTP response
+
+        Returns:
+            Delay in seconds, or None if the header is missing or invalid
+        """
+        value = response.headers.get("Retry-After")
+        if not value:
+            return None
+        value = value.strip()
+        if value.isdigit():
+            return float(value)
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if retry_at is None:
+            return None
+        return max(0.0, retry_at.timestamp() - time.time())
+
+    def next_delay(self, attempt: int, response=None) -> Optional[float]:
+        """
+        Decide whether to retry and how long to wait first.
+
+        Args:
+            attempt: Number of retries already made
+            response: Failed response, or None for a connection error
+
+        Returns:
+            Delay in seconds before the next attempt, or None to give up
+            (including when the wait would outlast the active deadline)
+        """
+        if response is not None and response.status_code not in self.config.statuses:
+            return None
+        if response is None and not self.config.retry_connection_errors:
+            return None
+
+        if attempt >= self.config.max_retries:
+            self._count("gave_up")
+            return None
+
+        delay = self.backoff(attempt)
+        if response is not None and self.config.respect_retry_after:
+            retry_after = self.retry_after(response)
+            if retry_after is not None:
+                if retry_after > self.config.retry_after_max:
+                    self._count("gave_up")
+                    return None
+                delay = retry_after
+
+        left = remaining()
+        if left is not None and delay >= left:
+            self._count("gave_up")
+            return None
+
+        if not self.budget.withdraw():
+            self._count("budget_exhausted")
+            return None
+
+        self._count("retries")
+        return delay
+
+    def _count(self, name: str):
+        with self._lock:
+            self._stats[name] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get retry counters.
+
+        Returns:
+            Dictionary with retries made, retries refused by the budget,
+            requests that ran out of attempts, and budget tokens left
+        """
+        with self._lock:
+            stats = dict(self._stats)
+        stats["budget_tokens"] = self.budget.tokens
+        return stats
@@ -1,50 +1,835 @@
 """Individual service clients for each platform."""
+import contextvars
+import mimetypes
+import os
+import re
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import replace
+from typing import Optional, Any, Callable, Dict, Iterable, Iterator, Tuple, Union
+from urllib.parse import quote, unquote
+
+from .artifacts import ArtifactCache, CachedArtifact
 from .base import BaseClient
+from .batching import InferenceBatcher
+from .bulk import BulkObjects, ObjectRef, ObjectResult, MAX_DELETE_BATCH
+from .fanout import DEFAULT_CONCURRENCY
+from .index import ObjectIndex
+from .jobs import JobWaiter, JobCallback
+from .metrics import JobMetricsReader
+from .presign import PresignCache, PresignedURL, parse_expiry
+from .registry import ModelRegistry
+from .sync import DirectorySync, SyncResult
+from .transfer import MultipartUpload, RangedDownload, TransferResult
+
+
+def _transfer_config(client: BaseClient, part_size: Optional[int], concurrency: Optional[int]):
+    """Apply per-call part size and concurrency overrides to a client's transfer settings."""
+    overrides = {
+        name: value
+        for name, value in (("part_size", part_size), ("concurrency", concurrency))
+        if value is not None
+    }
+    return replace(client.transfer_config, **overrides) if overrides else client.transfer_config
+
+
+# Model and model version endpoints whose writes change registry entries
+MODEL_WRITE_PATTERN = re.compile(r"^/?v1/models/([^/?#]+)(?:/versions(?:/[^/?#]*)?)?/?(?:[?#].*)?$")
 
 
 class DarkshipClient(BaseClient):
     """Client for darkship.io API."""
 
-    def __init__(self, api_key: str, base_url: str = "https://api.darkship.io"):
+    def __init__(self, api_key: str, base_url: str = "https://api.darkship.io", **kwargs):
         """Initialize Darkship client."""
-        super().__init__(base_url=base_url, api_key=api_key)
+        super().__init__(base_url=base_url, api_key=api_key, **kwargs)
 
 
 class DarkstorageClient(BaseClient):
     """Client for darkstorage.io API."""
 
-    def __init__(self, api_key: str, base_url: str = "https://api.darkstorage.io"):
+    def __init__(self, api_key: str, base_url: str = "https://api.darkstorage.io", **kwargs):
         """Initialize Darkstorage client."""
-        super().__init__(base_url=base_url, api_key=api_key)
+        super().__init__(base_url=base_url, api_key=api_key, **kwargs)
+        # Whether the server has the batch delete endpoint; None until first used
+        self.batch_delete_supported: Optional[bool] = None
+        self.presign_cache = PresignCache(self.presign_config) if self.presign_config.cache else None
+
+    def _presign(self, bucket: str, key: str, operation: str, expires_in: int) -> PresignedURL:
+        payload = {"expires_in": expires_in}
+        if operation != "download":
+            payload["operation"] = operation
+        started, started_wall = time.monotonic(), time.time()
+        response = self.post(f"/v1/buckets/{quote(bucket, safe='')}/objects/{quote(key)}/presign", json=payload)
+        body = self.decode_json(response)
+        url = body.get(f"{operation}_url") or body["url"]
+        # Measure from when the request was sent, so the estimate errs early
+        expires_at = parse_expiry(body.get("expires_at")) or started_wall + expires_in
+        return PresignedURL(
+            url=url,
+            bucket=bucket,
+            key=key,
+            operation=operation,
+            expires_at=expires_at,
+            expires_monotonic=started + (expires_at - started_wall),
+        )
+
+    def presign(
+        self,
+        bucket: str,
+        key: str,
+        operation: str = "download",
+        expires_in: Optional[int] = None,
+        min_ttl: float = 0.0,
+    ) -> PresignedURL:
+        """
+        Get a presigned URL for an object, reusing a cached one while it is still valid.
+
+        Cached URLs are handed out until ``presign.safety_margin`` seconds
+        before they expire; concurrent requests for the same object share one
+        presign call.
+
+        Args:
+            bucket: Bucket name
+            key: Object key
+            operation: "download" or "upload"
+            expires_in: Lifetime of a newly presigned URL (default: presign.expires_in)
+            min_ttl: Seconds the URL must remain valid, if longer than the safety margin
+
+        Returns:
+            PresignedURL with ``url`` and ``expires_at``
+
+        Example:
+            url = client.presign("assets", "img/logo.png").url
+        """
+        expires_in = expires_in or self.presign_config.expires_in
+        if self.presign_cache is None:
+            return self._presign(bucket, key, operation, expires_in)
+        return self.presign_cache.get_or_presign(
+            bucket,
+            key,
+            operation,
+            lambda: self._presign(bucket, key, operation, expires_in),
+            min_ttl=min_ttl,
+        )
+
+    def presign_many(
+        self,
+        bucket: str,
+        keys: Iterable[str],
+        operation: str = "download",
+        expires_in: Optional[int] = None,
+        concurrency: Optional[int] = None,
+    ) -> Dict[str, PresignedURL]:
+        """
+        Presign many objects, requesting only the URLs that are not cached.
+
+        Args:
+            bucket: Bucket name
+            keys: Object keys
+            operation: "download" or "upload"
+            expires_in: Lifetime of newly presigned URLs (default: presign.expires_in)
+            concurrency: Presign requests in flight (default: presign.concurrency)
+
+        Returns:
+            Mapping of key to PresignedURL
+
+        Raises:
+            requests.HTTPError: If a presign request fails
+        """
+        expires_in = expires_in or self.presign_config.expires_in
+        keys = list(dict.fromkeys(keys))
+        urls: Dict[str, PresignedURL] = {}
+        missing = []
+        for key in keys:
+            entry = self.presign_cache.get(bucket, key, operation) if self.presign_cache is not None else None
+            if entry is not None:
+                urls[key] = entry
+            else:
+                missing.append(key)
+
+        def fetch(key: str) -> PresignedURL:
+            def request() -> PresignedURL:
+                return self._presign(bucket, key, operation, expires_in)
+            if self.presign_cache is None:
+                return request()
+            return self.presign_cache.fetch(bucket, key, operation, request)
+
+        if missing:
+            workers = min(concurrency or self.presign_config.concurrency, len(missing))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="aftership-presign") as executor:
+                futures = [
+                    executor.submit(contextvars.copy_context().run, fetch, key)
+                    for key in missing
+                ]
+                for key, future in zip(missing, futures):
+                    urls[key] = future.result()
+        return {key: urls[key] for key in keys}
+
+    def upload_file(
+        self,
+        path: str,
+        bucket: str,
+        key: Optional[str] = None,
+        content_type: Optional[str] = None,
+        part_size: Optional[int] = None,
+        concurrency: Optional[int] = None,
+        resume: bool = True,
+        state_path: Optional[str] = None,
+        progress: Optional[Callable[[int, int], None]] = None,
+        dedupe: bool = False,
+    ) -> TransferResult:
+        """
+        Upload a local file, in parallel parts if it is large.
+
+        Parts are sent from a memory map of the file without copying,
+        hashed as they are sent, retried individually, and tracked in a
+        state file so an interrupted upload resumes where it stopped (see
+        MultipartUpload).
+
+        Args:
+            path: Local file to upload
+            bucket: Destination bucket
+            key: Destination object key (default: the file name)
+            content_type: Content type (default: guessed from the file name)
+            part_size: Bytes per part (default: transfer.part_size)
+            concurrency: Parts uploaded in parallel (default: transfer.concurrency)
+            resume: Continue an earlier interrupted upload of the same file
+            state_path: Resume state file (default: ``<path>.upload-state``)
+            progress: Called with (bytes_done, total_bytes) as parts complete
+            dedupe: If an object with the same SHA-256 already exists in the
+                bucket, copy it server-side instead of uploading
+
+        Returns:
+            TransferResult with size, part counts, checksum and throughput
+
+        Raises:
+            requests.HTTPError: If the upload fails
+
+        Example:
+            result = client.upload_file("model.safetensors", "ml-models", "llama/model.safetensors")
+            print(f"{result.throughput / 1e6:.1f} MB/s, {result.checksum}")
+        """
+        config = _transfer_config(self, part_size, concurrency)
+        key = key or os.path.basename(path)
+        content_type = content_type or mimetypes.guess_type(path)[0] or "application/octet-stream"
+        return MultipartUpload(
+            self,
+            path,
+            bucket,
+            key,
+            content_type=content_type,
+            config=config,
+            state_path=state_path,
+            resume=resume,
+            progress=progress,
+            dedupe=dedupe,
+        ).run()
+
+    def download_file(
+        self,
+        bucket: str,
+        key: str,
+        path: str,
+        checksum: Optional[str] = None,
+        part_size: Optional[int] = None,
+        concurrency: Optional[int] = None,
+        resume: bool = True,
+        progress: Optional[Callable[[int, int], None]] = None,
+    ) -> TransferResult:
+        """
+        Download an object to a local file with parallel range requests.
+
+        Ranges are written straight into a preallocated file, the result is
+        verified, and an interrupted download resumes where it stopped (see
+        RangedDownload).
+
+        Args:
+            bucket: Source bucket
+            key: Source object key
+            path: Destination file
+            checksum: Expected digest as ``"<algorithm>:<hex>"``, e.g. ``"sha256:9f86..."``
+            part_size: Bytes per range request (default: transfer.part_size)
+            concurrency: Ranges downloaded in parallel (default: transfer.concurrency)
+            resume: Continue an earlier interrupted download of the same object
+            progress: Called with (bytes_done, total_bytes) as data arrives
+
+        Returns:
+            TransferResult with size, range counts and throughput
+
+        Raises:
+            requests.HTTPError: If the download fails
+            ValueError: If the size or checksum does not match
+        """
+        # A cached URL is reused only if it outlives a typical download
+        url = self.presign(bucket, key, min_ttl=self.presign_config.expires_in / 2).url
+        return RangedDownload(
+            self,
+            url,
+            path,
+            config=_transfer_config(self, part_size, concurrency),
+            checksum=checksum,
+            resume=resume,
+            progress=progress,
+            bucket=bucket,
+            key=key,
+            credentials=False,
+        ).run()
+
+    def sync(
+        self,
+        local_dir: str,
+        bucket: str,
+        prefix: str = "",
+        direction: str = "upload",
+        delete: bool = False,
+        conflict: str = "skip",
+        dry_run: bool = False,
+        concurrency: Optional[int] = None,
+        manifest_path: Optional[str] = None,
+        exclude: Iterable[str] = (),
+        progress: Optional[Callable[[int, int], None]] = None,
+    ) -> SyncResult:
+        """
+        Sync a local directory with a bucket prefix, transferring only changes.
+
+        A SQLite manifest of size, mtime and SHA-256 per file (by default
+        ``<local_dir>/.aftership-sync.db``) records the state after each sync,
+        so later runs only hash and transfer what changed (see DirectorySync).
+
+        Args:
+            local_dir: Local directory
+            bucket: Bucket name
+            prefix: Key prefix the directory maps to
+            direction: "upload" (local to bucket), "download" (bucket to
+                local) or "both"
+            delete: Propagate deletions
+            conflict: For two-way syncs, "skip", "local" or "remote" for files
+                changed on both sides
+            dry_run: Only report what would change
+            concurrency: Files transferred in parallel (default: transfer.concurrency)
+            manifest_path: Manifest database path
+            exclude: Glob patterns of relative paths or file names to skip
+            progress: Called with (actions_done, actions_total)
+
+        Returns:
+            SyncResult; per-file failures are collected in ``errors``
+
+        Example:
+            result = client.sync("./models", "ml-models", prefix="nightly", delete=True)
+            print(f"{len(result.uploaded)} uploaded in {result.elapsed:.1f}s")
+        """
+        return DirectorySync(
+            self,
+            local_dir,
+            bucket,
+            prefix=prefix,
+            direction=direction,
+            delete=delete,
+            conflict=conflict,
+            dry_run=dry_run,
+            concurrency=concurrency or self.transfer_config.concurrency,
+            manifest_path=manifest_path,
+            exclude=exclude,
+            progress=progress,
+        ).run()
+
+    def delete_objects(
+        self,
+        bucket: str,
+        keys: Iterable[ObjectRef],
+        batch_size: int = MAX_DELETE_BATCH,
+        missing_ok: bool = True,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        ordered: bool = False,
+        progress: Optional[Callable[[int, int], None]] = None,
+    ) -> Iterator[ObjectResult]:
+        """
+        Delete many objects with bounded concurrency.
+
+        Keys are sent in batches of up to 1000 to the batch delete endpoint,
+        or deleted one request per key if the server does not have it.
+
+        Args:
+            bucket: Bucket name
+            keys: Keys or listing items, consumed lazily
+            batch_size: Keys per batch request
+            missing_ok: Treat already-deleted objects as deleted
+            concurrency: Maximum requests in flight
+            ordered: Yield results in input order (True) or as they complete (False)
+            progress: Called with (keys_done, keys_failed)
+
+        Yields:
+            ObjectResult per key; failures are captured in ``result.error``
+
+        Example:
+            listing = client.paginate("/v1/buckets/logs/objects", params={"prefix": "2023/"})
+            failed = [r.key for r in client.delete_objects("logs", listing) if not r.ok]
+        """
+        bulk = BulkObjects(self, concurrency=concurrency, ordered=ordered, progress=progress)
+        return bulk.delete(bucket, keys, batch_size=batch_size, missing_ok=missing_ok)
+
+    def head_objects(
+        self,
+        bucket: str,
+        keys: Iterable[ObjectRef],
+        concurrency: int = DEFAULT_CONCURRENCY,
+        ordered: bool = False,
+        progress: Optional[Callable[[int, int], None]] = None,
+    ) -> Iterator[ObjectResult]:
+        """
+        Fetch metadata for many objects with concurrent HEAD requests.
+
+        Args:
+            bucket: Bucket name
+            keys: Keys or listing items, consumed lazily
+            concurrency: Maximum requests in flight
+            ordered: Yield results in input order (True) or as they complete (False)
+            progress: Called with (keys_done, keys_failed)
+
+        Yields:
+            ObjectResult per key with ``metadata`` (size, etag, content_type,
+            last_modified, metadata)
+        """
+        bulk = BulkObjects(self, concurrency=concurrency, ordered=ordered, progress=progress)
+        return bulk.head(bucket, keys)
+
+    def copy_objects(
+        self,
+        bucket: str,
+        keys: Iterable[Union[ObjectRef, Tuple[str, str]]],
+        dest_bucket: Optional[str] = None,
+        dest_key: Optional[Callable[[str], str]] = None,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        ordered: bool = False,
+        progress: Optional[Callable[[int, int], None]] = None,
+    ) -> Iterator[ObjectResult]:
+        """
+        Copy many objects server-side with bounded concurrency.
+
+        Args:
+            bucket: Source bucket
+            keys: Keys or listing items, or ``(source_key, dest_key)`` tuples
+            dest_bucket: Destination bucket (default: the source bucket)
+            dest_key: Maps a source key to its destination key (default: the same key)
+            concurrency: Maximum requests in flight
+            ordered: Yield results in input order (True) or as they complete (False)
+            progress: Called with (keys_done, keys_failed)
+
+        Yields:
+            ObjectResult per key
+
+        Example:
+            results = client.copy_objects(
+                "ml-models", keys, dest_bucket="ml-archive",
+                dest_key=lambda key: f"2024-06/{key}",
+            )
+        """
+        bulk = BulkObjects(self, concurrency=concurrency, ordered=ordered, progress=progress)
+        return bulk.copy(bucket, keys, dest_bucket=dest_bucket, dest_key=dest_key)
+
+    def object_index(
+        self,
+        bucket: str,
+        path: str = ":memory:",
+        max_age: Optional[float] = 300.0,
+        concurrency: int = DEFAULT_CONCURRENCY,
+    ) -> ObjectIndex:
+        """
+        Create a local index of a bucket's listing.
+
+        Existence, prefix and size queries on the index are answered from
+        SQLite; a prefix is listed again (in parallel, one listing per
+        sub-prefix) once its last refresh is older than ``max_age``.
+
+        Args:
+            bucket: Bucket name
+            path: SQLite database file (default: in memory)
+            max_age: Staleness bound in seconds (None: only refresh explicitly)
+            concurrency: Sub-prefixes listed in parallel
+
+        Returns:
+            ObjectIndex
+
+        Example:
+            index = client.object_index("ml-models", path="/var/cache/ml-models.db", max_age=60)
+            if not index.exists("nightly/model.bin"):
+                ...
+            count, total_bytes = index.size("nightly/")
+        """
+        return ObjectIndex(self, bucket, path=path, max_age=max_age, concurrency=concurrency)
 
 
 class ShipshackClient(BaseClient):
     """Client for shipshack.io API."""
 
-    def __init__(self, api_key: str, base_url: str = "https://api.shipshack.io"):
+    def __init__(self, api_key: str, base_url: str = "https://api.shipshack.io", **kwargs):
         """Initialize Shipshack client."""
-        super().__init__(base_url=base_url, api_key=api_key)
+        super().__init__(base_url=base_url, api_key=api_key, **kwargs)
 
 
 class Models2GoClient(BaseClient):
     """Client for models2go.com API."""
 
-    def __init__(self, api_key: str, base_url: str = "https://api.models2go.com"):
+    def __init__(self, api_key: str, base_url: str = "https://api.models2go.com", **kwargs):
         """Initialize Models2Go client."""
-        super().__init__(base_url=base_url, api_key=api_key)
+        super().__init__(base_url=base_url, api_key=api_key, **kwargs)
+        self._artifact_cache: Optional[ArtifactCache] = None
+        self._artifact_cache_lock = threading.Lock()
+        self._registry: Optional[ModelRegistry] = None
+        self._registry_lock = threading.Lock()
+
+    def request(self, method: str, endpoint: str, *args, **kwargs):
+        """Make an HTTP request; successful writes to a model invalidate it in the registry."""
+        response = super().request(method, endpoint, *args, **kwargs)
+        registry = self._registry
+        if registry is not None and method.upper() != "GET":
+            match = MODEL_WRITE_PATTERN.match(endpoint)
+            if match:
+                registry.invalidate(unquote(match.group(1)))
+        return response
+
+    @property
+    def registry(self) -> ModelRegistry:
+        """
+        In-memory index of models and versions (created on first use).
+
+        Assign a ModelRegistry to change its settings:
+        ``client.registry = ModelRegistry(client, ttl=30)``.
+        """
+        registry = self._registry
+        if registry is None:
+            with self._registry_lock:
+                if self._registry is None:
+                    self._registry = ModelRegistry(self)
+                registry = self._registry
+        return registry
+
+    @registry.setter
+    def registry(self, registry: ModelRegistry):
+        with self._registry_lock:
+            if self._registry is not None and self._registry is not registry:
+                self._registry.close()
+            self._registry = registry
+
+    def resolve_version(self, model_id: str, spec: str = "latest") -> Dict[str, Any]:
+        """
+        Find the version of a model a semver range or tag selects, from the registry.
+
+        Args:
+            model_id: Model ID
+            spec: Exact version, tag, "latest", or semver range (e.g. "^2.1")
+
+        Returns:
+            The version's item from ``/v1/models/{id}/versions``
+
+        Raises:
+            VersionNotFound: If no version matches
+
+        Example:
+            version = client.resolve_version("sentiment-analyzer", "~2.1")
+            artifact = client.fetch_model("sentiment-analyzer", version=version["version"])
+        """
+        return self.registry.resolve(model_id, spec)
+
+    def close(self):
+        """Stop registry refreshes and close the session."""
+        with self._registry_lock:
+            registry = self._registry
+        if registry is not None:
+            registry.close()
+        super().close()
+
+    def download_model(
+        self,
+        model_id: str,
+        path: str,
+        checksum: Optional[str] = None,
+        part_size: Optional[int] = None,
+        concurrency: Optional[int] = None,
+        resume: bool = True,
+        progress: Optional[Callable[[int, int], None]] = None,
+    ) -> TransferResult:
+        """
+        Download a model artifact to a local file with parallel range requests.
+
+        Uses the ``download_url`` from ``/v1/models/{id}/download``. The
+        ``size`` and ``sha256`` it reports, if any, are verified.
+
+        Args:
+            model_id: Model ID
+            path: Destination file
+            checksum: Expected digest as ``"<algorithm>:<hex>"`` (default: the
+                reported sha256)
+            part_size: Bytes per range request (default: transfer.part_size)
+            concurrency: Ranges downloaded in parallel (default: transfer.concurrency)
+            resume: Continue an earlier interrupted download of the same artifact
+            progress: Called with (bytes_done, total_bytes) as data arrives
+
+        Returns:
+            TransferResult with size, range counts and throughput
+
+        Raises:
+            requests.HTTPError: If the download fails
+            ValueError: If the size or checksum does not match
+        """
+        info = self.decode_json(self.get(f"/v1/models/{model_id}/download"))
+        return self._download_artifact(info, path, model_id, checksum, part_size, concurrency, resume, progress)
+
+    def _download_artifact(
+        self,
+        info: Dict[str, Any],
+        path: str,
+        model_id: str,
+        checksum: Optional[str] = None,
+        part_size: Optional[int] = None,
+        concurrency: Optional[int] = None,
+        resume: bool = True,
+        progress: Optional[Callable[[int, int], None]] = None,
+    ) -> TransferResult:
+        """Download the artifact described by a ``/download`` response."""
+        if checksum is None and info.get("sha256"):
+            checksum = f"sha256:{info['sha256']}"
+        return RangedDownload(
+            self,
+            info["download_url"],
+            path,
+            config=_transfer_config(self, part_size, concurrency),
+            size=info.get("size"),
+            checksum=checksum,
+            resume=resume,
+            progress=progress,
+            key=model_id,
+        ).run()
+
+    @property
+    def artifact_cache(self) -> ArtifactCache:
+        """
+        Local artifact cache used by fetch_model() (created on first use).
+
+        Lives in ``MODELS2GO_CACHE_DIR`` or ``~/.cache/aftershipstorage/models``.
+        Assign an ArtifactCache to change it:
+        ``client.artifact_cache = ArtifactCache("/mnt/nvme/models", max_size=200 * 2**30)``.
+        """
+        cache = self._artifact_cache
+        if cache is None:
+            with self._artifact_cache_lock:
+                if self._artifact_cache is None:
+                    self._artifact_cache = ArtifactCache()
+                cache = self._artifact_cache
+        return cache
+
+    @artifact_cache.setter
+    def artifact_cache(self, cache: ArtifactCache):
+        with self._artifact_cache_lock:
+            self._artifact_cache = cache
+
+    def fetch_model(
+        self,
+        model_id: str,
+        version: Optional[str] = None,
+        verify: bool = False,
+        part_size: Optional[int] = None,
+        concurrency: Optional[int] = None,
+        progress: Optional[Callable[[int, int], None]] = None,
+    ) -> CachedArtifact:
+        """
+        Get a model artifact through the local artifact cache.
+
+        Unlike download_model(), an artifact already on this host is not
+        downloaded again. A recorded pinned version is served without any
+        request. Use the returned path, or ``mmap()``, to load the weights
+        without copying.
+
+        Args:
+            model_id: Model ID
+            version: Model version (default: the latest, checked with the server)
+            verify: Re-hash a cached artifact before returning it
+            part_size: Bytes per range request when downloading
+            concurrency: Ranges downloaded in parallel
+            progress: Called with (bytes_done, total_bytes) while downloading
+
+        Returns:
+            CachedArtifact with the blob path, digest and whether it was a hit
+
+        Raises:
+            requests.HTTPError: If a request fails
+            ValueError: If the download does not match the reported digest
+
+        Example:
+            artifact = client.fetch_model("sentiment-analyzer", version="2.1.0")
+            with artifact.mmap() as weights:
+                model = load_weights(memoryview(weights))
+        """
+        return self.artifact_cache.fetch(
+            self, model_id, version, verify=verify,
+            part_size=part_size, concurrency=concurrency, progress=progress,
+        )
 
 
 class HostscienceClient(BaseClient):
     """Client for hostscience.io API."""
 
-    def __init__(self, api_key: str, base_url: str = "https://api.hostscience.io"):
+    def __init__(self, api_key: str, base_url: str = "https://api.hostscience.io", **kwargs):
         """Initialize Hostscience client."""
-        super().__init__(base_url=base_url, api_key=api_key)
+        super().__init__(base_url=base_url, api_key=api_key, **kwargs)
 
 
 class AiserveClient(BaseClient):
     """Client for aiserve.farm API."""
 
-    def __init__(self, api_key: str, base_url: str = "https://api.aiserve.farm"):
+    def __init__(self, api_key: str, base_url: str = "https://api.aiserve.farm", **kwargs):
         """Initialize Aiserve client."""
-        super().__init__(base_url=base_url, api_key=api_key)
+        super().__init__(base_url=base_url, api_key=api_key, **kwargs)
+        self._jobs: Optional[JobWaiter] = None
+        self._jobs_lock = threading.Lock()
+        self._batchers: Dict[str, InferenceBatcher] = {}
+        self._batchers_lock = threading.Lock()
+
+    @property
+    def jobs(self) -> JobWaiter:
+        """
+        Waiter tracking compute jobs from one scheduler thread (created on first use).
+
+        Assign a JobWaiter to change its polling settings:
+        ``client.jobs = JobWaiter(client, max_interval=300)``.
+        """
+        jobs = self._jobs
+        if jobs is None:
+            with self._jobs_lock:
+                if self._jobs is None:
+                    self._jobs = JobWaiter(self)
+                jobs = self._jobs
+        return jobs
+
+    @jobs.setter
+    def jobs(self, waiter: JobWaiter):
+        with self._jobs_lock:
+            if self._jobs is not None and self._jobs is not waiter:
+                self._jobs.close()
+            self._jobs = waiter
+
+    def watch_job(
+        self,
+        job_id: str,
+        callback: Optional[JobCallback] = None,
+        expected_runtime: Optional[float] = None,
+    ) -> Future:
+        """
+        Track a compute job without blocking.
+
+        Args:
+            job_id: Compute job ID
+            callback: Called with (job_id, final status) when the job finishes
+            expected_runtime: Expected seconds until the job finishes
+
+        Returns:
+            Future resolving with the final status (see JobWaiter.watch)
+
+        Example:
+            futures = [client.watch_job(job["id"]) for job in submitted]
+            for future in concurrent.futures.as_completed(futures):
+                print(future.result()["status"])
+        """
+        return self.jobs.watch(job_id, callback=callback, expected_runtime=expected_runtime)
+
+    def wait_for_job(
+        self,
+        job_id: str,
+        timeout: Optional[float] = None,
+        expected_runtime: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """
+        Block until a compute job finishes.
+
+        Args:
+            job_id: Compute job ID
+            timeout: Seconds to wait (default: forever)
+            expected_runtime: Expected seconds until the job finishes
+
+        Returns:
+            Final job status
+
+        Raises:
+            JobFailed: If the job failed or was cancelled
+            concurrent.futures.TimeoutError: If the timeout passes first
+        """
+        return self.jobs.wait(job_id, timeout=timeout, expected_runtime=expected_runtime)
+
+    def job_metrics(
+        self,
+        job_id: str,
+        max_points: Optional[int] = None,
+        stream: bool = True,
+        interval: float = 5.0,
+    ) -> JobMetricsReader:
+        """
+        Create an incremental reader for a compute job's metrics.
+
+        Args:
+            job_id: Compute job ID
+            max_points: Points kept per metric (default: all)
+            stream: Try a live stream before polling
+            interval: Seconds between polls when the server does not stream
+
+        Returns:
+            JobMetricsReader (call ``refresh()`` or iterate ``follow()``)
+
+        Example:
+            metrics = client.job_metrics(job_id)
+            for _ in metrics.follow():
+                print(metrics["loss"].values[-1])
+        """
+        return JobMetricsReader(self, job_id, max_points=max_points, stream=stream, interval=interval)
+
+    def inference_batcher(self, endpoint_id: str, **kwargs) -> InferenceBatcher:
+        """
+        Get the batcher used by predict() for an inference endpoint (created on first use).
+
+        Args:
+            endpoint_id: Inference endpoint ID
+            **kwargs: InferenceBatcher settings (max_batch_size, max_latency,
+                max_in_flight, parameters, on_batch), applied when the
+                batcher is created
+
+        Returns:
+            InferenceBatcher shared by all callers of this endpoint
+        """
+        with self._batchers_lock:
+            batcher = self._batchers.get(endpoint_id)
+            if batcher is None:
+                batcher = self._batchers[endpoint_id] = InferenceBatcher(self, endpoint_id, **kwargs)
+            return batcher
+
+    def predict(self, endpoint_id: str, input: Any) -> Future:
+        """
+        Run inference on one input, batched with concurrent calls to the same endpoint.
+
+        Calls from any number of threads are combined into
+        ``POST /v1/inference/batch`` requests (see InferenceBatcher).
+
+        Args:
+            endpoint_id: Inference endpoint ID
+            input: Model input
+
+        Returns:
+            Future resolving with the input's result
+
+        Example:
+            futures = [client.predict(endpoint_id, text) for text in texts]
+            labels = [future.result()["label"] for future in futures]
+        """
+        return self.inference_batcher(endpoint_id).predict(input)
+
+    def close(self):
+        """Send queued predictions, stop the job waiter and close the session."""
+        with self._batchers_lock:
+            batchers, self._batchers = list(self._batchers.values()), {}
+        for batcher in batchers:
+            batcher.close()
+        with self._jobs_lock:
+            jobs = self._jobs
+        if jobs is not None:
+            jobs.close()
+        super().close()
@@ -0,0 +1,560 @@
+"""Incremental decoding of large JSON and NDJSON response bodies."""
+import codecs
+import json
+import re
+from typing import Optional, Dict, Any, Iterable, Iterator, AsyncIterator, List
+
+from .codec import JSONCodec
+from .pagination import ITEMS_KEYS
+
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+# Content types decoded as newline-delimited JSON by format="auto"
+NDJSON_TYPES = ("ndjson", "jsonl", "jsonlines", "json-lines")
+
+# Content type decoded as server-sent events by format="auto"
+SSE_TYPE = "text/event-stream"
+
+FORMATS = ("auto", "json", "ndjson", "sse")
+
+_WHITESPACE = " \t\n\r"
+# Characters of numbers and of true, false and null
+_SCALAR_CHARS = frozenset("0123456789.eE+-truefalsn")
+_CLOSERS = {"{": "}", "[": "]"}
+
+# Next character that matters to the value scanner, outside and inside strings
+_STRUCTURE_RE = re.compile(r'["{}\[\]]')
+_STRING_RE = re.compile(r'["\\]')
+
+# Parser states
+_START = "start"
+_KEY = "key"
+_COLON = "colon"
+_VALUE = "value"
+_OBJECT_NEXT = "object_next"
+_ITEM = "item"
+_ITEM_NEXT = "item_next"
+_DONE = "done"
+
+
+class _NeedMore(Exception):
+    """Raised internally when the buffer ends in the middle of a token."""
+
+
+class JSONItemParser:
+    """
+    Push parser yielding the elements of a JSON array as they arrive.
+
+    The array is either the top-level value or a field of a top-level
+    object. Only one element is buffered at a time, so memory stays
+    proportional to the largest element rather than the whole document.
+    Other top-level fields of an enclosing object are decoded normally and
+    collected in ``metadata`` (for example a ``next_cursor``).
+
+    An element split across chunks is scanned for its end one chunk at a
+    time and decoded once, when complete, so large elements cost linear
+    time. Unbalanced brackets and unexpected characters fail as soon as
+    they arrive rather than at the end of the body.
+    """
+
+    def __init__(self, items_key: Optional[str] = None):
+        """
+        Initialize the parser.
+
+        Args:
+            items_key: Object field holding the array (default: a top-level
+                array, or the first of ``items``, ``data``, ``results``,
+                ``objects`` and ``records`` holding an array)
+        """
+        self.items_key = items_key
+        self.metadata: Dict[str, Any] = {}
+        self._decoder = json.JSONDecoder()
+        self._text = codecs.getincrementaldecoder("utf-8")()
+        self._buf = ""
+        self._pos = 0
+        self._state = _START
+        self._in_object = False
+        self._key: Optional[str] = None
+        self._found = False
+        self._eof = False
+        # Scanner state for a value split across chunks
+        self._pending: Optional[List[str]] = None
+        self._ready = False
+        self._scalar = False
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escape = False
+
+    def feed(self, data: bytes) -> List[Any]:
+        """
+        Add a chunk of the body.
+
+        Args:
+            data: Next bytes of the response body
+
+        Returns:
+            Array elements completed by this chunk
+        """
+        text = self._text.decode(data)
+        if self._pending is not None:
+            self._pending.append(text)
+            if self._scan(text, 0) is None:
+                return []
+            self._buf, self._pending = "".join(self._pending), None
+            self._ready = True
+        else:
+            self._buf = self._buf[self._pos:] + text
+        self._pos = 0
+        return self._parse()
+
+    def close(self) -> List[Any]:
+        """
+        Signal the end of the body.
+
+        Returns:
+            Any remaining array elements
+
+        Raises:
+            ValueError: If the body is truncated, malformed, or contains no
+                matching array
+        """
+        text = self._text.decode(b"", final=True)
+        if self._pending is not None:
+            self._buf, self._pending = "".join(self._pending) + text, None
+        else:
+            self._buf = self._buf[self._pos:] + text
+        self._pos = 0
+        self._eof = True
+        items = self._parse()
+        if self._state != _DONE or self._buf[self._pos:].strip(_WHITESPACE):
+            raise ValueError("Truncated or malformed JSON response body")
+        if not self._found:
+            raise ValueError("Could not find the item array in the response; pass items_key")
+        return items
+
+    def _peek(self) -> str:
+        """Skip whitespace and return the next character."""
+        while self._pos < len(self._buf) and self._buf[self._pos] in _WHITESPACE:
+            self._pos += 1
+        if self._pos >= len(self._buf):
+            raise _NeedMore()
+        return self._buf[self._pos]
+
+    def _begin(self) -> int:
+        """Reset the scanner for the value at the current position and return where to scan from."""
+        char = self._buf[self._pos]
+        self._stack = []
+        self._in_string = self._escape = False
+        self._scalar = char in _SCALAR_CHARS
+        if self._scalar:
+            return self._pos
+        if char == '"':
+            self._in_string = True
+        elif char in _CLOSERS:
+            self._stack.append(_CLOSERS[char])
+        else:
+            raise ValueError(f"Malformed JSON response body: unexpected {char!r} at offset {self._pos}")
+        return self._pos + 1
+
+    def _scan(self, text: str, index: int) -> Optional[int]:
+        """
+        Continue scanning the current value through ``text``.
+
+        Returns:
+            Index in ``text`` just past the end of the value, or None if the
+            value continues in the next chunk
+        """
+        length = len(text)
+        if self._scalar:
+            while index < length and text[index] in _SCALAR_CHARS:
+                index += 1
+            return index if index < length else None
+        stack = self._stack
+        while True:
+            if self._escape:
+                if index >= length:
+                    return None
+                self._escape = False
+                index += 1
+            match = (_STRING_RE if self._in_string else _STRUCTURE_RE).search(text, index)
+            if match is None:
+                return None
+            char = match.group()
+            index = match.end()
+            if self._in_string:
+                if char == "\\":
+                    self._escape = True
+                    continue
+                self._in_string = False
+                if not stack:
+                    return index
+            elif char == '"':
+                self._in_string = True
+            elif char in _CLOSERS:
+                stack.append(_CLOSERS[char])
+            elif not stack or stack.pop() != char:
+                raise ValueError(f"Malformed JSON response body: unexpected {char!r}")
+            elif not stack:
+                return index
+
+    def _value(self) -> Any:
+        """Decode one complete JSON value at the current position."""
+        self._peek()
+        if not (self._ready or self._eof) and self._scan(self._buf, self._begin()) is None:
+            # Keep the partial value aside; later chunks are only scanned, not re-decoded
+            self._pending = [self._buf[self._pos:]]
+            raise _NeedMore()
+        self._ready = False
+        try:
+            value, self._pos = self._decoder.raw_decode(self._buf, self._pos)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Malformed JSON response body: {e.msg}") from None
+        return value
+
+    def _expect(self, char: str):
+        if self._peek() != char:
+            raise ValueError(f"Malformed JSON response body: expected {char!r} at offset {self._pos}")
+        self._pos += 1
+
+    def _is_items_key(self, key: str) -> bool:
+        if self._found:
+            return False
+        if self.items_key is not None:
+            return key == self.items_key
+        return key in ITEMS_KEYS
+
+    def _parse(self) -> List[Any]:
+        items = []
+        try:
+            while self._state != _DONE:
+                if self._state == _START:
+                    char = self._peek()
+                    self._pos += 1
+                    if char == "[":
+                        self._found = True
+                        self._state = _ITEM
+                    elif char == "{":
+                        self._in_object = True
+                        self._state = _KEY
+                    else:
+                        raise ValueError("Response body is not a JSON array or object")
+                elif self._state == _KEY:
+                    if self._peek() == "}":
+                        self._pos += 1
+                        self._state = _DONE
+                        continue
+                    key = self._value()
+                    if not isinstance(key, str):
+                        raise ValueError("Malformed JSON response body: expected an object key")
+                    self._key = key
+                    self._state = _COLON
+                elif self._state == _COLON:
+                    self._expect(":")
+                    self._state = _VALUE
+                elif self._state == _VALUE:
+                    if self._peek() == "[" and self._is_items_key(self._key):
+                        self._pos += 1
+                        self._found = True
+                        self._state = _ITEM
+                    else:
+                        self.metadata[self._key] = self._value()
+                        self._state = _OBJECT_NEXT
+                elif self._state == _OBJECT_NEXT:
+                    char = self._peek()
+                    self._pos += 1
+                    if char == ",":
+                        self._state = _KEY
+                    elif char == "}":
+                        self._state = _DONE
+                    else:
+                        raise ValueError(f"Malformed JSON response body at offset {self._pos - 1}")
+                elif self._state == _ITEM:
+                    if self._peek() == "]":
+                        self._pos += 1
+                        self._state = _OBJECT_NEXT if self._in_object else _DONE
+                        continue
+                    items.append(self._value())
+                    self._state = _ITEM_NEXT
+                elif self._state == _ITEM_NEXT:
+                    char = self._peek()
+                    self._pos += 1
+                    if char == ",":
+                        self._state = _ITEM
+                    elif char == "]":
+                        self._state = _OBJECT_NEXT if self._in_object else _DONE
+                    else:
+                        raise ValueError(f"Malformed JSON response body at offset {self._pos - 1}")
+        except _NeedMore:
+            pass
+        return items
+
+
+class NDJSONParser:
+    """Push parser for newline-delimited JSON (one value per line)."""
+
+    def __init__(self, codec: Optional[JSONCodec] = None):
+        """
+        Initialize the parser.
+
+        Args:
+            codec: Codec used to decode each line (default: JSONCodec())
+        """
+        self.codec = codec or JSONCodec()
+        self.metadata: Dict[str, Any] = {}
+        self._buf = b""
+
+    def feed(self, data: bytes) -> List[Any]:
+        """
+        Add a chunk of the body.
+
+        Args:
+            data: Next bytes of the response body
+
+        Returns:
+            Values of the lines completed by this chunk
+        """
+        self._buf += data
+        if b"\n" not in data:
+            return []
+        *lines, self._buf = self._buf.split(b"\n")
+        return [self.codec.loads(line) for line in lines if line.strip()]
+
+    def close(self) -> List[Any]:
+        """
+        Signal the end of the body.
+
+        Returns:
+            The value of a final line without a trailing newline, if any
+        """
+        line, self._buf = self._buf, b""
+        return [self.codec.loads(line)] if line.strip() else []
+
+
+class SSEParser:
+    """
+    Push parser for server-sent events whose data is JSON.
+
+    Each event's ``data`` lines are joined and decoded; comments (such as
+    keep-alive lines) are skipped. ``metadata`` holds the ``id`` of the last
+    event (for resuming with ``Last-Event-ID``), the last ``event`` name and
+    the server's ``retry`` delay in milliseconds.
+    """
+
+    def __init__(self, codec: Optional[JSONCodec] = None):
+        """
+        Initialize the parser.
+
+        Args:
+            codec: Codec used to decode event data (default: JSONCodec())
+        """
+        self.codec = codec or JSONCodec()
+        self.metadata: Dict[str, Any] = {}
+        self._buf = b""
+        self._data: List[bytes] = []
+        self._event: Optional[str] = None
+
+    def feed(self, data: bytes) -> List[Any]:
+        """
+        Add a chunk of the stream.
+
+        Args:
+            data: Next bytes of the response body
+
+        Returns:
+            Decoded data of the events completed by this chunk
+        """
+        self._buf += data
+        if b"\n" not in data:
+            return []
+        *lines, self._buf = self._buf.split(b"\n")
+        items = []
+        for line in lines:
+            item = self._line(line.rstrip(b"\r"))
+            if item is not None:
+                items.append(item)
+        return items
+
+    def _line(self, line: bytes) -> Any:
+        if not line:
+            return self._dispatch()
+        if line.startswith(b":"):
+            return None
+        name, _, value = line.partition(b":")
+        if value.startswith(b" "):
+            value = value[1:]
+        if name == b"data":
+            self._data.append(value)
+        elif name == b"id":
+            self.metadata["id"] = value.decode("utf-8")
+        elif name == b"event":
+            self._event = value.decode("utf-8")
+        elif name == b"retry" and value.isdigit():
+            self.metadata["retry"] = int(value)
+        return None
+
+    def _dispatch(self) -> Any:
+        """Finish the current event (at a blank line)."""
+        data, self._data = self._data, []
+        event, self._event = self._event, None
+        if not data:
+            return None
+        self.metadata["event"] = event or "message"
+        return self.codec.loads(b"\n".join(data))
+
+    def close(self) -> List[Any]:
+        """
+        Signal the end of the stream.
+
+        Returns:
+            Nothing: an event cut off by the end of the stream is discarded
+        """
+        self._buf, self._data, self._event = b"", [], None
+        return []
+
+
+def make_parser(
+    format: str,
+    content_type: Optional[str],
+    items_key: Optional[str] = None,
+    codec: Optional[JSONCodec] = None,
+):
+    """
+    Create the parser for a response body.
+
+    Args:
+        format: "json", "ndjson", "sse", or "auto" to choose from the Content-Type
+        content_type: Response Content-Type header
+        items_key: Object field holding the array (JSON only)
+        codec: Codec used to decode NDJSON lines and event data
+
+    Returns:
+        JSONItemParser, NDJSONParser or SSEParser
+    """
+    if format not in FORMATS:
+        raise ValueError(f"Unknown stream format: {format!r} (expected one of {', '.join(FORMATS)})")
+    if format == "auto":
+        content_type = (content_type or "").lower()
+        if SSE_TYPE in content_type:
+            format = "sse"
+        elif any(name in content_type for name in NDJSON_TYPES):
+            format = "ndjson"
+        else:
+            format = "json"
+    if format == "ndjson":
+        return NDJSONParser(codec)
+    if format == "sse":
+        return SSEParser(codec)
+    return JSONItemParser(items_key)
+
+
+def iter_items(chunks: Iterable[bytes], parser) -> Iterator[Any]:
+    """
+    Feed byte chunks through a parser and yield the decoded items.
+
+    Args:
+        chunks: Response body chunks
+        parser: JSONItemParser or NDJSONParser
+
+    Yields:
+        Decoded items in order
+    """
+    for chunk in chunks:
+        if chunk:
+            yield from parser.feed(chunk)
+    yield from parser.close()
+
+
+async def aiter_items(chunks: AsyncIterator[bytes], parser) -> AsyncIterator[Any]:
+    """
+    Async counterpart of iter_items.
+
+    Args:
+        chunks: Async iterator of response body chunks
+        parser: JSONItemParser or NDJSONParser
+
+    Yields:
+        Decoded items in order
+    """
+    async for chunk in chunks:
+        if chunk:
+            for item in parser.feed(chunk):
+                yield item
+    for item in parser.close():
+        yield item
+
+
+class ItemStream:
+    """
+    Iterator over the items of a streamed response.
+
+    The response is closed when iteration finishes, fails, or ``close()`` is
+    called. After iteration, ``metadata`` holds the other top-level fields
+    of an enclosing JSON object.
+    """
+
+    def __init__(self, response, parser, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        """
+        Initialize the stream.
+
+        Args:
+            response: Response opened with ``stream=True``
+            parser: JSONItemParser or NDJSONParser
+            chunk_size: Bytes read from the socket at a time
+        """
+        self.response = response
+        self.parser = parser
+        self.chunk_size = chunk_size
+
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        """Top-level fields outside the item array (complete after iteration)."""
+        return self.parser.metadata
+
+    def __iter__(self) -> Iterator[Any]:
+        try:
+            yield from iter_items(self.response.iter_content(chunk_size=self.chunk_size), self.parser)
+        finally:
+            self.close()
+
+    def close(self):
+        """Close the underlying response."""
+        self.response.close()
+
+    def __enter__(self):
+        """Context manager entry."""
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Context manager exit."""
+        self.close()
+
+
+class AsyncItemStream(ItemStream):
+    """Async counterpart of ItemStream; iterate with ``async for``."""
+
+    def __iter__(self):
+        raise TypeError("AsyncItemStream must be iterated with 'async for'")
+
+    async def __aiter__(self) -> AsyncIterator[Any]:
+        try:
+            async for item in aiter_items(self.response.aiter_bytes(self.chunk_size), self.parser):
+                yield item
+        finally:
+            await self.close()
+
+    async def close(self):
+        """Close the underlying response."""
+        await self.response.aclose()
+
+    def __enter__(self):
+        """Reject synchronous context manager use."""
+        raise TypeError("AsyncItemStream must be used with 'async with'")
+
+    async def __aenter__(self):
+        """Async context manager entry."""
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """Async context manager exit."""
+        await self.close()
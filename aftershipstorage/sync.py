@@ -0,0 +1,563 @@
+"""Incremental directory sync between a local tree and a darkstorage bucket."""
+import contextvars
+import fnmatch
+import os
+import sqlite3
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, Future
+from dataclasses import dataclass, field
+from typing import Optional, Dict, Any, Iterator, List, Tuple, Callable, Iterable, Container
+from urllib.parse import quote
+
+import requests
+
+from .checksums import CHECKSUM_ALGORITHM, file_digest
+
+
+MANIFEST_NAME = ".aftership-sync.db"
+
+# Resume state kept next to a file while it is transferred (see MultipartUpload, RangedDownload)
+STATE_SUFFIXES = (".upload-state", ".download-state")
+
+DIRECTIONS = ("upload", "download", "both")
+CONFLICT_POLICIES = ("skip", "local", "remote")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    remote TEXT NOT NULL,
+    path TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    sha256 TEXT,
+    etag TEXT,
+    PRIMARY KEY (remote, path)
+) WITHOUT ROWID;
+"""
+
+
+def content_digest(checksum: Optional[str]) -> Optional[str]:
+    """
+    Get the hex SHA-256 of a whole file from a TransferResult checksum.
+
+    Returns:
+        Hex digest, or None for a composite multipart checksum (which
+        depends on the part size, not just the content)
+    """
+    if not checksum:
+        return None
+    algorithm, _, hex_digest = checksum.partition(":")
+    if algorithm != CHECKSUM_ALGORITHM or "-" in hex_digest:
+        return None
+    return hex_digest
+
+
+def is_transfer_artifact(name: str, siblings: Container[str]) -> bool:
+    """
+    Check whether a file is a temporary file of an interrupted transfer.
+
+    Only this library's own artifacts match: ``<name>.upload-state`` next
+    to ``<name>``, ``<name>.part`` and ``<name>.download-state`` next to
+    each other, and the ``.tmp`` files their state is written through.
+    Other files ending in ``.part`` or ``.tmp`` are synced as usual.
+
+    Args:
+        name: File name
+        siblings: Names of the other files in the same directory
+    """
+    if name.endswith(tuple(suffix + ".tmp" for suffix in STATE_SUFFIXES)):
+        return True
+    if name.endswith(".upload-state"):
+        return name[:-len(".upload-state")] in siblings
+    if name.endswith(".download-state"):
+        return name[:-len(".download-state")] + ".part" in siblings
+    if name.endswith(".part"):
+        return name[:-len(".part")] + ".download-state" in siblings
+    return False
+
+
+def is_safe_relative_path(rel_path: str) -> bool:
+    """
+    Check that a "/"-separated relative path stays inside the directory it is joined to.
+
+    Rejects absolute paths, drive letters, empty, "." and ".." components,
+    and components containing a path separator of this platform.
+    """
+    parts = rel_path.split("/")
+    for part in parts:
+        if part in ("", ".", "..") or os.sep in part or (os.altsep and os.altsep in part):
+            return False
+    return not os.path.isabs(rel_path) and not os.path.splitdrive(os.path.join(*parts))[0]
+
+
+@dataclass
+class SyncAction:
+    """One planned change."""
+    op: str  # "upload", "download", "delete_remote", "delete_local" or "conflict"
+    path: str  # Path relative to the synced directory, with "/" separators
+    sha256: Optional[str] = None  # Content hash recorded at the last sync
+    etag: Optional[str] = None  # Remote ETag from the current listing (downloads and conflicts)
+
+
+@dataclass
+class SyncResult:
+    """Outcome of a sync run."""
+    uploaded: List[str] = field(default_factory=list)
+    downloaded: List[str] = field(default_factory=list)
+    deleted_remote: List[str] = field(default_factory=list)
+    deleted_local: List[str] = field(default_factory=list)
+    conflicts: List[str] = field(default_factory=list)  # Changed on both sides and left untouched
+    unchanged: int = 0  # Files that were touched but whose content did not change
+    errors: Dict[str, str] = field(default_factory=dict)  # Path -> error message
+    bytes_transferred: int = 0
+    elapsed: float = 0.0
+    dry_run: bool = False
+
+    @property
+    def ok(self) -> bool:
+        """True if every action succeeded."""
+        return not self.errors
+
+
+class SyncManifest:
+    """
+    SQLite record of every synced file as of its last successful sync.
+
+    One manifest can track several bucket/prefix destinations; rows are
+    keyed by destination and relative path.
+    """
+
+    def __init__(self, path: str):
+        """
+        Open (or create) the manifest.
+
+        Args:
+            path: SQLite database file
+        """
+        self.path = path
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(_SCHEMA)
+
+    def record(self, remote: str, path: str, size: int, mtime_ns: int, sha256: Optional[str], etag: Optional[str]):
+        """Record a file as in sync."""
+        self.db.execute(
+            "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?)",
+            (remote, path, size, mtime_ns, sha256, etag),
+        )
+
+    def forget(self, remote: str, path: str):
+        """Remove a file from the manifest."""
+        self.db.execute("DELETE FROM files WHERE remote = ? AND path = ?", (remote, path))
+
+    def commit(self):
+        """Persist recorded changes."""
+        self.db.commit()
+
+    def close(self):
+        """Close the database."""
+        self.db.close()
+
+
+class DirectorySync:
+    """
+    Sync a local directory with a bucket prefix, transferring only changes.
+
+    The local tree is compared with the manifest by size and mtime, which
+    needs no file reads, so unchanged trees of millions of files are
+    scanned in seconds. Files whose size or mtime changed are hashed, and
+    only files whose content actually changed are uploaded. For downloads
+    the bucket listing is compared with the ETags recorded in the manifest.
+    The comparison runs inside SQLite, so memory use does not grow with the
+    tree. Transfers run with bounded concurrency.
+
+    Directions:
+
+    - ``upload``: local changes and (with ``delete``) local deletions are
+      applied to the bucket; the bucket is not listed
+    - ``download``: bucket changes and (with ``delete``) deletions are
+      applied locally
+    - ``both``: changes flow both ways; files changed on both sides are
+      resolved by ``conflict`` ("skip" reports them, "local" or "remote"
+      picks a side)
+
+    Remote keys that would land outside ``local_dir`` (absolute, ``..`` or
+    through a symlink) are never written; they are reported in
+    ``SyncResult.errors``.
+    """
+
+    def __init__(
+        self,
+        client,
+        local_dir: str,
+        bucket: str,
+        prefix: str = "",
+        direction: str = "upload",
+        delete: bool = False,
+        conflict: str = "skip",
+        dry_run: bool = False,
+        concurrency: int = 8,
+        manifest_path: Optional[str] = None,
+        exclude: Iterable[str] = (),
+        progress: Optional[Callable[[int, int], None]] = None,
+    ):
+        """
+        Initialize the sync.
+
+        Args:
+            client: DarkstorageClient used for transfers
+            local_dir: Local directory
+            bucket: Bucket name
+            prefix: Key prefix the directory maps to
+            direction: "upload", "download" or "both"
+            delete: Propagate deletions
+            conflict: "skip", "local" or "remote" for files changed on both sides
+            dry_run: Only plan; transfer nothing
+            concurrency: Files transferred in parallel
+            manifest_path: Manifest database (default: ``<local_dir>/.aftership-sync.db``)
+            exclude: Glob patterns of relative paths or file names to skip
+            progress: Called with (actions_done, actions_total) as actions finish
+        """
+        if direction not in DIRECTIONS:
+            raise ValueError(f"Unknown sync direction: {direction!r} (expected one of {', '.join(DIRECTIONS)})")
+        if conflict not in CONFLICT_POLICIES:
+            raise ValueError(
+                f"Unknown conflict policy: {conflict!r} (expected one of {', '.join(CONFLICT_POLICIES)})"
+            )
+        self.client = client
+        self.local_dir = os.path.abspath(local_dir)
+        self._real_dir = os.path.realpath(self.local_dir)
+        self.bucket = bucket
+        self.prefix = f"{prefix.strip('/')}/" if prefix.strip("/") else ""
+        self.direction = direction
+        self.delete = delete
+        self.conflict = conflict
+        self.dry_run = dry_run
+        self.concurrency = max(1, concurrency)
+        self.manifest_path = manifest_path or os.path.join(self.local_dir, MANIFEST_NAME)
+        self.exclude = tuple(exclude)
+        self.progress = progress
+        self.remote = f"{bucket}/{self.prefix}"
+        self.rejected: List[str] = []  # Remote keys skipped because they are not safe local paths
+
+    # Scanning
+
+    def _excluded(self, rel_path: str, name: str) -> bool:
+        if name.startswith(MANIFEST_NAME):
+            return True
+        return any(fnmatch.fnmatchcase(rel_path, p) or fnmatch.fnmatchcase(name, p) for p in self.exclude)
+
+    def scan_local(self) -> Iterator[Tuple[str, int, int]]:
+        """
+        Walk the local directory.
+
+        Yields:
+            (relative path, size, mtime_ns) for every file
+        """
+        stack = [""]
+        while stack:
+            rel_dir = stack.pop()
+            try:
+                entries = os.scandir(os.path.join(self.local_dir, rel_dir))
+            except FileNotFoundError:
+                continue
+            with entries:
+                entries = list(entries)
+            names = {entry.name for entry in entries}
+            for entry in entries:
+                rel_path = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+                if entry.is_dir(follow_symlinks=False):
+                    if not any(fnmatch.fnmatchcase(rel_path, p) for p in self.exclude):
+                        stack.append(rel_path)
+                elif (
+                    entry.is_file()
+                    and not is_transfer_artifact(entry.name, names)
+                    and not self._excluded(rel_path, entry.name)
+                ):
+                    st = entry.stat()
+                    yield rel_path, st.st_size, st.st_mtime_ns
+
+    def scan_remote(self) -> Iterator[Tuple[str, int, Optional[str]]]:
+        """
+        List the bucket prefix.
+
+        Yields:
+            (relative path, size, etag) for every object
+        """
+        self.rejected = []
+        params = {"prefix": self.prefix} if self.prefix else None
+        for obj in self.client.paginate(f"/v1/buckets/{self.bucket}/objects", params=params, page_size=1000):
+            key = obj["key"]
+            if not key.startswith(self.prefix) or key.endswith("/"):
+                continue
+            rel_path = key[len(self.prefix):]
+            if not is_safe_relative_path(rel_path):
+                self.rejected.append(rel_path)
+                continue
+            name = rel_path.rsplit("/", 1)[-1]
+            if not self._excluded(rel_path, name):
+                yield rel_path, int(obj.get("size") or 0), obj.get("etag")
+
+    # Planning
+
+    def _plan(self, db: sqlite3.Connection) -> int:
+        """Fill the temporary ``plan`` table. Returns the number of actions."""
+        db.executescript("""
+            CREATE TEMP TABLE scan (path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER) WITHOUT ROWID;
+            CREATE TEMP TABLE listing (path TEXT PRIMARY KEY, size INTEGER, etag TEXT) WITHOUT ROWID;
+            CREATE TEMP TABLE local_changed (path TEXT PRIMARY KEY) WITHOUT ROWID;
+            CREATE TEMP TABLE remote_changed (path TEXT PRIMARY KEY, etag TEXT) WITHOUT ROWID;
+            CREATE TEMP TABLE plan (op TEXT, path TEXT, sha256 TEXT, etag TEXT);
+        """)
+        db.executemany("INSERT OR REPLACE INTO scan VALUES (?, ?, ?)", self.scan_local())
+        remote = (self.remote,)
+
+        db.execute("""
+            INSERT INTO local_changed
+            SELECT s.path FROM scan s
+            LEFT JOIN files f ON f.remote = ? AND f.path = s.path
+            WHERE f.path IS NULL OR f.size != s.size OR f.mtime_ns != s.mtime_ns
+        """, remote)
+
+        listed = self.direction != "upload"
+        if listed:
+            db.executemany("INSERT OR REPLACE INTO listing VALUES (?, ?, ?)", self.scan_remote())
+            # Objects we uploaded without learning their ETag: adopt the listed one
+            db.execute("""
+                UPDATE files SET etag = (SELECT l.etag FROM listing l WHERE l.path = files.path)
+                WHERE remote = ? AND etag IS NULL AND EXISTS (
+                    SELECT 1 FROM listing l WHERE l.path = files.path AND l.size = files.size
+                )
+            """, remote)
+            db.execute("""
+                INSERT INTO remote_changed
+                SELECT l.path, l.etag FROM listing l
+                LEFT JOIN files f ON f.remote = ? AND f.path = l.path
+                WHERE f.path IS NULL OR f.etag IS NOT l.etag
+            """, remote)
+
+        push = self.direction in ("upload", "both")
+        pull = self.direction in ("download", "both")
+
+        if push:
+            # remote_changed is empty for one-way uploads, so nothing is a conflict
+            db.execute("""
+                INSERT INTO plan
+                SELECT CASE WHEN r.path IS NULL THEN 'upload' ELSE 'conflict' END, c.path, f.sha256, r.etag
+                FROM local_changed c
+                LEFT JOIN files f ON f.remote = ? AND f.path = c.path
+                LEFT JOIN remote_changed r ON r.path = c.path
+            """, remote)
+        if pull:
+            # One-way downloads overwrite local changes; two-way syncs planned them as conflicts
+            db.execute("""
+                INSERT INTO plan
+                SELECT 'download', r.path, f.sha256, r.etag
+                FROM remote_changed r
+                LEFT JOIN files f ON f.remote = ? AND f.path = r.path
+                WHERE ? = 'download' OR r.path NOT IN (SELECT path FROM local_changed)
+            """, (self.remote, self.direction))
+
+        if self.delete and push:
+            # Deleted locally; skip objects that changed remotely since
+            db.execute("""
+                INSERT INTO plan
+                SELECT 'delete_remote', f.path, f.sha256, NULL FROM files f
+                WHERE f.remote = ?
+                  AND f.path NOT IN (SELECT path FROM scan)
+                  AND f.path NOT IN (SELECT path FROM remote_changed)
+                  AND (? = 0 OR f.path IN (SELECT path FROM listing))
+            """, (self.remote, int(listed)))
+        if self.delete and pull:
+            # Deleted remotely; skip files that changed locally since
+            db.execute("""
+                INSERT INTO plan
+                SELECT 'delete_local', f.path, f.sha256, NULL FROM files f
+                WHERE f.remote = ?
+                  AND f.path NOT IN (SELECT path FROM listing)
+                  AND f.path IN (SELECT path FROM scan)
+                  AND f.path NOT IN (SELECT path FROM local_changed)
+            """, remote)
+        if listed:
+            # Gone on both sides: nothing to do but forget it
+            db.execute("""
+                DELETE FROM files WHERE remote = ?
+                  AND path NOT IN (SELECT path FROM scan)
+                  AND path NOT IN (SELECT path FROM listing)
+            """, remote)
+
+        return db.execute("SELECT COUNT(*) FROM plan").fetchone()[0]
+
+    # Execution
+
+    def _key(self, rel_path: str) -> str:
+        return f"{self.prefix}{rel_path}"
+
+    def _local(self, rel_path: str) -> str:
+        """Local path of a relative path, refusing any that resolves outside ``local_dir``."""
+        if not is_safe_relative_path(rel_path):
+            raise ValueError(f"Unsafe path {rel_path!r}")
+        path = os.path.join(self.local_dir, *rel_path.split("/"))
+        # A symlinked directory inside local_dir may point elsewhere
+        if os.path.commonpath([os.path.realpath(path), self._real_dir]) != self._real_dir:
+            raise ValueError(f"Path {rel_path!r} resolves outside {self.local_dir}")
+        return path
+
+    def _record_local(self, rel_path: str, sha256: Optional[str], etag: Optional[str]) -> Dict[str, Any]:
+        st = os.stat(self._local(rel_path))
+        return {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": sha256, "etag": etag}
+
+    def _upload(self, action: SyncAction) -> Tuple[str, Dict[str, Any], int]:
+        local_path = self._local(action.path)
+        sha256 = None
+        if action.sha256 is not None:
+            sha256 = file_digest(local_path)
+            if sha256 == action.sha256:
+                # Touched but not modified
+                return "unchanged", self._record_local(action.path, sha256, None), 0
+        result = self.client.upload_file(local_path, self.bucket, self._key(action.path))
+        # Single-part uploads hash the file as it is sent
+        sha256 = sha256 or content_digest(result.checksum) or file_digest(local_path)
+        etag = result.response.get("etag") if isinstance(result.response, dict) else None
+        return "uploaded", self._record_local(action.path, sha256, etag), result.bytes_transferred
+
+    def _download(self, action: SyncAction) -> Tuple[str, Dict[str, Any], int]:
+        local_path = self._local(action.path)
+        os.makedirs(os.path.dirname(local_path), exist_ok=True)
+        result = self.client.download_file(self.bucket, self._key(action.path), local_path)
+        return "downloaded", self._record_local(action.path, file_digest(local_path), action.etag), result.bytes_transferred
+
+    def _resolve_conflict(self, action: SyncAction) -> Tuple[str, Optional[Dict[str, Any]], int]:
+        local_path = self._local(action.path)
+        # Identical content on both sides (e.g. the first two-way sync)
+        if action.etag and action.etag.strip('"') == file_digest(local_path, "md5"):
+            return "unchanged", self._record_local(action.path, file_digest(local_path), action.etag), 0
+        if self.conflict == "local":
+            return self._upload(action)
+        if self.conflict == "remote":
+            return self._download(action)
+        return "conflict", None, 0
+
+    def _delete_remote(self, action: SyncAction) -> Tuple[str, None, int]:
+        try:
+            self.client.delete(f"/v1/buckets/{self.bucket}/objects/{quote(self._key(action.path))}")
+        except requests.HTTPError as e:
+            if e.response is None or e.response.status_code != 404:
+                raise
+        return "deleted_remote", None, 0
+
+    def _delete_local(self, action: SyncAction) -> Tuple[str, None, int]:
+        try:
+            os.remove(self._local(action.path))
+        except FileNotFoundError:
+            pass
+        return "deleted_local", None, 0
+
+    def _execute(self, action: SyncAction):
+        handler = {
+            "upload": self._upload,
+            "download": self._download,
+            "conflict": self._resolve_conflict,
+            "delete_remote": self._delete_remote,
+            "delete_local": self._delete_local,
+        }[action.op]
+        return handler(action)
+
+    def run(self) -> SyncResult:
+        """
+        Plan and apply the sync.
+
+        Returns:
+            SyncResult listing what changed; per-file failures are collected
+            in ``errors`` rather than raised
+        """
+        started = time.monotonic()
+        result = SyncResult(dry_run=self.dry_run)
+        os.makedirs(self.local_dir, exist_ok=True)
+        manifest = SyncManifest(self.manifest_path)
+        try:
+            total = self._plan(manifest.db)
+            for rel_path in self.rejected:
+                result.errors[rel_path] = f"Key {self._key(rel_path)!r} is not a safe local path; skipped"
+            actions = self._actions(manifest.db)
+            if self.dry_run:
+                planned = {
+                    "upload": result.uploaded,
+                    "download": result.downloaded,
+                    "delete_remote": result.deleted_remote,
+                    "delete_local": result.deleted_local,
+                    "conflict": result.conflicts,
+                }
+                for action in actions:
+                    planned[action.op].append(action.path)
+                return result
+
+            done = 0
+            for action, outcome, error in self._run_bounded(actions):
+                done += 1
+                if error is not None:
+                    result.errors[action.path] = str(error)
+                else:
+                    status, record, nbytes = outcome
+                    result.bytes_transferred += nbytes
+                    if status == "unchanged":
+                        result.unchanged += 1
+                    else:
+                        getattr(result, "conflicts" if status == "conflict" else status).append(action.path)
+                    if record is not None:
+                        manifest.record(self.remote, action.path, **record)
+                    elif status in ("deleted_remote", "deleted_local"):
+                        manifest.forget(self.remote, action.path)
+                if done % 500 == 0:
+                    manifest.commit()
+                if self.progress is not None:
+                    self.progress(done, total)
+            return result
+        finally:
+            if self.dry_run:
+                manifest.db.rollback()
+            else:
+                manifest.commit()
+            manifest.close()
+            result.elapsed = time.monotonic() - started
+
+    @staticmethod
+    def _actions(db: sqlite3.Connection, batch: int = 1000) -> Iterator[SyncAction]:
+        """Read the plan in batches, so the manifest can be committed while iterating."""
+        last = 0
+        while True:
+            rows = db.execute(
+                "SELECT rowid, op, path, sha256, etag FROM plan WHERE rowid > ? ORDER BY rowid LIMIT ?",
+                (last, batch),
+            ).fetchall()
+            if not rows:
+                return
+            for row in rows:
+                yield SyncAction(*row[1:])
+            last = rows[-1][0]
+
+    def _run_bounded(self, actions: Iterator[SyncAction]):
+        """Run actions on a worker pool with at most ``concurrency`` in flight."""
+        pending: "deque[Tuple[SyncAction, Future]]" = deque()
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="aftership-sync") as executor:
+            def submit_next() -> bool:
+                action = next(actions, None)
+                if action is None:
+                    return False
+                pending.append((action, executor.submit(contextvars.copy_context().run, self._execute, action)))
+                return True
+
+            try:
+                while len(pending) < self.concurrency and submit_next():
+                    pass
+                while pending:
+                    action, future = pending.popleft()
+                    try:
+                        yield action, future.result(), None
+                    except Exception as e:
+                        yield action, None, e
+                    submit_next()
+            finally:
+                for _, future in pending:
+                    future.cancel()
@@ -0,0 +1,257 @@
+"""Adaptive concurrency and bandwidth limits shared by a client's transfers."""
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional, Dict, Any, Iterator
+
+from .config import TransferConfig
+
+
+# Response statuses that mean the server is shedding load
+OVERLOAD_STATUSES = frozenset({429, 503})
+
+# Weight of the newest sample in the smoothed per-byte latency
+LATENCY_SMOOTHING = 0.2
+
+# Relative growth of the latency baseline per sample, so it tracks a slower link
+BASELINE_DRIFT = 0.002
+
+# Window over which live throughput is measured (seconds)
+THROUGHPUT_WINDOW = 1.0
+
+
+class BandwidthLimiter:
+    """
+    Token bucket capping the bytes per second sent and received.
+
+    Callers take tokens for each chunk before moving it and sleep when the
+    bucket is empty, so the cap holds across every thread that shares the
+    limiter. Up to one second of traffic may be sent in a burst.
+    """
+
+    def __init__(self, rate: Optional[float] = None):
+        """
+        Initialize the limiter.
+
+        Args:
+            rate: Bytes per second (None: unlimited)
+        """
+        self._lock = threading.Lock()
+        self.rate = rate
+        self._tokens = rate or 0.0
+        self._updated = time.monotonic()
+        self.waited = 0.0  # Seconds callers spent waiting for tokens
+
+    def set_rate(self, rate: Optional[float]):
+        """Change the cap (None: unlimited); takes effect for the next chunk."""
+        with self._lock:
+            self.rate = rate
+            self._tokens = min(self._tokens, rate or 0.0)
+
+    def consume(self, nbytes: int) -> float:
+        """
+        Take tokens for ``nbytes``, waiting until the cap allows them.
+
+        Returns:
+            Seconds spent waiting
+        """
+        with self._lock:
+            rate = self.rate
+            if not rate:
+                return 0.0
+            now = time.monotonic()
+            self._tokens = min(rate, self._tokens + (now - self._updated) * rate)
+            self._updated = now
+            # Going into debt lets chunks larger than the burst through at the capped rate
+            self._tokens -= nbytes
+            delay = -self._tokens / rate if self._tokens < 0 else 0.0
+            self.waited += delay
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+
+class TransferController:
+    """
+    Limits the part requests a client's transfers have in flight.
+
+    With ``adaptive``, the limit is found with AIMD driven by latency: each
+    completed part measures the time it took per byte. While that stays
+    within ``tolerance`` of the best recently seen, the limit grows by about
+    one request per round of completions (additive increase). When it rises
+    further, requests are queueing on the link or the server, and the limit
+    is cut in proportion. A 429 or 503 response, a timeout or a dropped
+    connection halves it (multiplicative decrease). At most one cut is made
+    per round, so a burst of errors from one round counts once.
+
+    Without ``adaptive``, nothing is gated (each transfer runs its own
+    ``concurrency`` parts) but the metrics are still collected.
+
+    An optional bandwidth cap applies to every transfer of the client.
+    """
+
+    def __init__(self, config: Optional[TransferConfig] = None):
+        """
+        Initialize the controller.
+
+        Args:
+            config: Transfer settings (default: TransferConfig())
+        """
+        self.config = config or TransferConfig()
+        self.adaptive = self.config.adaptive
+        self.min_limit = max(1, self.config.min_concurrency)
+        self.max_limit = max(self.min_limit, self.config.max_concurrency)
+        self.tolerance = self.config.latency_tolerance
+        self.bandwidth = BandwidthLimiter(self.config.max_bandwidth)
+
+        self._cond = threading.Condition()
+        self._local = threading.local()  # Per-thread throttle wait of the open slot
+        self._limit = float(min(max(self.config.concurrency, self.min_limit), self.max_limit))
+        self._in_flight = 0
+        self._baseline: Optional[float] = None  # Best recent seconds per byte
+        self._latency: Optional[float] = None  # Smoothed seconds per byte
+        self._since_cut = int(self._limit)  # Completions since the limit was last cut
+        self._stats = {"requests": 0, "bytes": 0, "backoffs": 0, "overloaded": 0}
+        self._window_start = time.monotonic()
+        self._window_bytes = 0
+        self._throughput = 0.0
+
+    @property
+    def limit(self) -> int:
+        """Requests currently allowed in flight (0 when not adaptive)."""
+        return int(self._limit) if self.adaptive else 0
+
+    def acquire(self):
+        """Wait for a free slot and take it."""
+        with self._cond:
+            if self.adaptive:
+                while self._in_flight >= int(self._limit):
+                    self._cond.wait()
+            self._in_flight += 1
+
+    def release(self, nbytes: int, elapsed: Optional[float]):
+        """
+        Give a slot back and feed the outcome to the controller.
+
+        Args:
+            nbytes: Bytes the request moved
+            elapsed: Seconds it took, or None if it failed
+        """
+        with self._cond:
+            self._in_flight -= 1
+            self._since_cut += 1
+            self._stats["requests"] += 1
+            if elapsed is not None and nbytes > 0:
+                self._sample(elapsed / nbytes)
+            self._cond.notify_all()
+
+    def count_bytes(self, nbytes: int):
+        """Record bytes moved (for throughput) and apply the bandwidth cap."""
+        waited = self.bandwidth.consume(nbytes)
+        if waited:
+            self._local.throttled = getattr(self._local, "throttled", 0.0) + waited
+        with self._cond:
+            now = time.monotonic()
+            if not self._window_bytes:
+                self._window_start = now  # Idle time before the first bytes is not part of the window
+            self._stats["bytes"] += nbytes
+            self._window_bytes += nbytes
+            if now - self._window_start >= THROUGHPUT_WINDOW:
+                self._throughput = self._window_bytes / (now - self._window_start)
+                self._window_start, self._window_bytes = now, 0
+
+    def _sample(self, latency: float):
+        """Adjust the limit for a successful request's seconds per byte (lock held)."""
+        if self._baseline is None or latency < self._baseline:
+            self._baseline = latency
+        else:
+            self._baseline *= 1 + BASELINE_DRIFT
+        self._latency = (
+            latency if self._latency is None
+            else self._latency + LATENCY_SMOOTHING * (latency - self._latency)
+        )
+        if not self.adaptive:
+            return
+        if self._latency <= self._baseline * self.tolerance:
+            self._limit = min(self.max_limit, self._limit + 1 / self._limit)
+        else:
+            self._cut(self._baseline * self.tolerance / self._latency)
+
+    def _cut(self, factor: float) -> bool:
+        """Shrink the limit, at most once per round of completions (lock held)."""
+        if self._since_cut < self._limit:
+            return False
+        self._limit = max(self.min_limit, self._limit * max(factor, self.config.backoff_ratio))
+        self._since_cut = 0
+        self._stats["backoffs"] += 1
+        return True
+
+    def overloaded(self):
+        """Record an overload signal (429/503, timeout or dropped connection)."""
+        with self._cond:
+            self._stats["overloaded"] += 1
+            if self.adaptive:
+                self._cut(self.config.backoff_ratio)
+
+    def response_hook(self, response, *args, **kwargs):
+        """requests response hook reporting overload statuses, including ones retried internally."""
+        if response.status_code in OVERLOAD_STATUSES:
+            self.overloaded()
+        return response
+
+    @contextmanager
+    def slot(self, nbytes: int) -> Iterator[None]:
+        """
+        Hold a slot for one part request.
+
+        Time this thread spends waiting on the bandwidth cap inside the slot
+        is not counted as latency, so the cap does not drive the limit down.
+
+        Args:
+            nbytes: Bytes the request moves
+
+        Example:
+            with controller.slot(len(part)):
+                client.put(endpoint, data=part)
+        """
+        self.acquire()
+        self._local.throttled = 0.0
+        started = time.monotonic()
+        elapsed = None
+        try:
+            yield
+            elapsed = max(0.0, time.monotonic() - started - self._local.throttled)
+        finally:
+            self.release(nbytes, elapsed)
+
+    def set_bandwidth(self, bytes_per_second: Optional[float]):
+        """Change the bandwidth cap of all transfers (None: unlimited)."""
+        self.bandwidth.set_rate(bytes_per_second)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get live transfer metrics.
+
+        Returns:
+            Dictionary with in_flight requests, the current concurrency
+            limit (0 when not adaptive), throughput in bytes per second over
+            the last second, total requests and bytes, backoffs (limit
+            cuts), overloaded (429/503 responses, timeouts and dropped
+            connections), latency and baseline (seconds per MiB), the
+            bandwidth cap, and throttled (seconds spent waiting on it)
+        """
+        with self._cond:
+            stats = dict(self._stats)
+            stats["in_flight"] = self._in_flight
+            stats["limit"] = self.limit
+            span = time.monotonic() - self._window_start
+            if span >= THROUGHPUT_WINDOW or not self._throughput:
+                # The open window is overdue (traffic stopped) or is the first one
+                stats["throughput"] = self._window_bytes / span if span > 0 else 0.0
+            else:
+                stats["throughput"] = self._throughput
+            stats["latency"] = self._latency * 1024 * 1024 if self._latency is not None else None
+            stats["baseline"] = self._baseline * 1024 * 1024 if self._baseline is not None else None
+        stats["max_bandwidth"] = self.bandwidth.rate
+        stats["throttled"] = self.bandwidth.waited
+        return stats
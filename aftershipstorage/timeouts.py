@@ -0,0 +1,154 @@
+"""Per-endpoint timeout policies and end-to-end deadlines."""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from fnmatch import fnmatchcase
+from typing import Optional, Tuple, Union, Iterator
+
+from .config import TimeoutConfig
+
+
+DEFAULT_READ_TIMEOUT = 30.0
+
+_deadline = ContextVar("aftershipstorage_deadline", default=None)
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when a request is attempted after the active deadline has passed."""
+
+
+@contextmanager
+def deadline(seconds: float) -> Iterator[None]:
+    """
+    Bound every request made inside the block by a shared time budget.
+
+    Requests made under the deadline get their connect and read timeouts
+    capped to the remaining budget, retries stop once the budget cannot cover
+    the next backoff, and requests started after it expires raise
+    DeadlineExceeded. Nested deadlines can only shorten the outer one.
+
+    The deadline follows the current thread or asyncio task (it is stored in
+    a context variable); work handed to other threads must be wrapped in its
+    own ``deadline`` block or run with ``contextvars.copy_context()``.
+
+    Args:
+        seconds: Time budget for the block
+
+    Example:
+        with deadline(30):
+            client.darkstorage.post("/v1/upload", json=upload)
+            client.models2go.post("/v1/models", json=model)
+    """
+    expires_at = time.monotonic() + seconds
+    outer = _deadline.get()
+    if outer is not None:
+        expires_at = min(expires_at, outer)
+    token = _deadline.set(expires_at)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """
+    Get the time left before the active deadline.
+
+    Returns:
+        Seconds remaining (may be negative), or None if no deadline is active
+    """
+    expires_at = _deadline.get()
+    if expires_at is None:
+        return None
+    return expires_at - time.monotonic()
+
+
+def check_deadline() -> Optional[float]:
+    """
+    Ensure the active deadline has not expired.
+
+    Returns:
+        Seconds remaining, or None if no deadline is active
+
+    Raises:
+        DeadlineExceeded: If the deadline has passed
+    """
+    left = remaining()
+    if left is not None and left <= 0:
+        raise DeadlineExceeded("Deadline exceeded before the request could be sent")
+    return left
+
+
+class TimeoutPolicy:
+    """Resolves the connect/read timeout for each request."""
+
+    def __init__(self, config: Optional[TimeoutConfig] = None):
+        """
+        Initialize the policy.
+
+        Args:
+            config: Timeout settings (default: TimeoutConfig())
+        """
+        self.config = config or TimeoutConfig()
+        self._endpoints = [
+            ("/" + pattern.lstrip("/"), self._split(value))
+            for pattern, value in self.config.endpoints.items()
+        ]
+
+    def _split(self, value: Union[float, dict, tuple, list]) -> Tuple[float, float]:
+        if isinstance(value, dict):
+            return (
+                float(value.get("connect", self.config.connect)),
+                float(value.get("read", self._default_read())),
+            )
+        if isinstance(value, (tuple, list)):
+            return float(value[0]), float(value[1])
+        return float(self.config.connect), float(value)
+
+    def _default_read(self) -> float:
+        if self.config.read is None:
+            return DEFAULT_READ_TIMEOUT
+        return self.config.read
+
+    def resolve(
+        self,
+        endpoint: str,
+        timeout: Union[None, float, Tuple[float, float]] = None,
+    ) -> Tuple[float, float]:
+        """
+        Resolve the (connect, read) timeout for a request.
+
+        Priority:
+        1. Explicit timeout passed to the request
+        2. First endpoint pattern matching the path
+        3. Default connect/read timeouts
+
+        The result is capped by the remaining deadline, if one is active.
+
+        Args:
+            endpoint: API endpoint path
+            timeout: Explicit timeout (seconds or (connect, read) tuple)
+
+        Returns:
+            (connect, read) timeout in seconds
+
+        Raises:
+            DeadlineExceeded: If the active deadline has passed
+        """
+        left = check_deadline()
+
+        if isinstance(timeout, (int, float)):
+            connect = read = float(timeout)
+        elif timeout is not None:
+            connect, read = self._split(timeout)
+        else:
+            connect, read = float(self.config.connect), self._default_read()
+            path = "/" + endpoint.split("?", 1)[0].lstrip("/")
+            for pattern, value in self._endpoints:
+                if fnmatchcase(path, pattern):
+                    connect, read = value
+                    break
+
+        if left is not None:
+            connect, read = min(connect, left), min(read, left)
+        return connect, read
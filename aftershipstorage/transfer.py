@@ -0,0 +1,762 @@
+"""Parallel multipart transfers of large objects."""
+import contextvars
+import json
+import math
+import mmap
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Optional, Dict, Any, Callable, List, Tuple
+from urllib.parse import quote
+
+import requests
+
+from .checksums import HashingReader, CHECKSUM_ALGORITHM, buffer_digest, composite_digest, file_digest, format_checksum
+from .config import TransferConfig
+from .throttle import TransferController
+
+
+# Upper bound on the number of parts in one multipart upload
+MAX_PARTS = 10000
+
+# Byte ranges address the stored bytes, so downloads never negotiate a content encoding
+IDENTITY = {"Accept-Encoding": "identity"}
+
+
+@dataclass
+class TransferResult:
+    """Outcome and throughput of a completed transfer."""
+    bucket: Optional[str]
+    key: Optional[str]
+    size: int  # Object size in bytes
+    parts: int  # Number of parts the object was transferred in
+    parts_resumed: int  # Parts already transferred by an earlier, interrupted run
+    bytes_transferred: int  # Bytes sent or received by this run
+    elapsed: float  # Seconds spent transferring
+    response: Any = None  # Decoded body of the final API response, if any
+    checksum: Optional[str] = None  # "sha256:<hex>" of the content (composite "-<parts>" form for multipart uploads)
+    deduplicated: bool = False  # Stored by copying an existing object with the same content
+
+    @property
+    def throughput(self) -> float:
+        """Bytes per second transferred by this run."""
+        return self.bytes_transferred / self.elapsed if self.elapsed > 0 else 0.0
+
+
+def part_workers(config: TransferConfig, controller: TransferController, parts: int) -> int:
+    """Threads for a transfer's parts: the adaptive limit decides how many actually run."""
+    workers = config.max_concurrency if controller.adaptive else config.concurrency
+    return max(1, min(workers, parts))
+
+
+def is_overload_error(error: BaseException) -> bool:
+    """Check whether a part failure suggests the link or server is overloaded (429/503 are seen by the hook)."""
+    return isinstance(error, (requests.ConnectionError, requests.Timeout))
+
+
+def write_json_atomic(path: str, data: Dict[str, Any]):
+    """Write a JSON file so readers never observe a partial write."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+class MultipartUpload:
+    """
+    Upload a file to darkstorage in parallel parts.
+
+    The file is memory-mapped and every part is sent straight from a
+    ``memoryview`` slice of the mapping, so no part is copied into Python
+    memory. Failed parts are retried individually. Completed parts are
+    recorded in a state file next to the source, so an interrupted upload
+    resumes with the remaining parts; the state file is removed once the
+    upload completes.
+
+    Files smaller than ``multipart_threshold``, and empty files (which have
+    no parts), are sent with a single PUT to the ``upload_url`` returned by
+    ``POST /v1/upload`` (presigned, so the API key is not sent with it).
+    Larger files use the multipart endpoints:
+
+    - ``POST /v1/buckets/{bucket}/uploads`` -> ``{"upload_id": ...}``
+    - ``PUT /v1/buckets/{bucket}/uploads/{upload_id}/parts/{part_number}``
+      -> ETag header (or ``{"etag": ...}``)
+    - ``POST /v1/buckets/{bucket}/uploads/{upload_id}/complete``
+
+    Part requests go through the client's TransferController, which caps
+    them (with ``transfer.adaptive``) and bandwidth across all its transfers.
+
+    Every part is SHA-256 hashed by its worker as it is sent, so checksums
+    cost no second read of the file. The part digests are sent with the
+    completion request, together with their composite checksum.
+
+    With ``dedupe``, the file's SHA-256 is computed first and looked up with
+    ``GET /v1/buckets/{bucket}/digests/sha256/{digest}``. If an object with
+    the same content exists, it is copied server-side to ``key`` and no data
+    is uploaded.
+    """
+
+    upload_endpoint = "/v1/upload"
+    create_endpoint = "/v1/buckets/{bucket}/uploads"
+    part_endpoint = "/v1/buckets/{bucket}/uploads/{upload_id}/parts/{part_number}"
+    complete_endpoint = "/v1/buckets/{bucket}/uploads/{upload_id}/complete"
+    digest_endpoint = "/v1/buckets/{bucket}/digests/{algorithm}/{digest}"
+    copy_endpoint = "/v1/buckets/{bucket}/objects/{key}/copy"
+
+    def __init__(
+        self,
+        client,
+        path: str,
+        bucket: str,
+        key: str,
+        content_type: str = "application/octet-stream",
+        config: Optional[TransferConfig] = None,
+        state_path: Optional[str] = None,
+        resume: bool = True,
+        progress: Optional[Callable[[int, int], None]] = None,
+        dedupe: bool = False,
+    ):
+        """
+        Initialize the upload.
+
+        Args:
+            client: DarkstorageClient used for the requests
+            path: Local file to upload
+            bucket: Destination bucket
+            key: Destination object key
+            content_type: Content type of the object
+            config: Part size, concurrency and multipart threshold settings (default: TransferConfig())
+            state_path: Resume state file (default: ``<path>.upload-state``)
+            resume: Continue an earlier interrupted upload of the same file
+            progress: Called with (bytes_done, total_bytes) after each part
+            dedupe: Copy an existing object with the same SHA-256 instead of
+                uploading
+        """
+        self.client = client
+        self.path = path
+        self.bucket = bucket
+        self.key = key
+        self.content_type = content_type
+        self.config = config or TransferConfig()
+        self.state_path = state_path or f"{path}.upload-state"
+        self.resume = resume
+        self.progress = progress
+        self.dedupe = dedupe
+        self.controller: TransferController = client.transfer_controller
+
+        stat = os.stat(path)
+        self.size = stat.st_size
+        self.mtime_ns = stat.st_mtime_ns
+        self.part_size = max(self.config.part_size, math.ceil(self.size / MAX_PARTS))
+
+        self._lock = threading.Lock()
+        self._state: Dict[str, Any] = {}
+        self._bytes_done = 0
+
+    @property
+    def part_count(self) -> int:
+        """Number of parts the file is split into."""
+        return max(1, math.ceil(self.size / self.part_size))
+
+    def run(self) -> TransferResult:
+        """
+        Upload the file.
+
+        Returns:
+            TransferResult with the API's completion response
+
+        Raises:
+            requests.HTTPError: If a request fails and cannot be retried;
+                completed parts are kept in the state file for resuming
+        """
+        started = time.monotonic()
+        digest = None
+        if self.dedupe:
+            digest = file_digest(self.path)
+            response = self._copy_duplicate(digest)
+            if response is not None:
+                self._report(self.size)
+                return TransferResult(
+                    self.bucket, self.key, self.size, 0, 0, 0, time.monotonic() - started, response,
+                    checksum=format_checksum(digest), deduplicated=True,
+                )
+
+        if self.size < self.config.multipart_threshold or self.size == 0:
+            response, digest = self._upload_single(digest)
+            return TransferResult(
+                self.bucket, self.key, self.size, 1, 0, self.size, time.monotonic() - started, response,
+                checksum=format_checksum(digest),
+            )
+
+        self._load_state(digest)
+        done = self._state["parts"]
+        resumed = len(done)
+        resumed_bytes = sum(self._part_length(int(n)) for n in done)
+        self._bytes_done = resumed_bytes
+        remaining = [n for n in range(1, self.part_count + 1) if str(n) not in done]
+        # Parts recorded by a run that did not keep their digests
+        unhashed = [int(n) for n in done if n not in self._state["checksums"]]
+
+        if remaining or unhashed:
+            with open(self.path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapping:
+                view = memoryview(mapping)
+                try:
+                    self._upload_parts(view, remaining, unhashed)
+                finally:
+                    view.release()
+
+        part_numbers = range(1, self.part_count + 1)
+        checksums = self._state["checksums"]
+        checksum = format_checksum(composite_digest([checksums[str(n)] for n in part_numbers]))
+        payload = {
+            "key": self.key,
+            "parts": [
+                {"part_number": n, "etag": self._state["parts"][str(n)], CHECKSUM_ALGORITHM: checksums[str(n)]}
+                for n in part_numbers
+            ],
+            "checksum": checksum,
+        }
+        if digest is not None:
+            payload[CHECKSUM_ALGORITHM] = digest
+        response = self.client.post(
+            self.complete_endpoint.format(bucket=self.bucket, upload_id=self._state["upload_id"]),
+            json=payload,
+        )
+        self._remove_state()
+        return TransferResult(
+            self.bucket,
+            self.key,
+            self.size,
+            self.part_count,
+            resumed,
+            self.size - resumed_bytes,
+            time.monotonic() - started,
+            self._decode(response),
+            checksum=format_checksum(digest) if digest is not None else checksum,
+        )
+
+    def _copy_duplicate(self, digest: str) -> Optional[Any]:
+        """
+        Store the object by copying an existing one with the same digest.
+
+        Returns:
+            Decoded copy response, or None if no object has this content
+        """
+        try:
+            response = self.client.get(
+                self.digest_endpoint.format(bucket=self.bucket, algorithm=CHECKSUM_ALGORITHM, digest=digest)
+            )
+        except requests.HTTPError as e:
+            if e.response is not None and e.response.status_code == 404:
+                return None
+            raise
+        existing = self.client.decode_json(response)
+        if existing.get("size") not in (None, self.size):
+            return None
+        if existing["key"] == self.key:
+            return existing
+        response = self.client.post(
+            self.copy_endpoint.format(bucket=self.bucket, key=quote(existing["key"])),
+            json={"destination_bucket": self.bucket, "destination_key": self.key},
+            retry=True,
+        )
+        return self._decode(response) or existing
+
+    def _part_range(self, part_number: int):
+        start = (part_number - 1) * self.part_size
+        return start, min(start + self.part_size, self.size)
+
+    def _part_length(self, part_number: int) -> int:
+        start, end = self._part_range(part_number)
+        return end - start
+
+    def _decode(self, response) -> Any:
+        return self.client.decode_json(response) if response.content else None
+
+    def _upload_single(self, digest: Optional[str] = None) -> Tuple[Any, str]:
+        """
+        Upload a small file with one PUT to a presigned URL.
+
+        Returns:
+            (decoded response, hex SHA-256 of the content)
+        """
+        payload = {"bucket": self.bucket, "key": self.key, "content_type": self.content_type, "size": self.size}
+        if digest is not None:
+            payload[CHECKSUM_ALGORITHM] = digest
+        response = self.client.post(self.upload_endpoint, json=payload)
+        upload_url = self.client.decode_json(response)["upload_url"]
+        headers = {"Content-Type": self.content_type}
+        hooks = {"response": self.controller.response_hook}
+        if self.size == 0:
+            response = self.client.put(
+                upload_url, data=b"", headers=headers, retry=True, credentials=False, hooks=hooks
+            )
+            digest = buffer_digest(b"")
+        else:
+            with open(self.path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapping:
+                with self.controller.slot(self.size), HashingReader(mapping, on_read=self.controller.count_bytes) as body:
+                    response = self.client.put(
+                        upload_url, data=body, headers=headers, retry=True, credentials=False, hooks=hooks
+                    )
+                    digest = body.hexdigest()
+        self._report(self.size)
+        return self._decode(response), digest
+
+    def _load_state(self, digest: Optional[str] = None):
+        """Load resume state for this file, or start a new multipart upload."""
+        identity = {
+            "bucket": self.bucket,
+            "key": self.key,
+            "size": self.size,
+            "mtime_ns": self.mtime_ns,
+            "part_size": self.part_size,
+        }
+        if self.resume and os.path.exists(self.state_path):
+            try:
+                with open(self.state_path) as f:
+                    state = json.load(f)
+            except (OSError, ValueError):
+                state = {}
+            if state.get("upload_id") and all(state.get(name) == value for name, value in identity.items()):
+                state.setdefault("parts", {})
+                state.setdefault("checksums", {})
+                self._state = state
+                return
+
+        payload = {"key": self.key, "content_type": self.content_type, "size": self.size}
+        if digest is not None:
+            payload[CHECKSUM_ALGORITHM] = digest
+        response = self.client.post(self.create_endpoint.format(bucket=self.bucket), json=payload)
+        self._state = {
+            **identity,
+            "upload_id": self.client.decode_json(response)["upload_id"],
+            "parts": {},
+            "checksums": {},
+        }
+        write_json_atomic(self.state_path, self._state)
+
+    def _remove_state(self):
+        try:
+            os.remove(self.state_path)
+        except FileNotFoundError:
+            pass
+
+    def _report(self, nbytes: int):
+        with self._lock:
+            self._bytes_done += nbytes
+            done = self._bytes_done
+        if self.progress is not None:
+            self.progress(done, self.size)
+
+    def _upload_parts(self, view: memoryview, part_numbers: List[int], unhashed: List[int] = ()):
+        """Upload parts concurrently, recording each completed part and its digest."""
+        with ThreadPoolExecutor(
+            max_workers=part_workers(self.config, self.controller, len(part_numbers)),
+            thread_name_prefix="aftership-upload",
+        ) as executor:
+            futures = {
+                executor.submit(contextvars.copy_context().run, self._upload_part, view, n): n
+                for n in part_numbers
+            }
+            futures.update({executor.submit(self._hash_part, view, n): n for n in unhashed})
+            error = None
+            try:
+                for future in as_completed(futures):
+                    if future.cancelled():
+                        continue
+                    try:
+                        etag, checksum = future.result()
+                    except Exception as e:
+                        # Stop starting new parts, but keep recording the
+                        # parts already in flight so a resume can skip them
+                        if error is None:
+                            error = e
+                            for pending in futures:
+                                pending.cancel()
+                        continue
+                    with self._lock:
+                        if etag is not None:
+                            self._state["parts"][str(futures[future])] = etag
+                        self._state["checksums"][str(futures[future])] = checksum
+                        write_json_atomic(self.state_path, self._state)
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
+            if error is not None:
+                raise error
+
+    def _hash_part(self, view: memoryview, part_number: int) -> Tuple[None, str]:
+        """Hash an already uploaded part."""
+        start, end = self._part_range(part_number)
+        with view[start:end] as part:
+            return None, buffer_digest(part)
+
+    def _upload_part(self, view: memoryview, part_number: int) -> Tuple[str, str]:
+        """
+        Upload one part.
+
+        Transient failures are retried by the client's RetryPolicy (the body
+        is rewound for each attempt), within its retry budget.
+
+        Returns:
+            (ETag, hex SHA-256 of the part)
+        """
+        start, end = self._part_range(part_number)
+        endpoint = self.part_endpoint.format(
+            bucket=self.bucket, upload_id=self._state["upload_id"], part_number=part_number
+        )
+        try:
+            with self.controller.slot(end - start), view[start:end] as part, \
+                    HashingReader(part, on_read=self.controller.count_bytes) as body:
+                response = self.client.put(
+                    endpoint,
+                    data=body,
+                    headers={"Content-Type": "application/octet-stream"},
+                    retry=True,
+                    hooks={"response": self.controller.response_hook},
+                )
+                checksum = body.hexdigest()
+        except requests.RequestException as e:
+            if is_overload_error(e):
+                self.controller.overloaded()
+            raise
+
+        etag = response.headers.get("ETag")
+        if not etag:
+            etag = self._decode(response)["etag"]
+        self._report(end - start)
+        return etag, checksum
+
+
+def parse_content_range(value: Optional[str]) -> Optional[int]:
+    """
+    Get the total length from a Content-Range header.
+
+    Args:
+        value: Header value (e.g. "bytes 0-0/1048576")
+
+    Returns:
+        Total object size, or None if unknown
+    """
+    if not value or "/" not in value:
+        return None
+    total = value.rsplit("/", 1)[1].strip()
+    return int(total) if total.isdigit() else None
+
+
+class RangedDownload:
+    """
+    Download a URL with parallel HTTP Range requests.
+
+    The destination is preallocated as ``<path>.part`` and every range is
+    streamed straight into the file at its offset, so no range is held in
+    memory. Ranges carry ``If-Range`` with the object's ETag (or, for a weak
+    ETag, which ``If-Range`` cannot use, are checked against it), so a
+    change to the object mid-download fails instead of mixing versions. Completed
+    ranges are recorded in a state file and an interrupted download resumes
+    with the remaining ranges. The size (and checksum, if given) is verified
+    before the file is moved into place.
+
+    Servers that do not support ranges, or do not report the object's
+    size, are downloaded with a single streaming GET. Range requests go
+    through the client's TransferController (see MultipartUpload).
+
+    The API key is only sent if ``credentials`` is set and the URL is on
+    the client's own origin; presigned URLs carry their own authorization.
+    """
+
+    def __init__(
+        self,
+        client,
+        url: str,
+        path: str,
+        config: Optional[TransferConfig] = None,
+        size: Optional[int] = None,
+        checksum: Optional[str] = None,
+        state_path: Optional[str] = None,
+        resume: bool = True,
+        progress: Optional[Callable[[int, int], None]] = None,
+        bucket: Optional[str] = None,
+        key: Optional[str] = None,
+        credentials: bool = True,
+    ):
+        """
+        Initialize the download.
+
+        Args:
+            client: Client used for the requests
+            url: Download URL or endpoint
+            path: Destination file
+            config: Range size and concurrency settings (default: TransferConfig())
+            size: Expected size in bytes, verified after download
+            checksum: Expected digest as ``"<algorithm>:<hex>"`` (e.g.
+                ``"sha256:9f86..."``), verified after download
+            state_path: Resume state file (default: ``<path>.download-state``)
+            resume: Continue an earlier interrupted download of the same object
+            progress: Called with (bytes_done, total_bytes) as data arrives
+            bucket: Bucket name reported in the result
+            key: Object key reported in the result
+            credentials: Send the API key (never sent outside the API's origin);
+                False for presigned URLs
+        """
+        self.client = client
+        self.url = url
+        self.credentials = credentials
+        self.path = path
+        self.config = config or TransferConfig()
+        self.expected_size = size
+        self.checksum = checksum
+        self.part_path = f"{path}.part"
+        self.state_path = state_path or f"{path}.download-state"
+        self.resume = resume
+        self.progress = progress
+        self.bucket = bucket
+        self.key = key
+        self.controller: TransferController = client.transfer_controller
+
+        self.size = 0
+        self.etag: Optional[str] = None
+        self._lock = threading.Lock()
+        self._state: Dict[str, Any] = {}
+        self._bytes_done = 0
+        self._bytes_received = 0
+
+    def run(self) -> TransferResult:
+        """
+        Download the file.
+
+        Returns:
+            TransferResult with size, range counts and throughput
+
+        Raises:
+            requests.HTTPError: If a request fails and cannot be retried;
+                completed ranges are kept for resuming
+            ValueError: If the size or checksum does not match, or the
+                object changed during the download
+        """
+        started = time.monotonic()
+        try:
+            probe = self._get(headers={**IDENTITY, "Range": "bytes=0-0"})
+        except requests.HTTPError as e:
+            if e.response is None:
+                raise
+            e.response.close()
+            # An empty object has no byte 0: 416 with "bytes */0"
+            if e.response.status_code != 416 or parse_content_range(e.response.headers.get("Content-Range")) != 0:
+                raise
+            probe = None
+        try:
+            if probe is None:
+                ranged, total = False, 0
+                open(self.part_path, "wb").close()
+            else:
+                total = parse_content_range(probe.headers.get("Content-Range"))
+                ranged = probe.status_code == 206 and total is not None
+                self.url = probe.url or self.url
+                self.etag = probe.headers.get("ETag")
+                if probe.status_code == 206 and total is None:
+                    # "bytes 0-0/*": the size is unknown, so fetch the whole object
+                    probe.close()
+                    probe = self._get(headers=IDENTITY)
+                if not ranged:
+                    self._download_single(probe)
+            parts, resumed = 1, 0
+        finally:
+            if probe is not None:
+                probe.close()
+
+        if ranged:
+            self.size = total
+            parts, resumed = self._download_ranges()
+
+        self._verify()
+        os.replace(self.part_path, self.path)
+        self._remove_state()
+        return TransferResult(
+            self.bucket,
+            self.key,
+            self.size,
+            parts,
+            resumed,
+            self._bytes_received,
+            time.monotonic() - started,
+        )
+
+    def _get(self, headers: Dict[str, str], **kwargs) -> requests.Response:
+        return self.client.get(
+            self.url, headers=headers, stream=True, cache=False, credentials=self.credentials, **kwargs
+        )
+
+    def _report(self, nbytes: int):
+        with self._lock:
+            self._bytes_done += nbytes
+            self._bytes_received += nbytes
+            done = self._bytes_done
+        if self.progress is not None:
+            self.progress(done, self.size)
+
+    def _download_single(self, probe):
+        """Download without ranges: the probe response carries the whole body."""
+        length = probe.headers.get("Content-Length")
+        self.size = int(length) if length and length.isdigit() else 0
+        with open(self.part_path, "wb") as f:
+            for chunk in probe.iter_content(chunk_size=1024 * 1024):
+                self.controller.count_bytes(len(chunk))
+                f.write(chunk)
+                self._report(len(chunk))
+        self.size = os.path.getsize(self.part_path)
+
+    def _ranges(self) -> List[tuple]:
+        part_size = max(self.config.part_size, math.ceil(self.size / MAX_PARTS))
+        return [(start, min(start + part_size, self.size) - 1) for start in range(0, self.size, part_size)]
+
+    def _load_state(self, ranges: List[tuple]) -> Dict[str, Any]:
+        identity = {"size": self.size, "etag": self.etag, "ranges": len(ranges)}
+        if (
+            self.resume
+            and self.etag
+            and os.path.exists(self.state_path)
+            and os.path.exists(self.part_path)
+            and os.path.getsize(self.part_path) == self.size
+        ):
+            try:
+                with open(self.state_path) as f:
+                    state = json.load(f)
+            except (OSError, ValueError):
+                state = {}
+            if all(state.get(name) == value for name, value in identity.items()):
+                state.setdefault("done", [])
+                return state
+
+        # Preallocate so ranges can be written at their offsets in any order
+        with open(self.part_path, "wb") as f:
+            if hasattr(os, "posix_fallocate") and self.size:
+                os.posix_fallocate(f.fileno(), 0, self.size)
+            else:
+                f.truncate(self.size)
+        state = {**identity, "done": []}
+        write_json_atomic(self.state_path, state)
+        return state
+
+    def _download_ranges(self):
+        """Fetch the missing ranges concurrently. Returns (ranges, ranges resumed)."""
+        ranges = self._ranges()
+        self._state = self._load_state(ranges)
+        done = set(self._state["done"])
+        resumed = len(done)
+        self._bytes_done = sum(ranges[i][1] - ranges[i][0] + 1 for i in done)
+        remaining = [i for i in range(len(ranges)) if i not in done]
+        if not remaining:
+            return len(ranges), resumed
+
+        fd = os.open(self.part_path, os.O_RDWR | getattr(os, "O_BINARY", 0))
+        try:
+            with ThreadPoolExecutor(
+                max_workers=part_workers(self.config, self.controller, len(remaining)),
+                thread_name_prefix="aftership-download",
+            ) as executor:
+                futures = {
+                    executor.submit(contextvars.copy_context().run, self._download_range, fd, *ranges[i]): i
+                    for i in remaining
+                }
+                error = None
+                try:
+                    for future in as_completed(futures):
+                        if future.cancelled():
+                            continue
+                        try:
+                            future.result()
+                        except Exception as e:
+                            if error is None:
+                                error = e
+                                for pending in futures:
+                                    pending.cancel()
+                            continue
+                        with self._lock:
+                            self._state["done"].append(futures[future])
+                            write_json_atomic(self.state_path, self._state)
+                except BaseException:
+                    for future in futures:
+                        future.cancel()
+                    raise
+                if error is not None:
+                    raise error
+        finally:
+            os.close(fd)
+        return len(ranges), resumed
+
+    def _write(self, fd: int, data: bytes, offset: int):
+        if hasattr(os, "pwrite"):
+            os.pwrite(fd, data, offset)
+        else:
+            with self._lock:
+                os.lseek(fd, offset, os.SEEK_SET)
+                os.write(fd, data)
+
+    def _download_range(self, fd: int, start: int, end: int):
+        """
+        Stream one byte range into the file.
+
+        Failed requests are retried by the client's RetryPolicy. If the body
+        breaks off, the rest of the range is requested again from the last
+        byte received, as a retry of the same policy (attempts, budget and
+        deadline).
+        """
+        offset = start
+        attempt = 0
+        while offset <= end:
+            headers = {**IDENTITY, "Range": f"bytes={offset}-{end}"}
+            weak = bool(self.etag) and self.etag.startswith("W/")
+            if self.etag and not weak:
+                # If-Range only accepts strong validators; a weak one always gets a 200
+                headers["If-Range"] = self.etag
+            error = None
+            with self.controller.slot(end + 1 - offset):
+                try:
+                    response = self._get(headers, hooks={"response": self.controller.response_hook})
+                except requests.RequestException as e:
+                    if is_overload_error(e):
+                        self.controller.overloaded()
+                    raise
+                try:
+                    if response.status_code != 206 or (weak and response.headers.get("ETag") != self.etag):
+                        raise ValueError(f"Object changed during download of {self.url}")
+                    for chunk in response.iter_content(chunk_size=1024 * 1024):
+                        chunk = chunk[:end + 1 - offset]
+                        self.controller.count_bytes(len(chunk))
+                        self._write(fd, chunk, offset)
+                        offset += len(chunk)
+                        self._report(len(chunk))
+                except (requests.ConnectionError, requests.exceptions.ChunkedEncodingError) as e:
+                    error = e
+                finally:
+                    response.close()
+            if offset <= end:
+                self.controller.overloaded()
+                delay = self.client.retry_policy.next_delay(attempt)
+                if delay is None:
+                    raise requests.ConnectionError(f"Range {start}-{end} ended early at {offset}") from error
+                attempt += 1
+                time.sleep(delay)
+
+    def _verify(self):
+        """Check the downloaded size and checksum."""
+        actual_size = os.path.getsize(self.part_path)
+        if self.expected_size is not None and actual_size != self.expected_size:
+            raise ValueError(f"Downloaded {actual_size} bytes, expected {self.expected_size}")
+        if self.size and actual_size != self.size:
+            raise ValueError(f"Downloaded {actual_size} bytes, server reported {self.size}")
+        if self.checksum:
+            algorithm, _, expected = self.checksum.partition(":")
+            if file_digest(self.part_path, algorithm) != expected.lower():
+                self._remove_state()
+                raise ValueError(f"{algorithm} checksum mismatch for {self.path}")
+
+    def _remove_state(self):
+        try:
+            os.remove(self.state_path)
+        except FileNotFoundError:
+            pass
@@ -51,6 +51,14 @@ response = client.aiserve.get(f"/v1/compute/jobs/{job_id}/metrics")
 metrics = response.json()
 print(f"Job metrics: {metrics}")
 
+# Track the job in the background instead of polling its status in a loop;
+# one scheduler thread serves every watched job
+job_future = client.aiserve.watch_job(
+    job_id,
+    callback=lambda job_id, status: print(f"Job {job_id} finished: {status['status']}"),
+    expected_runtime=6 * 3600,
+)
+
 # Get job logs
 response = client.aiserve.get(
     f"/v1/compute/jobs/{job_id}/logs",
@@ -112,6 +120,12 @@ response = client.aiserve.get(
 endpoint_metrics = response.json()
 print(f"Endpoint metrics: {endpoint_metrics}")
 
+# Run inference on single inputs; concurrent calls are combined into
+# /v1/inference/batch requests of up to 32 inputs
+futures = [client.aiserve.predict(endpoint_id, {"text": text}) for text in ["great", "awful", "fine"]]
+print(f"Predictions: {[future.result() for future in futures]}")
+print(f"Batching stats: {client.aiserve.inference_batcher(endpoint_id).stats()}")
+
 # Create a batch inference job
 batch_job = {
     "name": "batch-sentiment-analysis",
@@ -0,0 +1,26 @@
+"""Example: Issuing many requests concurrently with the async client."""
+import asyncio
+
+from aftershipstorage import AsyncAftershipStorage
+
+
+async def main():
+    async with AsyncAftershipStorage.from_env() as client:
+        # Fetch many shipments concurrently over a single connection pool
+        tracking_numbers = [f"TRACK{i:05d}" for i in range(500)]
+        responses = await asyncio.gather(*[
+            client.darkship.get(f"/v1/shipments/{tracking_number}")
+            for tracking_number in tracking_numbers
+        ])
+        print(f"Fetched {len(responses)} shipments")
+
+        # Calls across services can be mixed freely
+        buckets, jobs = await asyncio.gather(
+            client.darkstorage.get("/v1/buckets"),
+            client.aiserve.get("/v1/compute/jobs"),
+        )
+        print("Buckets:", buckets.json())
+        print("Jobs:", jobs.json())
+
+
+asyncio.run(main())
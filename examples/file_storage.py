@@ -27,6 +27,15 @@ response = client.darkstorage.post("/v1/upload", json=upload_request)
 upload_url = response.json()["upload_url"]
 print(f"Upload URL: {upload_url}")
 
+# Upload a large file in parallel parts (resumes if interrupted)
+result = client.darkstorage.upload_file(
+    "checkpoints/model.safetensors",
+    bucket="my-app-data",
+    key="models/model.safetensors",
+    concurrency=8,
+)
+print(f"Uploaded {result.size} bytes in {result.parts} parts at {result.throughput / 1e6:.1f} MB/s")
+
 # List files in a bucket
 response = client.darkstorage.get("/v1/buckets/my-app-data/objects")
 files = response.json()
@@ -1,5 +1,5 @@
 """Example: Complete pipeline using all services together."""
-from aftershipstorage import AftershipStorage
+from aftershipstorage import AftershipStorage, deadline
 
 client = AftershipStorage.from_env()
 
@@ -99,25 +99,38 @@ else:
 # Step 6: Monitor everything
 print("6. Monitoring pipeline status...")
 
-# Check storage
-response = client.darkstorage.get("/v1/buckets/ml-models/objects")
-storage_status = response.json()
-print(f"   Storage: {len(storage_status)} files")
-
-# Check model status
-response = client.models2go.get(f"/v1/models/{published_model['id']}")
-model_status = response.json()
-print(f"   Model: {model_status['name']} v{model_status['version']}")
-
-# Check hosting
-response = client.hostscience.get(f"/v1/instances/{deployed_instance['id']}")
-instance_status = response.json()
-print(f"   Hosting: {instance_status['name']} - {instance_status['status']}")
-
-# Check shipment
-response = client.darkship.get(f"/v1/shipments/{created_shipment['tracking_number']}")
-shipment_status = response.json()
-print(f"   Shipment: {shipment_status['tracking_number']} - {shipment_status['status']}")
+# All status checks run concurrently and share a 10 second budget
+with deadline(10):
+    storage, model_check, instance_check, shipment_check = client.gather([
+        {"service": "darkstorage", "endpoint": "/v1/buckets/ml-models/objects"},
+        {"service": "models2go", "endpoint": f"/v1/models/{published_model['id']}"},
+        {"service": "hostscience", "endpoint": f"/v1/instances/{deployed_instance['id']}"},
+        {"service": "darkship", "endpoint": f"/v1/shipments/{created_shipment['tracking_number']}"},
+    ])
+
+# A failed check is reported on its result instead of aborting the others
+if storage.ok:
+    print(f"   Storage: {len(storage.response.json())} files")
+else:
+    print(f"   Storage: check failed ({storage.error})")
+
+if model_check.ok:
+    model_status = model_check.response.json()
+    print(f"   Model: {model_status['name']} v{model_status['version']}")
+else:
+    print(f"   Model: check failed ({model_check.error})")
+
+if instance_check.ok:
+    instance_status = instance_check.response.json()
+    print(f"   Hosting: {instance_status['name']} - {instance_status['status']}")
+else:
+    print(f"   Hosting: check failed ({instance_check.error})")
+
+if shipment_check.ok:
+    shipment_status = shipment_check.response.json()
+    print(f"   Shipment: {shipment_status['tracking_number']} - {shipment_status['status']}")
+else:
+    print(f"   Shipment: check failed ({shipment_check.error})")
 
 print("\n=== Pipeline Complete ===")
 
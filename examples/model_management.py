@@ -59,11 +59,27 @@ response = client.models2go.post(f"/v1/models/{model_id}/versions", json=new_ver
 version = response.json()
 print(f"Published version: {version}")
 
+# Resolve a version range from the in-memory registry (no request once loaded);
+# the version published above is visible immediately
+latest_1x = client.models2go.resolve_version(model_id, "^1.0")
+print(f"Latest 1.x version: {latest_1x['version']}")
+
 # Download model (get download URL)
 response = client.models2go.get(f"/v1/models/{model_id}/download")
 download_info = response.json()
 print(f"Download URL: {download_info['download_url']}")
 
+# Download the model artifact with parallel range requests (resumes if interrupted)
+result = client.models2go.download_model(model_id, "sentiment-analyzer.bin", concurrency=16)
+print(f"Downloaded {result.size} bytes at {result.throughput / 1e6:.1f} MB/s")
+
+# On inference hosts, fetch weights through the local artifact cache instead:
+# a redeploy of the same version reuses the stored file without downloading
+artifact = client.models2go.fetch_model(model_id, version="1.1.0")
+print(f"Weights at {artifact.path} ({'cached' if artifact.hit else 'downloaded'})")
+with artifact.mmap() as weights:
+    print(f"Mapped {len(weights)} bytes without copying")
+
 # Get model usage statistics
 response = client.models2go.get(f"/v1/models/{model_id}/stats")
 stats = response.json()
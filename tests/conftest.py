@@ -0,0 +1,112 @@
+"""Shared fixtures: a local HTTP server that records the requests it receives."""
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Tuple
+
+import pytest
+
+
+Route = Callable[["RecordedRequest"], Tuple[int, Dict[str, str], bytes]]
+
+
+class RecordedRequest:
+    """A request received by the test server."""
+
+    def __init__(self, method: str, path: str, headers: Dict[str, str], body: bytes):
+        self.method = method
+        self.path = path
+        self.headers = headers
+        self.body = body
+
+
+class StubServer:
+    """
+    Threaded HTTP server with routes keyed by (method, path).
+
+    Routes return (status, headers, body). Unrouted requests get a 404.
+    A route may set Content-Length itself to send a truncated body.
+    """
+
+    def __init__(self):
+        self.routes: Dict[Tuple[str, str], Route] = {}
+        self.requests: List[RecordedRequest] = []
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _handle(self):
+                if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+                    body = self._read_chunked()
+                else:
+                    length = int(self.headers.get("Content-Length") or 0)
+                    body = self.rfile.read(length) if length else b""
+                request = RecordedRequest(self.command, self.path, dict(self.headers.items()), body)
+                with server._lock:
+                    server.requests.append(request)
+                route = server.routes.get((self.command, self.path.split("?")[0]))
+                status, headers, payload = route(request) if route else (404, {}, b"")
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                if "Content-Length" in headers:
+                    # A longer declared length simulates a connection dropped mid-body
+                    self.close_connection = True
+                else:
+                    self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                if self.command != "HEAD":
+                    self.wfile.write(payload)
+
+            def _read_chunked(self) -> bytes:
+                chunks = []
+                while True:
+                    size = int(self.rfile.readline().split(b";")[0], 16)
+                    chunks.append(self.rfile.read(size))
+                    self.rfile.readline()
+                    if not size:
+                        return b"".join(chunks)
+
+            do_GET = do_PUT = do_POST = do_DELETE = do_HEAD = _handle
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, args=(0.05,), daemon=True)
+        self.thread.start()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.httpd.server_address[1]}"
+
+    def route(self, method: str, path: str, handler: Route):
+        """Register a handler for ``method path``."""
+        self.routes[(method, path)] = handler
+
+    def received(self, method: str, path: str) -> List[RecordedRequest]:
+        """Requests received for ``method path``."""
+        with self._lock:
+            return [r for r in self.requests if r.method == method and r.path.split("?")[0] == path]
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def server():
+    """Stub API server."""
+    stub = StubServer()
+    yield stub
+    stub.close()
+
+
+@pytest.fixture
+def storage():
+    """Second stub server on another origin, standing in for presigned storage URLs."""
+    stub = StubServer()
+    yield stub
+    stub.close()
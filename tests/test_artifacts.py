@@ -0,0 +1,80 @@
+"""ArtifactCache digest validation and eviction."""
+import hashlib
+import json
+import os
+import time
+
+import pytest
+
+from aftershipstorage import ArtifactCache, Models2GoClient
+from aftershipstorage.artifacts import TOUCH_INTERVAL, parse_digest
+
+
+def sha256(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+@pytest.mark.parametrize("digest", [
+    "sha256:" + "0" * 63,
+    "sha256:" + "G" * 64,
+    "sha256:" + "A" * 64,
+    "sha256:../../../../etc/passwd",
+    "nope:" + "0" * 64,
+    "shake_128:00",
+    "sha256",
+])
+def test_malformed_digests_are_rejected(digest):
+    with pytest.raises(ValueError):
+        parse_digest(digest)
+
+
+def test_blob_path_stays_in_the_cache(tmp_path):
+    cache = ArtifactCache(str(tmp_path))
+    digest = "sha256:" + sha256(b"x")
+    assert cache.blob_path(digest).startswith(str(tmp_path / "blobs" / "sha256"))
+    with pytest.raises(ValueError):
+        cache.blob_path("sha256:../../outside")
+
+
+def test_fetch_rejects_a_malformed_server_digest(server, tmp_path):
+    server.route("GET", "/v1/models/m/download", lambda r: (
+        200, {"Content-Type": "application/json"},
+        json.dumps({"download_url": f"{server.url}/blob", "sha256": "../../escape"}).encode(),
+    ))
+    client = Models2GoClient(api_key="key", base_url=server.url)
+    with pytest.raises(ValueError, match="Malformed"):
+        ArtifactCache(str(tmp_path)).fetch(client, "m")
+    assert not server.received("GET", "/blob")
+
+
+def add_blob(cache, tmp_path, data, age):
+    source = tmp_path / f"src-{sha256(data)}"
+    source.write_bytes(data)
+    digest, path = cache.add(str(source))
+    used = time.time() - age
+    os.utime(path, (used, used))
+    return path
+
+
+def test_evict_removes_least_recently_used(tmp_path):
+    cache = ArtifactCache(str(tmp_path / "cache"))
+    old = add_blob(cache, tmp_path, b"a" * 100, age=3 * TOUCH_INTERVAL)
+    older = add_blob(cache, tmp_path, b"b" * 100, age=4 * TOUCH_INTERVAL)
+    newest = add_blob(cache, tmp_path, b"c" * 100, age=2 * TOUCH_INTERVAL)
+
+    assert cache.evict(max_size=150) == 200
+    assert not os.path.exists(older) and not os.path.exists(old)
+    assert os.path.exists(newest)
+
+
+def test_evict_keeps_recently_handed_out_blobs(tmp_path):
+    cache = ArtifactCache(str(tmp_path / "cache"))
+    first = add_blob(cache, tmp_path, b"a" * 100, age=3 * TOUCH_INTERVAL)
+    digest = "sha256:" + sha256(b"a" * 100)
+    add_blob(cache, tmp_path, b"b" * 100, age=2 * TOUCH_INTERVAL)
+
+    assert cache.get(digest) == first  # Marks it used; the caller has not opened it yet
+    newest = add_blob(cache, tmp_path, b"c" * 100, age=0)
+
+    assert cache.evict(max_size=0) == 100
+    assert os.path.exists(first) and os.path.exists(newest)
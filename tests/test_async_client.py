@@ -0,0 +1,36 @@
+"""AsyncBaseClient pool limits and streamed error responses."""
+import asyncio
+
+import httpx
+import pytest
+
+from aftershipstorage import AsyncDarkstorageClient, PoolConfig
+
+
+def pool_limits(client):
+    pool = client.session._transport._pool
+    return pool._max_connections, pool._max_keepalive_connections
+
+
+def test_blocking_pool_caps_connections():
+    client = AsyncDarkstorageClient(api_key="key", pool=PoolConfig(maxsize=4, block=True))
+    assert pool_limits(client) == (4, 4)
+
+
+def test_non_blocking_pool_keeps_max_connections():
+    client = AsyncDarkstorageClient(api_key="key", max_connections=50, pool=PoolConfig(maxsize=8))
+    assert pool_limits(client) == (50, 8)
+    client = AsyncDarkstorageClient(api_key="key", max_connections=2, pool=PoolConfig(maxsize=8))
+    assert pool_limits(client) == (8, 8)
+
+
+def test_failed_stream_is_closed(server):
+    server.route("GET", "/v1/missing", lambda r: (404, {}, b"not found"))
+
+    async def fetch():
+        async with AsyncDarkstorageClient(api_key="key", base_url=server.url) as client:
+            with pytest.raises(httpx.HTTPStatusError) as error:
+                await client.get("/v1/missing", stream=True)
+            return error.value.response
+
+    assert asyncio.run(fetch()).is_closed
@@ -0,0 +1,42 @@
+"""The async client only sends the API key to the API's own origin."""
+import asyncio
+
+from aftershipstorage import AsyncDarkstorageClient
+
+
+API_KEY = "secret-key"
+
+
+def fetch(server, url, **kwargs):
+    async def run():
+        async with AsyncDarkstorageClient(api_key=API_KEY, base_url=server.url) as client:
+            return await client.get(url, **kwargs)
+    return asyncio.run(run())
+
+
+def test_api_requests_carry_the_key(server):
+    server.route("GET", "/v1/ping", lambda r: (200, {"Content-Type": "application/json"}, b"{}"))
+    fetch(server, "/v1/ping")
+    assert server.received("GET", "/v1/ping")[0].headers.get("X-API-Key") == API_KEY
+
+
+def test_credentials_false_omits_the_key_on_the_api_origin(server):
+    server.route("GET", "/v1/ping", lambda r: (200, {}, b""))
+    fetch(server, "/v1/ping", credentials=False)
+    assert "X-API-Key" not in server.received("GET", "/v1/ping")[0].headers
+
+
+def test_other_origins_never_receive_the_key(server, storage):
+    storage.route("GET", "/file", lambda r: (200, {}, b"data"))
+    fetch(server, f"{storage.url}/file")
+    fetch(server, f"{storage.url}/file", headers={"X-API-Key": API_KEY})
+    assert all("X-API-Key" not in request.headers for request in storage.received("GET", "/file"))
+
+
+def test_cross_origin_redirect_drops_the_key(server, storage):
+    server.route("GET", "/v1/redirect", lambda r: (302, {"Location": f"{storage.url}/file"}, b""))
+    storage.route("GET", "/file", lambda r: (200, {}, b"data"))
+    response = fetch(server, "/v1/redirect", follow_redirects=True)
+    assert response.content == b"data"
+    assert server.received("GET", "/v1/redirect")[0].headers.get("X-API-Key") == API_KEY
+    assert "X-API-Key" not in storage.received("GET", "/file")[0].headers
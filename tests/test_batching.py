@@ -0,0 +1,137 @@
+"""InferenceBatcher and AsyncInferenceBatcher: flush triggers, result routing and backpressure."""
+import asyncio
+import threading
+import time
+
+import pytest
+
+from aftershipstorage.batching import AsyncInferenceBatcher, InferenceBatcher, InferenceError
+
+
+class FakeClient:
+    """Answers batch requests with each input doubled; "bad" inputs get an error entry."""
+
+    def __init__(self, gate=None):
+        self.batches = []
+        self.gate = gate
+
+    def post(self, endpoint, json):
+        self.batches.append(json["inputs"])
+        if self.gate is not None:
+            self.gate.wait(5)
+        return json
+
+    @staticmethod
+    def decode_json(body):
+        if body["inputs"] == ["short"]:
+            return {"outputs": []}
+        return {"outputs": [{"error": "rejected"} if x == "bad" else x * 2 for x in body["inputs"]]}
+
+
+class AsyncFakeClient(FakeClient):
+
+    async def post(self, endpoint, json):
+        self.batches.append(json["inputs"])
+        if self.gate is not None:
+            await self.gate.wait()
+        return json
+
+
+def test_full_batch_is_sent_at_once():
+    client = FakeClient()
+    reasons = []
+    on_batch = lambda metrics: reasons.append(metrics.reason)  # noqa: E731
+    with InferenceBatcher(client, "ep", max_batch_size=3, max_latency=10, on_batch=on_batch) as batcher:
+        futures = batcher.predict_many([1, 2, 3])
+        assert [future.result(5) for future in futures] == [2, 4, 6]
+        stats = batcher.stats()
+
+    assert client.batches == [[1, 2, 3]]
+    assert reasons == ["size"]
+    assert stats["full_batches"] == 1 and stats["mean_batch_size"] == 3
+
+
+def test_partial_batch_is_sent_after_max_latency():
+    client = FakeClient()
+    with InferenceBatcher(client, "ep", max_batch_size=32, max_latency=0.02) as batcher:
+        assert batcher.predict(5).result(5) == 10
+        assert batcher.stats()["latency_flushes"] == 1
+
+
+def test_results_and_errors_reach_their_own_callers():
+    with InferenceBatcher(FakeClient(), "ep", max_batch_size=3, max_latency=10) as batcher:
+        good, bad, other = batcher.predict_many([1, "bad", 3])
+        assert good.result(5) == 2 and other.result(5) == 6
+        with pytest.raises(InferenceError) as error:
+            bad.result(5)
+        assert error.value.index == 1 and error.value.detail == "rejected"
+        assert batcher.stats()["errors"] == 0
+
+
+def test_mismatched_result_count_fails_the_batch():
+    with InferenceBatcher(FakeClient(), "ep", max_batch_size=1) as batcher:
+        with pytest.raises(ValueError):
+            batcher.predict("short").result(5)
+
+
+def test_close_sends_queued_inputs():
+    client = FakeClient()
+    batcher = InferenceBatcher(client, "ep", max_batch_size=32, max_latency=10)
+    futures = batcher.predict_many([1, 2])
+    batcher.close()
+
+    assert [future.result(0) for future in futures] == [2, 4]
+    assert batcher.stats()["close_flushes"] == 1
+    with pytest.raises(RuntimeError):
+        batcher.predict(3)
+
+
+def test_inputs_queue_while_senders_are_busy():
+    gate = threading.Event()
+    client = FakeClient(gate)
+    with InferenceBatcher(client, "ep", max_batch_size=8, max_latency=0, max_in_flight=1) as batcher:
+        first = batcher.predict(1)
+        while not client.batches:
+            time.sleep(0.001)
+        rest = batcher.predict_many([2, 3, 4])
+        assert batcher.stats()["queued"] == 3
+        gate.set()
+        assert [future.result(5) for future in [first] + rest] == [2, 4, 6, 8]
+
+    assert client.batches == [[1], [2, 3, 4]]
+
+
+def test_async_batcher_flushes_by_size_latency_and_close():
+    async def run():
+        client = AsyncFakeClient()
+        batcher = AsyncInferenceBatcher(client, "ep", max_batch_size=2, max_latency=0.02)
+        assert await asyncio.gather(batcher.predict(1), batcher.predict(2)) == [2, 4]
+        assert await batcher.predict(3) == 6
+        pending = asyncio.ensure_future(batcher.predict(4))
+        await asyncio.sleep(0)
+        await batcher.close()
+        return client.batches, batcher.stats(), await pending
+
+    batches, stats, last = asyncio.run(run())
+    assert batches == [[1, 2], [3], [4]]
+    assert last == 8
+    assert (stats["full_batches"], stats["latency_flushes"], stats["close_flushes"]) == (1, 1, 1)
+
+
+def test_async_batcher_grows_batches_while_busy():
+    async def run():
+        gate = asyncio.Event()
+        client = AsyncFakeClient(gate)
+        batcher = AsyncInferenceBatcher(client, "ep", max_batch_size=8, max_latency=0, max_in_flight=1)
+        first = asyncio.ensure_future(batcher.predict(1))
+        await asyncio.sleep(0.01)
+        rest = [asyncio.ensure_future(batcher.predict(x)) for x in ("bad", 3)]
+        await asyncio.sleep(0.01)
+        gate.set()
+        results = await asyncio.gather(first, *rest, return_exceptions=True)
+        await batcher.close()
+        return client.batches, results
+
+    batches, results = asyncio.run(run())
+    assert batches == [[1], ["bad", 3]]
+    assert results[0] == 2 and isinstance(results[1], InferenceError) and results[2] == 6
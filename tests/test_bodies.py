@@ -0,0 +1,144 @@
+"""Streaming request bodies: lengths, chunked encoding and replay on retry."""
+import array
+import asyncio
+import io
+import os
+
+import pytest
+import requests
+
+from aftershipstorage import AsyncDarkstorageClient, DarkstorageClient, RetryConfig
+from aftershipstorage.bodies import RequestBody
+
+
+def flaky():
+    """Route answering 503 to every other request."""
+    calls = []
+
+    def route(request):
+        calls.append(request)
+        return (503, {}, b"") if len(calls) % 2 else (200, {}, b"")
+    return route
+
+
+def client_for(server, cls=DarkstorageClient):
+    return cls(api_key="key", base_url=server.url, retry=RetryConfig(backoff_base=0.001))
+
+
+def test_known_lengths():
+    assert RequestBody(b"abc").length == 3
+    assert RequestBody(bytearray(5)).length == 5
+    # Multi-byte items are sent as their raw bytes, without a copy
+    numbers = array.array("i", [1, 2, 3])
+    body = RequestBody(memoryview(numbers))
+    assert body.length == 3 * numbers.itemsize
+    assert body.data.obj is numbers
+    assert RequestBody(iter([b"a"])).length is None
+
+
+def test_file_length_counts_from_the_current_position(tmp_path):
+    path = tmp_path / "data.bin"
+    path.write_bytes(b"x" * 100)
+    with open(path, "rb") as f:
+        f.seek(40)
+        body = RequestBody(f)
+        assert body.length == 60 and body.replayable
+        f.read()
+        body.rewind()
+        assert f.tell() == 40
+
+
+def test_pipes_and_generators_have_no_length_and_are_not_replayable():
+    read_fd, write_fd = os.pipe()
+    with os.fdopen(read_fd, "rb") as pipe, os.fdopen(write_fd, "wb"):
+        body = RequestBody(pipe)
+        assert body.length is None and not body.replayable
+
+    body = RequestBody(chunk for chunk in [b"a", memoryview(b"b")])
+    assert body.length is None and not body.replayable
+    assert list(body.data) == [b"a", memoryview(b"b")]
+
+
+def test_known_length_bodies_are_sent_with_content_length(server, tmp_path):
+    server.route("PUT", "/v1/objects/a", lambda request: (200, {}, b""))
+    client = DarkstorageClient(api_key="key", base_url=server.url)
+    buffer = bytearray(b"0123456789")
+
+    client.put("/v1/objects/a", data=memoryview(buffer)[2:6])
+    path = tmp_path / "data.bin"
+    path.write_bytes(b"header:payload")
+    with open(path, "rb") as f:
+        f.seek(7)
+        client.put("/v1/objects/a", data=f)
+
+    sent = server.received("PUT", "/v1/objects/a")
+    assert [(r.headers.get("Content-Length"), r.body) for r in sent] == [("4", b"2345"), ("7", b"payload")]
+
+
+def test_iterables_are_sent_chunked(server):
+    server.route("PUT", "/v1/objects/a", lambda request: (200, {}, b""))
+    client = DarkstorageClient(api_key="key", base_url=server.url)
+
+    client.put("/v1/objects/a", data=(part for part in [b"first,", memoryview(b"second,"), b"third"]))
+
+    sent = server.received("PUT", "/v1/objects/a")[0]
+    assert sent.headers.get("Transfer-Encoding") == "chunked"
+    assert "Content-Length" not in sent.headers
+    assert sent.body == b"first,second,third"
+
+
+def test_retry_resends_a_file_from_its_start(server, tmp_path):
+    server.route("PUT", "/v1/objects/a", flaky())
+    path = tmp_path / "data.bin"
+    path.write_bytes(b"skip|" + b"z" * 200000)
+
+    with open(path, "rb") as f:
+        f.seek(5)
+        assert client_for(server).put("/v1/objects/a", data=f).status_code == 200
+
+    sent = server.received("PUT", "/v1/objects/a")
+    assert len(sent) == 2
+    assert sent[0].body == sent[1].body == b"z" * 200000
+
+
+def test_generator_body_is_not_retried(server):
+    server.route("PUT", "/v1/objects/a", flaky())
+
+    with pytest.raises(requests.HTTPError):
+        client_for(server).put("/v1/objects/a", data=iter([b"once"]))
+
+    assert len(server.received("PUT", "/v1/objects/a")) == 1
+
+
+def test_async_client_streams_and_replays_bodies(server, tmp_path):
+    server.route("PUT", "/v1/objects/a", flaky())
+    server.route("PUT", "/v1/objects/b", lambda request: (200, {}, b""))
+    path = tmp_path / "data.bin"
+    path.write_bytes(b"y" * 100000)
+
+    async def chunks():
+        for part in (b"async,", b"chunks"):
+            yield part
+
+    async def run():
+        async with client_for(server, AsyncDarkstorageClient) as client:
+            with open(path, "rb") as f:
+                await client.put("/v1/objects/a", data=f)
+            await client.put("/v1/objects/b", data=chunks())
+
+    asyncio.run(run())
+    retried = server.received("PUT", "/v1/objects/a")
+    assert [r.headers.get("Content-Length") for r in retried] == ["100000", "100000"]
+    assert retried[0].body == retried[1].body == b"y" * 100000
+    assert server.received("PUT", "/v1/objects/b")[0].body == b"async,chunks"
+
+
+def test_unreadable_position_is_not_replayable():
+    class Unseekable(io.RawIOBase):
+        def readable(self):
+            return True
+
+        def seekable(self):
+            return False
+
+    assert not RequestBody(Unseekable()).replayable
@@ -0,0 +1,116 @@
+"""Bulk delete, HEAD and copy: the batch delete probe, per-key fallback and per-key results."""
+import json
+
+import requests
+
+from aftershipstorage import DarkstorageClient
+from aftershipstorage.bulk import ObjectError
+
+BATCH = "/v1/buckets/b/objects/delete"
+
+
+def reply(body, status=200):
+    return status, {"Content-Type": "application/json"}, json.dumps(body).encode()
+
+
+def client_for(server):
+    return DarkstorageClient(api_key="key", base_url=server.url)
+
+
+def by_key(results):
+    return {result.key: result for result in results}
+
+
+def test_batch_delete_reports_per_key_errors(server):
+    def delete(request):
+        keys = json.loads(request.body)["keys"]
+        errors = [{"key": key, "code": "NoSuchKey"} for key in keys if key == "gone"]
+        errors += [{"key": key, "code": "AccessDenied", "message": "locked"} for key in keys if key == "locked"]
+        return reply({"deleted": keys, "errors": errors})
+
+    server.route("POST", BATCH, delete)
+    client = client_for(server)
+    progress = []
+
+    results = by_key(client.delete_objects(
+        "b", ["a", {"key": "gone"}, "locked", "c", "d"], batch_size=2,
+        progress=lambda done, failed: progress.append((done, failed)),
+    ))
+
+    assert sorted(results) == ["a", "c", "d", "gone", "locked"]
+    assert [key for key, result in results.items() if not result.ok] == ["locked"]
+    error = results["locked"].error
+    assert isinstance(error, ObjectError) and (error.code, error.message) == ("AccessDenied", "locked")
+    assert client.batch_delete_supported is True
+    batches = [json.loads(r.body)["keys"] for r in server.received("POST", BATCH)]
+    # The first batch probes the endpoint; the rest are sent concurrently
+    assert batches[0] == ["a", "gone"] and sorted(batches[1:]) == [["d"], ["locked", "c"]]
+    assert progress[-1] == (5, 1)
+
+
+def test_missing_batch_endpoint_falls_back_to_single_deletes(server):
+    server.route("POST", BATCH, lambda request: reply({}, status=404))
+    server.route("DELETE", "/v1/buckets/b/objects/a", lambda request: (204, {}, b""))
+    server.route("DELETE", "/v1/buckets/b/objects/dir/b%20c", lambda request: (204, {}, b""))
+    client = client_for(server)
+
+    first = by_key(client.delete_objects("b", ["a", "dir/b c", "missing"], batch_size=2))
+    second = by_key(client.delete_objects("b", ["a"], missing_ok=False))
+
+    assert all(result.ok for result in first.values())
+    assert client.batch_delete_supported is False
+    assert len(server.received("POST", BATCH)) == 1  # Probed once, then remembered
+    assert len(server.received("DELETE", "/v1/buckets/b/objects/a")) == 2
+    assert second["a"].ok
+    strict = by_key(client.delete_objects("b", ["missing"], missing_ok=False))
+    assert isinstance(strict["missing"].error, requests.HTTPError)
+
+
+def test_failed_probe_fails_its_keys_without_deciding_support(server):
+    server.route("POST", BATCH, lambda request: reply({}, status=500))
+    client = client_for(server)
+
+    results = list(client.delete_objects("b", ["a", "b"]))
+
+    assert [result.ok for result in results] == [False, False]
+    assert isinstance(results[0].error, requests.HTTPError)
+    assert client.batch_delete_supported is None
+
+
+def test_head_objects_returns_metadata(server):
+    headers = {
+        "Content-Length": "1234",
+        "ETag": '"abc"',
+        "Content-Type": "application/octet-stream",
+        "Last-Modified": "Wed, 01 May 2024 12:00:00 GMT",
+        "X-Meta-Owner": "ml-team",
+    }
+    server.route("HEAD", "/v1/buckets/b/objects/model%20v1.bin", lambda request: (200, headers, b""))
+    client = client_for(server)
+
+    results = by_key(client.head_objects("b", [{"key": "model v1.bin", "size": 1234}, "missing.bin"]))
+
+    assert results["model v1.bin"].result() == {
+        "size": 1234,
+        "etag": '"abc"',
+        "content_type": "application/octet-stream",
+        "last_modified": "Wed, 01 May 2024 12:00:00 GMT",
+        "metadata": {"owner": "ml-team"},
+    }
+    assert results["missing.bin"].error.response.status_code == 404
+
+
+def test_copy_objects_maps_destinations(server):
+    def copy(request):
+        return reply({"copied": json.loads(request.body)})
+
+    server.route("POST", "/v1/buckets/src/objects/a/copy", copy)
+    server.route("POST", "/v1/buckets/src/objects/b/copy", copy)
+    client = client_for(server)
+
+    mapped = by_key(client.copy_objects("src", ["a", "b"], dest_bucket="dst", dest_key=lambda key: f"backup/{key}"))
+    paired = by_key(client.copy_objects("src", [("a", "renamed")]))
+
+    assert mapped["a"].destination == "backup/a"
+    assert mapped["b"].result() == {"copied": {"destination_bucket": "dst", "destination_key": "backup/b"}}
+    assert paired["a"].result() == {"copied": {"destination_bucket": "src", "destination_key": "renamed"}}
@@ -0,0 +1,100 @@
+"""Conditional-GET response cache: freshness, revalidation, eviction and invalidation."""
+from aftershipstorage import CacheConfig, DarkstorageClient
+from aftershipstorage.cache import ResponseCache
+
+
+API = "https://api.models2go.com"
+
+
+def store(cache, url, headers=None, content=b"{}"):
+    headers = {"Cache-Control": "max-age=60", **(headers or {})}
+    return cache.store(cache.key(url), 200, headers, content, url)
+
+
+def test_write_invalidates_only_the_resource_and_below():
+    cache = ResponseCache(CacheConfig(enabled=True))
+    for path in ("/v1/models/abc", "/v1/models/abc?fields=name", "/v1/models/abc/versions", "/v1/models/abcdef"):
+        store(cache, API + path)
+
+    cache.invalidate(API + "/v1/models/abc")
+
+    assert cache.lookup(cache.key(API + "/v1/models/abcdef")) is not None
+    assert cache.stats()["entries"] == 1
+
+
+def test_vary_on_unkeyed_headers_is_not_stored():
+    cache = ResponseCache(CacheConfig(enabled=True))
+    assert store(cache, API + "/a", {"Vary": "Accept-Encoding, accept"}) is not None
+    assert store(cache, API + "/b", {"Vary": "Authorization"}) is None
+    assert store(cache, API + "/c", {"Vary": "*"}) is None
+
+
+def test_private_responses_need_opt_in():
+    assert store(ResponseCache(CacheConfig(enabled=True)), API + "/a", {"Cache-Control": "private, max-age=60"}) is None
+    opted_in = ResponseCache(CacheConfig(enabled=True, store_private=True))
+    assert store(opted_in, API + "/a", {"Cache-Control": "private, max-age=60"}) is not None
+
+
+def cached_client(server, **config):
+    return DarkstorageClient(api_key="key", base_url=server.url, cache=CacheConfig(enabled=True, **config))
+
+
+def test_fresh_response_is_served_from_memory(server):
+    server.route("GET", "/v1/pricing", lambda r: (200, {"Cache-Control": "max-age=60"}, b'{"gpu": 1}'))
+    client = cached_client(server)
+
+    first, second = client.get("/v1/pricing"), client.get("/v1/pricing")
+
+    assert second.json() == {"gpu": 1} and second.from_cache and not getattr(first, "from_cache", False)
+    assert len(server.received("GET", "/v1/pricing")) == 1
+    client.get("/v1/pricing", cache=False)
+    assert len(server.received("GET", "/v1/pricing")) == 2
+
+
+def test_stale_response_is_revalidated(server):
+    def pricing(request):
+        if request.headers.get("If-None-Match") == '"v1"':
+            return 304, {"ETag": '"v1"'}, b""
+        return 200, {"ETag": '"v1"'}, b'{"gpu": 1}'
+
+    server.route("GET", "/v1/pricing", pricing)
+    client = cached_client(server)
+
+    client.get("/v1/pricing")
+    response = client.get("/v1/pricing")
+
+    assert response.status_code == 200 and response.json() == {"gpu": 1} and response.from_cache
+    assert server.received("GET", "/v1/pricing")[1].headers.get("If-None-Match") == '"v1"'
+    assert client.cache_stats()["revalidations"] == 1
+
+
+def test_no_store_is_never_cached(server):
+    server.route("GET", "/v1/secret", lambda r: (200, {"Cache-Control": "no-store"}, b"{}"))
+    client = cached_client(server)
+    client.get("/v1/secret")
+    client.get("/v1/secret")
+    assert len(server.received("GET", "/v1/secret")) == 2
+
+
+def test_least_recently_used_entry_is_evicted(server):
+    for name in ("a", "b", "c"):
+        server.route("GET", f"/v1/{name}", lambda r: (200, {"Cache-Control": "max-age=60"}, b"{}"))
+    client = cached_client(server, max_entries=2)
+
+    for name in ("a", "b", "a", "c", "a", "b"):
+        client.get(f"/v1/{name}")
+
+    assert [len(server.received("GET", f"/v1/{name}")) for name in ("a", "b", "c")] == [1, 2, 1]
+    assert client.cache_stats()["evictions"] == 2
+
+
+def test_successful_write_drops_the_cached_resource(server):
+    server.route("GET", "/v1/models/abc", lambda r: (200, {"Cache-Control": "max-age=60"}, b"{}"))
+    server.route("PUT", "/v1/models/abc", lambda r: (200, {}, b"{}"))
+    client = cached_client(server)
+
+    client.get("/v1/models/abc")
+    client.put("/v1/models/abc", json={"name": "new"})
+    client.get("/v1/models/abc")
+
+    assert len(server.received("GET", "/v1/models/abc")) == 2
@@ -0,0 +1,114 @@
+"""Checksums: file digests, hashing while sending, and composite multipart checksums."""
+import hashlib
+import json
+
+import pytest
+
+from aftershipstorage import DarkstorageClient, TransferConfig, checksums
+from aftershipstorage.checksums import HashingReader, composite_digest, file_digest, format_checksum
+
+UPLOADS = "/v1/buckets/b/uploads"
+
+
+def sha256(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def test_file_digest_hashes_in_blocks(tmp_path, monkeypatch):
+    monkeypatch.setattr(checksums, "HASH_BLOCK_SIZE", 7)
+    path = tmp_path / "data.bin"
+    data = bytes(range(256)) * 10
+    path.write_bytes(data)
+    empty = tmp_path / "empty.bin"
+    empty.write_bytes(b"")
+
+    assert file_digest(str(path)) == sha256(data)
+    assert file_digest(str(path), "md5") == hashlib.md5(data).hexdigest()
+    assert file_digest(str(empty)) == sha256(b"")
+
+
+def test_hashing_reader_hashes_what_is_read():
+    data = b"0123456789" * 100
+    sizes = []
+    reader = HashingReader(data, on_read=sizes.append)
+
+    chunks = [bytes(reader.read(300)) for _ in range(4)]
+    assert b"".join(chunks) == data and len(reader) == 0
+    assert sizes == [300, 300, 300, 100]
+    assert reader.hexdigest() == sha256(data)
+
+
+def test_hashing_reader_restarts_when_rewound():
+    reader = HashingReader(memoryview(b"abcdef"))
+    reader.read(3)
+    with pytest.raises(ValueError, match="not fully read"):
+        reader.hexdigest()
+    reader.seek(0)
+    reader.read()
+    assert reader.hexdigest() == sha256(b"abcdef")
+    with pytest.raises(ValueError):
+        reader.seek(2)
+
+
+def test_composite_digest():
+    parts = [b"part one", b"part two", b"end"]
+    expected = sha256(b"".join(hashlib.sha256(part).digest() for part in parts))
+
+    assert composite_digest([sha256(part) for part in parts]) == f"{expected}-3"
+    assert format_checksum("abc") == "sha256:abc"
+
+
+@pytest.fixture
+def multipart(server):
+    """Multipart upload routes; parts are kept by number."""
+    parts = {}
+
+    def put_part(number):
+        def route(request):
+            parts[number] = request.body
+            return 200, {"ETag": f'"etag-{number}"'}, b""
+        return route
+
+    server.route("POST", UPLOADS, lambda request: (200, {"Content-Type": "application/json"}, b'{"upload_id": "u1"}'))
+    for number in range(1, 5):
+        server.route("PUT", f"{UPLOADS}/u1/parts/{number}", put_part(number))
+    server.route("POST", f"{UPLOADS}/u1/complete", lambda request: (200, {"Content-Type": "application/json"}, request.body))
+    return parts
+
+
+def test_multipart_upload_sends_part_and_composite_checksums(server, multipart, tmp_path):
+    path = tmp_path / "model.bin"
+    data = b"0123456789" * 3 + b"tail"
+    path.write_bytes(data)
+    client = DarkstorageClient(api_key="key", base_url=server.url,
+                               transfer=TransferConfig(part_size=10, multipart_threshold=0))
+
+    result = client.upload_file(str(path), "b", "model.bin", resume=False)
+
+    parts = [data[i:i + 10] for i in range(0, len(data), 10)]
+    completion = json.loads(server.received("POST", f"{UPLOADS}/u1/complete")[0].body)
+    assert [part["sha256"] for part in completion["parts"]] == [sha256(part) for part in parts]
+    assert completion["checksum"] == result.checksum == format_checksum(composite_digest([sha256(part) for part in parts]))
+    assert [multipart[number] for number in sorted(multipart)] == parts
+
+
+def test_resumed_upload_hashes_parts_sent_earlier(server, multipart, tmp_path):
+    path = tmp_path / "model.bin"
+    data = b"a" * 10 + b"b" * 10 + b"c" * 5
+    path.write_bytes(data)
+    stat = path.stat()
+    # An earlier run uploaded part 1 but did not record its digest
+    state = {
+        "bucket": "b", "key": "model.bin", "size": stat.st_size, "mtime_ns": stat.st_mtime_ns,
+        "part_size": 10, "upload_id": "u1", "parts": {"1": '"etag-1"'},
+    }
+    (tmp_path / "model.bin.upload-state").write_text(json.dumps(state))
+    client = DarkstorageClient(api_key="key", base_url=server.url,
+                               transfer=TransferConfig(part_size=10, multipart_threshold=0))
+
+    result = client.upload_file(str(path), "b", "model.bin")
+
+    assert sorted(multipart) == [2, 3]
+    expected = composite_digest([sha256(b"a" * 10), sha256(b"b" * 10), sha256(b"c" * 5)])
+    assert result.checksum == format_checksum(expected)
+    assert not (tmp_path / "model.bin.upload-state").exists()
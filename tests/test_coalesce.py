@@ -0,0 +1,116 @@
+"""Single-flight coalescing: shared results and errors, and key isolation."""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from aftershipstorage import CoalesceConfig, DarkstorageClient
+from aftershipstorage.coalesce import AsyncSingleFlight, SingleFlight
+
+
+def wait_for(condition):
+    while not condition():
+        time.sleep(0.001)
+
+
+def run_together(group, keys, fn):
+    """Call ``group.do`` for every key at once, letting ``fn`` finish only after all have joined."""
+    release = threading.Event()
+
+    def gated():
+        release.wait(5)
+        return fn()
+
+    with ThreadPoolExecutor(max_workers=len(keys)) as executor:
+        futures = [executor.submit(group.do, key, gated) for key in keys]
+        wait_for(lambda: group.stats()["executed"] + group.stats()["coalesced"] == len(keys))
+        release.set()
+    return futures
+
+
+def test_concurrent_callers_share_one_result():
+    group = SingleFlight()
+    calls = []
+    futures = run_together(group, ["k"] * 6, lambda: calls.append(1) or object())
+
+    results = [future.result() for future in futures]
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+    assert group.stats() == {"executed": 1, "coalesced": 5, "in_flight": 0}
+
+
+def test_concurrent_callers_share_one_exception():
+    group = SingleFlight()
+    error = ValueError("boom")
+
+    def fail():
+        raise error
+
+    futures = run_together(group, ["k"] * 4, fail)
+    for future in futures:
+        with pytest.raises(ValueError) as raised:
+            future.result()
+        assert raised.value is error
+    assert group.stats()["executed"] == 1
+
+
+def test_different_keys_run_separately():
+    group = SingleFlight()
+    calls = []
+    futures = run_together(group, ["a", "a", "b"], lambda: calls.append(1) or object())
+
+    assert len(calls) == 2
+    results = [future.result() for future in futures]
+    assert results[0] is results[1] and results[2] is not results[0]
+
+
+def test_calls_after_completion_run_again():
+    group = SingleFlight()
+    assert group.do("k", lambda: 1) == 1
+    assert group.do("k", lambda: 2) == 2
+    assert group.stats()["coalesced"] == 0
+
+
+def test_async_callers_share_one_task():
+    async def run():
+        group = AsyncSingleFlight()
+        calls = []
+
+        def fetch(key):
+            async def call():
+                calls.append(key)
+                await asyncio.sleep(0.01)
+                return key.upper()
+            return call
+
+        results = await asyncio.gather(*(group.do(key, fetch(key)) for key in ("a", "a", "a", "b")))
+        return calls, results, group.stats()
+
+    calls, results, stats = asyncio.run(run())
+    assert calls == ["a", "b"]
+    assert results == ["A", "A", "A", "B"]
+    assert stats == {"executed": 2, "coalesced": 2, "in_flight": 0}
+
+
+def test_client_coalesces_identical_gets(server):
+    release = threading.Event()
+
+    def hot(request):
+        release.wait(5)
+        return 200, {}, b'{"status": "delivered"}'
+
+    server.route("GET", "/v1/shipments/1", hot)
+    client = DarkstorageClient(api_key="key", base_url=server.url, coalesce=CoalesceConfig(enabled=True))
+
+    with ThreadPoolExecutor(max_workers=5) as executor:
+        futures = [executor.submit(client.get, "/v1/shipments/1") for _ in range(4)]
+        futures.append(executor.submit(client.get, "/v1/shipments/1", params={"fields": "status"}))
+        wait_for(lambda: client.coalesce_stats()["executed"] + client.coalesce_stats()["coalesced"] == 5)
+        release.set()
+        responses = [future.result() for future in futures]
+
+    assert all(response.json() == {"status": "delivered"} for response in responses)
+    assert len(server.received("GET", "/v1/shipments/1")) == 2  # Different params are a different request
+    assert client.coalesce_stats()["coalesced"] == 3
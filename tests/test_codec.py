@@ -0,0 +1,102 @@
+"""JSON codec selection, stdlib/orjson parity and the client's use of the codec."""
+import datetime
+import json
+import math
+
+import pytest
+
+from aftershipstorage import DarkstorageClient, codec as codec_module
+from aftershipstorage.codec import JSONCodec, OrjsonCodec, encode_body, get_codec
+
+PAYLOAD = {
+    "tracking_number": "1Z999AA10123456784",
+    "events": [{"status": "in_transit", "location": "Köln", "emoji": "📦"}, {"status": "delivered"}],
+    "weight": 12.75,
+    "count": 2 ** 53,
+    "flags": [True, False, None],
+    "nested": {"empty": {}, "list": []},
+}
+
+
+@pytest.fixture
+def orjson_codec():
+    pytest.importorskip("orjson")
+    return get_codec("orjson")
+
+
+def test_auto_prefers_orjson_when_installed(monkeypatch):
+    if codec_module.orjson is not None:
+        assert isinstance(get_codec("auto"), OrjsonCodec)
+    monkeypatch.setattr(codec_module, "orjson", None)
+    assert type(get_codec("auto")) is JSONCodec
+    assert type(get_codec(None)) is JSONCodec
+    with pytest.raises(ImportError, match="aftershipstorage\\[orjson\\]"):
+        get_codec("orjson")
+
+
+def test_named_and_custom_codecs():
+    custom = JSONCodec()
+    assert get_codec(custom) is custom
+    assert type(get_codec("json")) is JSONCodec
+    with pytest.raises(ValueError, match="Unknown JSON codec"):
+        get_codec("simplejson")
+
+
+def test_stdlib_codec_is_compact_utf8():
+    body = JSONCodec().dumps(PAYLOAD)
+    assert b", " not in body and "Köln".encode() in body
+    assert JSONCodec().loads(body) == PAYLOAD
+    assert JSONCodec().loads(body.decode()) == PAYLOAD
+
+
+def test_codecs_agree_on_plain_json(orjson_codec):
+    stdlib = JSONCodec()
+
+    assert orjson_codec.loads(stdlib.dumps(PAYLOAD)) == PAYLOAD
+    assert stdlib.loads(orjson_codec.dumps(PAYLOAD)) == PAYLOAD
+    assert orjson_codec.dumps(PAYLOAD) == stdlib.dumps(PAYLOAD)
+    assert orjson_codec.dumps({1: "a"}) == stdlib.dumps({1: "a"})
+
+
+def test_codecs_differ_on_datetimes_and_nan(orjson_codec):
+    stdlib = JSONCodec()
+    when = {"at": datetime.datetime(2024, 5, 1, 12, 30)}
+
+    with pytest.raises(TypeError):
+        stdlib.dumps(when)
+    assert orjson_codec.dumps(when) == b'{"at":"2024-05-01T12:30:00"}'
+    assert stdlib.dumps(float("nan")) == b"NaN" and orjson_codec.dumps(float("nan")) == b"null"
+    assert math.isnan(stdlib.loads(b"NaN"))
+    with pytest.raises(ValueError):
+        orjson_codec.loads(b"NaN")
+
+
+def test_encoded_bytes_are_sent_unchanged():
+    body = b'{"already":"encoded"}'
+    assert encode_body(JSONCodec(), body) is body
+    assert encode_body(JSONCodec(), {"a": 1}) == b'{"a":1}'
+
+
+def test_client_encodes_and_decodes_with_its_codec(server):
+    class RecordingCodec(JSONCodec):
+
+        def __init__(self):
+            self.calls = []
+
+        def dumps(self, obj):
+            self.calls.append("dumps")
+            return super().dumps(obj)
+
+        def loads(self, data):
+            self.calls.append("loads")
+            return super().loads(data)
+
+    server.route("POST", "/v1/echo", lambda request: (200, {"Content-Type": "application/json"}, request.body))
+    codec = RecordingCodec()
+    client = DarkstorageClient(api_key="key", base_url=server.url, codec=codec)
+
+    response = client.post("/v1/echo", json=PAYLOAD)
+    assert client.decode_json(response) == PAYLOAD
+    assert server.received("POST", "/v1/echo")[0].body == json.dumps(
+        PAYLOAD, separators=(",", ":"), ensure_ascii=False).encode()
+    assert codec.calls == ["dumps", "loads"]
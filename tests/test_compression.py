@@ -0,0 +1,27 @@
+"""Compressed responses are only negotiated when compression is enabled."""
+import httpx
+import requests
+
+from aftershipstorage import AsyncDarkstorageClient, CompressionConfig, DarkstorageClient
+from aftershipstorage import async_base, base
+
+
+def fake_decoders(monkeypatch):
+    monkeypatch.setattr(base, "requests_decoders", lambda: ("gzip", "zstd"))
+    monkeypatch.setattr(async_base, "httpx_decoders", lambda: ("gzip", "zstd"))
+
+
+def test_default_accept_encoding_is_untouched(monkeypatch):
+    fake_decoders(monkeypatch)
+    client = DarkstorageClient(api_key="key")
+    assert client.session.headers["Accept-Encoding"] == requests.utils.default_headers()["Accept-Encoding"]
+    client = AsyncDarkstorageClient(api_key="key")
+    assert client.session.headers["Accept-Encoding"] == httpx.Client().headers["Accept-Encoding"]
+
+
+def test_enabled_compression_negotiates_accept_encoding(monkeypatch):
+    fake_decoders(monkeypatch)
+    compression = CompressionConfig(enabled=True)
+    assert DarkstorageClient(api_key="key", compression=compression).session.headers["Accept-Encoding"] == "zstd, gzip"
+    client = AsyncDarkstorageClient(api_key="key", compression=compression)
+    assert client.session.headers["Accept-Encoding"] == "zstd, gzip"
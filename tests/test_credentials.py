@@ -0,0 +1,55 @@
+"""The API key is only sent to the API's own origin."""
+import json
+
+from aftershipstorage import DarkstorageClient
+
+
+API_KEY = "secret-key"
+
+
+def client_for(server):
+    return DarkstorageClient(api_key=API_KEY, base_url=server.url)
+
+
+def test_api_requests_carry_the_key(server):
+    server.route("GET", "/v1/ping", lambda r: (200, {"Content-Type": "application/json"}, b"{}"))
+    client_for(server).get("/v1/ping")
+    assert server.received("GET", "/v1/ping")[0].headers.get("X-API-Key") == API_KEY
+
+
+def test_presigned_upload_omits_the_key(server, storage, tmp_path):
+    upload_url = f"{storage.url}/presigned/object?signature=abc"
+    server.route("POST", "/v1/upload", lambda r: (
+        200, {"Content-Type": "application/json"}, json.dumps({"upload_url": upload_url}).encode()
+    ))
+    storage.route("PUT", "/presigned/object", lambda r: (200, {}, b""))
+    path = tmp_path / "small.bin"
+    path.write_bytes(b"payload")
+
+    client_for(server).upload_file(str(path), "bucket", "small.bin", resume=False)
+
+    assert server.received("POST", "/v1/upload")[0].headers.get("X-API-Key") == API_KEY
+    put = storage.received("PUT", "/presigned/object")
+    assert put and put[0].body == b"payload"
+    assert "X-API-Key" not in put[0].headers
+
+
+def test_credentials_false_omits_the_key_on_the_api_origin(server):
+    server.route("GET", "/v1/ping", lambda r: (200, {}, b""))
+    client_for(server).get("/v1/ping", credentials=False)
+    assert "X-API-Key" not in server.received("GET", "/v1/ping")[0].headers
+
+
+def test_other_origins_never_receive_the_key(server, storage):
+    storage.route("GET", "/file", lambda r: (200, {}, b"data"))
+    client_for(server).get(f"{storage.url}/file")
+    assert "X-API-Key" not in storage.received("GET", "/file")[0].headers
+
+
+def test_cross_origin_redirect_drops_the_key(server, storage):
+    server.route("GET", "/v1/redirect", lambda r: (302, {"Location": f"{storage.url}/file"}, b""))
+    storage.route("GET", "/file", lambda r: (200, {}, b"data"))
+    response = client_for(server).get("/v1/redirect")
+    assert response.content == b"data"
+    assert server.received("GET", "/v1/redirect")[0].headers.get("X-API-Key") == API_KEY
+    assert "X-API-Key" not in storage.received("GET", "/file")[0].headers
@@ -0,0 +1,204 @@
+"""RangedDownload: credentials, probe edge cases, If-Range and resume."""
+import json
+import os
+import re
+
+import pytest
+import requests
+
+from aftershipstorage import DarkstorageClient, Models2GoClient
+
+
+DATA = bytes(range(48))
+RANGE_RE = re.compile(r"bytes=(\d+)-(\d+)")
+
+
+class StoredObject:
+    """Serves an object over HTTP ranges, the way object storage does."""
+
+    def __init__(self, data=DATA, etag='"v1"'):
+        self.data = data
+        self.etag = etag
+        self.fail_from = None  # Fail range requests starting at or after this offset
+
+    def __call__(self, request):
+        headers = {"ETag": self.etag} if self.etag else {}
+        match = RANGE_RE.match(request.headers.get("Range", ""))
+        if_range = request.headers.get("If-Range")
+        if match is None or (if_range is not None and if_range != self.etag):
+            return 200, headers, self.data
+        start, end = int(match.group(1)), int(match.group(2))
+        if start >= len(self.data):
+            return 416, {"Content-Range": f"bytes */{len(self.data)}"}, b""
+        if self.fail_from is not None and start >= self.fail_from:
+            return 404, {}, b""
+        end = min(end, len(self.data) - 1)
+        headers["Content-Range"] = f"bytes {start}-{end}/{len(self.data)}"
+        return 206, headers, self.data[start:end + 1]
+
+
+def darkstorage(server, storage, stored):
+    server.route("POST", "/v1/buckets/bucket/objects/key/presign", lambda r: (
+        200, {"Content-Type": "application/json"}, json.dumps({"url": f"{storage.url}/object"}).encode()
+    ))
+    storage.route("GET", "/object", stored)
+    return DarkstorageClient(api_key="secret-key", base_url=server.url)
+
+
+def test_ranged_download_without_credentials(server, storage, tmp_path):
+    client = darkstorage(server, storage, StoredObject())
+    target = tmp_path / "out.bin"
+    result = client.download_file("bucket", "key", str(target), part_size=16)
+
+    assert target.read_bytes() == DATA
+    assert result.parts == 3
+    gets = storage.received("GET", "/object")
+    assert len(gets) == 4  # Probe and three ranges
+    assert all("X-API-Key" not in r.headers for r in gets)
+    assert all(r.headers.get("If-Range") == '"v1"' for r in gets[1:])
+    assert not os.path.exists(f"{target}.download-state")
+
+
+def test_external_model_download_url_without_credentials(server, storage, tmp_path):
+    server.route("GET", "/v1/models/m/download", lambda r: (
+        200, {"Content-Type": "application/json"},
+        json.dumps({"download_url": f"{storage.url}/object", "size": len(DATA)}).encode(),
+    ))
+    storage.route("GET", "/object", StoredObject())
+    client = Models2GoClient(api_key="secret-key", base_url=server.url)
+    target = tmp_path / "model.bin"
+    client.download_model("m", str(target), part_size=16)
+
+    assert target.read_bytes() == DATA
+    assert all("X-API-Key" not in r.headers for r in storage.received("GET", "/object"))
+
+
+def test_unknown_total_falls_back_to_a_plain_get(server, storage, tmp_path):
+    def handler(request):
+        if "Range" in request.headers:
+            return 206, {"Content-Range": "bytes 0-0/*"}, DATA[:1]
+        return 200, {}, DATA
+
+    client = darkstorage(server, storage, handler)
+    target = tmp_path / "out.bin"
+    result = client.download_file("bucket", "key", str(target), part_size=16)
+
+    assert target.read_bytes() == DATA
+    assert result.size == len(DATA)
+    assert "Range" not in storage.received("GET", "/object")[-1].headers
+
+
+def test_empty_object(server, storage, tmp_path):
+    client = darkstorage(server, storage, StoredObject(data=b""))
+    target = tmp_path / "empty.bin"
+    result = client.download_file("bucket", "key", str(target))
+
+    assert target.read_bytes() == b""
+    assert result.size == 0
+
+
+def test_weak_etag_is_not_sent_in_if_range(server, storage, tmp_path):
+    client = darkstorage(server, storage, StoredObject(etag='W/"v1"'))
+    target = tmp_path / "out.bin"
+    client.download_file("bucket", "key", str(target), part_size=16)
+
+    assert target.read_bytes() == DATA
+    assert all("If-Range" not in r.headers for r in storage.received("GET", "/object"))
+
+
+def test_weak_etag_change_fails(server, storage, tmp_path):
+    stored = StoredObject(etag='W/"v1"')
+    probe = stored.__call__
+
+    def handler(request):
+        response = probe(request)
+        stored.etag = 'W/"v2"'  # Replaced after the probe
+        return response
+
+    client = darkstorage(server, storage, handler)
+    with pytest.raises(ValueError, match="changed"):
+        client.download_file("bucket", "key", str(tmp_path / "out.bin"), part_size=16, concurrency=1)
+
+
+def test_if_range_mismatch_fails(server, storage, tmp_path):
+    stored = StoredObject()
+    probe = stored.__call__
+
+    def handler(request):
+        response = probe(request)
+        stored.etag = '"v2"'
+        return response
+
+    client = darkstorage(server, storage, handler)
+    with pytest.raises(ValueError, match="changed"):
+        client.download_file("bucket", "key", str(tmp_path / "out.bin"), part_size=16, concurrency=1)
+
+
+def test_resume_fetches_only_missing_ranges(server, storage, tmp_path):
+    stored = StoredObject()
+    stored.fail_from = 32
+    client = darkstorage(server, storage, stored)
+    target = tmp_path / "out.bin"
+    with pytest.raises(requests.HTTPError):
+        client.download_file("bucket", "key", str(target), part_size=16, concurrency=1)
+    assert os.path.exists(f"{target}.download-state")
+
+    stored.fail_from = None
+    before = len(storage.received("GET", "/object"))
+    result = client.download_file("bucket", "key", str(target), part_size=16, concurrency=1)
+
+    assert target.read_bytes() == DATA
+    assert result.parts_resumed == 2
+    assert len(storage.received("GET", "/object")) - before == 2  # Probe and the last range
+
+
+def test_changed_object_is_not_resumed(server, storage, tmp_path):
+    stored = StoredObject()
+    stored.fail_from = 32
+    client = darkstorage(server, storage, stored)
+    target = tmp_path / "out.bin"
+    with pytest.raises(requests.HTTPError):
+        client.download_file("bucket", "key", str(target), part_size=16, concurrency=1)
+
+    stored.fail_from = None
+    stored.data, stored.etag = DATA[::-1], '"v2"'
+    result = client.download_file("bucket", "key", str(target), part_size=16, concurrency=1)
+
+    assert target.read_bytes() == DATA[::-1]
+    assert result.parts_resumed == 0
+
+
+def truncating(stored, times):
+    """Wrap a StoredObject so the first ``times`` range responses break off halfway."""
+    remaining = [times]
+
+    def handler(request):
+        status, headers, body = stored(request)
+        if status == 206 and remaining[0] > 0 and "bytes=0-0" not in request.headers.get("Range", ""):
+            remaining[0] -= 1
+            return status, {**headers, "Content-Length": str(len(body))}, body[:len(body) // 2]
+        return status, headers, body
+
+    return handler
+
+
+def test_broken_range_is_requested_again(server, storage, tmp_path):
+    client = darkstorage(server, storage, truncating(StoredObject(), 1))
+    client.retry_policy.config.backoff_base = 0.0
+    target = tmp_path / "out.bin"
+    client.download_file("bucket", "key", str(target), part_size=16, concurrency=1)
+
+    assert target.read_bytes() == DATA
+    ranges = [r.headers["Range"] for r in storage.received("GET", "/object")]
+    # The truncated bytes arrive in one read, so the whole range is requested again
+    assert ranges == ["bytes=0-0", "bytes=0-15", "bytes=0-15", "bytes=16-31", "bytes=32-47"]
+    assert client.retry_policy.stats()["retries"] == 1
+
+
+def test_broken_range_resumes_draw_on_the_retry_budget(server, storage, tmp_path):
+    client = darkstorage(server, storage, truncating(StoredObject(), 100))
+    client.retry_policy.config.backoff_base = 0.0
+    client.retry_policy.budget._tokens = 0
+    with pytest.raises(requests.ConnectionError, match="ended early"):
+        client.download_file("bucket", "key", str(tmp_path / "out.bin"), part_size=16, concurrency=1)
+    assert client.retry_policy.stats()["budget_exhausted"] >= 1
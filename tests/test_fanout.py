@@ -0,0 +1,52 @@
+"""A malformed spec fails its own result without aborting the batch."""
+import asyncio
+
+from aftershipstorage import AftershipStorage, AsyncAftershipStorage, DarkstorageClient
+
+
+def ok(request):
+    return 200, {"Content-Type": "application/json"}, b"{}"
+
+
+def test_map_reports_malformed_spec(server):
+    server.route("GET", "/v1/a", ok)
+    server.route("GET", "/v1/b", ok)
+    client = DarkstorageClient(api_key="key", base_url=server.url)
+
+    results = list(client.map(["/v1/a", {"method": "GET"}, 42, "/v1/b"], concurrency=2))
+
+    assert [result.index for result in results] == [0, 1, 2, 3]
+    assert [result.ok for result in results] == [True, False, False, True]
+    assert isinstance(results[1].error, KeyError)
+    assert isinstance(results[2].error, TypeError)
+    assert results[2].spec == 42
+
+
+def test_gather_reports_malformed_spec(server):
+    server.route("GET", "/v1/a", ok)
+    storage = AftershipStorage(darkstorage_api_key="key", darkstorage_base_url=server.url)
+
+    results = list(storage.gather([
+        ("darkstorage", "GET", "/v1/a"),
+        {"service": "darkstorage"},
+        ("darkstorage", "GET", "/v1/a"),
+    ]))
+
+    assert [result.ok for result in results] == [True, False, True]
+    assert isinstance(results[1].error, KeyError)
+
+
+def test_async_gather_reports_malformed_spec(server):
+    server.route("GET", "/v1/a", ok)
+
+    async def gather():
+        async with AsyncAftershipStorage(darkstorage_api_key="key", darkstorage_base_url=server.url) as storage:
+            return [result async for result in storage.gather([
+                ("darkstorage", "GET", "/v1/a"),
+                object(),
+                ("darkstorage", "GET", "/v1/a"),
+            ])]
+
+    results = asyncio.run(gather())
+    assert [result.ok for result in results] == [True, False, True]
+    assert isinstance(results[1].error, TypeError)
@@ -0,0 +1,126 @@
+"""ObjectIndex refresh: sharding, sweeping and failure handling."""
+import json
+import threading
+import time
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+import requests
+
+from aftershipstorage import DarkstorageClient
+from aftershipstorage.index import ObjectIndex
+
+
+class Bucket:
+    """Listing endpoint with prefix, delimiter and limit/offset support."""
+
+    def __init__(self, keys):
+        self.keys = set(keys)
+        self.fail = set()  # Prefixes whose undelimited listing fails
+        self.delay = {}  # Prefix -> seconds to wait before answering
+
+    def __call__(self, request):
+        params = {k: v[0] for k, v in parse_qs(urlsplit(request.path).query).items()}
+        prefix, delimiter = params.get("prefix", ""), params.get("delimiter")
+        time.sleep(self.delay.get(prefix, 0))
+        if prefix in self.fail and not delimiter:
+            return 500, {}, b""
+        entries = set()
+        for key in self.keys:
+            if not key.startswith(prefix):
+                continue
+            rest = key[len(prefix):]
+            if delimiter and delimiter in rest:
+                entries.add(("prefix", prefix + rest.split(delimiter)[0] + delimiter))
+            else:
+                entries.add(("key", key))
+        offset, limit = int(params.get("offset", 0)), int(params["limit"])
+        page = sorted(entries, key=lambda e: e[1])[offset:offset + limit]
+        body = {
+            "items": [{"key": v, "size": len(v), "etag": f'"{v}"'} for kind, v in page if kind == "key"],
+            "common_prefixes": [{"prefix": v} for kind, v in page if kind == "prefix"],
+        }
+        return 200, {"Content-Type": "application/json"}, json.dumps(body).encode()
+
+
+KEYS = ["top.txt", "a/1", "a/2", "b/1", "b/c/1", "d/1"]
+
+
+@pytest.fixture
+def bucket(server):
+    bucket = Bucket(KEYS)
+    server.route("GET", "/v1/buckets/bucket/objects", bucket)
+    return bucket
+
+
+def make_index(server, **kwargs):
+    client = DarkstorageClient(api_key="key", base_url=server.url)
+    client.retry_policy.config.max_retries = 0
+    return ObjectIndex(client, "bucket", max_age=None, concurrency=4, **kwargs)
+
+
+def test_refresh_lists_direct_objects_and_shards(server, bucket):
+    index = make_index(server, page_size=2)
+    result = index.refresh()
+
+    assert result.objects == len(KEYS)
+    assert result.shards == 3
+    assert [o["key"] for o in index.list()] == sorted(KEYS)
+    assert index.exists("b/c/1") and not index.exists("b/c/2")
+    assert index.size("a/") == (2, 6)
+
+
+def test_refresh_sweeps_deleted_objects(server, bucket):
+    index = make_index(server)
+    index.refresh()
+    bucket.keys.discard("a/2")
+    result = index.refresh()
+
+    assert result.removed == 1
+    assert not index.exists("a/2")
+
+
+def test_failed_refresh_removes_nothing(server, bucket):
+    index = make_index(server)
+    index.refresh()
+    bucket.keys -= {"a/2", "top.txt"}
+    bucket.fail.add("b/")
+
+    with pytest.raises(requests.HTTPError):
+        index.refresh()
+    assert index.exists("a/2") and index.exists("top.txt")
+
+
+def test_consumer_failure_stops_workers(server, bucket, monkeypatch):
+    bucket.keys |= {f"a/s{i}/{j}" for i in range(8) for j in range(40)}
+    index = make_index(server, page_size=1)
+    write = index._write
+
+    def fail(batch, generation):
+        if batch[0][0].startswith("a/s"):
+            raise RuntimeError("disk full")
+        write(batch, generation)
+
+    # One row per batch, so listing workers fill the queue and block on it
+    monkeypatch.setattr("aftershipstorage.index.WRITE_BATCH", 1)
+    monkeypatch.setattr(index, "_write", fail)
+    started = time.monotonic()
+    with pytest.raises(RuntimeError, match="disk full"):
+        index.refresh("a/")
+    assert time.monotonic() - started < 5
+    assert not [t for t in threading.enumerate() if t.name.startswith("aftership-index")]
+
+
+def test_queries_are_answered_during_a_refresh(server, bucket):
+    index = make_index(server)
+    index.refresh()
+    bucket.delay["d/"] = 1.0
+    refresh = threading.Thread(target=index.refresh)
+    refresh.start()
+    try:
+        time.sleep(0.2)
+        started = time.monotonic()
+        assert index.exists("a/1")
+        assert time.monotonic() - started < 0.5
+    finally:
+        refresh.join()
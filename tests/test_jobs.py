@@ -0,0 +1,133 @@
+"""JobWaiter polling: batched listings, conditional per-job fallback and backoff."""
+import json
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+import requests
+
+from aftershipstorage import AiserveClient
+from aftershipstorage.jobs import JobFailed, JobWaiter, _Watch
+
+
+def reply(body, status=200, headers=None):
+    return status, {"Content-Type": "application/json", **(headers or {})}, json.dumps(body).encode()
+
+
+def states(*sequence):
+    """Route answering with the next state of a job each time it is polled."""
+    remaining = list(sequence)
+    return lambda: remaining.pop(0) if len(remaining) > 1 else remaining[0]
+
+
+def watch_together(waiter, job_ids, **kwargs):
+    """Watch jobs so that the scheduler finds them all due in one round."""
+    with waiter._cond:
+        return waiter.watch_many(job_ids, **kwargs)
+
+
+def waiter_for(server, **kwargs):
+    client = AiserveClient(api_key="key", base_url=server.url)
+    kwargs.setdefault("min_interval", 0.01)
+    kwargs.setdefault("max_interval", 0.05)
+    return JobWaiter(client, **kwargs)
+
+
+def test_due_jobs_share_one_listing(server):
+    jobs = {"a": states("running", "completed"), "b": states("queued", "running", "completed")}
+
+    def listing(request):
+        ids = parse_qs(urlsplit(request.path).query)["ids"][0].split(",")
+        return reply({"items": [{"id": job_id, "status": jobs[job_id]()} for job_id in ids]})
+
+    def status(job_id):
+        return lambda request: reply({"status": jobs[job_id]()})
+
+    server.route("GET", "/v1/compute/jobs", listing)
+    # Jobs drifting apart later are polled one by one
+    server.route("GET", "/v1/compute/jobs/a/status", status("a"))
+    server.route("GET", "/v1/compute/jobs/b/status", status("b"))
+
+    with waiter_for(server) as waiter:
+        futures = watch_together(waiter, ["a", "b"])
+        assert futures["a"].result(5)["status"] == "completed"
+        assert futures["b"].result(5)["status"] == "completed"
+        stats = waiter.stats()
+
+    assert stats["batch_supported"] is True
+    assert stats["completed"] == 2 and stats["tracked"] == 0
+    first = parse_qs(urlsplit(server.received("GET", "/v1/compute/jobs")[0].path).query)
+    assert sorted(first["ids"][0].split(",")) == ["a", "b"]
+
+
+def test_unfiltered_listing_falls_back_to_conditional_polls(server):
+    server.route("GET", "/v1/compute/jobs", lambda r: reply({}, status=404))
+    polls = {"a": states("running", "running", "completed"), "b": states("running", "failed")}
+
+    def status(job_id):
+        def route(request):
+            state = polls[job_id]()
+            etag = f'"{job_id}-{state}"'
+            if request.headers.get("If-None-Match") == etag:
+                return 304, {"ETag": etag}, b""
+            return reply({"status": state, "message": "out of memory" if state == "failed" else None},
+                         headers={"ETag": etag})
+        return route
+
+    server.route("GET", "/v1/compute/jobs/a/status", status("a"))
+    server.route("GET", "/v1/compute/jobs/b/status", status("b"))
+    finished = []
+
+    with waiter_for(server) as waiter:
+        futures = watch_together(waiter, ["a", "b"], callback=lambda job_id, status: finished.append(job_id))
+        assert futures["a"].result(5)["status"] == "completed"
+        with pytest.raises(JobFailed) as error:
+            futures["b"].result(5)
+        stats = waiter.stats()
+
+    assert error.value.state == "failed" and "out of memory" in str(error.value)
+    assert stats["batch_supported"] is False
+    assert stats["not_modified"] >= 1
+    assert sorted(finished) == ["a", "b"]
+    revalidated = server.received("GET", "/v1/compute/jobs/a/status")[1]
+    assert revalidated.headers.get("If-None-Match") == '"a-running"'
+
+
+def test_unreadable_job_fails_its_future(server):
+    server.route("GET", "/v1/compute/jobs", lambda r: reply({}, status=404))
+    server.route("GET", "/v1/compute/jobs/gone/status", lambda r: reply({}, status=404))
+
+    with waiter_for(server) as waiter:
+        with pytest.raises(requests.HTTPError):
+            waiter.wait("gone", timeout=5)
+        assert waiter.tracked == 0
+
+
+def test_unwatch_cancels_the_future(server):
+    server.route("GET", "/v1/compute/jobs/a/status", lambda r: reply({"status": "running"}))
+
+    with waiter_for(server) as waiter:
+        future = waiter.watch("a")
+        assert waiter.unwatch("a")
+        assert future.cancelled() and waiter.tracked == 0
+        assert not waiter.unwatch("a")
+
+    with pytest.raises(RuntimeError):
+        waiter.watch("a")
+
+
+def test_interval_backs_off_and_resets_on_change():
+    waiter = JobWaiter(client=None, min_interval=1.0, max_interval=5.0, backoff=2.0, jitter=0)
+    watch = _Watch("a", None, None, waiter.min_interval)
+
+    intervals = [waiter._next_interval(watch, changed=False) for _ in range(4)]
+    assert intervals == [2.0, 4.0, 5.0, 5.0]
+    assert waiter._next_interval(watch, changed=True) == 1.0
+
+
+def test_interval_tracks_expected_runtime():
+    waiter = JobWaiter(client=None, min_interval=1.0, max_interval=60.0, backoff=2.0, jitter=0)
+    watch = _Watch("a", None, 10.0, 30.0)
+
+    assert waiter._next_interval(watch, changed=False) == pytest.approx(5.0, abs=0.1)
+    watch.started -= 20.0  # Past the expected runtime: back to plain backoff
+    assert waiter._next_interval(watch, changed=False) == 60.0
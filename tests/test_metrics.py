@@ -0,0 +1,72 @@
+"""MetricSeries buffers and JobMetricsReader streaming."""
+import json
+import math
+
+from aftershipstorage import AiserveClient
+from aftershipstorage.metrics import MetricSeries
+
+
+def series(points, max_points=None):
+    s = MetricSeries("loss", max_points)
+    for step, timestamp, value in points:
+        s.append(step, timestamp, value)
+    return s
+
+
+def test_since_with_timestamps():
+    s = series([(0, 10.0, 1.0), (1, 20.0, 2.0), (2, 30.0, 3.0)])
+    assert list(s.since(20.0).values) == [3.0]
+    assert list(s.since(5.0).values) == [1.0, 2.0, 3.0]
+    assert len(s.since(30.0)) == 0
+
+
+def test_copy_of_a_step_only_series():
+    s = series([(step, math.nan, float(step)) for step in range(5)])
+    copy = s.copy()
+    assert list(copy.steps) == [0, 1, 2, 3, 4]
+    assert copy.values is not s.values
+
+
+def test_since_with_missing_timestamps():
+    s = series([(0, 10.0, 1.0), (1, math.nan, 2.0), (2, 30.0, 3.0), (3, math.nan, 4.0)])
+    assert list(s.since(10.0).values) == [2.0, 3.0, 4.0]
+    assert list(s.since(30.0).values) == [4.0]
+    assert list(series([(0, math.nan, 1.0)]).since(100.0).values) == [1.0]
+
+
+def test_trimmed_series_returns_to_bisect():
+    s = series([(0, math.nan, 0.0)] + [(i, float(i), float(i)) for i in range(1, 200)], max_points=100)
+    assert len(s) < 200 and not math.isnan(s.timestamps[0])
+    assert list(s.since(197.0).values) == [198.0, 199.0]
+
+
+def sse(*events):
+    return "".join(f"id: {i}\ndata: {json.dumps(e)}\n\n" for i, e in events).encode()
+
+
+def test_follow_reconnects_after_a_truncated_stream(server):
+    streams = [
+        # Declares more bytes than it sends: the connection drops mid-stream
+        lambda body: (200, {"Content-Type": "text/event-stream", "Content-Length": str(len(body) + 100)}, body),
+        lambda body: (200, {"Content-Type": "text/event-stream"}, body),
+    ]
+    first = (1, {"step": 1, "loss": 0.5})
+    bodies = [sse(first), sse(first, (2, {"step": 2, "loss": 0.4}))]
+
+    def metrics(request):
+        index = min(len(server.received("GET", "/v1/compute/jobs/j/metrics")), 2) - 1
+        return streams[index](bodies[index])
+
+    server.route("GET", "/v1/compute/jobs/j/metrics", metrics)
+    server.route("GET", "/v1/compute/jobs/j/status", lambda r: (
+        200, {"Content-Type": "application/json"}, b'{"status": "succeeded"}'
+    ))
+    client = AiserveClient(api_key="key", base_url=server.url)
+    client.retry_policy.config.backoff_base = 0.0
+    reader = client.job_metrics("j", interval=0.01)
+
+    added = list(reader.follow())
+
+    assert sum(added) == 2
+    assert list(reader["loss"].steps) == [1, 2]
+    assert reader.stats()["reconnects"] >= 1
@@ -0,0 +1,133 @@
+"""Paginator termination for offset, cursor and link listings."""
+import asyncio
+import json
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+from aftershipstorage import AsyncDarkstorageClient, DarkstorageClient
+
+
+ITEMS = [{"id": i} for i in range(23)]
+
+
+def query(request):
+    return {k: v[0] for k, v in parse_qs(urlsplit(request.path).query).items()}
+
+
+def offset_route(cap=None, total=False, has_more=False):
+    def handler(request):
+        params = query(request)
+        offset, limit = int(params.get("offset", 0)), int(params["limit"])
+        page = ITEMS[offset:offset + min(limit, cap or limit)]
+        body = {"items": page}
+        if total:
+            body["total"] = len(ITEMS)
+        if has_more:
+            body["has_more"] = offset + len(page) < len(ITEMS)
+        return 200, {"Content-Type": "application/json"}, json.dumps(body).encode()
+    return handler
+
+
+def client(server):
+    return DarkstorageClient(api_key="key", base_url=server.url)
+
+
+@pytest.mark.parametrize("prefetch", [0, 1, 3])
+def test_offset_listing_ends_at_empty_page(server, prefetch):
+    server.route("GET", "/v1/things", offset_route())
+    assert list(client(server).paginate("/v1/things", page_size=5, prefetch=prefetch)) == ITEMS
+
+
+@pytest.mark.parametrize("prefetch", [0, 1, 3])
+def test_offset_listing_with_capped_limit(server, prefetch):
+    server.route("GET", "/v1/things", offset_route(cap=4))
+    assert list(client(server).paginate("/v1/things", page_size=10, prefetch=prefetch)) == ITEMS
+    offsets = [int(query(r).get("offset", 0)) for r in server.received("GET", "/v1/things")]
+    assert {0, 4, 8, 12, 16, 20} <= set(offsets)
+
+
+def test_offset_listing_stops_at_total(server):
+    server.route("GET", "/v1/things", offset_route(total=True))
+    assert list(client(server).paginate("/v1/things", page_size=5, prefetch=0)) == ITEMS
+    assert len(server.received("GET", "/v1/things")) == 5
+
+
+def test_offset_listing_stops_at_has_more(server):
+    server.route("GET", "/v1/things", offset_route(has_more=True))
+    assert list(client(server).paginate("/v1/things", page_size=5, prefetch=0)) == ITEMS
+    assert len(server.received("GET", "/v1/things")) == 5
+
+
+def test_max_items(server):
+    server.route("GET", "/v1/things", offset_route())
+    assert list(client(server).paginate("/v1/things", page_size=5, max_items=7)) == ITEMS[:7]
+
+
+def cursor_route(repeat=False):
+    def handler(request):
+        cursor = int(query(request).get("cursor", 0))
+        page = ITEMS[cursor:cursor + 10]
+        body = {"items": page}
+        if cursor + 10 < len(ITEMS):
+            body["next_cursor"] = "0" if repeat else str(cursor + 10)
+        return 200, {"Content-Type": "application/json"}, json.dumps(body).encode()
+    return handler
+
+
+def test_cursor_listing(server):
+    server.route("GET", "/v1/things", cursor_route())
+    assert list(client(server).paginate("/v1/things", page_size=10)) == ITEMS
+
+
+def test_offset_is_only_sent_for_offset_listings(server):
+    server.route("GET", "/v1/things", cursor_route())
+    server.route("GET", "/v1/rows", offset_route())
+    list(client(server).paginate("/v1/things", page_size=10))
+    list(client(server).paginate("/v1/rows", page_size=10, style="offset"))
+    resumed = list(client(server).paginate("/v1/rows", params={"offset": 20}, page_size=10))
+
+    assert [query(r).get("offset") for r in server.received("GET", "/v1/things")] == [None, None, None]
+    assert [query(r).get("offset") for r in server.received("GET", "/v1/rows")][:2] == ["0", "10"]
+    assert resumed == ITEMS[20:]
+
+
+def test_repeated_cursor_raises(server):
+    server.route("GET", "/v1/things", cursor_route(repeat=True))
+    with pytest.raises(ValueError, match="already returned"):
+        list(client(server).paginate("/v1/things", page_size=10))
+
+
+def test_repeated_link_raises(server):
+    server.route("GET", "/v1/things", lambda r: (
+        200, {"Content-Type": "application/json", "Link": f'<{server.url}/v1/things?page=2>; rel="next"'}, b"[1]"
+    ))
+    with pytest.raises(ValueError, match="already returned"):
+        list(client(server).paginate("/v1/things"))
+
+
+def test_async_offset_listing_with_capped_limit(server):
+    server.route("GET", "/v1/things", offset_route(cap=4))
+
+    async def collect():
+        async with AsyncDarkstorageClient(api_key="key", base_url=server.url) as async_client:
+            return [item async for item in async_client.paginate("/v1/things", page_size=10, prefetch=2)]
+
+    assert asyncio.run(collect()) == ITEMS
+
+
+def test_async_cursor_listing(server):
+    server.route("GET", "/v1/things", cursor_route())
+
+    async def collect():
+        async with AsyncDarkstorageClient(api_key="key", base_url=server.url) as async_client:
+            return [item async for item in async_client.paginate("/v1/things", page_size=10)]
+
+    assert asyncio.run(collect()) == ITEMS
+    assert [query(r).get("cursor") for r in server.received("GET", "/v1/things")] == [None, "10", "20"]
+
+
+def test_ignored_offset_raises(server):
+    server.route("GET", "/v1/things", lambda r: (200, {"Content-Type": "application/json"}, b"[1, 2]"))
+    with pytest.raises(ValueError, match="same page"):
+        list(client(server).paginate("/v1/things", page_size=5))
@@ -0,0 +1,77 @@
+"""Connection pool sizing, keep-alive reuse and expiry, and pool settings from config."""
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from aftershipstorage import Config, DarkstorageClient, PoolConfig
+
+
+def client_for(server, **pool):
+    return DarkstorageClient(api_key="key", base_url=server.url, pool=PoolConfig(**pool))
+
+
+def host_stats(client, server):
+    return client.pool_stats()[server.url.split("//", 1)[1]]
+
+
+def test_pool_settings_reach_the_adapter():
+    client = DarkstorageClient(api_key="key", pool=PoolConfig(connections=3, maxsize=25, block=True))
+    pool_kw = client.adapter.poolmanager.connection_pool_kw
+    assert (client.adapter.poolmanager.pools._maxsize, pool_kw["maxsize"], pool_kw["block"]) == (3, 25, True)
+
+
+def test_keepalive_connection_is_reused(server):
+    server.route("GET", "/v1/ping", lambda r: (200, {}, b"ok"))
+    client = client_for(server)
+    for _ in range(5):
+        client.get("/v1/ping")
+
+    stats = host_stats(client, server)
+    assert stats["requests"] == 5
+    assert stats["connections_opened"] == 1
+    assert stats["idle_connections"] == 1 and stats["in_flight"] == 0
+
+
+def test_idle_connections_expire(server):
+    server.route("GET", "/v1/ping", lambda r: (200, {}, b"ok"))
+    client = client_for(server, keepalive_expiry=0.05)
+    client.get("/v1/ping")
+    client.get("/v1/ping")
+    time.sleep(0.1)
+    client.get("/v1/ping")
+
+    stats = host_stats(client, server)
+    assert stats["keepalive_expired"] == 1
+    assert stats["connections_opened"] == 2
+
+
+def test_blocking_pool_caps_connections(server):
+    def slow(request):
+        time.sleep(0.05)
+        return 200, {}, b"ok"
+
+    server.route("GET", "/v1/slow", slow)
+    client = client_for(server, maxsize=2, block=True)
+    with ThreadPoolExecutor(max_workers=6) as executor:
+        list(executor.map(lambda _: client.get("/v1/slow"), range(6)))
+
+    stats = host_stats(client, server)
+    assert stats["connections_opened"] <= 2
+    assert stats["peak_in_flight"] > 2  # Requests waiting for a connection count as in flight
+
+
+def test_service_pool_overrides_global_settings():
+    config = Config.from_dict({
+        "settings": {"pool": {"maxsize": 20, "keepalive_expiry": 30}},
+        "darkstorage": {"api_key": "key", "pool": {"maxsize": 50, "block": True}},
+    })
+
+    assert config.resolve_pool("darkstorage") == PoolConfig(maxsize=50, block=True, keepalive_expiry=30)
+    assert config.resolve_pool("darkship") == PoolConfig(maxsize=20, keepalive_expiry=30)
+    assert config.client_options("darkstorage")["pool"].maxsize == 50
+
+
+def test_unknown_pool_setting_is_rejected():
+    with pytest.raises(ValueError, match="Unknown pool settings: max_size"):
+        Config.from_dict({"darkship": {"pool": {"max_size": 5}}})
@@ -0,0 +1,138 @@
+"""Presigned URL cache: reuse, safety margin, eviction, invalidation and path escaping."""
+import json
+import time
+
+import pytest
+
+from aftershipstorage import DarkstorageClient, PresignConfig
+from aftershipstorage.presign import PresignCache, PresignedURL, parse_expiry
+
+PRESIGN = "/v1/buckets/assets/objects/img/logo.png/presign"
+
+
+def presign_route(lifetime=3600):
+    """Route presigning URLs that expire ``lifetime`` seconds from now."""
+    calls = []
+
+    def route(request):
+        body = json.loads(request.body)
+        url = f"https://cdn.example/{request.path}?op={body.get('operation', 'download')}&n={len(calls)}"
+        calls.append(body)
+        return 200, {"Content-Type": "application/json"}, json.dumps(
+            {"url": url, "expires_at": time.time() + lifetime}).encode()
+    route.calls = calls
+    return route
+
+
+def client_for(server, **presign):
+    return DarkstorageClient(api_key="key", base_url=server.url, presign=PresignConfig(**presign))
+
+
+def entry(key, ttl=3600.0, bucket="b"):
+    return PresignedURL(f"https://cdn.example/{key}", bucket, key, "download",
+                        expires_at=time.time() + ttl, expires_monotonic=time.monotonic() + ttl)
+
+
+def test_parse_expiry():
+    assert parse_expiry(1700000000) == 1700000000.0
+    assert parse_expiry("2024-05-01T12:00:00Z") == parse_expiry("2024-05-01T12:00:00+00:00") == 1714564800.0
+    assert parse_expiry("soon") is None and parse_expiry(None) is None
+
+
+def test_urls_are_reused_until_the_safety_margin(server):
+    route = presign_route()
+    server.route("POST", PRESIGN, route)
+    client = client_for(server)
+
+    first = client.presign("assets", "img/logo.png")
+    assert client.presign("assets", "img/logo.png") is first
+    assert client.presign("assets", "img/logo.png", operation="upload") is not first
+    # Needs the URL for longer than it has left: presigned again
+    assert client.presign("assets", "img/logo.png", min_ttl=7200).url != first.url
+    assert route.calls == [{"expires_in": 3600}, {"expires_in": 3600, "operation": "upload"}, {"expires_in": 3600}]
+    assert client.presign_cache.stats()["hits"] == 1
+
+
+def test_urls_inside_the_safety_margin_are_not_cached(server):
+    route = presign_route(lifetime=30)
+    server.route("POST", PRESIGN, route)
+    client = client_for(server, safety_margin=60)
+
+    client.presign("assets", "img/logo.png")
+    client.presign("assets", "img/logo.png")
+
+    assert len(route.calls) == 2
+    assert client.presign_cache.stats()["entries"] == 0
+
+
+def test_cache_can_be_disabled(server):
+    route = presign_route()
+    server.route("POST", PRESIGN, route)
+    client = client_for(server, cache=False)
+
+    client.presign("assets", "img/logo.png")
+    client.presign("assets", "img/logo.png")
+
+    assert client.presign_cache is None and len(route.calls) == 2
+
+
+def test_bucket_and_key_are_escaped(server):
+    route = presign_route()
+    server.route("POST", "/v1/buckets/team%2Fa%20b/objects/dir/model%20v1.bin/presign", route)
+    client = client_for(server)
+
+    url = client.presign("team/a b", "dir/model v1.bin")
+
+    assert len(route.calls) == 1
+    assert (url.bucket, url.key) == ("team/a b", "dir/model v1.bin")
+
+
+def test_presign_many_requests_only_missing_keys(server):
+    routes = {key: presign_route() for key in ("a", "b", "c")}
+    for key, route in routes.items():
+        server.route("POST", f"/v1/buckets/assets/objects/{key}/presign", route)
+    client = client_for(server)
+    cached = client.presign("assets", "a")
+
+    urls = client.presign_many("assets", ["b", "a", "c", "b"], concurrency=2)
+
+    assert list(urls) == ["b", "a", "c"]
+    assert urls["a"] is cached
+    assert [len(route.calls) for route in routes.values()] == [1, 1, 1]
+
+
+def test_least_recently_used_urls_are_evicted():
+    cache = PresignCache(PresignConfig(max_entries=2))
+    for key in ("a", "b"):
+        cache.store(entry(key))
+    cache.get("b", "a", "download")
+    cache.store(entry("c"))
+
+    assert cache.get("b", "b", "download") is None
+    assert cache.get("b", "a", "download") is not None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_expired_entries_are_dropped_on_lookup():
+    cache = PresignCache(PresignConfig(safety_margin=0.15))
+    cache.store(entry("a", ttl=0.3))
+    assert cache.get("b", "a", "download") is not None
+    time.sleep(0.2)
+    assert cache.get("b", "a", "download") is None
+    assert cache.stats()["expired"] == 1
+
+
+@pytest.mark.parametrize("bucket, key, remaining", [
+    (None, None, []),
+    ("b", None, [("other", "a")]),
+    ("b", "a", [("b", "b"), ("other", "a")]),
+])
+def test_invalidate(bucket, key, remaining):
+    cache = PresignCache()
+    for entry_bucket, entry_key in (("b", "a"), ("b", "b"), ("other", "a")):
+        cache.store(entry(entry_key, bucket=entry_bucket))
+
+    cache.invalidate(bucket, key)
+
+    kept = [(b, k) for b, k in (("b", "a"), ("b", "b"), ("other", "a")) if cache.get(b, k, "download")]
+    assert kept == remaining
@@ -0,0 +1,112 @@
+"""Semver parsing and range matching used by ModelRegistry.resolve."""
+import pytest
+
+from aftershipstorage.registry import VersionRange, _ModelEntry, parse_version
+
+
+@pytest.mark.parametrize("spec,version,expected", [
+    ("1.2.3", "1.2.3", True),
+    ("v1.2.3", "1.2.3", True),
+    ("=1.2.3", "1.2.4", False),
+    (">=1.2.0 <2", "1.9.9", True),
+    (">=1.2.0 <2", "2.0.0", False),
+    (">=1.2.0 <2", "1.1.9", False),
+    (">= 1.2, < 2", "1.5.0", True),
+    ("1.2.x", "1.2.9", True),
+    ("1.2.x", "1.3.0", False),
+    ("1.2", "1.2.9", True),
+    ("1", "1.9.0", True),
+    ("1", "2.0.0", False),
+    ("*", "0.0.1", True),
+    ("", "3.0.0", True),
+    ("^1.2.3", "1.9.0", True),
+    ("^1.2.3", "1.2.2", False),
+    ("^1.2.3", "2.0.0", False),
+    ("^0.2.3", "0.2.9", True),
+    ("^0.2.3", "0.3.0", False),
+    ("^0.0.3", "0.0.3", True),
+    ("^0.0.3", "0.0.4", False),
+    ("~1.2.3", "1.2.9", True),
+    ("~1.2.3", "1.3.0", False),
+    ("~1", "1.9.0", True),
+    ("~1", "2.0.0", False),
+    ("1.2 - 1.4", "1.2.0", True),
+    ("1.2 - 1.4", "1.4.9", True),
+    ("1.2 - 1.4", "1.5.0", False),
+    (">1.2", "1.2.9", False),
+    (">1.2", "1.3.0", True),
+    ("<=1.2", "1.2.9", True),
+    ("<=1.2", "1.3.0", False),
+    ("<1.0.0 || >=3", "0.9.0", True),
+    ("<1.0.0 || >=3", "2.0.0", False),
+    ("<1.0.0 || >=3", "3.1.0", True),
+])
+def test_range_matches(spec, version, expected):
+    assert VersionRange(spec).matches(parse_version(version)) is expected
+
+
+@pytest.mark.parametrize("spec,version,expected", [
+    ("*", "1.0.0-rc.1", False),
+    ("^1.0.0", "1.1.0-beta", False),
+    (">=2.0.0-rc.1", "2.0.0-rc.2", True),
+    (">=2.0.0-rc.1", "2.0.0-rc.0", False),
+    (">=2.0.0-rc.1", "2.1.0-rc.1", False),
+    (">=2.0.0-rc.1", "2.1.0", True),
+])
+def test_prereleases_match_only_when_named(spec, version, expected):
+    assert VersionRange(spec).matches(parse_version(version)) is expected
+
+
+def test_include_prerelease_matches_any_prerelease_in_range():
+    version_range = VersionRange("^1.0.0")
+    assert version_range.matches(parse_version("1.1.0-beta"), include_prerelease=True)
+    assert not version_range.matches(parse_version("2.0.0-beta"), include_prerelease=True)
+
+
+@pytest.mark.parametrize("spec", ["not a range", ">=1.2.3.4", "^banana"])
+def test_invalid_range_raises(spec):
+    with pytest.raises(ValueError):
+        VersionRange(spec)
+
+
+def test_version_precedence():
+    ordered = [
+        "1.0.0-alpha", "1.0.0-alpha.1", "1.0.0-alpha.beta", "1.0.0-beta", "1.0.0-beta.2",
+        "1.0.0-beta.11", "1.0.0-rc.1", "1.0.0", "1.0.1", "1.10.0", "2.0.0",
+    ]
+    assert sorted(ordered, key=parse_version) == ordered
+    assert parse_version("2.1") == parse_version("2.1.0")
+    assert parse_version("1.0.0+build.5") == parse_version("1.0.0")
+    assert parse_version("2.2.0+linux-x86") == parse_version("2.2.0")
+    assert parse_version("1.0.0-x.1") == (1, 0, 0, 0, ((1, "x"), (0, 1)))
+    assert parse_version("1.x") is None
+    assert parse_version("stable") is None
+
+
+def test_entry_resolves_versions_tags_and_ranges():
+    entry = _ModelEntry(
+        {"dist_tags": {"stable": "1.4.0"}},
+        [{"version": v} for v in ("1.2.0", "1.4.0", "1.5.0", "2.0.0-rc.1", "nightly-build")] + [{"name": "0.9.0"}],
+    )
+
+    assert entry.resolve("latest", include_prerelease=False) == "1.5.0"
+    assert entry.resolve("latest", include_prerelease=True) == "2.0.0-rc.1"
+    assert entry.resolve("stable", include_prerelease=False) == "1.4.0"
+    assert entry.resolve("nightly-build", include_prerelease=False) == "nightly-build"
+    assert entry.resolve("~1.2", include_prerelease=False) == "1.2.0"
+    assert entry.resolve("<1", include_prerelease=False) == "0.9.0"
+    assert entry.resolve("^3", include_prerelease=False) is None
+    assert entry.resolve("beta", include_prerelease=False) is None
+
+
+def test_entry_resolves_v_prefixed_specs():
+    entry = _ModelEntry({}, [{"version": v} for v in ("1.9.0", "2.0.0", "2.1.0", "3.0.0")])
+
+    assert entry.resolve("v2.1.0", include_prerelease=False) == "2.1.0"
+    assert entry.resolve("v2", include_prerelease=False) == "2.1.0"
+    assert entry.resolve("v1.x", include_prerelease=False) == "1.9.0"
+
+
+def test_build_metadata_does_not_hide_a_version():
+    entry = _ModelEntry({}, [{"version": v} for v in ("2.1.0", "2.2.0+linux-x86")])
+    assert entry.resolve("^2", include_prerelease=False) == "2.2.0+linux-x86"
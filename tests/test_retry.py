@@ -0,0 +1,121 @@
+"""Retry policy: retryable methods and statuses, Retry-After and the retry budget."""
+import time
+from email.utils import formatdate
+
+import pytest
+import requests
+
+from aftershipstorage import DarkstorageClient, RetryConfig
+from aftershipstorage.retry import RetryBudget, RetryPolicy
+
+
+class FakeResponse:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+def failing(times, status=503, headers=None):
+    """Route failing ``times`` times before answering 200."""
+    calls = []
+
+    def route(request):
+        calls.append(request)
+        if len(calls) <= times:
+            return status, dict(headers or {}), b""
+        return 200, {}, b"ok"
+    return route
+
+
+def client_for(server, **retry):
+    retry.setdefault("backoff_base", 0.001)
+    return DarkstorageClient(api_key="key", base_url=server.url, retry=RetryConfig(**retry))
+
+
+def test_idempotent_request_is_retried(server):
+    server.route("GET", "/v1/flaky", failing(2))
+    client = client_for(server)
+
+    assert client.get("/v1/flaky").content == b"ok"
+    assert len(server.received("GET", "/v1/flaky")) == 3
+    assert client.retry_stats()["retries"] == 2
+
+
+def test_post_is_only_retried_when_opted_in(server):
+    server.route("POST", "/v1/once", failing(1))
+    server.route("POST", "/v1/opted", failing(1))
+    client = client_for(server)
+
+    with pytest.raises(requests.HTTPError):
+        client.post("/v1/once", json={})
+    assert client.post("/v1/opted", json={}, retry=True).content == b"ok"
+    assert len(server.received("POST", "/v1/once")) == 1
+    assert len(server.received("POST", "/v1/opted")) == 2
+
+
+def test_other_statuses_are_not_retried(server):
+    server.route("GET", "/v1/broken", failing(1, status=500))
+    with pytest.raises(requests.HTTPError):
+        client_for(server).get("/v1/broken")
+    assert len(server.received("GET", "/v1/broken")) == 1
+
+
+def test_gives_up_after_max_retries(server):
+    server.route("GET", "/v1/down", failing(10))
+    client = client_for(server, max_retries=2)
+
+    with pytest.raises(requests.HTTPError):
+        client.get("/v1/down")
+    assert len(server.received("GET", "/v1/down")) == 3
+    assert client.retry_stats()["gave_up"] == 1
+
+
+def test_retry_after_sets_the_delay(server, monkeypatch):
+    delays = []
+    monkeypatch.setattr(time, "sleep", delays.append)
+    server.route("GET", "/v1/throttled", failing(1, status=429, headers={"Retry-After": "3"}))
+
+    assert client_for(server).get("/v1/throttled").content == b"ok"
+    assert delays == [3.0]
+
+
+def test_retry_after_forms():
+    policy = RetryPolicy(RetryConfig(retry_after_max=60))
+    assert policy.retry_after(FakeResponse(429, {"Retry-After": "7"})) == 7.0
+    assert policy.retry_after(FakeResponse(429, {"Retry-After": formatdate(time.time() + 30, usegmt=True)})) == \
+        pytest.approx(30, abs=2)
+    assert policy.retry_after(FakeResponse(429, {"Retry-After": "soon"})) is None
+    # Waiting longer than retry_after_max is not worth it
+    assert policy.next_delay(0, FakeResponse(503, {"Retry-After": "600"})) is None
+
+
+def test_backoff_is_capped_full_jitter():
+    policy = RetryPolicy(RetryConfig(backoff_base=1.0, backoff_max=4.0))
+    for attempt, cap in [(0, 1.0), (1, 2.0), (2, 4.0), (5, 4.0)]:
+        assert all(0 <= policy.backoff(attempt) <= cap for _ in range(50))
+
+
+def test_budget_limits_retries(server):
+    server.route("GET", "/v1/down", failing(100))
+    client = client_for(server, budget_capacity=1, budget_ratio=0)
+
+    for _ in range(2):
+        with pytest.raises(requests.HTTPError):
+            client.get("/v1/down")
+
+    # The only token went to the first request's first retry
+    assert len(server.received("GET", "/v1/down")) == 3
+    stats = client.retry_stats()
+    assert stats["retries"] == 1 and stats["budget_exhausted"] == 2 and stats["budget_tokens"] == 0
+
+
+def test_budget_refills_with_traffic():
+    budget = RetryBudget(ratio=0.5, capacity=2)
+    assert budget.withdraw() and budget.withdraw() and not budget.withdraw()
+    budget.deposit()
+    assert not budget.withdraw()
+    budget.deposit()
+    assert budget.withdraw()
+    for _ in range(10):
+        budget.deposit()
+    assert budget.tokens == 2
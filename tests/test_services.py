@@ -0,0 +1,50 @@
+"""Lazily created service helpers are created once under concurrent first use."""
+import threading
+import time
+
+import pytest
+
+from aftershipstorage import AiserveClient, Models2GoClient, services
+
+
+class SlowHelper:
+    created = 0
+
+    def __init__(self, *args, **kwargs):
+        type(self).created += 1
+        time.sleep(0.05)
+
+    def close(self):
+        pass
+
+
+def first_use(read, threads=8):
+    barrier = threading.Barrier(threads)
+    seen = []
+
+    def run():
+        barrier.wait()
+        seen.append(read())
+
+    workers = [threading.Thread(target=run) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return seen
+
+
+@pytest.mark.parametrize("client_class,attribute,helper", [
+    (AiserveClient, "jobs", "JobWaiter"),
+    (Models2GoClient, "registry", "ModelRegistry"),
+    (Models2GoClient, "artifact_cache", "ArtifactCache"),
+])
+def test_lazy_helper_is_created_once(monkeypatch, client_class, attribute, helper):
+    slow = type("Slow" + helper, (SlowHelper,), {"created": 0})
+    monkeypatch.setattr(services, helper, slow)
+    client = client_class(api_key="key")
+
+    seen = first_use(lambda: getattr(client, attribute))
+
+    assert slow.created == 1
+    assert all(value is seen[0] for value in seen)
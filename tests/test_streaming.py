@@ -0,0 +1,100 @@
+"""Incremental JSON, NDJSON and SSE decoding of streamed response bodies."""
+import json
+
+import pytest
+
+from aftershipstorage import DarkstorageClient
+from aftershipstorage.streaming import JSONItemParser, NDJSONParser, SSEParser, iter_items, make_parser
+
+
+def chunked(data, size):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+class CountingDecoder(json.JSONDecoder):
+
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    def raw_decode(self, s, idx=0):
+        self.calls += 1
+        return super().raw_decode(s, idx)
+
+
+@pytest.mark.parametrize("size", [1, 3, 7, 1024])
+def test_items_and_metadata_survive_any_chunking(size):
+    items = [{"key": "a\"]}", "size": 12.5e3}, [1, [2, {}]], "é☃", -7, True, None]
+    body = json.dumps({"count": 6, "objects": items, "next_cursor": "c2"}, ensure_ascii=False).encode()
+    parser = JSONItemParser()
+
+    assert list(iter_items(chunked(body, size), parser)) == items
+    assert parser.metadata == {"count": 6, "next_cursor": "c2"}
+
+
+def test_items_are_yielded_as_their_chunks_arrive():
+    parser = JSONItemParser()
+    assert parser.feed(b'[{"a": 1}, {"b": ') == [{"a": 1}]
+    assert parser.feed(b'2}, 12') == [{"b": 2}]  # The number may continue
+    assert parser.feed(b'34]') == [1234]
+    assert parser.close() == []
+
+
+def test_large_item_is_decoded_once():
+    parser = JSONItemParser()
+    parser._decoder = decoder = CountingDecoder()
+    body = json.dumps([{"blob": "x" * 100000}, 1]).encode()
+
+    assert list(iter_items(chunked(body, 100), parser)) == [{"blob": "x" * 100000}, 1]
+    assert decoder.calls == 2
+
+
+@pytest.mark.parametrize("chunk", [b"[1, }", b'[{"a": 1]', b"[1, @", b'{"items": [1 2'])
+def test_malformed_body_fails_without_waiting_for_the_end(chunk):
+    with pytest.raises(ValueError, match="Malformed"):
+        JSONItemParser().feed(chunk)
+
+
+@pytest.mark.parametrize("body", [b'[{"a": 1}, {"b"', b'[1, 2', b'{"items": [1]'])
+def test_truncated_body_fails_on_close(body):
+    parser = JSONItemParser()
+    parser.feed(body)
+    with pytest.raises(ValueError):
+        parser.close()
+
+
+def test_missing_item_array_is_reported():
+    parser = JSONItemParser()
+    parser.feed(b'{"count": 0}')
+    with pytest.raises(ValueError, match="items_key"):
+        parser.close()
+
+
+def test_ndjson_and_sse_parsers():
+    ndjson = NDJSONParser()
+    assert list(iter_items([b'{"a": 1}\n{"b"', b': 2}\n\n{"c": 3}'], ndjson)) == [{"a": 1}, {"b": 2}, {"c": 3}]
+
+    sse = SSEParser()
+    stream = b': keep-alive\nid: 7\nevent: metric\ndata: {"loss":\ndata: 0.5}\n\nretry: 3000\ndata: {"cut'
+    assert list(iter_items(chunked(stream, 5), sse)) == [{"loss": 0.5}]
+    assert sse.metadata == {"id": "7", "event": "metric", "retry": 3000}
+
+
+def test_format_is_chosen_from_content_type():
+    assert isinstance(make_parser("auto", "application/x-ndjson"), NDJSONParser)
+    assert isinstance(make_parser("auto", "text/event-stream; charset=utf-8"), SSEParser)
+    assert isinstance(make_parser("auto", "application/json"), JSONItemParser)
+    with pytest.raises(ValueError):
+        make_parser("xml", None)
+
+
+def test_client_streams_items(server):
+    objects = [{"key": f"model-{i}.bin", "size": i} for i in range(500)]
+    body = json.dumps({"objects": objects, "next_cursor": "abc"}).encode()
+    server.route("GET", "/v1/buckets/models/objects",
+                 lambda request: (200, {"Content-Type": "application/json"}, body))
+    client = DarkstorageClient(api_key="key", base_url=server.url)
+
+    with client.stream_items("/v1/buckets/models/objects", chunk_size=256) as stream:
+        assert list(stream) == objects
+        assert stream.metadata == {"next_cursor": "abc"}
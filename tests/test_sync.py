@@ -0,0 +1,128 @@
+"""DirectorySync planning, transfer artifacts and path safety."""
+import hashlib
+import json
+import os
+
+import pytest
+
+from aftershipstorage import DarkstorageClient, sync as sync_module
+from aftershipstorage.sync import DirectorySync, content_digest, is_safe_relative_path, is_transfer_artifact
+
+
+def listing(server, keys):
+    objects = [{"key": key, "size": 1, "etag": f'"{i}"'} for i, key in enumerate(keys)]
+
+    def handler(request):
+        page = objects if "offset=0" in request.path or "offset" not in request.path else []
+        return 200, {"Content-Type": "application/json"}, json.dumps({"objects": page}).encode()
+
+    server.route("GET", "/v1/buckets/bucket/objects", handler)
+
+
+def syncer(server, local_dir, **kwargs):
+    client = DarkstorageClient(api_key="key", base_url=server.url)
+    return DirectorySync(client, str(local_dir), "bucket", **kwargs)
+
+
+def test_upload_plan(server, tmp_path):
+    (tmp_path / "a.txt").write_text("a")
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "sub" / "b.txt").write_text("b")
+    result = syncer(server, tmp_path, dry_run=True).run()
+
+    assert sorted(result.uploaded) == ["a.txt", "sub/b.txt"]
+    assert not server.requests  # Uploads do not list the bucket
+
+
+def test_files_are_read_once_per_upload(server, storage, tmp_path, monkeypatch):
+    upload_url = f"{storage.url}/presigned/object"
+    server.route("POST", "/v1/upload", lambda r: (
+        200, {"Content-Type": "application/json"}, json.dumps({"upload_url": upload_url}).encode()
+    ))
+    storage.route("PUT", "/presigned/object", lambda r: (200, {}, b""))
+    hashed = []
+    digest = sync_module.file_digest
+    monkeypatch.setattr(sync_module, "file_digest", lambda path, *args: hashed.append(path) or digest(path, *args))
+    local = tmp_path / "dir"
+    local.mkdir()
+    (local / "a.txt").write_text("first")
+
+    assert syncer(server, local).run().uploaded == ["a.txt"]
+    assert hashed == []  # Hashed while it was sent
+    os.utime(local / "a.txt", ns=(0, 0))
+    result = syncer(server, local).run()
+
+    assert result.uploaded == [] and result.unchanged == 1
+    assert len(hashed) == 1 and len(storage.received("PUT", "/presigned/object")) == 1
+
+
+def test_content_digest():
+    digest = hashlib.sha256(b"x").hexdigest()
+    assert content_digest(f"sha256:{digest}") == digest
+    assert content_digest(f"sha256:{digest}-3") is None
+    assert content_digest("md5:abc") is None and content_digest(None) is None
+
+
+def test_download_plan(server, tmp_path):
+    listing(server, ["x.bin", "dir/y.bin", "dir/"])
+    result = syncer(server, tmp_path, direction="download", dry_run=True).run()
+
+    assert sorted(result.downloaded) == ["dir/y.bin", "x.bin"]
+    assert result.ok
+
+
+def test_unsafe_remote_keys_are_rejected(server, tmp_path):
+    unsafe = ["../escape.txt", "/etc/passwd", "a/../../escape.txt", "a//b", "./c"]
+    listing(server, ["ok.txt"] + unsafe)
+    result = syncer(server, tmp_path / "dir", direction="download", dry_run=True).run()
+
+    assert result.downloaded == ["ok.txt"]
+    assert sorted(result.errors) == sorted(unsafe)
+
+
+def test_symlink_escape_is_refused(server, tmp_path):
+    outside = tmp_path / "outside"
+    outside.mkdir()
+    local_dir = tmp_path / "dir"
+    local_dir.mkdir()
+    os.symlink(outside, local_dir / "link")
+    sync = syncer(server, local_dir)
+
+    assert sync._local("sub/file") == os.path.join(str(local_dir), "sub", "file")
+    with pytest.raises(ValueError, match="outside"):
+        sync._local("link/file")
+
+
+@pytest.mark.parametrize("rel_path, safe", [
+    ("a", True),
+    ("a/b.txt", True),
+    ("..a/b..", True),
+    ("..", False),
+    ("a/..", False),
+    ("/a", False),
+    ("a/./b", False),
+    ("", False),
+])
+def test_is_safe_relative_path(rel_path, safe):
+    assert is_safe_relative_path(rel_path) is safe
+
+
+def test_only_transfer_artifacts_are_ignored(server, tmp_path):
+    names = [
+        "model.bin.part", "model.bin.download-state", "model.bin.download-state.tmp",
+        "big.bin", "big.bin.upload-state",
+        "notes.part", "scratch.tmp", "orphan.upload-state",
+    ]
+    for name in names:
+        (tmp_path / name).write_text(name)
+    result = syncer(server, tmp_path, dry_run=True).run()
+
+    assert sorted(result.uploaded) == ["big.bin", "notes.part", "orphan.upload-state", "scratch.tmp"]
+
+
+def test_is_transfer_artifact():
+    assert is_transfer_artifact("a.part", {"a.download-state"})
+    assert is_transfer_artifact("a.download-state", {"a.part"})
+    assert is_transfer_artifact("a.upload-state", {"a"})
+    assert not is_transfer_artifact("a.part", set())
+    assert not is_transfer_artifact("a.tmp", {"a"})
@@ -0,0 +1,34 @@
+"""TransferController: the bandwidth cap must not read as rising latency."""
+import time
+
+from aftershipstorage import TransferConfig
+from aftershipstorage.throttle import TransferController
+
+
+def part(controller, nbytes, work=0.01):
+    with controller.slot(nbytes):
+        time.sleep(work)
+        controller.count_bytes(nbytes)
+
+
+def test_bandwidth_wait_is_not_latency():
+    rate = 1_000_000
+    controller = TransferController(TransferConfig(adaptive=True, concurrency=4, max_bandwidth=rate))
+    part(controller, rate // 20)  # Unthrottled: sets the latency baseline
+    controller.count_bytes(rate - rate // 20)  # Spend the rest of the initial burst
+    for _ in range(4):
+        part(controller, rate // 20)  # Each waits about 50ms for tokens
+
+    stats = controller.stats()
+    assert stats["throttled"] >= 0.1
+    assert stats["backoffs"] == 0
+    assert controller.limit >= 4
+
+
+def test_latency_rise_still_cuts_the_limit():
+    controller = TransferController(TransferConfig(adaptive=True, concurrency=4))
+    part(controller, 1000, work=0.01)
+    part(controller, 1000, work=0.1)
+
+    assert controller.stats()["backoffs"] == 1
+    assert controller.limit < 4
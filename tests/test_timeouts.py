@@ -0,0 +1,84 @@
+"""Timeout resolution per endpoint and deadline propagation."""
+import time
+
+import pytest
+import requests
+
+from aftershipstorage import Config, DarkstorageClient, DeadlineExceeded, TimeoutConfig, deadline
+from aftershipstorage.timeouts import TimeoutPolicy, remaining
+
+
+def test_timeouts_resolve_by_endpoint_pattern():
+    policy = TimeoutPolicy(TimeoutConfig(connect=2, read=10, endpoints={
+        "/v1/inference/*": 120,
+        "v1/buckets/*/objects": {"read": 60},
+        "/v1/compute/*": [1, 5],
+        "/v1/*": 3,
+    }))
+
+    assert policy.resolve("/v1/inference/batch") == (2.0, 120.0)
+    assert policy.resolve("/v1/buckets/b/objects?limit=10") == (2.0, 60.0)
+    assert policy.resolve("v1/compute/jobs") == (1.0, 5.0)
+    assert policy.resolve("/v1/pricing") == (2.0, 3.0)  # First matching pattern wins
+    assert policy.resolve("/health") == (2.0, 10.0)
+    assert policy.resolve("/v1/inference/batch", timeout=4) == (4.0, 4.0)
+    assert policy.resolve("/v1/inference/batch", timeout=(1, 7)) == (1.0, 7.0)
+
+
+def test_read_timeout_defaults_to_settings_timeout():
+    config = Config.from_dict({
+        "settings": {"timeout": 45, "timeouts": {"connect": 3}},
+        "aiserve": {"timeouts": {"read": 300}},
+    })
+    assert (config.resolve_timeouts("darkship").connect, config.resolve_timeouts("darkship").read) == (3, 45)
+    assert config.resolve_timeouts("aiserve").read == 300
+    assert TimeoutPolicy().resolve("/anything") == (10.0, 30.0)
+
+
+def test_deadline_caps_timeouts_and_nests():
+    policy = TimeoutPolicy(TimeoutConfig(connect=10, read=60))
+    assert remaining() is None
+
+    with deadline(5):
+        connect, read = policy.resolve("/v1/x")
+        assert 4 < connect <= 5 and 4 < read <= 5
+        with deadline(60):
+            assert remaining() <= 5  # An inner deadline cannot extend the outer one
+        with deadline(1):
+            assert remaining() <= 1
+    assert remaining() is None
+
+
+def test_expired_deadline_raises_before_sending(server):
+    server.route("GET", "/v1/ping", lambda r: (200, {}, b"ok"))
+    client = DarkstorageClient(api_key="key", base_url=server.url)
+
+    with deadline(0.01):
+        time.sleep(0.02)
+        with pytest.raises(DeadlineExceeded):
+            client.get("/v1/ping")
+    assert server.received("GET", "/v1/ping") == []
+
+
+def test_deadline_bounds_a_slow_request(server):
+    def slow(request):
+        time.sleep(0.5)
+        return 200, {}, b"late"
+
+    server.route("GET", "/v1/slow", slow)
+    client = DarkstorageClient(api_key="key", base_url=server.url)
+
+    started = time.monotonic()
+    with deadline(0.1), pytest.raises(requests.Timeout):
+        client.get("/v1/slow", retry=False)
+    assert time.monotonic() - started < 0.4
+
+
+def test_deadline_follows_fanout_workers(server):
+    server.route("GET", "/v1/ping", lambda r: (200, {}, b"ok"))
+    client = DarkstorageClient(api_key="key", base_url=server.url)
+
+    with deadline(0.01):
+        time.sleep(0.02)
+        results = list(client.map(["/v1/ping", "/v1/ping"], concurrency=2))
+    assert all(isinstance(result.error, DeadlineExceeded) for result in results)
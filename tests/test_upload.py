@@ -0,0 +1,23 @@
+"""MultipartUpload: choosing between a single PUT and multipart uploads."""
+import hashlib
+import json
+
+from aftershipstorage import DarkstorageClient, TransferConfig
+
+
+def test_empty_file_is_sent_with_a_single_put(server, storage, tmp_path):
+    upload_url = f"{storage.url}/presigned/object"
+    server.route("POST", "/v1/upload", lambda r: (
+        200, {"Content-Type": "application/json"}, json.dumps({"upload_url": upload_url}).encode()
+    ))
+    storage.route("PUT", "/presigned/object", lambda r: (200, {}, b""))
+    path = tmp_path / "empty.bin"
+    path.write_bytes(b"")
+    client = DarkstorageClient(api_key="key", base_url=server.url, transfer=TransferConfig(multipart_threshold=0))
+
+    result = client.upload_file(str(path), "b", "empty.bin", resume=False)
+
+    assert (result.size, result.parts) == (0, 1)
+    assert result.checksum == f"sha256:{hashlib.sha256(b'').hexdigest()}"
+    assert storage.received("PUT", "/presigned/object")[0].body == b""
+    assert not server.received("POST", "/v1/buckets/b/uploads")